@@ -5,6 +5,11 @@ Polls 4 metrics every BINANCE_POLL_SEC seconds:
   - global_ls_ratio  (globalLongShortAccountRatio)
   - taker_ls_ratio   (takerlongshortRatio)
   - basis
+
+심볼(ALT_SYMBOL_BINANCE + BINANCE_METRIC_SYMBOLS) × period(BINANCE_METRIC_PERIOD +
+BINANCE_METRIC_PERIODS) 조합의 요청을 한 AsyncClient로 동시에 보내고 (asyncio.gather),
+결과를 모아 upsert_futures_metrics 한 번(to_thread)으로 기록한다.
+동시 요청 수와 분당 weight는 BinanceWeightGate가 제한 (X-MBX-USED-WEIGHT-1M / Retry-After 반영).
 """
 
 from __future__ import annotations
@@ -16,7 +21,7 @@ from datetime import datetime, timezone
 
 import httpx
 
-from app.altdata.writer import upsert_futures_metric
+from app.altdata.writer import futures_metric_row, upsert_futures_metrics
 from app.config import Settings
 from sqlalchemy.engine import Engine
 
@@ -25,21 +30,104 @@ log = logging.getLogger(__name__)
 _MAX_RETRY = 3
 _RETRY_BASE = 2.0  # seconds
 
+# 요청당 weight 추정치 (응답 헤더가 오면 서버 값으로 보정)
+_ENDPOINT_WEIGHT = {
+    "/fapi/v1/openInterest": 1,
+    "/futures/data/globalLongShortAccountRatio": 1,
+    "/futures/data/takerlongshortRatio": 1,
+    "/futures/data/basis": 1,
+}
+
+
+def _split(spec: str) -> list[str]:
+    return [p.strip() for p in spec.split(",") if p.strip()]
+
+
+class BinanceWeightGate:
+    """동시 요청 수 + 분당 request weight 제한.
+
+    - Semaphore(concurrency): in-flight 요청 상한
+    - 분 단위 창마다 사용 weight를 로컬 추정 + X-MBX-USED-WEIGHT-1M 헤더로 보정,
+      weight_limit_1m * headroom에 닿으면 다음 분 경계까지 대기
+    - 429/418이면 Retry-After(없으면 지수 backoff) 동안 모든 요청 정지
+    """
+
+    def __init__(self, concurrency: int, weight_limit_1m: int, headroom: float = 0.8) -> None:
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self.budget = max(1.0, weight_limit_1m * headroom)
+        self.used_weight = 0
+        self._window = int(time.time() // 60)
+        self._blocked_until = 0.0
+        self.waits = 0
+        self.bans = 0
+
+    def _roll(self, now: float) -> None:
+        window = int(now // 60)
+        if window != self._window:
+            self._window = window
+            self.used_weight = 0
+
+    async def acquire(self, weight: int) -> None:
+        await self._sem.acquire()
+        while True:
+            now = time.time()
+            self._roll(now)
+            if self._blocked_until > now:
+                delay = self._blocked_until - now
+            elif self.used_weight + weight > self.budget:
+                delay = (self._window + 1) * 60 - now + 0.05
+            else:
+                self.used_weight += weight
+                return
+            self.waits += 1
+            log.info("Binance weight gate: used=%d budget=%.0f — wait %.1fs", self.used_weight, self.budget, delay)
+            await asyncio.sleep(delay)
+
+    def release(self) -> None:
+        self._sem.release()
+
+    def observe(self, resp: httpx.Response, attempt: int) -> None:
+        self._roll(time.time())
+        used = resp.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is not None:
+            try:
+                self.used_weight = max(self.used_weight, int(used))
+            except ValueError:
+                pass
+        if resp.status_code in (429, 418):
+            self.bans += 1
+            try:
+                wait = float(resp.headers.get("Retry-After") or 0)
+            except ValueError:
+                wait = 0.0
+            wait = wait or _RETRY_BASE * (2 ** attempt)
+            self._blocked_until = max(self._blocked_until, time.time() + wait)
+
 
-async def _get(client: httpx.AsyncClient, url: str, params: dict) -> dict | list | None:
+async def _get(
+    client: httpx.AsyncClient,
+    url: str,
+    params: dict,
+    gate: BinanceWeightGate | None = None,
+) -> dict | list | None:
     """GET with retry/backoff on 429/418/5xx."""
+    weight = _ENDPOINT_WEIGHT.get(url, 1)
     for attempt in range(_MAX_RETRY):
+        if gate is not None:
+            await gate.acquire(weight)
         try:
             t0 = time.time()
             resp = await client.get(url, params=params, timeout=10.0)
             latency_ms = int((time.time() - t0) * 1000)
+            if gate is not None:
+                gate.observe(resp, attempt)
             if resp.status_code == 200:
                 log.debug("GET %s params=%s latency=%dms", url, params, latency_ms)
                 return resp.json()
             if resp.status_code in (429, 418):
-                wait = _RETRY_BASE * (2 ** attempt)
-                log.warning("Rate limit %d on %s, retry in %.1fs", resp.status_code, url, wait)
-                await asyncio.sleep(wait)
+                log.warning("Rate limit %d on %s params=%s, retrying", resp.status_code, url, params)
+                if gate is None:
+                    await asyncio.sleep(_RETRY_BASE * (2 ** attempt))
                 continue
             log.warning("HTTP %d on %s", resp.status_code, url)
             return None
@@ -47,6 +135,9 @@ async def _get(client: httpx.AsyncClient, url: str, params: dict) -> dict | list
             wait = _RETRY_BASE * (2 ** attempt)
             log.warning("Request error (%s) %s, retry in %.1fs", exc, url, wait)
             await asyncio.sleep(wait)
+        finally:
+            if gate is not None:
+                gate.release()
     return None
 
 
@@ -66,24 +157,34 @@ class BinanceFuturesRestPoller:
         self._stop = False
         self.last_poll_ts: float = 0.0
         self.poll_count: int = 0
+        s = settings
+        self.symbols = list(dict.fromkeys([s.ALT_SYMBOL_BINANCE, *_split(s.BINANCE_METRIC_SYMBOLS)]))
+        self.periods = list(dict.fromkeys([s.BINANCE_METRIC_PERIOD, *_split(s.BINANCE_METRIC_PERIODS)]))
+        self.gate = BinanceWeightGate(
+            s.BINANCE_REST_CONCURRENCY, s.BINANCE_REST_WEIGHT_LIMIT_1M, s.BINANCE_REST_WEIGHT_HEADROOM,
+        )
 
     async def run(self) -> None:
         s = self.settings
         base = s.BINANCE_FUTURES_REST_BASE
-        symbol = s.ALT_SYMBOL_BINANCE
-        period = s.BINANCE_METRIC_PERIOD
         poll_sec = s.BINANCE_POLL_SEC
+        limits = httpx.Limits(
+            max_connections=s.BINANCE_REST_CONCURRENCY,
+            max_keepalive_connections=s.BINANCE_REST_CONCURRENCY,
+        )
 
-        async with httpx.AsyncClient(base_url=base) as client:
+        async with httpx.AsyncClient(base_url=base, limits=limits) as client:
             while not self._stop:
                 try:
                     now = datetime.now(timezone.utc)
-                    await self._poll_all(client, symbol, period, now)
+                    t0 = time.monotonic()
+                    n_rows = await self._poll_all(client, now)
                     self.last_poll_ts = time.time()
                     self.poll_count += 1
                     log.info(
-                        "Binance REST poll #%d done (symbol=%s period=%s)",
-                        self.poll_count, symbol, period,
+                        "Binance REST poll #%d done (symbols=%d periods=%s rows=%d %.0fms weight=%d)",
+                        self.poll_count, len(self.symbols), self.periods, n_rows,
+                        (time.monotonic() - t0) * 1000, self.gate.used_weight,
                     )
                 except asyncio.CancelledError:
                     break
@@ -91,68 +192,90 @@ class BinanceFuturesRestPoller:
                     log.exception("Binance REST poll error")
                 await asyncio.sleep(poll_sec)
 
-    async def _poll_all(
-        self,
-        client: httpx.AsyncClient,
-        symbol: str,
-        period: str,
-        now: datetime,
-    ) -> None:
-        # Bucket ts to minute
-        ts_bucket = now.replace(second=0, microsecond=0)
-
+    async def _open_interest(self, client: httpx.AsyncClient, symbol: str, ts_bucket: datetime) -> list[dict]:
         # 1) Open Interest (snapshot)
-        data = await _get(client, "/fapi/v1/openInterest", {"symbol": symbol})
-        if data and isinstance(data, dict):
-            value = float(data.get("openInterest") or 0) or None
-            ts = _ts_from_ms(data.get("time")) or ts_bucket
-            upsert_futures_metric(
-                self.engine, ts, symbol, "open_interest", value, None, "snapshot", data
-            )
+        data = await _get(client, "/fapi/v1/openInterest", {"symbol": symbol}, self.gate)
+        if not data or not isinstance(data, dict):
+            return []
+        value = float(data.get("openInterest") or 0) or None
+        ts = _ts_from_ms(data.get("time")) or ts_bucket
+        return [futures_metric_row(ts, symbol, "open_interest", value, None, "snapshot", data)]
 
+    async def _global_ls(
+        self, client: httpx.AsyncClient, symbol: str, period: str, ts_bucket: datetime,
+    ) -> list[dict]:
         # 2) Global Long/Short Account Ratio
         # Use ts_bucket (poll time) as ts so lag reflects when we polled, not bucket age
         rows = await _get(
             client,
             "/futures/data/globalLongShortAccountRatio",
             {"symbol": symbol, "period": period, "limit": 2},
+            self.gate,
         )
-        if rows and isinstance(rows, list) and len(rows) > 0:
-            row = rows[-1]  # most recent
-            long_acct = float(row.get("longAccount") or 0) or None
-            short_acct = float(row.get("shortAccount") or 0) or None
-            ls_ratio = float(row.get("longShortRatio") or 0) or None
-            upsert_futures_metric(
-                self.engine, ts_bucket, symbol, "global_ls_ratio", ls_ratio, long_acct, period, row
-            )
+        if not rows or not isinstance(rows, list):
+            return []
+        row = rows[-1]  # most recent
+        long_acct = float(row.get("longAccount") or 0) or None
+        ls_ratio = float(row.get("longShortRatio") or 0) or None
+        return [futures_metric_row(ts_bucket, symbol, "global_ls_ratio", ls_ratio, long_acct, period, row)]
 
+    async def _taker_ls(
+        self, client: httpx.AsyncClient, symbol: str, period: str, ts_bucket: datetime,
+    ) -> list[dict]:
         # 3) Taker Buy/Sell Volume Ratio
         rows = await _get(
             client,
             "/futures/data/takerlongshortRatio",
             {"symbol": symbol, "period": period, "limit": 2},
+            self.gate,
         )
-        if rows and isinstance(rows, list) and len(rows) > 0:
-            row = rows[-1]
-            buy_vol = float(row.get("buySellRatio") or 0) or None
-            sell_vol = float(row.get("sellVol") or 0) or None
-            upsert_futures_metric(
-                self.engine, ts_bucket, symbol, "taker_ls_ratio", buy_vol, sell_vol, period, row
-            )
+        if not rows or not isinstance(rows, list):
+            return []
+        row = rows[-1]
+        buy_vol = float(row.get("buySellRatio") or 0) or None
+        sell_vol = float(row.get("sellVol") or 0) or None
+        return [futures_metric_row(ts_bucket, symbol, "taker_ls_ratio", buy_vol, sell_vol, period, row)]
 
+    async def _basis(
+        self, client: httpx.AsyncClient, symbol: str, period: str, ts_bucket: datetime,
+    ) -> list[dict]:
         # 4) Basis (uses "pair" param instead of "symbol")
         rows = await _get(
             client,
             "/futures/data/basis",
             {"pair": symbol, "contractType": "PERPETUAL", "period": period, "limit": 2},
+            self.gate,
         )
-        if rows and isinstance(rows, list) and len(rows) > 0:
-            row = rows[-1]
-            basis = float(row.get("basis") or 0) or None
-            basis_rate = float(row.get("basisRate") or 0) or None
-            upsert_futures_metric(
-                self.engine, ts_bucket, symbol, "basis", basis, basis_rate, period, row
-            )
+        if not rows or not isinstance(rows, list):
+            return []
+        row = rows[-1]
+        basis = float(row.get("basis") or 0) or None
+        basis_rate = float(row.get("basisRate") or 0) or None
+        return [futures_metric_row(ts_bucket, symbol, "basis", basis, basis_rate, period, row)]
+
+    async def _poll_all(self, client: httpx.AsyncClient, now: datetime) -> int:
+        """모든 (endpoint, symbol, period) 요청을 동시에 → 한 번에 upsert. 기록한 행 수 반환."""
+        # Bucket ts to minute
+        ts_bucket = now.replace(second=0, microsecond=0)
+
+        jobs = []
+        for symbol in self.symbols:
+            jobs.append(self._open_interest(client, symbol, ts_bucket))
+            for period in self.periods:
+                jobs.append(self._global_ls(client, symbol, period, ts_bucket))
+                jobs.append(self._taker_ls(client, symbol, period, ts_bucket))
+                jobs.append(self._basis(client, symbol, period, ts_bucket))
+
+        rows: list[dict] = []
+        for result in await asyncio.gather(*jobs, return_exceptions=True):
+            if isinstance(result, BaseException):
+                log.warning("Binance REST metric job failed: %s", result)
+                continue
+            rows.extend(result)
+
+        if rows:
+            await asyncio.to_thread(upsert_futures_metrics, self.engine, rows)
+        return len(rows)
 
     def stop(self) -> None:
         self._stop = True
@@ -1,8 +1,9 @@
 """Binance Futures WebSocket collector.
 
 두 스트림을 각각 별도 커넥션으로 처리:
-  - !markPrice@arr@1s  → binance_mark_price_1s
-  - !forceOrder@arr    → binance_force_orders
+  - !markPrice@arr@1s  → binance_mark_price_1s (MarkPriceBatchWriter 경유, event loop에서 DB I/O 없음)
+                         + BINANCE_MARK_UNIVERSE 설정 시 초당 1행 columnar chunk → binance_mark_universe_1s
+  - !forceOrder@arr    → binance_force_orders (+ binance_liq_1s, asyncio.to_thread)
 """
 
 from __future__ import annotations
@@ -12,13 +13,22 @@ import json
 import logging
 import random
 import time
+from collections.abc import Callable
 from datetime import datetime, timezone
 
 import websockets
 from sqlalchemy.engine import Engine
 
-from app.altdata.writer import insert_force_order, insert_mark_price
+from app.altdata.liq_rollup import get_liq_rollup
+from app.altdata.universe import parse_universe, universe_chunk
+from app.altdata.writer import (
+    insert_force_order,
+    insert_mark_prices,
+    insert_mark_universe,
+    mark_price_row,
+)
 from app.config import Settings
+from app.db.batch import BatchWriter
 
 log = logging.getLogger(__name__)
 
@@ -26,14 +36,43 @@ _RECONNECT_MIN = 1.0
 _RECONNECT_MAX = 60.0
 
 
+def _notional(order: dict) -> float | None:
+    price = float(order.get("p") or order.get("price") or 0)
+    qty = float(order.get("q") or order.get("origQty") or 0)
+    return price * qty if price and qty else None
+
+
 def _backoff(attempt: int) -> float:
     """Exponential backoff with jitter."""
     base = min(_RECONNECT_MAX, _RECONNECT_MIN * (2 ** attempt))
     return base * (0.5 + random.random() * 0.5)
 
 
+class MarkPriceBatchWriter(BatchWriter):
+    """markPrice용 BatchWriter (app.db.batch).
+
+    insert_fn(engine, rows): 기본 insert_mark_prices (binance_mark_price_1s),
+    universe chunk는 insert_mark_universe (binance_mark_universe_1s).
+    WS handler는 put()만 호출하고, flush/backoff/drop 정책은 BatchWriter 그대로.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        flush_sec: float = 1.0,
+        batch_max: int = 500,
+        buffer_max: int = 10_000,
+        insert_fn: Callable[[Engine, list[dict]], None] = insert_mark_prices,
+        name: str = "markPrice",
+    ) -> None:
+        super().__init__(engine, flush_sec, batch_max, buffer_max, insert_fn=insert_fn, name=name)
+
+
 class BinanceMarkPriceWs:
-    """Streams !markPrice@arr@1s, stores BTCUSDT rows."""
+    """Streams !markPrice@arr@1s, buffers BTCUSDT rows for MarkPriceBatchWriter.
+
+    raw_json은 BINANCE_MARK_RAW_JSON_EVERY_SEC 간격으로만 저장 (1=매 row, 0=저장 안 함).
+    """
 
     def __init__(self, settings: Settings, engine: Engine) -> None:
         self.settings = settings
@@ -42,8 +81,48 @@ class BinanceMarkPriceWs:
         self.last_insert_ts: float = 0.0
         self.connected: bool = False
         self.insert_count: int = 0
+        self._last_raw_ts: float = 0.0
+        self.writer = MarkPriceBatchWriter(
+            engine,
+            flush_sec=settings.BINANCE_MARK_FLUSH_SEC,
+            batch_max=settings.BINANCE_MARK_BATCH_MAX,
+            buffer_max=settings.BINANCE_MARK_BUFFER_MAX,
+        )
+        # 전체/지정 심볼 universe — 메시지당 chunk 1개라 buffer 단위는 '초'
+        self.universe = parse_universe(settings.BINANCE_MARK_UNIVERSE)
+        self.universe_writer: MarkPriceBatchWriter | None = None
+        if self.universe is None or self.universe:
+            self.universe_writer = MarkPriceBatchWriter(
+                engine,
+                flush_sec=settings.BINANCE_MARK_FLUSH_SEC,
+                batch_max=60,
+                buffer_max=settings.BINANCE_MARK_UNIVERSE_BUFFER_SEC,
+                insert_fn=insert_mark_universe,
+                name="markPrice universe",
+            )
 
     async def run(self) -> None:
+        writers = [w for w in (self.writer, self.universe_writer) if w is not None]
+        flushers = [asyncio.create_task(w.run(), name=f"binance_{w.name}_flush") for w in writers]
+        try:
+            await self._run_ws()
+        finally:
+            for w in writers:
+                w.stop()
+            await asyncio.gather(*flushers, return_exceptions=True)
+            for w in writers:
+                log.info("%s writer stopped: %s", w.name, w.stats())
+
+    def _keep_raw(self, now: float) -> bool:
+        every = self.settings.BINANCE_MARK_RAW_JSON_EVERY_SEC
+        if every <= 0:
+            return False
+        if now - self._last_raw_ts >= every:
+            self._last_raw_ts = now
+            return True
+        return False
+
+    async def _run_ws(self) -> None:
         s = self.settings
         url = f"{s.BINANCE_FUTURES_WS_BASE}/{s.BINANCE_MARK_PRICE_STREAM}"
         attempt = 0
@@ -88,6 +167,11 @@ class BinanceMarkPriceWs:
         items = data if isinstance(data, list) else [data]
         target = self.settings.ALT_SYMBOL_BINANCE.upper()
 
+        if self.universe_writer is not None:
+            chunk = universe_chunk(items, self.universe)
+            if chunk is not None:
+                self.universe_writer.put(chunk)
+
         for item in items:
             symbol = str(item.get("s") or item.get("symbol") or "")
             if symbol.upper() != target:
@@ -99,8 +183,9 @@ class BinanceMarkPriceWs:
             else:
                 ts = datetime.now(timezone.utc)
 
-            insert_mark_price(self.engine, ts, symbol, item)
-            self.last_insert_ts = time.time()
+            now = time.time()
+            self.writer.put(mark_price_row(ts, symbol, item, keep_raw=self._keep_raw(now)))
+            self.last_insert_ts = now
             self.insert_count += 1
 
     def stop(self) -> None:
@@ -108,7 +193,10 @@ class BinanceMarkPriceWs:
 
 
 class BinanceForceOrderWs:
-    """Streams !forceOrder@arr, stores BTCUSDT liquidation events."""
+    """Streams !forceOrder@arr, stores BTCUSDT liquidation events.
+
+    이벤트마다 in-memory LiqRollup(초 bucket prefix-sum)과 binance_liq_1s도 갱신.
+    """
 
     def __init__(self, settings: Settings, engine: Engine) -> None:
         self.settings = settings
@@ -117,9 +205,12 @@ class BinanceForceOrderWs:
         self.last_recv_ts: float = 0.0
         self.connected: bool = False
         self.event_count: int = 0
+        self.rollup = get_liq_rollup()
+        self.rollup.horizon_sec = settings.BINANCE_LIQ_ROLLUP_HORIZON_SEC
 
     async def run(self) -> None:
         s = self.settings
+        await asyncio.to_thread(self.rollup.track, s.ALT_SYMBOL_BINANCE.upper(), self.engine)
         url = f"{s.BINANCE_FUTURES_WS_BASE}/{s.BINANCE_FORCE_ORDER_STREAM}"
         attempt = 0
         while not self._stop:
@@ -138,7 +229,7 @@ class BinanceForceOrderWs:
                             break
                         self.last_recv_ts = time.time()
                         try:
-                            self._handle(raw)
+                            await self._handle(raw)
                         except Exception:
                             log.exception("forceOrder parse error, skipping")
                 self.connected = False
@@ -154,7 +245,7 @@ class BinanceForceOrderWs:
                 await asyncio.sleep(delay)
                 attempt += 1
 
-    def _handle(self, raw) -> None:
+    async def _handle(self, raw) -> None:
         if isinstance(raw, bytes):
             data = json.loads(raw.decode())
         else:
@@ -179,7 +270,13 @@ class BinanceForceOrderWs:
             else:
                 ts = datetime.now(timezone.utc)
 
-            insert_force_order(self.engine, ts, symbol, order)
+            # insert + binance_liq_1s upsert는 thread에서 (Upbit ingest와 같은 event loop를 막지 않음)
+            inserted = await asyncio.to_thread(insert_force_order, self.engine, ts, symbol, order)
+            if inserted is not False:  # 중복 이벤트만 제외 (DB 오류여도 메모리 rollup은 유지)
+                self.rollup.add(
+                    symbol.upper(), ts, str(order.get("S") or order.get("side") or ""),
+                    _notional(order),
+                )
             self.event_count += 1
             log.info("ForceOrder: %s side=%s qty=%s", symbol, order.get("S"), order.get("q"))
 
@@ -0,0 +1,202 @@
+"""Binance 청산(forceOrder) 초 단위 rollup — window 합계를 prefix-sum으로 O(1) 조회.
+
+bucket ts = 이벤트 ts를 초 단위로 올림 (이벤트 ts ∈ (b-1, b] → bucket b).
+따라서 (t0-w, t0] 구간 합계 = cum[t0] - cum[t0-w] (t0가 정수 초일 때 raw 이벤트 scan과 동일).
+
+- 메모리: 심볼별 ring buffer에 누적합(cum) [buy_notional, sell_notional, buy_count, sell_count]과
+  '그 초까지의 마지막 이벤트 ts'를 저장. BinanceForceOrderWs가 이벤트마다 add().
+- DB: binance_liq_1s (symbol, side, ts) — raw insert와 같은 transaction에서 upsert (writer.insert_force_order)
+- PredictionRunner 등은 get_liq_rollup().window()를 먼저 쓰고, 범위 밖/미추적이면 None → binance_liq_1s 조회
+
+side는 Binance 주문 방향 그대로: SELL = 롱 포지션 청산, BUY = 숏 포지션 청산.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+_BUY_NOTIONAL, _SELL_NOTIONAL, _BUY_COUNT, _SELL_COUNT = range(4)
+
+_LOAD_BUCKETS = text("""
+SELECT extract(epoch FROM ts)::bigint AS sec, side, notional, cnt,
+       extract(epoch FROM last_ts) AS last_ts
+FROM binance_liq_1s
+WHERE symbol = :sym AND ts > to_timestamp(:since)
+ORDER BY ts
+""")
+
+_WINDOW_SQL = text("""
+SELECT
+    COALESCE(SUM(notional), 0.0)                                   AS notional,
+    COALESCE(SUM(cnt), 0)                                          AS cnt,
+    COALESCE(SUM(notional) FILTER (WHERE side = 'BUY'), 0.0)       AS buy_notional,
+    COALESCE(SUM(notional) FILTER (WHERE side = 'SELL'), 0.0)      AS sell_notional,
+    COALESCE(SUM(cnt) FILTER (WHERE side = 'BUY'), 0)              AS buy_count,
+    COALESCE(SUM(cnt) FILTER (WHERE side = 'SELL'), 0)             AS sell_count,
+    MAX(last_ts)                                                   AS liq_last_ts
+FROM binance_liq_1s
+WHERE symbol = :sym
+  AND ts >  (:t0 - :w * interval '1 second')
+  AND ts <= :t0
+""")
+
+
+def bucket_sec(ts: datetime) -> int:
+    """이벤트 ts → bucket 초 (올림)."""
+    return math.ceil(ts.timestamp())
+
+
+def _result(vec: np.ndarray, last_ts: float) -> dict:
+    return {
+        "notional": float(vec[_BUY_NOTIONAL] + vec[_SELL_NOTIONAL]),
+        "count": int(round(vec[_BUY_COUNT] + vec[_SELL_COUNT])),
+        "buy_notional": float(vec[_BUY_NOTIONAL]),
+        "sell_notional": float(vec[_SELL_NOTIONAL]),
+        "buy_count": int(round(vec[_BUY_COUNT])),
+        "sell_count": int(round(vec[_SELL_COUNT])),
+        "liq_last_ts": (
+            datetime.fromtimestamp(last_ts, tz=timezone.utc) if not math.isnan(last_ts) else None
+        ),
+    }
+
+
+class _SymbolBuckets:
+    """초 단위 누적합 ring buffer (최근 horizon_sec)."""
+
+    def __init__(self, horizon_sec: int, start_sec: int) -> None:
+        self.n = horizon_sec + 1
+        self.cum = np.zeros((self.n, 4))
+        self.last = np.full(self.n, np.nan)
+        # start_sec-1 = 0 기준점, start_sec부터 유효
+        self.head = start_sec - 1
+        self.since = start_sec
+        self.late_dropped = 0
+
+    def _advance(self, sec: int) -> None:
+        if sec <= self.head:
+            return
+        cur = self.cum[self.head % self.n].copy()
+        cur_last = self.last[self.head % self.n]
+        for s in range(max(self.head + 1, sec - self.n + 1), sec + 1):
+            self.cum[s % self.n] = cur
+            self.last[s % self.n] = cur_last
+        self.head = sec
+
+    def add(self, sec: int, vec: np.ndarray, last_ts: float) -> None:
+        self._advance(sec)
+        if sec <= self.head - self.n + 1 or sec < self.since:
+            self.late_dropped += 1
+            return
+        for s in range(sec, self.head + 1):
+            i = s % self.n
+            self.cum[i] += vec
+            if math.isnan(self.last[i]) or last_ts > self.last[i]:
+                self.last[i] = last_ts
+
+    def _at(self, sec: int) -> int | None:
+        """sec 시점 누적값의 ring index (범위 밖이면 None)."""
+        if sec >= self.head:
+            return self.head % self.n
+        if sec < max(self.head - self.n + 1, self.since - 1):
+            return None
+        return sec % self.n
+
+    def window(self, t0_sec: int, w: int) -> dict | None:
+        i1 = self._at(t0_sec)
+        i0 = self._at(t0_sec - w)
+        if i1 is None or i0 is None:
+            return None
+        last_ts = self.last[i1]
+        if not math.isnan(last_ts) and last_ts <= t0_sec - w:
+            last_ts = float("nan")  # 마지막 이벤트가 window 밖
+        return _result(self.cum[i1] - self.cum[i0], last_ts)
+
+
+class LiqRollup:
+    """심볼별 _SymbolBuckets. WS thread(event loop)와 predictor thread가 공유 → lock."""
+
+    def __init__(self, horizon_sec: int = 3600) -> None:
+        self.horizon_sec = horizon_sec
+        self._lock = threading.Lock()
+        self._symbols: dict[str, _SymbolBuckets] = {}
+
+    def track(self, symbol: str, engine: Engine | None = None) -> None:
+        """심볼 추적 시작. engine이 있으면 binance_liq_1s 최근 horizon으로 warm-up."""
+        now_sec = int(time.time())
+        start_sec = now_sec  # warm-up 없으면 지금부터만 유효 (이전 window는 None → DB)
+        rows = []
+        if engine is not None:
+            start_sec = now_sec - self.horizon_sec + 1
+            try:
+                with engine.connect() as conn:
+                    rows = conn.execute(_LOAD_BUCKETS, {"sym": symbol, "since": start_sec - 1}).fetchall()
+            except Exception as e:
+                log.warning("LiqRollup warm-up failed (%s) — tracking from now", e)
+                start_sec = now_sec
+        buckets = _SymbolBuckets(self.horizon_sec, start_sec)
+        for r in rows:
+            vec = np.zeros(4)
+            if r.side == "BUY":
+                vec[_BUY_NOTIONAL], vec[_BUY_COUNT] = r.notional or 0.0, r.cnt
+            else:
+                vec[_SELL_NOTIONAL], vec[_SELL_COUNT] = r.notional or 0.0, r.cnt
+            buckets.add(int(r.sec), vec, float(r.last_ts) if r.last_ts is not None else float("nan"))
+        buckets._advance(now_sec)
+        with self._lock:
+            self._symbols[symbol] = buckets
+        log.info("LiqRollup tracking %s (horizon=%ds warm buckets=%d)", symbol, self.horizon_sec, len(rows))
+
+    def add(self, symbol: str, ts: datetime, side: str, notional: float | None) -> None:
+        with self._lock:
+            b = self._symbols.get(symbol)
+            if b is None:
+                return
+            vec = np.zeros(4)
+            if side == "BUY":
+                vec[_BUY_NOTIONAL], vec[_BUY_COUNT] = notional or 0.0, 1
+            else:
+                vec[_SELL_NOTIONAL], vec[_SELL_COUNT] = notional or 0.0, 1
+            b.add(bucket_sec(ts), vec, ts.timestamp())
+
+    def window(self, symbol: str, t0: datetime, window_sec: int) -> dict | None:
+        """(t0-window_sec, t0] 합계 (t0는 초 단위로 내림). 미추적/범위 밖이면 None."""
+        with self._lock:
+            b = self._symbols.get(symbol)
+            if b is None:
+                return None
+            return b.window(int(t0.timestamp()), window_sec)
+
+
+def fetch_liq_window(engine: Engine, symbol: str, t0: datetime, window_sec: int) -> dict:
+    """메모리 rollup → 없으면 binance_liq_1s bucket 합계 (raw 이벤트 scan 없음)."""
+    agg = get_liq_rollup().window(symbol, t0, window_sec)
+    if agg is not None:
+        return agg
+    with engine.connect() as conn:
+        row = conn.execute(_WINDOW_SQL, {"sym": symbol, "t0": t0, "w": window_sec}).fetchone()
+    return {
+        "notional": float(row.notional),
+        "count": int(row.cnt),
+        "buy_notional": float(row.buy_notional),
+        "sell_notional": float(row.sell_notional),
+        "buy_count": int(row.buy_count),
+        "sell_count": int(row.sell_count),
+        "liq_last_ts": row.liq_last_ts,
+    }
+
+
+_ROLLUP = LiqRollup()
+
+
+def get_liq_rollup() -> LiqRollup:
+    return _ROLLUP
@@ -50,6 +50,15 @@ class BinanceAltDataRunner:
     def mark_price_insert_count(self) -> int:
         return self.mark_price_ws.insert_count
 
+    @property
+    def mark_price_writer_stats(self) -> dict:
+        return self.mark_price_ws.writer.stats()
+
+    @property
+    def mark_universe_writer_stats(self) -> dict | None:
+        w = self.mark_price_ws.universe_writer
+        return w.stats() if w is not None else None
+
     @property
     def force_order_connected(self) -> bool:
         return self.force_order_ws.connected
@@ -0,0 +1,94 @@
+"""!markPrice@arr@1s 전체 심볼 universe → 초당 1행 columnar chunk (binance_mark_universe_1s).
+
+한 메시지(모든 선물 심볼)를 심볼별 행 대신 배열 컬럼 하나로 저장:
+  ts, sym_ids INT[], mark_price / index_price / funding_rate DOUBLE PRECISION[]
+sym_ids는 binance_symbols(id, symbol) dictionary id — 배열 순서는 심볼명 정렬.
+
+BINANCE_MARK_UNIVERSE: ""(끔) | "*"(전체) | "BTCUSDT,ETHUSDT,..."(지정)
+ALT_SYMBOL_BINANCE의 per-symbol 행(binance_mark_price_1s)은 그대로 유지 — 기존 feature/predictor 경로 불변.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+def parse_universe(spec: str) -> set[str] | None:
+    """설정값 → 심볼 집합. "*"는 None(전체), 빈 값은 빈 집합(끔)."""
+    spec = spec.strip()
+    if spec == "*":
+        return None
+    return {p.strip().upper() for p in spec.split(",") if p.strip()}
+
+
+def _f(v) -> float | None:
+    try:
+        return float(v) if v not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def universe_chunk(items: list[dict], symbols: set[str] | None) -> dict | None:
+    """markPrice 배열 메시지 → chunk row (sym_ids는 flush 시점에 해석, 여기선 심볼명).
+
+    ts는 메시지 내 최대 event time (같은 초의 push라 모든 item이 사실상 동일).
+    """
+    picked: dict[str, dict] = {}
+    et_max = 0
+    for item in items:
+        sym = str(item.get("s") or item.get("symbol") or "").upper()
+        if not sym or (symbols is not None and sym not in symbols):
+            continue
+        picked[sym] = item
+        et_max = max(et_max, int(item.get("E") or 0))
+    if not picked:
+        return None
+    ts = (
+        datetime.fromtimestamp(et_max / 1000, tz=timezone.utc)
+        if et_max else datetime.now(timezone.utc)
+    )
+    names = sorted(picked)
+    return {
+        "ts": ts,
+        "symbols": names,
+        "mark_price": [_f(picked[n].get("p")) for n in names],
+        "index_price": [_f(picked[n].get("i")) for n in names],
+        "funding_rate": [_f(picked[n].get("r")) for n in names],
+    }
+
+
+_FETCH_UNIVERSE = text("""
+SELECT u.ts, s.symbol, x.mark_price, x.index_price, x.funding_rate
+FROM binance_mark_universe_1s u
+CROSS JOIN LATERAL unnest(u.sym_ids, u.mark_price, u.index_price, u.funding_rate)
+    AS x(sym_id, mark_price, index_price, funding_rate)
+JOIN binance_symbols s ON s.id = x.sym_id
+WHERE u.ts >= :start AND u.ts < :end
+  AND (CAST(:symbols AS TEXT[]) IS NULL OR s.symbol = ANY(CAST(:symbols AS TEXT[])))
+ORDER BY u.ts
+""")
+
+
+def load_mark_universe(
+    engine: Engine,
+    start: datetime,
+    end: datetime,
+    symbols: list[str] | None = None,
+    field: str = "mark_price",
+) -> pd.DataFrame:
+    """[start, end) universe → wide DataFrame (index=ts, columns=symbol, values=field).
+
+    cross-asset feature용 — 같은 초의 전 심볼이 한 행에 정렬된다.
+    """
+    with engine.connect() as conn:
+        df = pd.read_sql(
+            _FETCH_UNIVERSE, conn,
+            params={"start": start, "end": end, "symbols": [s.upper() for s in symbols] if symbols else None},
+        )
+    if df.empty:
+        return pd.DataFrame()
+    return df.pivot_table(index="ts", columns="symbol", values=field, aggfunc="last")
@@ -1,15 +1,18 @@
 """Alt Data DB writer: insert/upsert helpers for binance_mark_price_1s,
-binance_force_orders, binance_futures_metrics, coinglass_liquidation_map."""
+binance_mark_universe_1s, binance_force_orders, binance_futures_metrics, coinglass_liquidation_map."""
 
 from __future__ import annotations
 
 import json
 import logging
+import math
 from datetime import datetime, timezone
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from app.db.batch import get_write_behind
+
 log = logging.getLogger(__name__)
 
 
@@ -26,57 +29,149 @@ def _utcnow() -> datetime:
 # binance_mark_price_1s
 # ──────────────────────────────────────────────────────────────────────────────
 
+_INSERT_MARK_PRICE = text("""
+    INSERT INTO binance_mark_price_1s
+        (ts, symbol, mark_price, index_price, funding_rate,
+         next_funding_time, raw_json)
+    VALUES
+        (:ts, :symbol, :mark_price, :index_price, :funding_rate,
+         :next_funding_time, CAST(:raw_json AS JSONB))
+    ON CONFLICT DO NOTHING
+""")
+
+
+def mark_price_row(ts: datetime, symbol: str, row: dict, keep_raw: bool = True) -> dict:
+    """markPrice WS item → binance_mark_price_1s row params. keep_raw=False면 raw_json NULL."""
+    mark_price = float(row.get("p") or row.get("markPrice") or 0) or None
+    index_price = float(row.get("i") or row.get("indexPrice") or 0) or None
+    funding_rate = float(row.get("r") or row.get("fundingRate") or 0) or None
+    nft_ms = row.get("T") or row.get("nextFundingTime")
+    next_funding_time = (
+        datetime.fromtimestamp(int(nft_ms) / 1000, tz=timezone.utc)
+        if nft_ms
+        else None
+    )
+    return {
+        "ts": ts,
+        "symbol": symbol,
+        "mark_price": mark_price,
+        "index_price": index_price,
+        "funding_rate": funding_rate,
+        "next_funding_time": next_funding_time,
+        "raw_json": _j(row) if keep_raw else None,
+    }
+
+
+def insert_mark_prices(engine: Engine, rows: list[dict]) -> None:
+    """mark_price_row() 결과 여러 개를 한 transaction, executemany 한 번으로 insert.
+
+    예외는 호출측(MarkPriceBatchWriter)이 재시도/카운트하도록 그대로 올린다.
+    """
+    if not rows:
+        return
+    with engine.begin() as conn:
+        conn.execute(_INSERT_MARK_PRICE, rows)
+
+
 def insert_mark_price(engine: Engine, ts: datetime, symbol: str, row: dict) -> None:
     """Insert one mark-price row. Silently skips on duplicate key errors."""
     try:
-        mark_price = float(row.get("p") or row.get("markPrice") or 0) or None
-        index_price = float(row.get("i") or row.get("indexPrice") or 0) or None
-        funding_rate = float(row.get("r") or row.get("fundingRate") or 0) or None
-        nft_ms = row.get("T") or row.get("nextFundingTime")
-        next_funding_time = (
-            datetime.fromtimestamp(int(nft_ms) / 1000, tz=timezone.utc)
-            if nft_ms
-            else None
-        )
-        with engine.begin() as conn:
-            conn.execute(
-                text("""
-                    INSERT INTO binance_mark_price_1s
-                        (ts, symbol, mark_price, index_price, funding_rate,
-                         next_funding_time, raw_json)
-                    VALUES
-                        (:ts, :symbol, :mark_price, :index_price, :funding_rate,
-                         :next_funding_time, CAST(:raw_json AS JSONB))
-                    ON CONFLICT DO NOTHING
-                """),
-                {
-                    "ts": ts,
-                    "symbol": symbol,
-                    "mark_price": mark_price,
-                    "index_price": index_price,
-                    "funding_rate": funding_rate,
-                    "next_funding_time": next_funding_time,
-                    "raw_json": _j(row),
-                },
-            )
+        insert_mark_prices(engine, [mark_price_row(ts, symbol, row)])
     except Exception:
         log.exception("insert_mark_price error")
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# binance_mark_universe_1s (+ binance_symbols dictionary)
+# ──────────────────────────────────────────────────────────────────────────────
+
+# symbol → binance_symbols.id (id는 한번 부여되면 불변이므로 프로세스 수명 동안 캐시)
+_SYMBOL_IDS: dict[str, int] = {}
+
+_UPSERT_BINANCE_SYMBOLS = text("""
+    INSERT INTO binance_symbols (symbol)
+    SELECT unnest(CAST(:symbols AS TEXT[]))
+    ON CONFLICT (symbol) DO NOTHING
+""")
+
+_FETCH_BINANCE_SYMBOL_IDS = text("""
+    SELECT id, symbol FROM binance_symbols WHERE symbol = ANY(CAST(:symbols AS TEXT[]))
+""")
+
+_INSERT_MARK_UNIVERSE = text("""
+    INSERT INTO binance_mark_universe_1s
+        (ts, sym_ids, mark_price, index_price, funding_rate)
+    VALUES
+        (:ts, :sym_ids, :mark_price, :index_price, :funding_rate)
+    ON CONFLICT (ts) DO NOTHING
+""")
+
+
+def insert_mark_universe(engine: Engine, chunks: list[dict]) -> None:
+    """universe_chunk() 결과를 한 transaction에 기록. 처음 보는 심볼은 id를 먼저 부여."""
+    if not chunks:
+        return
+    # 새 id는 commit 후에만 캐시에 반영 (rollback되면 없는 id를 가리키게 됨)
+    new_ids: dict[str, int] = {}
+    with engine.begin() as conn:
+        unknown = sorted({s for c in chunks for s in c["symbols"] if s not in _SYMBOL_IDS})
+        if unknown:
+            conn.execute(_UPSERT_BINANCE_SYMBOLS, {"symbols": unknown})
+            for row in conn.execute(_FETCH_BINANCE_SYMBOL_IDS, {"symbols": unknown}):
+                new_ids[row.symbol] = row.id
+        ids = {**_SYMBOL_IDS, **new_ids} if new_ids else _SYMBOL_IDS
+        conn.execute(_INSERT_MARK_UNIVERSE, [
+            {
+                "ts": c["ts"],
+                "sym_ids": [ids[s] for s in c["symbols"]],
+                "mark_price": c["mark_price"],
+                "index_price": c["index_price"],
+                "funding_rate": c["funding_rate"],
+            }
+            for c in chunks
+        ])
+    _SYMBOL_IDS.update(new_ids)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # binance_force_orders
 # ──────────────────────────────────────────────────────────────────────────────
 
-def insert_force_order(engine: Engine, ts: datetime, symbol: str, order: dict) -> None:
-    """Insert one liquidation event with UNIQUE guard."""
+_UPSERT_LIQ_1S = text("""
+    INSERT INTO binance_liq_1s (ts, symbol, side, notional, qty, cnt, last_ts)
+    VALUES (to_timestamp(:bucket), :symbol, :side, COALESCE(:notional, 0.0), COALESCE(:qty, 0.0), 1, :ts)
+    ON CONFLICT (symbol, side, ts) DO UPDATE SET
+        notional = binance_liq_1s.notional + EXCLUDED.notional,
+        qty      = binance_liq_1s.qty + EXCLUDED.qty,
+        cnt      = binance_liq_1s.cnt + 1,
+        last_ts  = GREATEST(binance_liq_1s.last_ts, EXCLUDED.last_ts)
+""")
+
+
+def insert_force_order(engine: Engine, ts: datetime, symbol: str, order: dict) -> bool | None:
+    """Insert one liquidation event with UNIQUE guard.
+
+    새 이벤트면 같은 transaction에서 binance_liq_1s 초 bucket도 갱신 (중복 이벤트는 rollup에 미반영).
+    반환: True=신규, False=중복, None=DB 오류.
+    """
     try:
         side = str(order.get("S") or order.get("side") or "")
         price = float(order.get("p") or order.get("price") or 0) or None
         qty = float(order.get("q") or order.get("origQty") or 0) or None
         notional = (price * qty) if (price and qty) else None
         order_type = str(order.get("o") or order.get("type") or "")
+        params = {
+            "ts": ts,
+            "symbol": symbol,
+            "side": side,
+            "price": price,
+            "qty": qty,
+            "notional": notional,
+            "order_type": order_type,
+            "raw_json": _j(order),
+        }
         with engine.begin() as conn:
-            conn.execute(
+            new_id = conn.execute(
                 text("""
                     INSERT INTO binance_force_orders
                         (ts, symbol, side, price, qty, notional, order_type, raw_json)
@@ -84,26 +179,66 @@ def insert_force_order(engine: Engine, ts: datetime, symbol: str, order: dict) -
                         (:ts, :symbol, :side, :price, :qty, :notional, :order_type,
                          CAST(:raw_json AS JSONB))
                     ON CONFLICT (symbol, ts, side, price, qty) DO NOTHING
+                    RETURNING id
                 """),
-                {
-                    "ts": ts,
-                    "symbol": symbol,
-                    "side": side,
-                    "price": price,
-                    "qty": qty,
-                    "notional": notional,
-                    "order_type": order_type,
-                    "raw_json": _j(order),
-                },
-            )
+                params,
+            ).scalar()
+            if new_id is None:
+                return False
+            conn.execute(_UPSERT_LIQ_1S, {**params, "bucket": math.ceil(ts.timestamp())})
+        return True
     except Exception:
         log.exception("insert_force_order error")
+        return None
 
 
 # ──────────────────────────────────────────────────────────────────────────────
 # binance_futures_metrics
 # ──────────────────────────────────────────────────────────────────────────────
 
+_UPSERT_FUTURES_METRIC = text("""
+    INSERT INTO binance_futures_metrics
+        (ts, symbol, metric, value, value2, period, raw_json)
+    VALUES
+        (:ts, :symbol, :metric, :value, :value2, :period, CAST(:raw_json AS JSONB))
+    ON CONFLICT (metric, symbol, ts, period) DO UPDATE SET
+        value    = EXCLUDED.value,
+        value2   = EXCLUDED.value2,
+        raw_json = EXCLUDED.raw_json
+""")
+
+
+def futures_metric_row(
+    ts: datetime,
+    symbol: str,
+    metric: str,
+    value: float | None,
+    value2: float | None,
+    period: str,
+    raw: dict,
+) -> dict:
+    return {
+        "ts": ts,
+        "symbol": symbol,
+        "metric": metric,
+        "value": value,
+        "value2": value2,
+        "period": period,
+        "raw_json": _j(raw),
+    }
+
+
+def upsert_futures_metrics(engine: Engine, rows: list[dict]) -> None:
+    """futures_metric_row() 여러 개를 한 transaction, executemany 한 번으로 upsert.
+
+    같은 (metric, symbol, ts, period)가 batch에 두 번 있으면 뒤의 값이 남는다.
+    """
+    if not rows:
+        return
+    with engine.begin() as conn:
+        conn.execute(_UPSERT_FUTURES_METRIC, rows)
+
+
 def upsert_futures_metric(
     engine: Engine,
     ts: datetime,
@@ -116,28 +251,9 @@ def upsert_futures_metric(
 ) -> None:
     """Upsert one futures metric row. Uses (metric, symbol, ts, period) as unique key."""
     try:
-        with engine.begin() as conn:
-            conn.execute(
-                text("""
-                    INSERT INTO binance_futures_metrics
-                        (ts, symbol, metric, value, value2, period, raw_json)
-                    VALUES
-                        (:ts, :symbol, :metric, :value, :value2, :period, CAST(:raw_json AS JSONB))
-                    ON CONFLICT (metric, symbol, ts, period) DO UPDATE SET
-                        value    = EXCLUDED.value,
-                        value2   = EXCLUDED.value2,
-                        raw_json = EXCLUDED.raw_json
-                """),
-                {
-                    "ts": ts,
-                    "symbol": symbol,
-                    "metric": metric,
-                    "value": value,
-                    "value2": value2,
-                    "period": period,
-                    "raw_json": _j(raw),
-                },
-            )
+        upsert_futures_metrics(
+            engine, [futures_metric_row(ts, symbol, metric, value, value2, period, raw)]
+        )
     except Exception:
         log.exception("upsert_futures_metric error (metric=%s)", metric)
 
@@ -146,6 +262,22 @@ def upsert_futures_metric(
 # coinglass_liquidation_map
 # ──────────────────────────────────────────────────────────────────────────────
 
+_INSERT_COINGLASS_CALL_STATUS = text("""
+INSERT INTO coinglass_call_status
+    (ts, ok, http_status, error_msg, latency_ms, poll_count)
+VALUES
+    (:ts, :ok, :http_status, :error_msg, :latency_ms, :poll_count)
+""")
+
+_INSERT_COINGLASS_LIQ_MAP = text("""
+INSERT INTO coinglass_liquidation_map
+    (ts, symbol, exchange, timeframe, summary_json, raw_json)
+VALUES
+    (:ts, :symbol, :exchange, :timeframe,
+     CAST(:summary_json AS JSONB), CAST(:raw_json AS JSONB))
+""")
+
+
 def insert_coinglass_call_status(
     engine: Engine,
     ts: datetime,
@@ -156,24 +288,19 @@ def insert_coinglass_call_status(
     poll_count: int,
 ) -> None:
     """Coinglass HTTP 호출 결과를 call_status 테이블에 기록."""
+    params = {
+        "ts": ts,
+        "ok": ok,
+        "http_status": http_status,
+        "error_msg": error_msg,
+        "latency_ms": latency_ms,
+        "poll_count": poll_count,
+    }
+    if get_write_behind().submit(engine, "coinglass_call_status", _INSERT_COINGLASS_CALL_STATUS, params):
+        return
     try:
         with engine.begin() as conn:
-            conn.execute(
-                text("""
-                    INSERT INTO coinglass_call_status
-                        (ts, ok, http_status, error_msg, latency_ms, poll_count)
-                    VALUES
-                        (:ts, :ok, :http_status, :error_msg, :latency_ms, :poll_count)
-                """),
-                {
-                    "ts": ts,
-                    "ok": ok,
-                    "http_status": http_status,
-                    "error_msg": error_msg,
-                    "latency_ms": latency_ms,
-                    "poll_count": poll_count,
-                },
-            )
+            conn.execute(_INSERT_COINGLASS_CALL_STATUS, params)
     except Exception:
         log.exception("insert_coinglass_call_status error")
 
@@ -188,24 +315,18 @@ def insert_coinglass_liq_map(
     raw: dict,
 ) -> None:
     """Insert Coinglass liquidation map snapshot."""
+    params = {
+        "ts": ts,
+        "symbol": symbol,
+        "exchange": exchange,
+        "timeframe": timeframe,
+        "summary_json": _j(summary),
+        "raw_json": _j(raw),
+    }
+    if get_write_behind().submit(engine, "coinglass_liquidation_map", _INSERT_COINGLASS_LIQ_MAP, params):
+        return
     try:
         with engine.begin() as conn:
-            conn.execute(
-                text("""
-                    INSERT INTO coinglass_liquidation_map
-                        (ts, symbol, exchange, timeframe, summary_json, raw_json)
-                    VALUES
-                        (:ts, :symbol, :exchange, :timeframe,
-                         CAST(:summary_json AS JSONB), CAST(:raw_json AS JSONB))
-                """),
-                {
-                    "ts": ts,
-                    "symbol": symbol,
-                    "exchange": exchange,
-                    "timeframe": timeframe,
-                    "summary_json": _j(summary),
-                    "raw_json": _j(raw),
-                },
-            )
+            conn.execute(_INSERT_COINGLASS_LIQ_MAP, params)
     except Exception:
         log.exception("insert_coinglass_liq_map error")
@@ -0,0 +1 @@
+"""Paper policy backtester over stored predictions + market_1s."""
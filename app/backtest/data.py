@@ -0,0 +1,293 @@
+"""
+data.py — 백테스트 입력 로딩: predictions + market_1s → columnar numpy 배열
+
+Tick 시점 t의 입력은 live PaperTradingRunner._run_tick과 같은 규칙으로 만든다:
+  - pred:   t0 <= t 인 최신 prediction (as-of, _FETCH_LATEST_PRED와 동일)
+  - market: ts <= t 인 최신 market_1s bar의 bid/ask close
+            (bid_close_1s/ask_close_1s, 없으면 bid/ask)
+            spread_bps는 policy.market_snapshot과 동일 공식, lag_sec = t - bar ts
+  - bars:   intrabar TP/SL touch 판정용 bid_high_1s / bid_low_1s
+
+live는 WS quote 시점의 best bid/ask를 쓰므로 1s bar 기반 백테스트와의 일치는 근사치다.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.db.archive import read_range
+
+_NS = 1_000_000_000
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_ns(values) -> np.ndarray:
+    """Datetime-like Series/array (tz-aware UTC or naive UTC) → int64 epoch ns."""
+    s = pd.to_datetime(pd.Series(values), utc=True)
+    return s.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def ns_to_dt(ns: int) -> datetime:
+    """int64 epoch ns → tz-aware UTC datetime (µs precision, like DB timestamps)."""
+    return _EPOCH + timedelta(microseconds=int(ns) // 1000)
+
+
+@dataclass
+class BacktestData:
+    """Columnar backtest inputs. All timestamps are int64 epoch ns (UTC)."""
+
+    symbol: str
+
+    # decision ticks
+    tick_ts: np.ndarray
+    tick_bid: np.ndarray          # NaN = no quote
+    tick_ask: np.ndarray
+    tick_spread_bps: np.ndarray
+    tick_lag_sec: np.ndarray
+    tick_pred_idx: np.ndarray     # index into pred_* arrays, -1 = no prediction yet
+
+    # predictions (sorted by t0)
+    pred_t0: np.ndarray
+    pred_h_sec: np.ndarray
+    pred_r_t: np.ndarray
+    pred_p_up: np.ndarray
+    pred_p_down: np.ndarray
+    pred_p_none: np.ndarray
+    pred_ev: np.ndarray
+    pred_ev_rate: np.ndarray      # NaN = NULL
+    pred_z_barrier: np.ndarray    # NaN = NULL
+    pred_model_code: np.ndarray   # index into model_versions
+    model_versions: list[str] = field(default_factory=list)
+
+    # 1s bars for intrabar touch
+    bar_ts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    bar_bid_high: np.ndarray = field(default_factory=lambda: np.empty(0))
+    bar_bid_low: np.ndarray = field(default_factory=lambda: np.empty(0))
+    bar_ask: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    @property
+    def n_ticks(self) -> int:
+        return len(self.tick_ts)
+
+    def slice_ticks(self, a: int, b: int) -> BacktestData:
+        """Tick range [a, b) view; prediction/bar arrays are shared (as-of lookups stay valid)."""
+        return replace(
+            self,
+            tick_ts=self.tick_ts[a:b],
+            tick_bid=self.tick_bid[a:b],
+            tick_ask=self.tick_ask[a:b],
+            tick_spread_bps=self.tick_spread_bps[a:b],
+            tick_lag_sec=self.tick_lag_sec[a:b],
+            tick_pred_idx=self.tick_pred_idx[a:b],
+        )
+
+    def pred_row(self, j: int) -> dict | None:
+        """Prediction dict in the shape of runner._fetch_latest_pred()."""
+        if j < 0:
+            return None
+        ev_rate = self.pred_ev_rate[j]
+        z_barrier = self.pred_z_barrier[j]
+        return {
+            "t0": ns_to_dt(self.pred_t0[j]),
+            "symbol": self.symbol,
+            "h_sec": int(self.pred_h_sec[j]),
+            "r_t": float(self.pred_r_t[j]),
+            "p_up": float(self.pred_p_up[j]),
+            "p_down": float(self.pred_p_down[j]),
+            "p_none": float(self.pred_p_none[j]),
+            "ev": float(self.pred_ev[j]),
+            "ev_rate": None if np.isnan(ev_rate) else float(ev_rate),
+            "z_barrier": None if np.isnan(z_barrier) else float(z_barrier),
+            "model_version": self.model_versions[self.pred_model_code[j]],
+        }
+
+    def pred_idx_at(self, ts_ns: int) -> int:
+        """As-of prediction index for an arbitrary time (intrabar touch ticks)."""
+        return int(np.searchsorted(self.pred_t0, ts_ns, side="right")) - 1
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# DB 로딩
+# ──────────────────────────────────────────────────────────────────────────────
+
+def load_predictions(engine, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """predictions를 시간 범위로 로딩 (start 이전 최신 1건 포함 — 첫 tick의 as-of용)."""
+    with engine.connect() as conn:
+        df = pd.read_sql_query(
+            text("""
+                SELECT id, t0, h_sec, r_t, p_up, p_down, p_none,
+                       ev, ev_rate, z_barrier, model_version
+                FROM predictions
+                WHERE symbol = :sym
+                  AND t0 >= COALESCE(
+                        (SELECT MAX(t0) FROM predictions WHERE symbol = :sym AND t0 < :start),
+                        :start)
+                  AND t0 <= :end
+                ORDER BY t0 ASC, id ASC
+            """),
+            conn,
+            params={"sym": symbol, "start": start, "end": end},
+        )
+    return df
+
+
+def load_market_1s(engine, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """market_1s bid/ask close + bid high/low 로딩 (ARCHIVE_DIR의 Parquet 보관분 + DB)."""
+    return read_range(
+        engine, "market_1s", start, end, symbol=symbol,
+        columns=["ts", "bid", "ask", "bid_close_1s", "ask_close_1s", "bid_high_1s", "bid_low_1s"],
+    )
+
+
+def load_decision_ticks(
+    engine, symbol: str, start: datetime, end: datetime, book_id: str = "main",
+) -> pd.DataFrame:
+    """paper_decisions의 정규 tick 시각.
+
+    Intrabar touch tick (lag_sec = 0 인 TP/SL EXIT)은 제외 — 백테스트가 1s bar로 재현한다.
+    """
+    with engine.connect() as conn:
+        df = pd.read_sql_query(
+            text("""
+                SELECT ts, pos_status, cash_krw, action, reason, policy_profile
+                FROM paper_decisions
+                WHERE book_id = :book
+                  AND symbol = :sym
+                  AND ts >= :start
+                  AND ts <= :end
+                  AND NOT (action = 'EXIT_LONG' AND reason IN ('TP', 'SL')
+                           AND lag_sec = 0)
+                ORDER BY ts ASC
+            """),
+            conn,
+            params={"sym": symbol, "book": book_id, "start": start, "end": end},
+        )
+    return df
+
+
+def load_paper_trades(
+    engine, symbol: str, start: datetime, end: datetime, book_id: str = "main",
+) -> pd.DataFrame:
+    with engine.connect() as conn:
+        df = pd.read_sql_query(
+            text("""
+                SELECT t, action, reason, price, qty, fee_krw, cash_after, pnl_krw, pnl_rate
+                FROM paper_trades
+                WHERE book_id = :book
+                  AND symbol = :sym
+                  AND t >= :start
+                  AND t <= :end
+                ORDER BY t ASC, id ASC
+            """),
+            conn,
+            params={"sym": symbol, "book": book_id, "start": start, "end": end},
+        )
+    return df
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 배열 구성
+# ──────────────────────────────────────────────────────────────────────────────
+
+def make_tick_grid(start: datetime, end: datetime, interval_sec: int) -> np.ndarray:
+    """start부터 interval_sec 간격의 decision tick (epoch ns)."""
+    t0 = int(to_ns([start])[0])
+    t1 = int(to_ns([end])[0])
+    step = int(interval_sec) * _NS
+    return np.arange(t0, t1 + 1, step, dtype=np.int64)
+
+
+def _f64(s: pd.Series) -> np.ndarray:
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def build_backtest_data(
+    symbol: str,
+    tick_ts: np.ndarray,
+    df_pred: pd.DataFrame,
+    df_mkt: pd.DataFrame,
+) -> BacktestData:
+    """Build columnar arrays; tick inputs are resolved as-of via searchsorted."""
+    tick_ts = np.asarray(tick_ts, dtype=np.int64)
+
+    # ── predictions: 동일 t0 중복 시 마지막(id 최대)만 유지 (ORDER BY t0 DESC LIMIT 1과 동일 의미)
+    df_pred = df_pred.dropna(subset=["t0", "h_sec", "r_t", "p_up", "p_down", "p_none", "ev"])
+    pred_t0 = to_ns(df_pred["t0"]) if len(df_pred) else np.empty(0, dtype=np.int64)
+    if len(pred_t0):
+        keep = np.append(pred_t0[1:] != pred_t0[:-1], True)
+        df_pred = df_pred.loc[keep]
+        pred_t0 = pred_t0[keep]
+    codes, uniques = pd.factorize(df_pred["model_version"].fillna(""))
+
+    tick_pred_idx = np.searchsorted(pred_t0, tick_ts, side="right").astype(np.int64) - 1
+
+    # ── market_1s as-of
+    mkt_ts = to_ns(df_mkt["ts"]) if len(df_mkt) else np.empty(0, dtype=np.int64)
+    bid_close = _f64(df_mkt["bid_close_1s"]) if len(df_mkt) else np.empty(0)
+    ask_close = _f64(df_mkt["ask_close_1s"]) if len(df_mkt) else np.empty(0)
+    if len(df_mkt):
+        bid_close = np.where(np.isnan(bid_close), _f64(df_mkt["bid"]), bid_close)
+        ask_close = np.where(np.isnan(ask_close), _f64(df_mkt["ask"]), ask_close)
+
+    m = np.searchsorted(mkt_ts, tick_ts, side="right") - 1
+    has_mkt = m >= 0
+    mi = np.where(has_mkt, m, 0)
+    tick_bid = np.where(has_mkt, bid_close[mi] if len(mkt_ts) else np.nan, np.nan)
+    tick_ask = np.where(has_mkt, ask_close[mi] if len(mkt_ts) else np.nan, np.nan)
+    tick_lag = np.where(
+        has_mkt, (tick_ts - (mkt_ts[mi] if len(mkt_ts) else 0)) / _NS, 999.0,
+    )
+
+    # spread_bps: policy.market_snapshot과 동일 연산 순서
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mid = (tick_bid + tick_ask) / 2
+        spread = 10000 * (tick_ask - tick_bid) / mid
+    ok = (tick_bid > 0) & (tick_ask > 0) & (mid > 0)
+    tick_spread = np.where(ok, spread, 999.0)
+
+    return BacktestData(
+        symbol=symbol,
+        tick_ts=tick_ts,
+        tick_bid=tick_bid,
+        tick_ask=tick_ask,
+        tick_spread_bps=tick_spread,
+        tick_lag_sec=tick_lag,
+        tick_pred_idx=tick_pred_idx,
+        pred_t0=pred_t0,
+        pred_h_sec=_f64(df_pred["h_sec"]),
+        pred_r_t=_f64(df_pred["r_t"]),
+        pred_p_up=_f64(df_pred["p_up"]),
+        pred_p_down=_f64(df_pred["p_down"]),
+        pred_p_none=_f64(df_pred["p_none"]),
+        pred_ev=_f64(df_pred["ev"]),
+        pred_ev_rate=_f64(df_pred["ev_rate"]),
+        pred_z_barrier=_f64(df_pred["z_barrier"]),
+        pred_model_code=np.asarray(codes, dtype=np.int64),
+        model_versions=[str(u) for u in uniques],
+        bar_ts=mkt_ts,
+        bar_bid_high=_f64(df_mkt["bid_high_1s"]) if len(df_mkt) else np.empty(0),
+        bar_bid_low=_f64(df_mkt["bid_low_1s"]) if len(df_mkt) else np.empty(0),
+        bar_ask=ask_close,
+    )
+
+
+def load_backtest_data(
+    engine,
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    interval_sec: int,
+    tick_ts: np.ndarray | None = None,
+) -> BacktestData:
+    """DB에서 로딩 후 columnar 배열 구성. tick_ts 미지정 시 interval_sec 격자."""
+    df_pred = load_predictions(engine, symbol, start, end)
+    # market as-of 첫 tick용으로 약간 앞에서부터 로딩
+    df_mkt = load_market_1s(engine, symbol, start - timedelta(seconds=60), end)
+    if tick_ts is None:
+        tick_ts = make_tick_grid(start, end, interval_sec)
+    return build_backtest_data(symbol, tick_ts, df_pred, df_mkt)
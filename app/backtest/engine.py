@@ -0,0 +1,408 @@
+"""
+engine.py — paper policy 백테스트 엔진
+
+두 엔진 모두 tick마다 _Sim.step()을 호출하며, step()은 PaperTradingRunner._run_tick과
+같은 순서로 동작한다:
+  decide_action → execute_enter_long / execute_exit_long → carry_risk_fields
+  → compute_equity → apply_risk_checks
+따라서 수수료·슬리피지·HALT·test profile cooldown/rate limit 의미가 live와 동일하다.
+
+- run_reference: 모든 tick을 순회 (정확성 기준)
+- run_fast:      FLAT 구간의 진입 가능 tick을 numpy mask로 한 번에 계산하고
+                 진입 후보 tick과 LONG 구간 tick만 step() → 수개월 5초 tick을 수 초 내 처리.
+                 건너뛴 FLAT tick의 day-start 갱신은 다음 이벤트 직전 tick 1회 step으로 보정.
+
+Intrabar exit (PAPER_INTRABAR_EXIT_ENABLED): LONG 동안 직전 tick과 현재 tick 사이의
+1s bar에서 bid_high/bid_low * (1 - slip)이 u_exec/d_exec에 닿으면 해당 bar ts에
+barrier 가격으로 청산한다 (같은 bar에서 양쪽 touch 시 SL 우선 — exec_v1 라벨과 동일).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.backtest.data import BacktestData, ns_to_dt
+from app.trading.paper import (
+    apply_risk_checks,
+    carry_risk_fields,
+    compute_equity,
+    execute_enter_long,
+    execute_exit_long,
+)
+from app.trading.policy import _get_thresholds, decide_action, market_snapshot
+
+_NS = 1_000_000_000
+_HOUR_NS = 3600 * _NS
+
+
+def new_flat_position(symbol: str, cash_krw: float, day, settings) -> dict:
+    """paper_positions 초기 row (_INSERT_PAPER_POS와 동일 필드)."""
+    return {
+        "symbol": symbol,
+        "status": "FLAT",
+        "cash_krw": cash_krw,
+        "qty": 0.0,
+        "entry_time": None,
+        "entry_price": None,
+        "entry_fee_krw": None,
+        "u_exec": None,
+        "d_exec": None,
+        "h_sec": None,
+        "entry_pred_t0": None,
+        "entry_model_version": None,
+        "entry_r_t": None,
+        "entry_z_barrier": None,
+        "entry_ev_rate": None,
+        "entry_p_none": None,
+        "initial_krw": settings.PAPER_INITIAL_KRW,
+        "equity_high": cash_krw,
+        "day_start_date": day,
+        "day_start_equity": cash_krw,
+        "halted": False,
+        "halt_reason": None,
+        "halted_at": None,
+    }
+
+
+@dataclass
+class BacktestResult:
+    trades: list[dict]
+    final_pos: dict
+    initial_equity: float
+    final_equity: float
+    max_drawdown: float
+    n_ticks: int
+    n_steps: int
+    elapsed_sec: float
+    engine: str = "fast"
+    extra: dict = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        exits = [t for t in self.trades if t["action"] == "EXIT_LONG"]
+        pnl_rates = [t["pnl_rate"] for t in exits if t.get("pnl_rate") is not None]
+        by_reason: dict[str, int] = {}
+        for t in exits:
+            by_reason[t["reason"]] = by_reason.get(t["reason"], 0) + 1
+        pnl_krw = self.final_equity - self.initial_equity
+        return {
+            "engine": self.engine,
+            "n_ticks": self.n_ticks,
+            "n_steps": self.n_steps,
+            "n_enters": sum(1 for t in self.trades if t["action"] == "ENTER_LONG"),
+            "n_exits": len(exits),
+            "exits_by_reason": by_reason,
+            "win_rate": (sum(1 for r in pnl_rates if r > 0) / len(pnl_rates)) if pnl_rates else None,
+            "avg_pnl_rate": (sum(pnl_rates) / len(pnl_rates)) if pnl_rates else None,
+            "pnl_krw": pnl_krw,
+            "return_pct": pnl_krw / self.initial_equity * 100 if self.initial_equity else 0.0,
+            "max_drawdown_pct": self.max_drawdown * 100,
+            "halted": bool(self.final_pos.get("halted")),
+            "halt_reason": self.final_pos.get("halt_reason"),
+            "elapsed_sec": self.elapsed_sec,
+        }
+
+
+class _Sim:
+    """Paper book state + one-tick step shared by both engines."""
+
+    def __init__(self, data: BacktestData, settings, initial_pos: dict | None, intrabar: bool):
+        self.d = data
+        self.s = settings
+        self.profile = getattr(settings, "PAPER_POLICY_PROFILE", "strict")
+        self.slip_rate = settings.SLIPPAGE_BPS / 10000.0
+        self.intrabar = intrabar
+        if initial_pos is None:
+            day = ns_to_dt(data.tick_ts[0]).date() if data.n_ticks else None
+            initial_pos = new_flat_position(data.symbol, settings.PAPER_INITIAL_KRW, day, settings)
+        self.pos = dict(initial_pos)
+        self.initial_equity = float(self.pos["cash_krw"])
+        self.equity = self.initial_equity
+        self.max_dd = 0.0
+        self.trades: list[dict] = []
+        self.recent_enters: deque[datetime] = deque()
+        self.enter_ns: list[int] = []
+        self.last_trade_time: datetime | None = None
+        self.last_trade_ns: int | None = None
+        self.last_step_ns: int | None = None
+        self.last_tick = -1
+        self.n_steps = 0
+
+    # ── inputs ────────────────────────────────────────────────────────────────
+
+    def snapshot_at(self, k: int) -> dict:
+        d = self.d
+        bid = d.tick_bid[k]
+        ask = d.tick_ask[k]
+        return market_snapshot(
+            None if np.isnan(bid) else float(bid),
+            None if np.isnan(ask) else float(ask),
+            float(d.tick_lag_sec[k]),
+        )
+
+    # ── step (PaperTradingRunner._run_tick 과 동일 순서) ──────────────────────
+
+    def step(self, now_ns: int, pred: dict | None, snapshot: dict) -> str:
+        s = self.s
+        now_utc = ns_to_dt(now_ns)
+        pos = self.pos
+
+        recent_count, last_trade_time = 0, None
+        if self.profile == "test":
+            since = now_utc - timedelta(hours=1)
+            while self.recent_enters and self.recent_enters[0] < since:
+                self.recent_enters.popleft()
+            recent_count = len(self.recent_enters)
+            last_trade_time = self.last_trade_time
+
+        action, reason, _flags, _diag = decide_action(
+            now_utc, pos, pred, snapshot, s,
+            recent_enter_count=recent_count, last_trade_time=last_trade_time,
+        )
+
+        trade = None
+        if action == "ENTER_LONG":
+            result = execute_enter_long(pos, pred, snapshot, s, now_utc)
+            if result is not None:
+                new_pos, trade = result
+                pos = carry_risk_fields(new_pos, pos, s)
+        elif action == "EXIT_LONG":
+            new_pos, trade = execute_exit_long(pos, snapshot, s, now_utc, reason)
+            pos = carry_risk_fields(new_pos, pos, s)
+
+        equity = compute_equity(pos, snapshot, action, s)
+        risk, dd = apply_risk_checks(pos, equity, now_utc, s)
+        self.pos = {**pos, **risk}
+        self.equity = equity
+        self.max_dd = min(self.max_dd, dd)
+        self.last_step_ns = now_ns
+        self.n_steps += 1
+
+        if trade is not None:
+            self.trades.append(trade)
+            self.last_trade_time = trade["t"]
+            self.last_trade_ns = now_ns
+            if trade["action"] == "ENTER_LONG":
+                self.recent_enters.append(trade["t"])
+                self.enter_ns.append(now_ns)
+        return action
+
+    def step_tick(self, k: int) -> str:
+        d = self.d
+        self.last_tick = k
+        return self.step(int(d.tick_ts[k]), d.pred_row(int(d.tick_pred_idx[k])), self.snapshot_at(k))
+
+    # ── intrabar touch ────────────────────────────────────────────────────────
+
+    def find_touch(self, lo_ns: int, hi_ns: int) -> tuple[int, str] | None:
+        """First 1s bar in (lo_ns, hi_ns] touching u_exec/d_exec. Returns (bar idx, reason).
+
+        bar 하나가 high/low로 양쪽을 모두 건드리면 TP — ExitMonitor.on_quote와 같은 우선순위.
+        """
+        pos = self.pos
+        if pos["status"] != "LONG":
+            return None
+        d = self.d
+        i0 = int(np.searchsorted(d.bar_ts, lo_ns, side="right"))
+        i1 = int(np.searchsorted(d.bar_ts, hi_ns, side="right"))
+        if i0 >= i1:
+            return None
+        u_exec = pos.get("u_exec")
+        d_exec = pos.get("d_exec")
+        hit_up = np.zeros(i1 - i0, dtype=bool)
+        hit_dn = np.zeros(i1 - i0, dtype=bool)
+        if u_exec is not None:
+            hit_up = d.bar_bid_high[i0:i1] * (1 - self.slip_rate) >= u_exec
+        if d_exec is not None:
+            hit_dn = d.bar_bid_low[i0:i1] * (1 - self.slip_rate) <= d_exec
+        idx = np.flatnonzero(hit_up | hit_dn)
+        if len(idx) == 0:
+            return None
+        b = int(idx[0])
+        return i0 + b, ("TP" if hit_up[b] else "SL")
+
+    def step_touch(self, bar_idx: int, reason: str) -> str:
+        """ExitMonitor touch → runner._run_touch_exit 과 동일하게 lag 0 snapshot으로 tick."""
+        d = self.d
+        level = self.pos["d_exec"] if reason == "SL" else self.pos["u_exec"]
+        # bid such that bid * (1 - slip) lands on the barrier (nudged so the >= / <= holds)
+        bid = level / (1 - self.slip_rate)
+        while (reason == "TP" and bid * (1 - self.slip_rate) < level) or \
+              (reason == "SL" and bid * (1 - self.slip_rate) > level):
+            bid = float(np.nextafter(bid, np.inf if reason == "TP" else -np.inf))
+        ask = d.bar_ask[bar_idx]
+        now_ns = int(d.bar_ts[bar_idx])
+        snapshot = market_snapshot(bid, None if np.isnan(ask) else float(ask), 0.0)
+        return self.step(now_ns, d.pred_row(d.pred_idx_at(now_ns)), snapshot)
+
+    def maybe_touch(self, k: int) -> None:
+        """LONG이면 (직전 step, tick k] 에 끝난 1s bar에서 touch 확인 후 청산.
+
+        market_1s.ts는 bar 종료 시각이므로 ts == tick k 인 bar도 tick 이전 quote다.
+        """
+        if not self.intrabar or self.last_step_ns is None or self.pos["status"] != "LONG":
+            return
+        touch = self.find_touch(self.last_step_ns, int(self.d.tick_ts[k]))
+        if touch is not None:
+            self.step_touch(*touch)
+
+    def result(self, engine: str, t_start: float) -> BacktestResult:
+        return BacktestResult(
+            trades=self.trades,
+            final_pos=self.pos,
+            initial_equity=self.initial_equity,
+            final_equity=self.equity,
+            max_drawdown=self.max_dd,
+            n_ticks=self.d.n_ticks,
+            n_steps=self.n_steps,
+            elapsed_sec=time.perf_counter() - t_start,
+            engine=engine,
+        )
+
+
+def _intrabar(settings, intrabar: bool | None) -> bool:
+    if intrabar is None:
+        return bool(getattr(settings, "PAPER_INTRABAR_EXIT_ENABLED", True))
+    return intrabar
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Reference engine
+# ──────────────────────────────────────────────────────────────────────────────
+
+def run_reference(
+    data: BacktestData,
+    settings,
+    initial_pos: dict | None = None,
+    intrabar: bool | None = None,
+) -> BacktestResult:
+    """Step every tick — slow but structurally identical to the live runner."""
+    t_start = time.perf_counter()
+    sim = _Sim(data, settings, initial_pos, _intrabar(settings, intrabar))
+    for k in range(data.n_ticks):
+        sim.maybe_touch(k)
+        sim.step_tick(k)
+    return sim.result("reference", t_start)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Fast engine
+# ──────────────────────────────────────────────────────────────────────────────
+
+def enter_mask(data: BacktestData, settings) -> np.ndarray:
+    """Ticks where _decide_flat passes every static (state-independent) check.
+
+    Mirrors _decide_flat flag by flag; COOLDOWN / RATE_LIMIT / HALTED are state-dependent
+    and handled in run_fast.
+    """
+    th = _get_thresholds(settings)
+    j = data.tick_pred_idx
+    has_pred = j >= 0
+    jj = np.where(has_pred, j, 0)
+    if len(data.pred_t0) == 0:
+        return np.zeros(data.n_ticks, dtype=bool)
+
+    r_t = data.pred_r_t[jj]
+    p_up = data.pred_p_up[jj]
+    p_down = data.pred_p_down[jj]
+    p_none = data.pred_p_none[jj]
+    ev_rate = data.pred_ev_rate[jj]
+    spread = data.tick_spread_bps
+
+    # _compute_cost_est와 동일 연산 순서
+    fee_round = 2 * settings.FEE_RATE
+    slip_round = 2 * (settings.SLIPPAGE_BPS / 10000.0)
+    cost_est = settings.EV_COST_MULT * (fee_round + slip_round + spread / 10000.0)
+
+    with np.errstate(invalid="ignore"):
+        ok = has_pred
+        ok &= ~(data.tick_lag_sec > settings.DATA_LAG_SEC_MAX)
+        ok &= ~(spread > settings.ENTER_SPREAD_BPS_MAX)
+        ok &= ~(r_t <= th["cost_rmin_mult"] * cost_est)
+        ok &= ~(p_none > th["enter_pnone_max"])
+        ok &= ~(p_up < p_down + th["enter_pdir_margin"])
+        ok &= ~(np.isnan(ev_rate) | (ev_rate < th["enter_ev_rate_th"]))
+    return ok
+
+
+def _next_entry(sim: _Sim, cand: np.ndarray, k: int) -> int | None:
+    """First candidate tick >= k that also passes COOLDOWN / RATE_LIMIT (test profile)."""
+    s = sim.s
+    ts = sim.d.tick_ts
+    c = int(np.searchsorted(cand, k))
+    while c < len(cand):
+        i = int(cand[c])
+        if sim.profile != "test":
+            return i
+        t = int(ts[i])
+        if sim.last_trade_ns is not None and t - sim.last_trade_ns < s.TEST_COOLDOWN_SEC * _NS:
+            k2 = int(np.searchsorted(ts, sim.last_trade_ns + s.TEST_COOLDOWN_SEC * _NS, side="left"))
+            c = int(np.searchsorted(cand, max(k2, i + 1)))
+            continue
+        enters = sim.enter_ns
+        first_counted = int(np.searchsorted(enters, t - _HOUR_NS, side="left"))
+        counted = len(enters) - first_counted
+        if counted >= s.TEST_MAX_ENTRIES_PER_HOUR:
+            # 가장 오래된 것부터 빠져야 할 개수만큼 지난 시점 (t - 1h > e)
+            e = enters[first_counted + counted - s.TEST_MAX_ENTRIES_PER_HOUR]
+            k2 = int(np.searchsorted(ts, e + _HOUR_NS, side="right"))
+            c = int(np.searchsorted(cand, max(k2, i + 1)))
+            continue
+        return i
+    return None
+
+
+def run_fast(
+    data: BacktestData,
+    settings,
+    initial_pos: dict | None = None,
+    intrabar: bool | None = None,
+) -> BacktestResult:
+    """Columnar fast path — same trades as run_reference, skipping inert FLAT ticks."""
+    t_start = time.perf_counter()
+    sim = _Sim(data, settings, initial_pos, _intrabar(settings, intrabar))
+    n = data.n_ticks
+    cand = np.flatnonzero(enter_mask(data, settings))
+
+    k = 0
+    while k < n:
+        if sim.pos["status"] == "LONG":
+            sim.maybe_touch(k)
+            if sim.pos["status"] == "LONG":
+                sim.step_tick(k)
+                k += 1
+            continue
+
+        if sim.pos.get("halted"):
+            break
+        i = _next_entry(sim, cand, k)
+        if i is None:
+            break
+        if i - 1 >= k:
+            # 건너뛴 FLAT tick 중 마지막 1개만 step → day_start/equity_high 보정
+            sim.step_tick(i - 1)
+        action = sim.step_tick(i)
+        k = i + 1
+        if action == "ENTER_LONG" and sim.pos["status"] != "LONG":
+            # invest_krw < MIN_ORDER_KRW: cash 불변이므로 이후 진입도 모두 불가
+            break
+
+    if sim.last_tick < n - 1:
+        sim.step_tick(n - 1)
+    return sim.result("fast", t_start)
+
+
+def run_backtest(
+    data: BacktestData,
+    settings,
+    engine: str = "fast",
+    initial_pos: dict | None = None,
+    intrabar: bool | None = None,
+) -> BacktestResult:
+    if engine == "reference":
+        return run_reference(data, settings, initial_pos, intrabar)
+    return run_fast(data, settings, initial_pos, intrabar)
@@ -0,0 +1,334 @@
+"""
+optimize.py — policy threshold 탐색 (grid / random) + walk-forward 검증
+
+run_fast 백테스트를 파라미터 조합 × fold마다 process pool로 분산 실행한다.
+market/prediction 배열은 shared memory에 한 번만 올리고 worker는 attach만 하므로
+조합마다 배열을 pickle하지 않는다.
+
+사용법:
+  # grid
+  poetry run python -m app.backtest.optimize \\
+    --start "2026-02-01T00:00:00Z" --end "2026-03-01T00:00:00Z" \\
+    --grid ENTER_EV_RATE_TH=0,0.00001,0.00002 \\
+    --grid ENTER_PNONE_MAX=0.6,0.7,0.8 \\
+    --grid EXIT_EV_RATE_TH=-0.00004,-0.00002 \\
+    --folds 4 --workers 4
+
+  # random search
+  poetry run python -m app.backtest.optimize --start ... --end ... \\
+    --random 300 --seed 42 \\
+    --range ENTER_EV_RATE_TH=-0.00002:0.00005 \\
+    --range COST_RMIN_MULT=0.8:1.6
+
+옵션:
+  --profile strict|test   test profile은 TEST_* 키가 적용됨 (_get_thresholds 참고)
+  --folds N               기간을 N개 연속 구간으로 분할, 각 구간은 PAPER_INITIAL_KRW로 새로 시작
+  --objective pnl|calmar  walk-forward에서 파라미터 선택 기준 (기본 pnl)
+  --min-trades N          선택 후보의 in-sample 최소 청산 수 (기본 5)
+  --out results.csv       조합별 fold 결과 저장
+
+리포트:
+  - Pareto front: 전체 fold 합산 기준 (pnl ↑, max drawdown ↑(덜 음수), 청산 수 ↑)
+  - Walk-forward: fold i의 파라미터는 fold 0..i-1 성과로 선택, fold i 성과가 out-of-sample
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from app.backtest.data import BacktestData, load_backtest_data
+from app.backtest.engine import run_fast
+from app.backtest.run import parse_overrides
+from app.config import load_settings
+from app.db.session import get_engine
+from app.features.export_dataset import _parse_dt
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Shared memory
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def share_data(data: BacktestData) -> tuple[list[shared_memory.SharedMemory], dict]:
+    """Copy every ndarray field into shared memory. Returns (blocks, picklable spec)."""
+    blocks: list[shared_memory.SharedMemory] = []
+    spec: dict = {"symbol": data.symbol, "model_versions": list(data.model_versions), "arrays": {}}
+    for f in fields(data):
+        arr = getattr(data, f.name)
+        if not isinstance(arr, np.ndarray):
+            continue
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        spec["arrays"][f.name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+
+def attach_data(spec: dict) -> tuple[BacktestData, list[shared_memory.SharedMemory]]:
+    """Rebuild BacktestData as zero-copy views over the shared blocks."""
+    blocks: list[shared_memory.SharedMemory] = []
+    arrays: dict[str, np.ndarray] = {}
+    for name, (shm_name, shape, dtype) in spec["arrays"].items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    data = BacktestData(symbol=spec["symbol"], model_versions=spec["model_versions"], **arrays)
+    return data, blocks
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Worker
+# ──────────────────────────────────────────────────────────────────────────────
+
+# per-process state set by _init_worker (data views must outlive each task)
+_W: dict = {}
+
+
+def _init_worker(spec: dict | None, data: BacktestData | None, settings, folds, intrabar) -> None:
+    if spec is not None:
+        data, blocks = attach_data(spec)
+        _W["blocks"] = blocks
+    _W["data"] = data
+    _W["settings"] = settings
+    _W["folds"] = folds
+    _W["intrabar"] = intrabar
+
+
+def _evaluate(params: dict) -> dict:
+    data: BacktestData = _W["data"]
+    s = _W["settings"].model_copy(update=params)
+    out = {"params": params, "folds": []}
+    for a, b in _W["folds"]:
+        res = run_fast(data.slice_ticks(a, b), s, intrabar=_W["intrabar"])
+        sm = res.summary()
+        out["folds"].append({
+            "pnl_krw": sm["pnl_krw"],
+            "return_pct": sm["return_pct"],
+            "max_drawdown_pct": sm["max_drawdown_pct"],
+            "n_exits": sm["n_exits"],
+            "win_rate": sm["win_rate"],
+            "halted": sm["halted"],
+        })
+    return out
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Search space / selection
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def build_candidates(settings, grid: list[str], ranges: list[str], n_random: int, seed: int) -> list[dict]:
+    """Grid (cartesian product of --grid lists) × random draws over --range bounds."""
+    grid_axes: dict[str, list] = {}
+    for g in grid:
+        key, _, vals = g.partition("=")
+        grid_axes[key.strip()] = [
+            parse_overrides(settings, [f"{key.strip()}={v}"])[key.strip()] for v in vals.split(",") if v.strip()
+        ]
+    base = [
+        dict(zip(grid_axes, combo, strict=True)) for combo in itertools.product(*grid_axes.values())
+    ] or [{}]
+
+    if not ranges:
+        return base
+
+    bounds: dict[str, tuple[float, float]] = {}
+    for r in ranges:
+        key, _, span = r.partition("=")
+        lo, _, hi = span.partition(":")
+        key = key.strip()
+        parse_overrides(settings, [f"{key}={lo}"])  # validate key
+        bounds[key] = (float(lo), float(hi))
+
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(max(n_random, 1)):
+        draw = {}
+        for k, (lo, hi) in bounds.items():
+            v = rng.uniform(lo, hi)
+            draw[k] = int(round(v)) if isinstance(getattr(settings, k), int) else float(v)
+        out.append({**base[int(rng.integers(len(base)))], **draw})
+    return out
+
+
+def pareto_front(points: np.ndarray) -> np.ndarray:
+    """Indices of non-dominated rows (every column maximized)."""
+    keep = np.ones(len(points), dtype=bool)
+    for i in range(len(points)):
+        dominated = np.all(points >= points[i], axis=1) & np.any(points > points[i], axis=1)
+        if dominated.any():
+            keep[i] = False
+    return np.flatnonzero(keep)
+
+
+def _score(folds: list[dict], objective: str) -> float:
+    ret = sum(f["return_pct"] for f in folds)
+    if objective == "calmar":
+        dd = min((f["max_drawdown_pct"] for f in folds), default=0.0)
+        return ret / max(abs(dd), 0.01)
+    return sum(f["pnl_krw"] for f in folds)
+
+
+def walk_forward(results: list[dict], objective: str, min_trades: int) -> list[dict]:
+    """For fold i ≥ 1 pick the best params on folds [0, i) and report fold i out-of-sample."""
+    n_folds = len(results[0]["folds"]) if results else 0
+    steps = []
+    for i in range(1, n_folds):
+        best, best_score = None, None
+        for r in results:
+            ins = r["folds"][:i]
+            if sum(f["n_exits"] for f in ins) < min_trades:
+                continue
+            sc = _score(ins, objective)
+            if best_score is None or sc > best_score:
+                best, best_score = r, sc
+        if best is None:
+            steps.append({"fold": i, "params": None})
+            continue
+        steps.append({"fold": i, "params": best["params"], "in_sample": best_score, **best["folds"][i]})
+    return steps
+
+
+def _fold_bounds(n_ticks: int, n_folds: int) -> list[tuple[int, int]]:
+    edges = np.linspace(0, n_ticks, n_folds + 1).astype(int)
+    return [(int(edges[i]), int(edges[i + 1])) for i in range(n_folds) if edges[i + 1] > edges[i]]
+
+
+def run_search(
+    data: BacktestData,
+    settings,
+    candidates: list[dict],
+    n_folds: int,
+    workers: int,
+    intrabar: bool | None = None,
+) -> list[dict]:
+    folds = _fold_bounds(data.n_ticks, n_folds)
+    if workers <= 1:
+        _init_worker(None, data, settings, folds, intrabar)
+        return [_evaluate(p) for p in candidates]
+
+    blocks, spec = share_data(data)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(spec, None, settings, folds, intrabar),
+        ) as pool:
+            chunk = max(1, len(candidates) // (workers * 8))
+            return list(pool.map(_evaluate, candidates, chunksize=chunk))
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def results_frame(results: list[dict]) -> pd.DataFrame:
+    rows = []
+    for r in results:
+        fs = r["folds"]
+        row = dict(r["params"])
+        row["pnl_krw"] = sum(f["pnl_krw"] for f in fs)
+        row["return_pct"] = sum(f["return_pct"] for f in fs)
+        row["max_drawdown_pct"] = min((f["max_drawdown_pct"] for f in fs), default=0.0)
+        row["n_exits"] = sum(f["n_exits"] for f in fs)
+        row["halted_folds"] = sum(1 for f in fs if f["halted"])
+        for i, f in enumerate(fs):
+            row[f"f{i}_pnl_krw"] = f["pnl_krw"]
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Policy threshold search with walk-forward")
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument("--start", required=True, help="ISO8601 UTC")
+    parser.add_argument("--end", required=True, help="ISO8601 UTC")
+    parser.add_argument("--profile", choices=["strict", "test"], default=None)
+    parser.add_argument("--interval-sec", type=int, default=None)
+    parser.add_argument("--grid", action="append", default=[], metavar="KEY=v1,v2,...")
+    parser.add_argument("--range", dest="ranges", action="append", default=[], metavar="KEY=lo:hi")
+    parser.add_argument("--random", type=int, default=0, help="number of random draws over --range")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--folds", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--objective", choices=["pnl", "calmar"], default="pnl")
+    parser.add_argument("--min-trades", type=int, default=5)
+    parser.add_argument("--no-intrabar", action="store_true")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    s = load_settings()
+    updates = parse_overrides(s, args.overrides)
+    if args.profile:
+        updates["PAPER_POLICY_PROFILE"] = args.profile
+    if updates:
+        s = s.model_copy(update=updates)
+
+    try:
+        candidates = build_candidates(s, args.grid, args.ranges, args.random, args.seed)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if candidates == [{}]:
+        print("❌ Empty search space: pass --grid and/or --range")
+        return 1
+
+    symbol = args.symbol or s.SYMBOL
+    interval = args.interval_sec or s.DECISION_INTERVAL_SEC
+    engine = get_engine(s, "backtest_optimize", pool_size=2, statement_timeout_ms=0)
+    data = load_backtest_data(engine, symbol, _parse_dt(args.start), _parse_dt(args.end), interval)
+    if data.n_ticks == 0 or len(data.pred_t0) == 0:
+        print("❌ No ticks or predictions in range")
+        return 1
+
+    print("=" * 60)
+    print(f"Policy search: {len(candidates)} candidates × {args.folds} folds, workers={args.workers}")
+    print(f"  ticks={data.n_ticks}  predictions={len(data.pred_t0)}  bars={len(data.bar_ts)}")
+    print("=" * 60)
+
+    results = run_search(
+        data, s, candidates, args.folds, args.workers,
+        intrabar=False if args.no_intrabar else None,
+    )
+    df = results_frame(results)
+    param_cols = [c for c in df.columns if c.isupper()]
+
+    # ── Pareto front (full sample)
+    pts = df[["pnl_krw", "max_drawdown_pct", "n_exits"]].to_numpy(dtype=float)
+    front = df.iloc[pareto_front(pts)].sort_values("pnl_krw", ascending=False)
+    print(f"\n[Pareto front] {len(front)} / {len(df)} (pnl ↑, max_dd ↑, exits ↑)")
+    with pd.option_context("display.width", 200, "display.max_columns", 50):
+        print(front[param_cols + ["pnl_krw", "max_drawdown_pct", "n_exits", "halted_folds"]]
+              .head(args.top).to_string(index=False))
+
+    # ── Walk-forward
+    steps = walk_forward(results, args.objective, args.min_trades)
+    print(f"\n[Walk-forward] objective={args.objective} min_trades={args.min_trades}")
+    oos_pnl = 0.0
+    for st in steps:
+        if st["params"] is None:
+            print(f"  fold {st['fold']}: no candidate with >= {args.min_trades} in-sample exits")
+            continue
+        oos_pnl += st["pnl_krw"]
+        print(f"  fold {st['fold']}: params={st['params']}")
+        print(f"           OOS pnl={st['pnl_krw']:+,.0f} KRW  dd={st['max_drawdown_pct']:.3f}%  "
+              f"exits={st['n_exits']}  in-sample score={st['in_sample']:+.4g}")
+    print(f"  OOS total pnl: {oos_pnl:+,.0f} KRW")
+
+    if args.out:
+        df.to_csv(args.out, index=False)
+        print(f"\nResults saved: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+run.py — 저장된 predictions + market_1s로 paper policy 백테스트
+
+사용법:
+  poetry run python -m app.backtest.run \\
+    --start "2026-02-22T00:00:00Z" \\
+    --end   "2026-02-23T00:00:00Z"
+
+옵션:
+  --symbol KRW-BTC           (기본 settings.SYMBOL)
+  --profile strict|test      (기본 settings.PAPER_POLICY_PROFILE)
+  --interval-sec 5           (기본 settings.DECISION_INTERVAL_SEC)
+  --engine fast|reference    (기본 fast)
+  --no-intrabar              intrabar TP/SL touch 비활성화
+  --set KEY=VALUE            settings override (반복 가능, 예: --set ENTER_EV_RATE_TH=0.00002)
+  --trades-out trades.csv    체결 내역 저장
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+import pandas as pd
+
+from app.backtest.data import load_backtest_data
+from app.backtest.engine import run_backtest
+from app.config import load_settings
+from app.db.session import get_engine
+from app.features.export_dataset import _parse_dt
+
+
+def parse_overrides(settings, pairs: list[str]) -> dict:
+    """["KEY=VALUE", ...] → {KEY: value} cast to the existing settings field type."""
+    updates: dict = {}
+    for pair in pairs:
+        key, sep, raw = pair.partition("=")
+        key = key.strip()
+        if not sep or not hasattr(settings, key):
+            raise ValueError(f"unknown setting override: {pair!r}")
+        cur = getattr(settings, key)
+        if isinstance(cur, bool):
+            updates[key] = raw.strip().lower() in ("1", "true", "yes", "on")
+        elif isinstance(cur, int):
+            updates[key] = int(raw)
+        elif isinstance(cur, float):
+            updates[key] = float(raw)
+        else:
+            updates[key] = raw
+    return updates
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Paper policy backtest")
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument("--start", required=True, help="ISO8601 UTC")
+    parser.add_argument("--end", required=True, help="ISO8601 UTC")
+    parser.add_argument("--profile", choices=["strict", "test"], default=None)
+    parser.add_argument("--interval-sec", type=int, default=None)
+    parser.add_argument("--engine", choices=["fast", "reference"], default="fast")
+    parser.add_argument("--no-intrabar", action="store_true")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--trades-out", default=None)
+    args = parser.parse_args()
+
+    s = load_settings()
+    updates = parse_overrides(s, args.overrides)
+    if args.profile:
+        updates["PAPER_POLICY_PROFILE"] = args.profile
+    if updates:
+        s = s.model_copy(update=updates)
+
+    symbol = args.symbol or s.SYMBOL
+    interval = args.interval_sec or s.DECISION_INTERVAL_SEC
+    start = _parse_dt(args.start)
+    end = _parse_dt(args.end)
+
+    engine = get_engine(s, "backtest", pool_size=2, statement_timeout_ms=0)
+    print(f"Loading {symbol} {start} ~ {end} (interval={interval}s) ...")
+    data = load_backtest_data(engine, symbol, start, end, interval)
+    print(f"  ticks={data.n_ticks}  predictions={len(data.pred_t0)}  bars={len(data.bar_ts)}")
+    if data.n_ticks == 0 or len(data.pred_t0) == 0:
+        print("❌ No ticks or predictions in range")
+        return 1
+
+    result = run_backtest(
+        data, s, engine=args.engine, intrabar=False if args.no_intrabar else None,
+    )
+    summary = result.summary()
+
+    print("=" * 60)
+    print(f"Backtest [{summary['engine']}] profile={getattr(s, 'PAPER_POLICY_PROFILE', 'strict')}")
+    print("=" * 60)
+    print(f"  ticks / steps     : {summary['n_ticks']} / {summary['n_steps']}")
+    print(f"  enters / exits    : {summary['n_enters']} / {summary['n_exits']}")
+    print(f"  exits by reason   : {summary['exits_by_reason']}")
+    if summary["win_rate"] is not None:
+        print(f"  win rate          : {summary['win_rate']:.1%}")
+        print(f"  avg pnl_rate      : {summary['avg_pnl_rate'] * 100:+.4f}%")
+    print(f"  pnl               : {summary['pnl_krw']:+,.0f} KRW ({summary['return_pct']:+.3f}%)")
+    print(f"  max drawdown      : {summary['max_drawdown_pct']:.3f}%")
+    if summary["halted"]:
+        print(f"  HALTED            : {summary['halt_reason']}")
+    print(f"  elapsed           : {summary['elapsed_sec']:.3f}s")
+    print("=" * 60)
+
+    if args.trades_out:
+        pd.DataFrame(result.trades).to_csv(args.trades_out, index=False)
+        print(f"Trades saved: {args.trades_out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
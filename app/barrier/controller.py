@@ -29,6 +29,30 @@ WHERE symbol = :symbol AND ts >= :since AND spread_bps IS NOT NULL
 """)
 
 
+def sigma_from_mids(mids: list[float], dt: int) -> dict:
+    """dt초 간격으로 downsample한 mid의 log-return 표준편차 → sigma_1s.
+    (app.features.offline의 vectorized 버전과 같은 규칙)"""
+    if len(mids) < 2:
+        return {"sigma_1s": None, "sigma_dt": None, "sample_n": 0}
+
+    # Downsample by dt
+    use = mids[::dt] if dt > 1 else mids
+    if len(use) < 2:
+        return {"sigma_1s": None, "sigma_dt": None, "sample_n": 0}
+
+    arr = np.array(use, dtype=np.float64)
+    log_returns = np.diff(np.log(arr))
+    log_returns = log_returns[np.isfinite(log_returns)]
+
+    if len(log_returns) == 0:
+        return {"sigma_1s": None, "sigma_dt": None, "sample_n": 0}
+
+    sigma_dt = float(np.std(log_returns, ddof=1))
+    sigma_1s = sigma_dt / math.sqrt(dt) if dt > 0 else sigma_dt
+
+    return {"sigma_1s": sigma_1s, "sigma_dt": sigma_dt, "sample_n": len(log_returns)}
+
+
 class BarrierController:
     def __init__(self, settings: Settings, engine: Engine) -> None:
         self.settings = settings
@@ -62,26 +86,7 @@ class BarrierController:
             v = r.mid_close_1s if r.mid_close_1s is not None else r.mid
             if v is not None and v > 0:
                 mids.append(v)
-
-        if len(mids) < 2:
-            return {"sigma_1s": None, "sigma_dt": None, "sample_n": 0}
-
-        # Downsample by dt
-        use = mids[::dt] if dt > 1 else mids
-        if len(use) < 2:
-            return {"sigma_1s": None, "sigma_dt": None, "sample_n": 0}
-
-        arr = np.array(use, dtype=np.float64)
-        log_returns = np.diff(np.log(arr))
-        log_returns = log_returns[np.isfinite(log_returns)]
-
-        if len(log_returns) == 0:
-            return {"sigma_1s": None, "sigma_dt": None, "sample_n": 0}
-
-        sigma_dt = float(np.std(log_returns, ddof=1))
-        sigma_1s = sigma_dt / math.sqrt(dt) if dt > 0 else sigma_dt
-
-        return {"sigma_1s": sigma_1s, "sigma_dt": sigma_dt, "sample_n": len(log_returns)}
+        return sigma_from_mids(mids, dt)
 
     def compute_spread_median(self, symbol: str, now_utc: datetime) -> float | None:
         """Fetch median spread_bps from market_1s over COST_SPREAD_LOOKBACK_SEC."""
@@ -2,22 +2,28 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import Callable
 
 from sqlalchemy import text
 
 from app.barrier.controller import BarrierController
-from app.config import is_real_key, load_settings
+from app.config import is_real_key, load_paper_books, load_settings
 from app.db.init_db import ensure_schema
+from app.db.batch import get_write_behind
 from app.db.migrate import apply_migrations
-from app.db.session import get_engine
+from app.db.partitions import maintain_partitions
+from app.db.session import get_async_engine, get_engine, pool_stats
 from app.evaluator.evaluator import Evaluator
 from app.marketdata.resampler import MarketResampler
 from app.marketdata.state import MarketState
 from app.marketdata.upbit_ws import UpbitWsClient
 from app.models.baseline_v1 import BaselineModelV1
 from app.predictor.runner import PredictionRunner
+from app.tracing import get_tracer
 from app.altdata.runner import BinanceAltDataRunner, CoinglassAltDataRunner
+from app.exchange.private_ws import UpbitPrivateWsClient
 from app.exchange.runner import ShadowExecutionRunner, UpbitAccountRunner
+from app.trading.notify import PaperTradeFeed
 from app.trading.runner import PaperTradingRunner
 
 DB_RESOLVE_HINT = (
@@ -36,7 +42,7 @@ log = logging.getLogger(__name__)
 
 
 def check_db(settings) -> bool:
-    engine = get_engine(settings)
+    engine = get_engine(settings, "bot-check", pool_size=1)
     try:
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
@@ -56,7 +62,9 @@ async def consumer(
     queue: asyncio.Queue,
     state: MarketState,
     resampler: MarketResampler,
+    quote_listeners: list[Callable[[float, float], None]] | None = None,
 ) -> None:
+    listeners = quote_listeners or []
     while True:
         event = await queue.get()
         etype = event["event_type"]
@@ -88,6 +96,9 @@ async def consumer(
                         ask=best_ask,
                         imb_notional_top5=imb_notional,
                     )
+                    # Intrabar listeners (e.g. paper TP/SL monitor) — O(1), no I/O
+                    for listener in listeners:
+                        listener(best_bid, best_ask)
 
 
 async def printer(state: MarketState) -> None:
@@ -99,13 +110,14 @@ async def printer(state: MarketState) -> None:
 
 async def async_main() -> None:
     settings = load_settings()
-    engine = get_engine(settings)
+    engine = get_engine(settings, "bot")
+    async_engine = get_async_engine(settings, "bot-async")
     check_db(settings)
 
     ensure_schema(engine)
     log.info("DB schema ensured (market_1s, barrier_state, predictions, evaluation_results)")
 
-    apply_migrations(engine)
+    apply_migrations(engine, settings)
     log.info("DB migrations applied")
 
     state = MarketState(symbol=settings.SYMBOL)
@@ -116,7 +128,17 @@ async def async_main() -> None:
     model = BaselineModelV1()
     pred_runner = PredictionRunner(settings, engine, model)
     evaluator = Evaluator(settings, engine)
-    paper_runner = PaperTradingRunner(settings, engine, state)
+    paper_books = load_paper_books(settings)
+    # paper trade → shadow 즉시 전달: 같은 프로세스면 in-process, 아니면 Postgres LISTEN
+    trade_feed = PaperTradeFeed() if settings.UPBIT_SHADOW_NOTIFY_ENABLED else None
+    paper_runner = PaperTradingRunner(
+        settings, engine, state, books=paper_books,
+        trade_feed=trade_feed if settings.PAPER_TRADING_ENABLED else None,
+    )
+
+    quote_listeners: list = []
+    if settings.PAPER_TRADING_ENABLED and settings.PAPER_INTRABAR_EXIT_ENABLED:
+        quote_listeners.append(paper_runner.on_quote)
 
     async def sync_counters():
         while True:
@@ -124,9 +146,19 @@ async def async_main() -> None:
             state.counters["reconnect_count"] = client.reconnect_count
             state.counters["error_count"] = client.error_count
 
+    write_behind = get_write_behind()
+    wb_tables = {t.strip() for t in settings.DB_WRITE_BEHIND_TABLES.split(",") if t.strip()}
+    write_behind.configure(
+        engine, wb_tables,
+        flush_sec=settings.DB_WRITE_BEHIND_FLUSH_SEC,
+        batch_max=settings.DB_WRITE_BEHIND_BATCH_MAX,
+        buffer_max=settings.DB_WRITE_BEHIND_BUFFER_MAX,
+    )
+
     tasks = [
+        asyncio.create_task(write_behind.run(), name="write_behind"),
         asyncio.create_task(client.run(), name="ws"),
-        asyncio.create_task(consumer(queue, state, resampler), name="consumer"),
+        asyncio.create_task(consumer(queue, state, resampler, quote_listeners), name="consumer"),
         asyncio.create_task(printer(state), name="printer"),
         asyncio.create_task(sync_counters(), name="sync_counters"),
         asyncio.create_task(resampler.run(), name="resampler"),
@@ -135,9 +167,50 @@ async def async_main() -> None:
         asyncio.create_task(evaluator.run(), name="evaluator"),
     ]
 
+    if settings.TRACE_ENABLED:
+        tracer = get_tracer()
+        tracer.enabled = True
+        tasks.append(asyncio.create_task(
+            tracer.run_flusher(engine, settings.TRACE_FLUSH_SEC, async_engine=async_engine),
+            name="latency_trace_flush",
+        ))
+        log.info("Latency tracing enabled (flush=%ds)", settings.TRACE_FLUSH_SEC)
+
+    async def log_pool_stats():
+        while True:
+            await asyncio.sleep(settings.DB_POOL_STATS_LOG_SEC)
+            st = pool_stats(engine, reset_max=True)
+            log.info(
+                "DB pool: size=%d checked_out=%d overflow=%d checkouts=%d wait_avg=%.1fms "
+                "wait_max=%.1fms slow=%d timeouts=%d",
+                st["size"], st["checked_out"], st["overflow"], st["checkouts"],
+                st["wait_avg_ms"], st["wait_max_ms"], st["slow"], st["timeouts"],
+            )
+
+    if settings.DB_POOL_STATS_LOG_SEC > 0:
+        tasks.append(asyncio.create_task(log_pool_stats(), name="db_pool_stats"))
+
+    if settings.DB_PARTITION_TABLES.strip():
+        async def partition_maintenance():
+            while True:
+                await asyncio.sleep(settings.DB_PARTITION_MAINTAIN_SEC)
+                try:
+                    await asyncio.to_thread(maintain_partitions, engine, settings)
+                except Exception:
+                    log.exception("Partition maintenance failed")
+
+        tasks.append(asyncio.create_task(partition_maintenance(), name="partition_maintenance"))
+        log.info(
+            "Partition maintenance enabled (tables=%s interval=%s premake=%d)",
+            settings.DB_PARTITION_TABLES, settings.DB_PARTITION_INTERVAL, settings.DB_PARTITION_PREMAKE,
+        )
+
     if settings.PAPER_TRADING_ENABLED:
         tasks.append(asyncio.create_task(paper_runner.run(), name="paper_trading"))
-        log.info("Paper trading enabled")
+        log.info(
+            "Paper trading enabled (books=%s intrabar_exit=%s)",
+            list(paper_books), settings.PAPER_INTRABAR_EXIT_ENABLED,
+        )
 
     if settings.ALT_DATA_ENABLED:
         binance_runner = BinanceAltDataRunner(settings, engine)
@@ -152,13 +225,31 @@ async def async_main() -> None:
             settings.COINGLASS_POLL_SEC,
         )
 
+    private_ws = None
+    if settings.UPBIT_PRIVATE_WS_ENABLED and settings.UPBIT_ACCESS_KEY and settings.UPBIT_SECRET_KEY:
+        private_ws = UpbitPrivateWsClient(settings, engine)
+        tasks.append(asyncio.create_task(private_ws.run(), name="upbit_private_ws"))
+        log.info("UpbitPrivateWsClient enabled (%s)", settings.UPBIT_PRIVATE_WS_URL)
+
     if settings.UPBIT_SHADOW_ENABLED:
-        shadow_runner = ShadowExecutionRunner(settings, engine)
+        # Shadow execution mirrors the primary book only (its profile drives the live guards)
+        primary = settings.PAPER_PRIMARY_BOOK
+        if primary not in paper_books:
+            raise ValueError(f"PAPER_PRIMARY_BOOK={primary!r} not in PAPER_BOOKS {list(paper_books)}")
+        shadow_runner = ShadowExecutionRunner(
+            paper_books[primary], engine, private_ws=private_ws, trade_feed=trade_feed,
+        )
         tasks.append(asyncio.create_task(shadow_runner.run(), name="shadow_execution"))
-        log.info("ShadowExecutionRunner enabled (mode=%s)", settings.UPBIT_TRADE_MODE)
+        if trade_feed is not None and not settings.PAPER_TRADING_ENABLED:
+            tasks.append(asyncio.create_task(trade_feed.listen_pg(settings.DB_URL), name="paper_trade_listen"))
+        log.info(
+            "ShadowExecutionRunner enabled (mode=%s book=%s notify=%s)",
+            settings.UPBIT_TRADE_MODE, primary,
+            "off" if trade_feed is None else ("in-process" if settings.PAPER_TRADING_ENABLED else "pg"),
+        )
 
         if settings.UPBIT_ACCESS_KEY and settings.UPBIT_SECRET_KEY:
-            account_runner = UpbitAccountRunner(settings, engine)
+            account_runner = UpbitAccountRunner(settings, engine, private_ws=private_ws)
             tasks.append(asyncio.create_task(account_runner.run(), name="upbit_account"))
             log.info("UpbitAccountRunner enabled (poll=%ds)", settings.UPBIT_ACCOUNT_POLL_SEC)
         else:
@@ -1,3 +1,5 @@
+import json
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -86,6 +88,9 @@ class Settings(BaseSettings):
     # Equity logging
     PAPER_EQUITY_LOG_ENABLED: bool = True
 
+    # Intrabar TP/SL: check resting u_exec/d_exec on every orderbook quote
+    PAPER_INTRABAR_EXIT_ENABLED: bool = True
+
     # Policy profile: strict | test
     PAPER_POLICY_PROFILE: str = "strict"
     TEST_ENTER_EV_RATE_TH: float = -0.00003
@@ -96,6 +101,13 @@ class Settings(BaseSettings):
     TEST_MAX_ENTRIES_PER_HOUR: int = 2
     TEST_COOLDOWN_SEC: int = 300
 
+    # Multi-book paper trading: N named books share one tick / prediction / market snapshot.
+    # JSON {"book_id": {"SETTING": value, ...}} — 각 book은 전역 설정 + override
+    # 예: {"main": {}, "test": {"PAPER_POLICY_PROFILE": "test"}, "wide": {"PAPER_MAX_DRAWDOWN_PCT": 0.1}}
+    # 비어 있으면 전역 설정으로 단일 book(PAPER_PRIMARY_BOOK) 실행
+    PAPER_BOOKS: str = ""
+    PAPER_PRIMARY_BOOK: str = "main"   # ShadowExecution/대시보드가 따라가는 book
+
     MODE: str = "paper"
 
     # Upbit REST API
@@ -105,9 +117,22 @@ class Settings(BaseSettings):
     UPBIT_ACCOUNT_POLL_SEC: int = 30
     UPBIT_REST_TIMEOUT_SEC: float = 10.0
     UPBIT_REST_MAX_RETRY: int = 3
+    # 장수명 connection pool (keep-alive). HTTP/2는 optional 'h2' 패키지 필요
+    UPBIT_HTTP_POOL_SIZE: int = 4
+    UPBIT_HTTP2_ENABLED: bool = False
+    UPBIT_HTTP_KEEPALIVE_SEC: float = 30.0
+    # 공유 token bucket (rate group별 초당 허용량). permit 대기 상한 초과 시 호출 skip(throttled)
+    UPBIT_RATE_DEFAULT_PER_SEC: int = 30
+    UPBIT_RATE_ORDER_PER_SEC: int = 8
+    UPBIT_RATE_MAX_WAIT_SEC: float = 5.0
+    # Private WS (myOrder/myAsset push). 연결 중엔 REST는 재조정용 fallback만
+    UPBIT_PRIVATE_WS_ENABLED: bool = False
+    UPBIT_PRIVATE_WS_URL: str = "wss://api.upbit.com/websocket/v1/private"
+    UPBIT_ACCOUNT_RECONCILE_SEC: int = 300   # private WS 연결 중 계좌 REST polling 주기
 
     # Shadow / Live trading safety (3-layer guard)
     UPBIT_SHADOW_ENABLED: bool = True
+    UPBIT_SHADOW_NOTIFY_ENABLED: bool = True   # paper trade 커밋 즉시 shadow 실행 (false면 interval polling만)
     UPBIT_ORDER_TEST_ENABLED: bool = False
     LIVE_TRADING_ENABLED: bool = False
     UPBIT_TRADE_MODE: str = "shadow"  # shadow | live
@@ -116,6 +141,7 @@ class Settings(BaseSettings):
     # Live order polling (Step 8)
     LIVE_ORDER_POLL_INTERVAL_SEC: int = 5
     LIVE_ORDER_MAX_POLLS: int = 24  # up to 120s total
+    LIVE_ORDER_PUSH_WAIT_SEC: float = 30.0   # private WS 최종 체결 push 대기 후 REST polling fallback
 
     # E2E test order parameters (Step 10)
     UPBIT_E2E_TEST_ORDER_KRW: int = 10000   # BUY order_test KRW amount
@@ -127,7 +153,37 @@ class Settings(BaseSettings):
     UPBIT_TEST_SELL_BTC: float = 0.0001            # SELL order_test volume fallback (BTC)
     UPBIT_TEST_REQUIRE_PAPER_PROFILE: str = "test" # must match PAPER_POLICY_PROFILE to allow test
 
+    # Signal → order latency tracing (predictor → paper → shadow/Upbit hop별 monotonic 시각)
+    TRACE_ENABLED: bool = False
+    TRACE_FLUSH_SEC: int = 10   # 완료된 trace를 latency_traces에 일괄 insert하는 주기
+
     DB_URL: str = "postgresql+psycopg://postgres:postgres@db:5432/quant"
+    # engine factory (app.db.session.get_engine)
+    DB_POOL_SIZE: int = 0               # 0이면 활성 runner 수로 계산
+    DB_POOL_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT_SEC: float = 10.0   # checkout 대기 상한
+    DB_POOL_RECYCLE_SEC: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 60000   # 0이면 제한 없음 (대량 scan CLI는 component별로 0)
+    DB_APPLICATION_NAME: str = "quant"     # pg_stat_activity application_name = quant:<component>
+    DB_POOL_STATS_LOG_SEC: int = 60
+    DB_ASYNC_ENABLED: bool = False      # psycopg3 AsyncEngine (optional 'greenlet' 필요)
+    # write-behind (app.db.batch): 이 테이블들의 단건 writer는 buffer → executemany batch (async durability)
+    # 거래/주문/포지션/prediction은 항상 즉시 commit. 비우면 전부 즉시 기록
+    DB_WRITE_BEHIND_TABLES: str = (
+        "feature_snapshots,paper_decisions,coinglass_call_status,coinglass_liquidation_map"
+    )
+    DB_WRITE_BEHIND_FLUSH_SEC: float = 1.0
+    DB_WRITE_BEHIND_BATCH_MAX: int = 500
+    DB_WRITE_BEHIND_BUFFER_MAX: int = 10000
+    # cold storage (app.db.archive): 오래된 일 단위 구간 → zstd Parquet. 비어 있으면 reader는 DB만 조회
+    ARCHIVE_DIR: str = ""
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_CHUNK_ROWS: int = 50000     # server-side cursor fetch / Parquet row group 크기
+    # ts range partitioning (콤마 구분 테이블명 | "all", 비어 있으면 끔) — 기존 heap 테이블은 online 전환
+    DB_PARTITION_TABLES: str = ""
+    DB_PARTITION_INTERVAL: str = "day"    # day | week
+    DB_PARTITION_PREMAKE: int = 7         # 미리 만들어 둘 미래 partition 수
+    DB_PARTITION_MAINTAIN_SEC: int = 3600
 
     # ── Alt Data (Binance / Coinglass) ─────────────────────────────
     ALT_DATA_ENABLED: bool = True
@@ -139,9 +195,23 @@ class Settings(BaseSettings):
     BINANCE_FUTURES_REST_BASE: str = "https://fapi.binance.com"
     BINANCE_MARK_PRICE_STREAM: str = "!markPrice@arr@1s"
     BINANCE_FORCE_ORDER_STREAM: str = "!forceOrder@arr"
+    # markPrice write-behind: WS handler는 buffer에 넣기만, flusher가 batch insert
+    BINANCE_MARK_FLUSH_SEC: float = 1.0
+    BINANCE_MARK_BATCH_MAX: int = 500
+    BINANCE_MARK_BUFFER_MAX: int = 10000          # 초과 시 오래된 행부터 drop
+    BINANCE_MARK_RAW_JSON_EVERY_SEC: int = 60      # raw_json 저장 간격 (1=매 row, 0=저장 안 함)
+    # markPrice 전체 universe columnar 저장: ""=끔 | "*"=전체 | "BTCUSDT,ETHUSDT,..."
+    BINANCE_MARK_UNIVERSE: str = ""
+    BINANCE_MARK_UNIVERSE_BUFFER_SEC: int = 900    # DB 지연 시 보관할 최대 초(chunk) 수
     BINANCE_POLL_SEC: int = 60
     BINANCE_METRIC_PERIOD: str = "5m"
+    BINANCE_METRIC_SYMBOLS: str = ""    # 추가 수집 심볼 (콤마 구분, ALT_SYMBOL_BINANCE는 항상 포함)
+    BINANCE_METRIC_PERIODS: str = ""    # 추가 period (콤마 구분, BINANCE_METRIC_PERIOD는 항상 포함)
+    BINANCE_REST_CONCURRENCY: int = 8   # 동시 in-flight 요청 상한
+    BINANCE_REST_WEIGHT_LIMIT_1M: int = 2400
+    BINANCE_REST_WEIGHT_HEADROOM: float = 0.8   # 분당 weight 한도의 이 비율까지만 사용
     BINANCE_METRICS_FRESH_SEC: int = 180  # max(2*BINANCE_POLL_SEC, 180)
+    BINANCE_LIQ_ROLLUP_HORIZON_SEC: int = 3600    # 메모리 청산 rollup 보관 구간 (window 조회 상한)
 
     # Coinglass
     COINGLASS_API_KEY: str = ""
@@ -151,5 +221,43 @@ class Settings(BaseSettings):
     COINGLASS_ENABLED: bool = False
 
 
+def account_stale_after(settings: Settings, ws_connected: bool | None = None) -> int:
+    """upbit_account_snapshots가 stale로 보이기 시작하는 lag(초) — 실제 REST polling 주기 × 3.
+
+    private WS(myAsset) 연결 중엔 UpbitAccountRunner가 UPBIT_ACCOUNT_RECONCILE_SEC 주기로만 polling.
+    ws_connected None이면 UPBIT_PRIVATE_WS_ENABLED로 판단 (연결 상태를 모르는 dashboard).
+    """
+    if ws_connected is None:
+        ws_connected = settings.UPBIT_PRIVATE_WS_ENABLED
+    interval = settings.UPBIT_ACCOUNT_RECONCILE_SEC if ws_connected else settings.UPBIT_ACCOUNT_POLL_SEC
+    return interval * 3
+
+
 def load_settings() -> Settings:
     return Settings()
+
+
+# Stream-level settings every book must share (one WS / predictor / DB per process)
+_BOOK_SHARED_KEYS = {"SYMBOL", "DB_URL", "DECISION_INTERVAL_SEC", "PAPER_BOOKS", "PAPER_PRIMARY_BOOK"}
+
+
+def load_paper_books(settings: Settings) -> dict[str, Settings]:
+    """PAPER_BOOKS → {book_id: Settings}. Empty → {PAPER_PRIMARY_BOOK: settings}."""
+    raw = settings.PAPER_BOOKS.strip()
+    if not raw:
+        return {settings.PAPER_PRIMARY_BOOK: settings}
+    spec = json.loads(raw)
+    if not isinstance(spec, dict) or not spec:
+        raise ValueError("PAPER_BOOKS must be a non-empty JSON object")
+    base = settings.model_dump()
+    books: dict[str, Settings] = {}
+    for book_id, overrides in spec.items():
+        overrides = overrides or {}
+        unknown = [k for k in overrides if k not in Settings.model_fields]
+        if unknown:
+            raise ValueError(f"PAPER_BOOKS[{book_id}]: unknown settings {unknown}")
+        shared = [k for k in overrides if k in _BOOK_SHARED_KEYS]
+        if shared:
+            raise ValueError(f"PAPER_BOOKS[{book_id}]: per-book override not allowed for {shared}")
+        books[str(book_id)] = Settings.model_validate({**base, **overrides})
+    return books
@@ -13,7 +13,7 @@ import pandas as pd
 from datetime import datetime, timezone
 from sqlalchemy import text
 
-from app.config import is_real_key, load_settings
+from app.config import account_stale_after, is_real_key, load_paper_books, load_settings
 from app.db.session import get_engine
 from app.evaluator.evaluator import compute_calibration
 
@@ -25,6 +25,12 @@ DB_RESOLVE_HINT = (
 )
 
 
+@st.cache_resource
+def _engine(db_url: str):
+    # Streamlit rerun마다 새 engine/pool을 만들지 않도록 프로세스 단위로 재사용
+    return get_engine(load_settings(), "dashboard", pool_size=3)
+
+
 def main() -> None:
     st.set_page_config(page_title="BTC Quant Bot v1", layout="wide")
     st.title("BTC Quant Bot - v1 Dashboard")
@@ -36,7 +42,7 @@ def main() -> None:
     st.write(f"**SYMBOL:** {settings.SYMBOL}  |  **MODE:** {settings.MODE}")
 
     try:
-        engine = get_engine(settings)
+        engine = _engine(settings.DB_URL)
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         st.success("DB connection OK")
@@ -368,6 +374,33 @@ def main() -> None:
     # ══════════════════════════════════════════════════════════
     st.header("[E] Paper Trading")
 
+    # Paper books (PAPER_BOOKS) — pick one for the panels below
+    try:
+        with engine.connect() as conn:
+            books_df = pd.read_sql_query(
+                text(
+                    "SELECT book_id, status, cash_krw, qty, equity_high, halted, halt_reason, updated_at "
+                    "FROM paper_positions WHERE symbol = :sym ORDER BY book_id"
+                ),
+                conn,
+                params={"sym": settings.SYMBOL},
+            )
+    except Exception as e:
+        st.warning(f"paper books not available: {e}")
+        books_df = pd.DataFrame()
+
+    book_ids = books_df["book_id"].tolist() if not books_df.empty else [settings.PAPER_PRIMARY_BOOK]
+    if len(book_ids) > 1:
+        st.dataframe(books_df, use_container_width=True)
+        default_idx = book_ids.index(settings.PAPER_PRIMARY_BOOK) if settings.PAPER_PRIMARY_BOOK in book_ids else 0
+        book_id = st.selectbox("Paper book", book_ids, index=default_idx)
+    else:
+        book_id = book_ids[0]
+    try:
+        book_profile = load_paper_books(settings)[book_id].PAPER_POLICY_PROFILE
+    except (KeyError, ValueError):
+        book_profile = "N/A"
+
     try:
         with engine.connect() as conn:
             pp_df = pd.read_sql_query(
@@ -376,10 +409,10 @@ def main() -> None:
                     "u_exec, d_exec, h_sec, entry_r_t, entry_ev_rate, entry_p_none, "
                     "initial_krw, equity_high, day_start_date, day_start_equity, "
                     "halted, halt_reason, halted_at, updated_at "
-                    "FROM paper_positions WHERE symbol = :sym"
+                    "FROM paper_positions WHERE book_id = :book AND symbol = :sym"
                 ),
                 conn,
-                params={"sym": settings.SYMBOL},
+                params={"sym": settings.SYMBOL, "book": book_id},
             )
     except Exception as e:
         st.warning(f"paper_positions not available: {e}")
@@ -398,8 +431,8 @@ def main() -> None:
         p4.metric("Halted", str(halted_val) if halted_val is not None else "false")
         p4.metric("Halt Reason", pp.get("halt_reason") or "N/A")
         p5.metric("entry_r_t", f"{pp['entry_r_t']:.6f}" if pd.notna(pp["entry_r_t"]) else "N/A")
-        p5.metric("Profile", getattr(settings, "PAPER_POLICY_PROFILE", "strict"))
-        st.caption(f"Updated at: {pp['updated_at']}")
+        p5.metric("Profile", book_profile)
+        st.caption(f"Book: {book_id} — Updated at: {pp['updated_at']}")
     else:
         st.info("No paper position yet.")
 
@@ -411,12 +444,12 @@ def main() -> None:
                 text("""
                     SELECT ts, equity_est, drawdown_pct, policy_profile
                     FROM paper_decisions
-                    WHERE symbol = :sym AND equity_est IS NOT NULL
+                    WHERE book_id = :book AND symbol = :sym AND equity_est IS NOT NULL
                       AND ts >= now() - interval '6 hours'
                     ORDER BY ts ASC
                 """),
                 conn,
-                params={"sym": settings.SYMBOL},
+                params={"sym": settings.SYMBOL, "book": book_id},
             )
     except Exception as e:
         st.warning(f"equity data not available: {e}")
@@ -444,25 +477,25 @@ def main() -> None:
                            sum(fee_krw) as total_fee_krw
                     FROM (
                         SELECT * FROM paper_trades
-                        WHERE symbol = :sym AND action = 'EXIT_LONG'
+                        WHERE book_id = :book AND symbol = :sym AND action = 'EXIT_LONG'
                         ORDER BY t DESC LIMIT 200
                     ) sub
                 """),
                 conn,
-                params={"sym": settings.SYMBOL},
+                params={"sym": settings.SYMBOL, "book": book_id},
             )
             exit_reasons = pd.read_sql_query(
                 text("""
                     SELECT reason, count(*) as cnt
                     FROM (
                         SELECT reason FROM paper_trades
-                        WHERE symbol = :sym AND action = 'EXIT_LONG'
+                        WHERE book_id = :book AND symbol = :sym AND action = 'EXIT_LONG'
                         ORDER BY t DESC LIMIT 200
                     ) sub
                     GROUP BY reason ORDER BY cnt DESC
                 """),
                 conn,
-                params={"sym": settings.SYMBOL},
+                params={"sym": settings.SYMBOL, "book": book_id},
             )
     except Exception as e:
         st.warning(f"trade stats not available: {e}")
@@ -492,10 +525,10 @@ def main() -> None:
                 text(
                     "SELECT t, action, reason, price, qty, fee_krw, cash_after, "
                     "pnl_krw, pnl_rate, hold_sec, model_version "
-                    "FROM paper_trades WHERE symbol = :sym ORDER BY t DESC LIMIT 30"
+                    "FROM paper_trades WHERE book_id = :book AND symbol = :sym ORDER BY t DESC LIMIT 30"
                 ),
                 conn,
-                params={"sym": settings.SYMBOL},
+                params={"sym": settings.SYMBOL, "book": book_id},
             )
     except Exception as e:
         st.warning(f"paper_trades not available: {e}")
@@ -515,10 +548,10 @@ def main() -> None:
                     "SELECT ts, pos_status, action, reason, reason_flags, ev_rate, p_none, "
                     "spread_bps, lag_sec, cost_roundtrip_est, r_t, "
                     "equity_est, drawdown_pct, policy_profile "
-                    "FROM paper_decisions WHERE symbol = :sym ORDER BY ts DESC LIMIT 60"
+                    "FROM paper_decisions WHERE book_id = :book AND symbol = :sym ORDER BY ts DESC LIMIT 60"
                 ),
                 conn,
-                params={"sym": settings.SYMBOL},
+                params={"sym": settings.SYMBOL, "book": book_id},
             )
     except Exception as e:
         st.warning(f"paper_decisions not available: {e}")
@@ -536,13 +569,13 @@ def main() -> None:
                     SELECT reason, count(*) as cnt
                     FROM (
                         SELECT reason FROM paper_decisions
-                        WHERE symbol = :sym
+                        WHERE book_id = :book AND symbol = :sym
                         ORDER BY ts DESC LIMIT 500
                     ) sub
                     GROUP BY reason ORDER BY cnt DESC LIMIT 8
                 """),
                 conn,
-                params={"sym": settings.SYMBOL},
+                params={"sym": settings.SYMBOL, "book": book_id},
             )
     except Exception as e:
         st.warning(f"reason distribution not available: {e}")
@@ -561,10 +594,10 @@ def main() -> None:
             flags_raw = conn.execute(
                 text("""
                     SELECT reason_flags FROM paper_decisions
-                    WHERE symbol = :sym AND reason_flags IS NOT NULL
+                    WHERE book_id = :book AND symbol = :sym AND reason_flags IS NOT NULL
                     ORDER BY ts DESC LIMIT 500
                 """),
-                {"sym": settings.SYMBOL},
+                {"sym": settings.SYMBOL, "book": book_id},
             ).fetchall()
     except Exception as e:
         st.warning(f"reason_flags not available: {e}")
@@ -818,8 +851,7 @@ def main() -> None:
             if snap_ts.tzinfo is None:
                 snap_ts = snap_ts.replace(tzinfo=timezone.utc)
             snap_lag_sec = (now_utc - snap_ts).total_seconds()
-            threshold_sec = settings.UPBIT_ACCOUNT_POLL_SEC * 3
-            acct_fresh = snap_lag_sec <= threshold_sec
+            acct_fresh = snap_lag_sec <= account_stale_after(settings)
             snap_ts_str = str(snap_ts)[:19]
         else:
             snap_lag_sec = None
@@ -829,25 +861,23 @@ def main() -> None:
     if not acct_fresh:
         not_ready_reasons.append("ACCOUNT_STALE")
 
-    # remaining-req throttle check (from last order attempt)
+    # throttle check — 공유 limiter가 permit을 못 줘 skip된 주문 (status='throttled', 최근 10분)
+    # remaining-req.sec가 낮은 것 자체는 limiter 대기열에서 흡수되는 정상 상태라 기준으로 쓰지 않음
     rr_throttled = False
+    throttled_recent = 0
     try:
         with engine.connect() as conn:
-            rr_row = conn.execute(
+            throttled_recent = conn.execute(
                 text("""
-                    SELECT remaining_req FROM upbit_order_attempts
-                    WHERE symbol = :sym AND remaining_req IS NOT NULL
-                    ORDER BY ts DESC LIMIT 1
+                    SELECT count(*) FROM upbit_order_attempts
+                    WHERE symbol = :sym AND status = 'throttled'
+                      AND ts >= now() - interval '10 minutes'
                 """),
                 {"sym": settings.SYMBOL},
-            ).fetchone()
-        if rr_row is not None:
-            from app.exchange.upbit_rest import parse_remaining_req as _parse_rr
-            parsed_rr = _parse_rr(rr_row.remaining_req)
-            sec_val = parsed_rr.get("sec")
-            if sec_val is not None and sec_val <= 1:
-                rr_throttled = True
-                not_ready_reasons.append("THROTTLED")
+            ).scalar() or 0
+        if throttled_recent > 0:
+            rr_throttled = True
+            not_ready_reasons.append("THROTTLED")
     except Exception:
         pass
 
@@ -881,12 +911,14 @@ def main() -> None:
         "Account Fresh",
         f"{'✅' if acct_fresh else '❌'} lag={snap_lag_sec:.0f}s" if snap_lag_sec is not None else "❌ no data"
     )
-    r3.metric("Throttled", f"{'⚠️ YES' if rr_throttled else '✅ NO'}")
+    r3.metric("Throttled (10m)", f"⚠️ {throttled_recent}" if rr_throttled else "✅ 0")
     r4.metric("test_ok 건수", test_ok_cnt)
     st.caption(
         f"마지막 account snapshot: {snap_ts_str}  "
         f"| ACCOUNT_POLL_SEC={settings.UPBIT_ACCOUNT_POLL_SEC}  "
-        f"| freshness_threshold={settings.UPBIT_ACCOUNT_POLL_SEC * 3}s"
+        f"| RECONCILE_SEC={settings.UPBIT_ACCOUNT_RECONCILE_SEC} (private WS "
+        f"{'on' if settings.UPBIT_PRIVATE_WS_ENABLED else 'off'})  "
+        f"| freshness_threshold={account_stale_after(settings)}s"
     )
     if not_ready_reasons:
         st.caption(f"Not ready 사유: {not_ready_reasons}")
@@ -967,7 +999,7 @@ def main() -> None:
         with engine.connect() as conn:
             fo_cnt = conn.execute(
                 text("""
-                    SELECT count(*) FROM binance_force_orders
+                    SELECT COALESCE(SUM(cnt), 0) FROM binance_liq_1s
                     WHERE symbol=:sym
                       AND ts >= now() AT TIME ZONE 'UTC' - interval '86400 seconds'
                 """),
@@ -0,0 +1,443 @@
+"""Cold storage — 오래된 고빈도 테이블 구간을 zstd Parquet로 내리고, DB와 이어 읽는 reader.
+
+layout: {ARCHIVE_DIR}/{table}/date=YYYY-MM-DD/part-0.parquet  (UTC 일 단위, 행 0개인 날도 파일 생성)
+
+archive_day():
+  1) server-side cursor(stream_results)로 [day, day+1) 구간을 ARCHIVE_CHUNK_ROWS씩 읽어
+     ParquetWriter(zstd)에 row group 단위로 기록 — 전체를 메모리에 올리지 않음
+  2) tmp 파일 → DB count(*) / 기록 행 수 / Parquet footer num_rows 세 값이 같을 때만 rename
+  3) --delete면 그 다음에만 DB에서 제거: partitioned 테이블은 range 전체가 보관된 partition을
+     DETACH + DROP, heap 테이블은 해당 일 DELETE
+
+read_range(): [start, end] (end 포함 — 기존 loader와 동일) 를 archive + DB 한 시계열로.
+  range와 겹치는 보관된 날은 모두 Parquet (ts/symbol 필터 + 컬럼 projection pushdown),
+  보관되지 않은 구간만 DB. ARCHIVE_DIR가 비어 있으면 DB만.
+
+pyarrow는 optional extra (poetry install -E parquet) — 없으면 archive 기능과
+export_dataset의 parquet 출력만 RuntimeError, read_range는 DB 경로로 동작.
+
+사용법:
+  poetry run python -m app.db.archive --tables market_1s,feature_snapshots --older-than 30
+  poetry run python -m app.db.archive --tables all --older-than 30 --delete
+  poetry run python -m app.db.archive --status
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import re
+import sys
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config import load_settings
+from app.db.partitions import _step, _utc, is_partitioned, list_partitions, table_exists
+from app.db.session import get_engine
+
+log = logging.getLogger(__name__)
+
+ARCHIVE_TABLES = (
+    "market_1s",
+    "barrier_state",
+    "feature_snapshots",
+    "paper_decisions",
+    "binance_mark_price_1s",
+)
+
+_IDENT = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+_COLUMNS_SQL = text("""
+SELECT column_name, udt_name
+FROM information_schema.columns
+WHERE table_schema = current_schema() AND table_name = :table
+ORDER BY ordinal_position
+""")
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _require_pyarrow():
+    if not pyarrow_available():
+        raise RuntimeError(
+            "cold storage / parquet export에는 'pyarrow' 패키지가 필요합니다 "
+            "(poetry install -E parquet)"
+        )
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+def _check_table(table: str) -> None:
+    if table not in ARCHIVE_TABLES:
+        raise ValueError(f"archive 미지원 테이블: {table} (지원: {list(ARCHIVE_TABLES)})")
+
+
+def parse_tables(spec: str) -> list[str]:
+    names = [p.strip() for p in spec.split(",") if p.strip()]
+    if names == ["all"]:
+        return list(ARCHIVE_TABLES)
+    for n in names:
+        _check_table(n)
+    return names
+
+
+def day_path(root: str | Path, table: str, day: date) -> Path:
+    return Path(root) / table / f"date={day:%Y-%m-%d}" / "part-0.parquet"
+
+
+def archived_days(root: str | Path, table: str) -> set[date]:
+    out = set()
+    base = Path(root) / table
+    if not base.is_dir():
+        return out
+    for d in base.iterdir():
+        m = re.fullmatch(r"date=(\d{4}-\d{2}-\d{2})", d.name)
+        if m and (d / "part-0.parquet").is_file():
+            out.add(date.fromisoformat(m.group(1)))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+def _arrow_type(pa, udt: str):
+    return {
+        "timestamptz": pa.timestamp("us", tz="UTC"),
+        "timestamp": pa.timestamp("us"),
+        "float8": pa.float64(),
+        "float4": pa.float32(),
+        "numeric": pa.float64(),
+        "int2": pa.int16(),
+        "int4": pa.int32(),
+        "int8": pa.int64(),
+        "bool": pa.bool_(),
+        "date": pa.date32(),
+        "_float8": pa.list_(pa.float64()),
+        "_int4": pa.list_(pa.int32()),
+    }.get(udt, pa.string())   # text / varchar / jsonb(직렬화) 등
+
+
+def _arrow_schema(conn, pa, table: str):
+    cols = conn.execute(_COLUMNS_SQL, {"table": table}).fetchall()
+    if not cols:
+        raise ValueError(f"table not found: {table}")
+    schema = pa.schema([(c.column_name, _arrow_type(pa, c.udt_name)) for c in cols])
+    return schema, {c.column_name: c.udt_name for c in cols}
+
+
+def _column(values: tuple, udt: str) -> list:
+    if udt in ("jsonb", "json"):
+        return [
+            json.dumps(v, ensure_ascii=False, default=str) if v is not None else None
+            for v in values
+        ]
+    if udt == "numeric":
+        return [float(v) if v is not None else None for v in values]
+    return list(values)
+
+
+def archive_day(
+    engine: Engine,
+    table: str,
+    day: date,
+    root: str | Path,
+    chunk_rows: int = 50_000,
+) -> int:
+    """[day, day+1) 구간을 Parquet 파일 하나로. 검증까지 끝난 행 수 반환 (불일치면 RuntimeError)."""
+    _check_table(table)
+    pa, pq = _require_pyarrow()
+    lo, hi = _utc(day), _utc(day + timedelta(days=1))
+    path = day_path(root, table, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+
+    written = 0
+    # count와 scan이 같은 snapshot을 보도록 REPEATABLE READ
+    with engine.connect().execution_options(isolation_level="REPEATABLE READ") as conn:
+        schema, udts = _arrow_schema(conn, pa, table)
+        names = schema.names
+        expected = conn.execute(
+            text(f"SELECT count(*) FROM {table} WHERE ts >= :lo AND ts < :hi"),
+            {"lo": lo, "hi": hi},
+        ).scalar()
+        result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(
+            text(
+                f"SELECT {', '.join(names)} FROM {table} "
+                "WHERE ts >= :lo AND ts < :hi ORDER BY ts"
+            ),
+            {"lo": lo, "hi": hi},
+        )
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            for rows in result.partitions(chunk_rows):
+                cols = list(zip(*rows, strict=True))
+                batch = pa.table(
+                    [
+                        pa.array(_column(cols[i], udts[n]), type=schema.field(n).type)
+                        for i, n in enumerate(names)
+                    ],
+                    schema=schema,
+                )
+                writer.write_table(batch, row_group_size=chunk_rows)
+                written += len(rows)
+            if written == 0:
+                writer.write_table(schema.empty_table())
+
+    footer_rows = pq.ParquetFile(tmp).metadata.num_rows
+    if not (expected == written == footer_rows):
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(
+            f"[{table} {day}] row count mismatch: "
+            f"db={expected} written={written} parquet={footer_rows}"
+        )
+    os.replace(tmp, path)
+    return written
+
+
+def delete_archived(
+    engine: Engine,
+    table: str,
+    days: list[date],
+    root: str | Path,
+    interval: str = "day",
+) -> list[str]:
+    """보관 파일이 있는 날만 DB에서 제거. 제거 내역(partition 이름 / 'YYYY-MM-DD: N rows') 반환."""
+    done_days = archived_days(root, table)
+    days = [d for d in days if d in done_days]
+    out: list[str] = []
+    with engine.connect() as conn:
+        partitioned = is_partitioned(conn, table)
+        parts = list_partitions(conn, table) if partitioned else []
+    if partitioned:
+        step = _step(interval)
+        for name, start in parts:
+            span = [start + timedelta(days=i) for i in range(step.days)]
+            if all(d in done_days for d in span) and any(d in days for d in span):
+                with engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                    conn.execute(text(f"DROP TABLE {name}"))
+                out.append(name)
+        return out
+    for d in days:
+        with engine.begin() as conn:
+            n = conn.execute(
+                text(f"DELETE FROM {table} WHERE ts >= :lo AND ts < :hi"),
+                {"lo": _utc(d), "hi": _utc(d + timedelta(days=1))},
+            ).rowcount
+        out.append(f"{d}: {n} rows")
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+def _plan(
+    table: str, start: datetime, end: datetime, columns: list[str] | None, root,
+) -> tuple[list[str] | None, list[tuple], str]:
+    """(columns, segments, root).
+
+    segments: ts 순서의 ("archive", day) / ("db", lo, hi) — [start, end]와 겹치는 보관된 날은
+    전부 archive에서, 나머지 구간은 DB에서 [lo, hi) (hi None이면 end 포함) 로 읽는다.
+    """
+    _check_table(table)
+    if columns is not None:
+        bad = [c for c in columns if not _IDENT.match(c)]
+        if bad:
+            raise ValueError(f"invalid column names: {bad}")
+        if "ts" not in columns:
+            columns = ["ts", *columns]
+    if root is None:
+        root = load_settings().ARCHIVE_DIR
+
+    done = archived_days(root, table) if root and pyarrow_available() else set()
+    segments: list[tuple] = []
+    db_lo: datetime | None = start
+    d, last = start.astimezone(timezone.utc).date(), end.astimezone(timezone.utc).date()
+    while done and d <= last:
+        if d in done:
+            if db_lo is not None and db_lo < _utc(d):
+                segments.append(("db", db_lo, _utc(d)))
+            segments.append(("archive", d))
+            db_lo = None
+        elif db_lo is None:
+            db_lo = _utc(d)
+        d += timedelta(days=1)
+    if db_lo is not None and db_lo <= end:
+        segments.append(("db", db_lo, None))
+    return columns, segments, root
+
+
+def iter_range(
+    engine: Engine,
+    table: str,
+    start: datetime,
+    end: datetime,
+    symbol: str | None = None,
+    columns: list[str] | None = None,
+    chunk_rows: int = 50_000,
+    root: str | Path | None = None,
+) -> Iterator[pd.DataFrame]:
+    """read_range의 streaming 버전 — ts 오름차순 chunk(최대 chunk_rows행)를 차례로 yield.
+
+    archive는 일 파일 단위 (ts/symbol filter + column pushdown), DB는 server-side cursor
+    (stream_results)로 chunk_rows씩 fetch — 전체 구간을 메모리에 올리지 않는다.
+    """
+    columns, segments, root = _plan(table, start, end, columns, root)
+    filters = [("ts", ">=", pd.Timestamp(start)), ("ts", "<=", pd.Timestamp(end))]
+    if symbol is not None:
+        filters.append(("symbol", "==", symbol))
+    cond = "ts >= :start AND ts <= :end" + (" AND symbol = :sym" if symbol is not None else "")
+    select = f"SELECT {', '.join(columns) if columns else '*'} FROM {table} WHERE {cond}"
+
+    for seg in segments:
+        if seg[0] == "archive":
+            _, pq = _require_pyarrow()
+            df = pq.read_table(
+                day_path(root, table, seg[1]), columns=columns, filters=filters
+            ).to_pandas()
+            for i in range(0, len(df), chunk_rows):
+                part = df.iloc[i:i + chunk_rows].reset_index(drop=True)
+                part["ts"] = pd.to_datetime(part["ts"], utc=True)
+                yield part
+            continue
+        _, lo, hi = seg
+        sql = select + (" AND ts < :hi" if hi is not None else "") + " ORDER BY ts ASC"
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_rows).execute(
+                text(sql), {"start": lo, "end": end, "hi": hi, "sym": symbol},
+            )
+            keys = list(result.keys())
+            for rows in result.partitions(chunk_rows):
+                part = pd.DataFrame.from_records(rows, columns=keys)
+                part["ts"] = pd.to_datetime(part["ts"], utc=True)
+                yield part
+
+
+def read_range(
+    engine: Engine,
+    table: str,
+    start: datetime,
+    end: datetime,
+    symbol: str | None = None,
+    columns: list[str] | None = None,
+    root: str | Path | None = None,
+) -> pd.DataFrame:
+    """[start, end] (end 포함) 를 archive + DB에서 ts 오름차순 하나의 DataFrame으로.
+
+    root None이면 ARCHIVE_DIR 설정. columns None이면 전체 컬럼 ('ts'는 항상 포함).
+    """
+    frames = [
+        f for f in iter_range(engine, table, start, end, symbol, columns, root=root)
+        if not f.empty
+    ]
+    if not frames:
+        cols = columns if columns is None or "ts" in columns else ["ts", *columns]
+        return pd.DataFrame(columns=cols or [])
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return df.sort_values("ts", kind="stable").reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="고빈도 테이블 → zstd Parquet cold storage")
+    parser.add_argument("--tables", default="all", help="대상 테이블 (콤마 구분, all=전체)")
+    parser.add_argument(
+        "--older-than", type=int, default=None,
+        help="이 일수보다 오래된 날만 보관 (기본 ARCHIVE_AFTER_DAYS)",
+    )
+    parser.add_argument("--root", default=None, help="archive 디렉터리 (기본 ARCHIVE_DIR)")
+    parser.add_argument(
+        "--delete", action="store_true", help="검증된 날은 DB에서 제거 (partition DROP / DELETE)"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="대상 날짜만 출력")
+    parser.add_argument("--status", action="store_true", help="테이블별 보관 현황")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    s = load_settings()
+    root = args.root or s.ARCHIVE_DIR
+    if not root:
+        print("❌ ARCHIVE_DIR 미설정 (--root 로 지정)")
+        return 1
+    older = s.ARCHIVE_AFTER_DAYS if args.older_than is None else args.older_than
+    tables = parse_tables(args.tables)
+    engine = get_engine(s, "archive", pool_size=2, statement_timeout_ms=0)
+
+    sep = "=" * 60
+    print(sep)
+    print(
+        f"  archive — root={root} older_than={older}d "
+        f"delete={args.delete} dry_run={args.dry_run}"
+    )
+    print(sep)
+
+    if args.status:
+        for table in tables:
+            days = sorted(archived_days(root, table))
+            rng = f"{days[0]} ~ {days[-1]}" if days else "-"
+            print(f"  [{table}] archived days: {len(days)} ({rng})")
+        print(sep)
+        return 0
+
+    if not args.dry_run:
+        _require_pyarrow()
+
+    ok = True
+    cutoff_day = datetime.now(timezone.utc).date() - timedelta(days=older)
+    for table in tables:
+        with engine.connect() as conn:
+            if not table_exists(conn, table):
+                print(f"  [{table}] (없음)")
+                continue
+            min_ts = conn.execute(text(f"SELECT min(ts) FROM {table}")).scalar()
+        if min_ts is None:
+            print(f"  [{table}] 비어 있음")
+            continue
+        done = archived_days(root, table)
+        day = min_ts.astimezone(timezone.utc).date()
+        todo = []
+        while day < cutoff_day:
+            todo.append(day)
+            day += timedelta(days=1)
+        span = f"{todo[0]} ~ {todo[-1]}" if todo else "-"
+        print(f"  [{table}] 대상 {len(todo)}일 ({span})")
+        if args.dry_run:
+            continue
+        for d in todo:
+            if d in done:
+                continue
+            try:
+                n = archive_day(engine, table, d, root, s.ARCHIVE_CHUNK_ROWS)
+                print(f"    ✅ {d}: {n} rows → {day_path(root, table, d)}")
+            except Exception as e:
+                ok = False
+                print(f"    ❌ {d}: {e}")
+                break
+        if args.delete:
+            for item in delete_archived(engine, table, todo, root, s.DB_PARTITION_INTERVAL):
+                print(f"    DB 제거: {item}")
+
+    print(sep)
+    print("DONE ✅" if ok else "FAILED ❌")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
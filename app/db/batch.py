@@ -0,0 +1,322 @@
+"""Write-behind batching layer — 단건 writer helper들을 table별 buffer에 모아 executemany로 기록.
+
+BatchWriter: bounded buffer 1개 + flusher (원래 markPrice 전용이던 것을 일반화).
+WriteBehind: table → BatchWriter. writer helper(app.db.writer / app.features.writer /
+app.altdata.writer)는 submit()이 True면 buffer에 넣고 바로 반환, False면 기존처럼 즉시 기록.
+
+durability (table별, DB_WRITE_BEHIND_TABLES로 선택):
+  - async (write-behind): telemetry/로그성 테이블. flush 전 crash 시 최대 flush_sec 분량 유실 가능
+  - sync: 거래/주문/포지션/prediction 등 같은 tick 안에서 다시 읽거나 상태를 이루는 테이블
+    (SYNC_ONLY_TABLES — write-behind 지정 시 ValueError)
+
+flush는 statement별로 묶어 한 transaction에서 executemany. 데이터 오류(제약 위반 등)면
+그 batch를 행 단위로 다시 기록해 문제 행만 버리고, 연결 오류면 batch를 buffer로 되돌려 재시도.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+log = logging.getLogger(__name__)
+
+_STATS_LOG_SEC = 60.0
+_RETRY_MIN = 1.0
+_RETRY_MAX = 60.0
+
+# write-behind 가능 테이블 (기본값은 config DB_WRITE_BEHIND_TABLES)
+WRITE_BEHIND_TABLES = {
+    "feature_snapshots",
+    "paper_decisions",
+    "coinglass_call_status",
+    "coinglass_liquidation_map",
+    # 아래는 곧바로 다시 읽는 테이블 — flush_sec만큼 늦게 보여도 될 때만 지정
+    # (predictor/evaluator, UpbitAccountRunner의 snapshot freshness 체크)
+    "upbit_account_snapshots",
+    "market_1s",
+    "barrier_state",
+    "evaluation_results",
+}
+
+# 항상 즉시 commit (상태/주문 기록, RETURNING id 필요)
+SYNC_ONLY_TABLES = {
+    "paper_trades",
+    "paper_positions",
+    "predictions",
+    "upbit_order_attempts",
+    "upbit_order_snapshots",
+    "live_positions",
+    "barrier_params",
+}
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with jitter."""
+    base = min(_RETRY_MAX, _RETRY_MIN * (2 ** attempt))
+    return base * (0.5 + random.random() * 0.5)
+
+
+class BatchWriter:
+    """Bounded write-behind buffer.
+
+    put()은 O(1) (DB I/O 없음, event loop thread에서 호출). run()이 flush_sec마다 또는
+    batch_max개가 차면 최대 batch_max행을 to_thread(insert_fn)로 한 transaction에 기록.
+    - buffer가 buffer_max에 도달하면 가장 오래된 행부터 버림 (dropped) — DB가 느려도
+      메모리와 event loop는 영향 없음
+    - flush 실패 시 batch를 buffer 앞에 되돌리고 (공간이 있는 만큼) 지수 backoff
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        flush_sec: float = 1.0,
+        batch_max: int = 500,
+        buffer_max: int = 10_000,
+        insert_fn: Callable[[Engine, list], None] | None = None,
+        name: str = "batch",
+    ) -> None:
+        if insert_fn is None:
+            raise ValueError("insert_fn required")
+        self.engine = engine
+        self.insert_fn = insert_fn
+        self.name = name
+        self.flush_sec = flush_sec
+        self.batch_max = max(1, batch_max)
+        self._buf: deque = deque()
+        self.buffer_max = max(self.batch_max, buffer_max)
+        self._wake = asyncio.Event()
+        self._stop = False
+        # backpressure metrics
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+        self.last_flush_ts: float = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buf)
+
+    def put(self, row) -> None:
+        if len(self._buf) >= self.buffer_max:
+            self._buf.popleft()
+            self.dropped += 1
+        self._buf.append(row)
+        self.enqueued += 1
+        if len(self._buf) > self.max_depth:
+            self.max_depth = len(self._buf)
+        if len(self._buf) >= self.batch_max:
+            self._wake.set()
+
+    def _take(self) -> list:
+        n = min(len(self._buf), self.batch_max)
+        return [self._buf.popleft() for _ in range(n)]
+
+    def _requeue(self, batch: list) -> None:
+        room = self.buffer_max - len(self._buf)
+        keep = batch[-room:] if room > 0 else []
+        self.dropped += len(batch) - len(keep)
+        self._buf.extendleft(reversed(keep))
+
+    async def flush(self) -> bool:
+        """buffer가 빌 때까지 batch 단위 flush. 실패하면 False."""
+        while self._buf:
+            batch = self._take()
+            t0 = time.monotonic()
+            try:
+                await asyncio.to_thread(self.insert_fn, self.engine, batch)
+            except Exception as exc:
+                self.failed_flushes += 1
+                self._requeue(batch)
+                log.warning(
+                    "%s flush failed (%d rows, depth=%d dropped=%d): %s",
+                    self.name, len(batch), len(self._buf), self.dropped, exc,
+                )
+                return False
+            self.last_flush_ms = (time.monotonic() - t0) * 1000
+            self.last_flush_ts = time.time()
+            self.flushes += 1
+            self.written += len(batch)
+        return True
+
+    async def run(self, log_stats: bool = True) -> None:
+        attempt = 0
+        last_log = time.monotonic()
+        while not self._stop:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_sec)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            if await self.flush():
+                attempt = 0
+            else:
+                await asyncio.sleep(_backoff(attempt))
+                attempt += 1
+            if log_stats and time.monotonic() - last_log >= _STATS_LOG_SEC:
+                last_log = time.monotonic()
+                log.info("%s writer: %s", self.name, self.stats())
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._buf),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+        }
+
+    def stop(self) -> None:
+        self._stop = True
+        self._wake.set()
+
+
+def execute_grouped(engine: Engine, rows: list[tuple]) -> None:
+    """[(stmt, params), ...] → statement별 executemany 한 transaction.
+
+    데이터 오류면 행 단위로 다시 기록해 실패 행만 버린다 (연결 오류는 그대로 올려 재시도).
+    """
+    groups: dict = {}
+    for stmt, params in rows:
+        groups.setdefault(stmt, []).append(params)
+    try:
+        with engine.begin() as conn:
+            for stmt, params in groups.items():
+                conn.execute(stmt, params)
+        return
+    except (OperationalError, InterfaceError):
+        raise
+    except DBAPIError as exc:
+        if exc.connection_invalidated:
+            raise
+        log.warning("write-behind batch rejected (%s) — retrying %d rows one by one", exc.orig, len(rows))
+    bad = 0
+    for stmt, params in rows:
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt, params)
+        except (OperationalError, InterfaceError):
+            raise
+        except DBAPIError as exc:
+            bad += 1
+            log.error("write-behind row dropped: %s", exc.orig)
+    if bad:
+        log.warning("write-behind: %d/%d rows dropped after row-by-row retry", bad, len(rows))
+
+
+class WriteBehind:
+    """table별 BatchWriter 묶음. configure() + run() 전에는 submit()이 항상 False (즉시 기록)."""
+
+    def __init__(self) -> None:
+        self.engine: Engine | None = None
+        self.tables: set[str] = set()
+        self._writers: dict[str, BatchWriter] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._rate_mark: dict[str, tuple[int, float]] = {}
+
+    def configure(
+        self,
+        engine: Engine,
+        tables: set[str],
+        flush_sec: float = 1.0,
+        batch_max: int = 500,
+        buffer_max: int = 10_000,
+    ) -> None:
+        bad = tables & SYNC_ONLY_TABLES
+        if bad:
+            raise ValueError(f"sync-only 테이블은 write-behind 불가: {sorted(bad)}")
+        unknown = tables - WRITE_BEHIND_TABLES
+        if unknown:
+            raise ValueError(f"write-behind 미지원 테이블: {sorted(unknown)} (지원: {sorted(WRITE_BEHIND_TABLES)})")
+        self.engine = engine
+        self.tables = set(tables)
+        self._writers = {
+            t: BatchWriter(engine, flush_sec, batch_max, buffer_max, insert_fn=execute_grouped, name=t)
+            for t in sorted(tables)
+        }
+
+    def accepts(self, engine: Engine, table: str) -> bool:
+        """지금 submit()하면 buffer로 들어가는지 (호출 측이 transaction 밖으로 뺄지 결정할 때)."""
+        return self._loop is not None and engine is self.engine and table in self.tables
+
+    def submit(self, engine: Engine, table: str, stmt, params) -> bool:
+        """write-behind 대상이면 buffer에 넣고 True. 아니면 False — 호출 측이 즉시 기록.
+
+        predictor/evaluator 등 to_thread 안에서 불려도 안전 (loop thread로 넘겨서 put).
+        """
+        loop = self._loop
+        if not self.accepts(engine, table):
+            return False
+        writer = self._writers[table]
+        items = params if isinstance(params, list) else [params]
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        for p in items:
+            if on_loop:
+                writer.put((stmt, p))
+            else:
+                loop.call_soon_threadsafe(writer.put, (stmt, p))
+        return True
+
+    async def run(self) -> None:
+        if not self._writers:
+            return
+        self._loop = asyncio.get_running_loop()
+        log.info("Write-behind enabled: %s", sorted(self._writers))
+        stats_task = asyncio.create_task(self._log_stats())
+        try:
+            await asyncio.gather(*(w.run(log_stats=False) for w in self._writers.values()))
+        finally:
+            stats_task.cancel()
+            self._loop = None
+            # 종료 시 남은 행 (loop 해제 후 들어오는 submit은 즉시 기록 경로)
+            for w in self._writers.values():
+                await w.flush()
+
+    async def _log_stats(self) -> None:
+        while True:
+            await asyncio.sleep(_STATS_LOG_SEC)
+            for table, st in self.stats().items():
+                log.info("write-behind %s: %s", table, st)
+
+    def stats(self) -> dict[str, dict]:
+        """table별 BatchWriter 통계 + 직전 stats() 호출 이후 commit rate (rows/s)."""
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for table, w in self._writers.items():
+                st = w.stats()
+                written0, t0 = self._rate_mark.get(table, (0, now))
+                st["rows_per_sec"] = round((w.written - written0) / (now - t0), 2) if now > t0 else 0.0
+                self._rate_mark[table] = (w.written, now)
+                out[table] = st
+        return out
+
+    def stop(self) -> None:
+        for w in self._writers.values():
+            w.stop()
+
+
+_WRITE_BEHIND = WriteBehind()
+
+
+def get_write_behind() -> WriteBehind:
+    return _WRITE_BEHIND
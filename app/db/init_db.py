@@ -1,7 +1,15 @@
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from app.db.migrate import lock_schema, schema_is_current
 from app.db.models import Base
 
 
 def ensure_schema(engine: Engine) -> None:
-    Base.metadata.create_all(engine)
+    # warm start: schema_version이 최신이면 create_all(테이블별 존재 확인) 생략
+    if schema_is_current(engine):
+        return
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL statement_timeout = 0"))   # lock 대기 중 timeout 방지
+        lock_schema(conn)
+        Base.metadata.create_all(conn)
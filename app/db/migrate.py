@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
 
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import Settings
+from app.db.partitions import convert_to_partitioned, maintain_partitions, parse_tables
 
 log = logging.getLogger(__name__)
 
@@ -254,227 +258,403 @@ CREATE TABLE IF NOT EXISTS live_positions (
 """)
 
 
-def apply_migrations(engine: Engine) -> None:
-    """Run all idempotent migrations sequentially."""
-    with engine.begin() as conn:
-        # (1) market_1s columns
-        _add_columns(conn, "market_1s", _MIG_MARKET_1S, "market_1s bid/ask OHLC + extras")
-
-        # (2) barrier_state columns
-        _add_columns(conn, "barrier_state", _MIG_BARRIER_STATE, "barrier_state feedback cols")
-
-        # (3) predictions columns
-        _add_columns(conn, "predictions", _MIG_PREDICTIONS, "predictions v1 cols")
-
-        # (4) evaluation_results columns
-        # p_up, p_down, p_none already exist – use IF NOT EXISTS so no error
-        _add_columns(conn, "evaluation_results", _MIG_EVALUATION_RESULTS, "evaluation_results exec_v1 cols")
-
-        # (5) barrier_params table
-        conn.execute(_CREATE_BARRIER_PARAMS)
-        log.info("Applied: barrier_params table (CREATE IF NOT EXISTS)")
-
-        # (6) paper_decisions multi-flag + equity
-        _add_columns(conn, "paper_decisions", _MIG_PAPER_DECISIONS, "paper_decisions equity+flags")
-
-        # (7) paper_positions risk management
-        _add_columns(conn, "paper_positions", _MIG_PAPER_POSITIONS, "paper_positions risk mgmt")
-
-        # (8) upbit_account_snapshots table
-        conn.execute(_CREATE_UPBIT_ACCOUNT_SNAPSHOTS)
-        conn.execute(_CREATE_IDX_ACCOUNT_SNAPSHOTS_TS)
-        conn.execute(_CREATE_IDX_ACCOUNT_SNAPSHOTS_SYM_CUR)
-        log.info("Applied: upbit_account_snapshots table (CREATE IF NOT EXISTS)")
-
-        # (9) upbit_order_attempts table
-        conn.execute(_CREATE_UPBIT_ORDER_ATTEMPTS)
-        conn.execute(_CREATE_IDX_ORDER_ATTEMPTS_TS)
-        conn.execute(_CREATE_IDX_ORDER_ATTEMPTS_SYM_TS)
-        log.info("Applied: upbit_order_attempts table (CREATE IF NOT EXISTS)")
-
-        # (10) upbit_order_attempts: Step 8 extended columns
-        _add_columns(conn, "upbit_order_attempts", _MIG_ORDER_ATTEMPTS_STEP8, "upbit_order_attempts Step 8 cols")
-
-        # (11) upbit_order_snapshots table (Step 8)
-        conn.execute(_CREATE_UPBIT_ORDER_SNAPSHOTS)
-        conn.execute(_CREATE_IDX_ORDER_SNAPSHOTS_SYM_TS)
-        conn.execute(_CREATE_IDX_ORDER_SNAPSHOTS_UUID_TS)
-        log.info("Applied: upbit_order_snapshots table (CREATE IF NOT EXISTS)")
-
-        # (12) live_positions table (Step 8)
-        conn.execute(_CREATE_LIVE_POSITIONS)
-        log.info("Applied: live_positions table (CREATE IF NOT EXISTS)")
-
-        # (13) upbit_order_attempts: unique index for idempotency (Step 9)
-        conn.execute(text("""
-            CREATE UNIQUE INDEX IF NOT EXISTS ux_upbit_order_attempts_identifier_mode
-            ON upbit_order_attempts (identifier, mode)
-            WHERE identifier IS NOT NULL
-        """))
-        log.info("Applied: ux_upbit_order_attempts_identifier_mode (CREATE UNIQUE INDEX IF NOT EXISTS)")
-
-        # (14) upbit_order_attempts: blocked_reasons JSONB (Step 11)
-        conn.execute(text("""
-            ALTER TABLE upbit_order_attempts
-            ADD COLUMN IF NOT EXISTS blocked_reasons JSONB
-        """))
-        log.info("Applied: upbit_order_attempts.blocked_reasons JSONB (Step 11)")
-
-        # ── Step ALT: Alt Data tables ────────────────────────────────────
-        # (ALT-1) binance_mark_price_1s
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS binance_mark_price_1s (
-                id              BIGSERIAL PRIMARY KEY,
-                ts              TIMESTAMPTZ NOT NULL,
-                symbol          TEXT NOT NULL,
-                mark_price      DOUBLE PRECISION,
-                index_price     DOUBLE PRECISION,
-                funding_rate    DOUBLE PRECISION,
-                next_funding_time TIMESTAMPTZ,
-                raw_json        JSONB NOT NULL
-            )
-        """))
-        conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS ix_binance_mark_price_symbol_ts
-            ON binance_mark_price_1s (symbol, ts DESC)
-        """))
-        log.info("Applied: binance_mark_price_1s (CREATE IF NOT EXISTS)")
-
-        # (ALT-2) binance_force_orders
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS binance_force_orders (
-                id          BIGSERIAL PRIMARY KEY,
-                ts          TIMESTAMPTZ NOT NULL,
-                symbol      TEXT NOT NULL,
-                side        TEXT,
-                price       DOUBLE PRECISION,
-                qty         DOUBLE PRECISION,
-                notional    DOUBLE PRECISION,
-                order_type  TEXT,
-                raw_json    JSONB NOT NULL,
-                UNIQUE (symbol, ts, side, price, qty)
-            )
-        """))
-        conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS ix_binance_force_orders_symbol_ts
-            ON binance_force_orders (symbol, ts DESC)
-        """))
-        log.info("Applied: binance_force_orders (CREATE IF NOT EXISTS)")
-
-        # (ALT-3) binance_futures_metrics
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS binance_futures_metrics (
-                id          BIGSERIAL PRIMARY KEY,
-                ts          TIMESTAMPTZ NOT NULL,
-                symbol      TEXT NOT NULL,
-                metric      TEXT NOT NULL,
-                value       DOUBLE PRECISION,
-                value2      DOUBLE PRECISION,
-                period      TEXT,
-                raw_json    JSONB NOT NULL,
-                UNIQUE (metric, symbol, ts, period)
-            )
-        """))
-        conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS ix_binance_futures_metrics_metric_symbol_ts
-            ON binance_futures_metrics (metric, symbol, ts DESC)
-        """))
-        log.info("Applied: binance_futures_metrics (CREATE IF NOT EXISTS)")
-
-        # (ALT-4) coinglass_liquidation_map
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS coinglass_liquidation_map (
-                id           BIGSERIAL PRIMARY KEY,
-                ts           TIMESTAMPTZ NOT NULL,
-                symbol       TEXT NOT NULL,
-                exchange     TEXT,
-                timeframe    TEXT,
-                summary_json JSONB,
-                raw_json     JSONB NOT NULL
-            )
-        """))
-        conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS ix_coinglass_liq_map_symbol_ts
-            ON coinglass_liquidation_map (symbol, ts DESC)
-        """))
-        log.info("Applied: coinglass_liquidation_map (CREATE IF NOT EXISTS)")
-
-        # ── Step ALT-1: feature_snapshots (학습/모델 입력용 정렬 스냅샷) ──────
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS feature_snapshots (
-                ts                      TIMESTAMPTZ NOT NULL,
-                symbol                  TEXT NOT NULL,
-                -- Upbit market
-                mid_krw                 DOUBLE PRECISION,
-                spread_bps              DOUBLE PRECISION,
-                imb_notional_top5       DOUBLE PRECISION,
-                -- Barrier
-                r_t                     DOUBLE PRECISION,
-                r_min_eff               DOUBLE PRECISION,
-                cost_roundtrip_est      DOUBLE PRECISION,
-                sigma_1s                DOUBLE PRECISION,
-                sigma_h                 DOUBLE PRECISION,
-                k_vol_eff               DOUBLE PRECISION,
-                barrier_status          TEXT,
-                -- Prediction
-                p_up                    DOUBLE PRECISION,
-                p_down                  DOUBLE PRECISION,
-                p_none                  DOUBLE PRECISION,
-                ev                      DOUBLE PRECISION,
-                ev_rate                 DOUBLE PRECISION,
-                action_hat              TEXT,
-                model_version           TEXT,
-                -- Binance mark/index/funding (latest near ts)
-                bin_mark_price          DOUBLE PRECISION,
-                bin_index_price         DOUBLE PRECISION,
-                bin_funding_rate        DOUBLE PRECISION,
-                bin_mark_index_basis    DOUBLE PRECISION,
-                -- Binance metrics (latest within freshness window)
-                oi_value                DOUBLE PRECISION,
-                global_ls_ratio         DOUBLE PRECISION,
-                taker_ls_ratio          DOUBLE PRECISION,
-                basis_value             DOUBLE PRECISION,
-                -- Binance liquidation aggregates (rolling 5m)
-                liq_5m_notional         DOUBLE PRECISION,
-                liq_5m_count            INTEGER,
-                -- Raw debug payload (optional)
-                raw_json                JSONB,
-                PRIMARY KEY (ts, symbol)
-            )
-        """))
-        conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS ix_feature_snapshots_symbol_ts
-            ON feature_snapshots (symbol, ts DESC)
-        """))
-        log.info("Applied: feature_snapshots (CREATE IF NOT EXISTS)")
-
-        # ── Step ALT-2: feature_snapshots에 source_ts 컬럼 추가 (누수 감지용) ──
-        for col_def in [
-            "bin_mark_ts  TIMESTAMPTZ",
-            "oi_ts        TIMESTAMPTZ",
-            "liq_last_ts  TIMESTAMPTZ",
-        ]:
-            conn.execute(text(
-                f"ALTER TABLE feature_snapshots ADD COLUMN IF NOT EXISTS {col_def}"
-            ))
-        log.info("Applied: feature_snapshots source_ts columns (Step ALT-2)")
-
-        # ── Step ALT-2: coinglass_call_status 테이블 ─────────────────────────
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS coinglass_call_status (
-                id          BIGSERIAL PRIMARY KEY,
-                ts          TIMESTAMPTZ NOT NULL DEFAULT now(),
-                ok          BOOLEAN NOT NULL,
-                http_status INTEGER,
-                error_msg   TEXT,
-                latency_ms  INTEGER,
-                poll_count  INTEGER
-            )
-        """))
-        conn.execute(text("""
-            CREATE INDEX IF NOT EXISTS ix_coinglass_call_status_ts
-            ON coinglass_call_status (ts DESC)
-        """))
-        log.info("Applied: coinglass_call_status (CREATE IF NOT EXISTS)")
-
-    log.info("All migrations complete (v1 + Step 7-11 + Step ALT + Step ALT-1 + Step ALT-2)")
+def _migrate_baseline(conn: Connection) -> None:
+    """v1 + Step 7-11 + Step ALT + Step ALT-1 + Step ALT-2 + (12)-(19) — 모두 IF NOT EXISTS라 재실행 안전."""
+    # (1) market_1s columns
+    _add_columns(conn, "market_1s", _MIG_MARKET_1S, "market_1s bid/ask OHLC + extras")
+
+    # (2) barrier_state columns
+    _add_columns(conn, "barrier_state", _MIG_BARRIER_STATE, "barrier_state feedback cols")
+
+    # (3) predictions columns
+    _add_columns(conn, "predictions", _MIG_PREDICTIONS, "predictions v1 cols")
+
+    # (4) evaluation_results columns
+    # p_up, p_down, p_none already exist – use IF NOT EXISTS so no error
+    _add_columns(conn, "evaluation_results", _MIG_EVALUATION_RESULTS, "evaluation_results exec_v1 cols")
+
+    # (5) barrier_params table
+    conn.execute(_CREATE_BARRIER_PARAMS)
+    log.info("Applied: barrier_params table (CREATE IF NOT EXISTS)")
+
+    # (6) paper_decisions multi-flag + equity
+    _add_columns(conn, "paper_decisions", _MIG_PAPER_DECISIONS, "paper_decisions equity+flags")
+
+    # (7) paper_positions risk management
+    _add_columns(conn, "paper_positions", _MIG_PAPER_POSITIONS, "paper_positions risk mgmt")
+
+    # (8) upbit_account_snapshots table
+    conn.execute(_CREATE_UPBIT_ACCOUNT_SNAPSHOTS)
+    conn.execute(_CREATE_IDX_ACCOUNT_SNAPSHOTS_TS)
+    conn.execute(_CREATE_IDX_ACCOUNT_SNAPSHOTS_SYM_CUR)
+    log.info("Applied: upbit_account_snapshots table (CREATE IF NOT EXISTS)")
+
+    # (9) upbit_order_attempts table
+    conn.execute(_CREATE_UPBIT_ORDER_ATTEMPTS)
+    conn.execute(_CREATE_IDX_ORDER_ATTEMPTS_TS)
+    conn.execute(_CREATE_IDX_ORDER_ATTEMPTS_SYM_TS)
+    log.info("Applied: upbit_order_attempts table (CREATE IF NOT EXISTS)")
+
+    # (10) upbit_order_attempts: Step 8 extended columns
+    _add_columns(conn, "upbit_order_attempts", _MIG_ORDER_ATTEMPTS_STEP8, "upbit_order_attempts Step 8 cols")
+
+    # (11) upbit_order_snapshots table (Step 8)
+    conn.execute(_CREATE_UPBIT_ORDER_SNAPSHOTS)
+    conn.execute(_CREATE_IDX_ORDER_SNAPSHOTS_SYM_TS)
+    conn.execute(_CREATE_IDX_ORDER_SNAPSHOTS_UUID_TS)
+    log.info("Applied: upbit_order_snapshots table (CREATE IF NOT EXISTS)")
+
+    # (12) live_positions table (Step 8)
+    conn.execute(_CREATE_LIVE_POSITIONS)
+    log.info("Applied: live_positions table (CREATE IF NOT EXISTS)")
+
+    # (13) upbit_order_attempts: unique index for idempotency (Step 9)
+    conn.execute(text("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_upbit_order_attempts_identifier_mode
+        ON upbit_order_attempts (identifier, mode)
+        WHERE identifier IS NOT NULL
+    """))
+    log.info("Applied: ux_upbit_order_attempts_identifier_mode (CREATE UNIQUE INDEX IF NOT EXISTS)")
+
+    # (14) upbit_order_attempts: blocked_reasons JSONB (Step 11)
+    conn.execute(text("""
+        ALTER TABLE upbit_order_attempts
+        ADD COLUMN IF NOT EXISTS blocked_reasons JSONB
+    """))
+    log.info("Applied: upbit_order_attempts.blocked_reasons JSONB (Step 11)")
+
+    # ── Step ALT: Alt Data tables ────────────────────────────────────
+    # (ALT-1) binance_mark_price_1s
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS binance_mark_price_1s (
+            id              BIGSERIAL PRIMARY KEY,
+            ts              TIMESTAMPTZ NOT NULL,
+            symbol          TEXT NOT NULL,
+            mark_price      DOUBLE PRECISION,
+            index_price     DOUBLE PRECISION,
+            funding_rate    DOUBLE PRECISION,
+            next_funding_time TIMESTAMPTZ,
+            raw_json        JSONB NOT NULL
+        )
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_binance_mark_price_symbol_ts
+        ON binance_mark_price_1s (symbol, ts DESC)
+    """))
+    log.info("Applied: binance_mark_price_1s (CREATE IF NOT EXISTS)")
+
+    # (ALT-2) binance_force_orders
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS binance_force_orders (
+            id          BIGSERIAL PRIMARY KEY,
+            ts          TIMESTAMPTZ NOT NULL,
+            symbol      TEXT NOT NULL,
+            side        TEXT,
+            price       DOUBLE PRECISION,
+            qty         DOUBLE PRECISION,
+            notional    DOUBLE PRECISION,
+            order_type  TEXT,
+            raw_json    JSONB NOT NULL,
+            UNIQUE (symbol, ts, side, price, qty)
+        )
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_binance_force_orders_symbol_ts
+        ON binance_force_orders (symbol, ts DESC)
+    """))
+    log.info("Applied: binance_force_orders (CREATE IF NOT EXISTS)")
+
+    # (ALT-3) binance_futures_metrics
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS binance_futures_metrics (
+            id          BIGSERIAL PRIMARY KEY,
+            ts          TIMESTAMPTZ NOT NULL,
+            symbol      TEXT NOT NULL,
+            metric      TEXT NOT NULL,
+            value       DOUBLE PRECISION,
+            value2      DOUBLE PRECISION,
+            period      TEXT,
+            raw_json    JSONB NOT NULL,
+            UNIQUE (metric, symbol, ts, period)
+        )
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_binance_futures_metrics_metric_symbol_ts
+        ON binance_futures_metrics (metric, symbol, ts DESC)
+    """))
+    log.info("Applied: binance_futures_metrics (CREATE IF NOT EXISTS)")
+
+    # (ALT-4) coinglass_liquidation_map
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS coinglass_liquidation_map (
+            id           BIGSERIAL PRIMARY KEY,
+            ts           TIMESTAMPTZ NOT NULL,
+            symbol       TEXT NOT NULL,
+            exchange     TEXT,
+            timeframe    TEXT,
+            summary_json JSONB,
+            raw_json     JSONB NOT NULL
+        )
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_coinglass_liq_map_symbol_ts
+        ON coinglass_liquidation_map (symbol, ts DESC)
+    """))
+    log.info("Applied: coinglass_liquidation_map (CREATE IF NOT EXISTS)")
+
+    # ── Step ALT-1: feature_snapshots (학습/모델 입력용 정렬 스냅샷) ──────
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS feature_snapshots (
+            ts                      TIMESTAMPTZ NOT NULL,
+            symbol                  TEXT NOT NULL,
+            -- Upbit market
+            mid_krw                 DOUBLE PRECISION,
+            spread_bps              DOUBLE PRECISION,
+            imb_notional_top5       DOUBLE PRECISION,
+            -- Barrier
+            r_t                     DOUBLE PRECISION,
+            r_min_eff               DOUBLE PRECISION,
+            cost_roundtrip_est      DOUBLE PRECISION,
+            sigma_1s                DOUBLE PRECISION,
+            sigma_h                 DOUBLE PRECISION,
+            k_vol_eff               DOUBLE PRECISION,
+            barrier_status          TEXT,
+            -- Prediction
+            p_up                    DOUBLE PRECISION,
+            p_down                  DOUBLE PRECISION,
+            p_none                  DOUBLE PRECISION,
+            ev                      DOUBLE PRECISION,
+            ev_rate                 DOUBLE PRECISION,
+            action_hat              TEXT,
+            model_version           TEXT,
+            -- Binance mark/index/funding (latest near ts)
+            bin_mark_price          DOUBLE PRECISION,
+            bin_index_price         DOUBLE PRECISION,
+            bin_funding_rate        DOUBLE PRECISION,
+            bin_mark_index_basis    DOUBLE PRECISION,
+            -- Binance metrics (latest within freshness window)
+            oi_value                DOUBLE PRECISION,
+            global_ls_ratio         DOUBLE PRECISION,
+            taker_ls_ratio          DOUBLE PRECISION,
+            basis_value             DOUBLE PRECISION,
+            -- Binance liquidation aggregates (rolling 5m)
+            liq_5m_notional         DOUBLE PRECISION,
+            liq_5m_count            INTEGER,
+            -- Raw debug payload (optional)
+            raw_json                JSONB,
+            PRIMARY KEY (ts, symbol)
+        )
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_feature_snapshots_symbol_ts
+        ON feature_snapshots (symbol, ts DESC)
+    """))
+    log.info("Applied: feature_snapshots (CREATE IF NOT EXISTS)")
+
+    # ── Step ALT-2: feature_snapshots에 source_ts 컬럼 추가 (누수 감지용) ──
+    for col_def in [
+        "bin_mark_ts  TIMESTAMPTZ",
+        "oi_ts        TIMESTAMPTZ",
+        "liq_last_ts  TIMESTAMPTZ",
+    ]:
+        conn.execute(text(
+            f"ALTER TABLE feature_snapshots ADD COLUMN IF NOT EXISTS {col_def}"
+        ))
+    log.info("Applied: feature_snapshots source_ts columns (Step ALT-2)")
+
+    # ── Step ALT-2: coinglass_call_status 테이블 ─────────────────────────
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS coinglass_call_status (
+            id          BIGSERIAL PRIMARY KEY,
+            ts          TIMESTAMPTZ NOT NULL DEFAULT now(),
+            ok          BOOLEAN NOT NULL,
+            http_status INTEGER,
+            error_msg   TEXT,
+            latency_ms  INTEGER,
+            poll_count  INTEGER
+        )
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_coinglass_call_status_ts
+        ON coinglass_call_status (ts DESC)
+    """))
+    log.info("Applied: coinglass_call_status (CREATE IF NOT EXISTS)")
+
+    # (15) paper books: book_id on paper_positions / paper_trades / paper_decisions
+    for table in ("paper_positions", "paper_trades", "paper_decisions"):
+        conn.execute(text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS book_id TEXT NOT NULL DEFAULT 'main'"
+        ))
+    # paper_positions PK: (symbol) → (book_id, symbol)
+    conn.execute(text("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conrelid = 'paper_positions'::regclass
+                  AND contype = 'p'
+                  AND array_length(conkey, 1) = 2
+            ) THEN
+                ALTER TABLE paper_positions DROP CONSTRAINT IF EXISTS paper_positions_pkey;
+                ALTER TABLE paper_positions ADD CONSTRAINT paper_positions_pkey
+                    PRIMARY KEY (book_id, symbol);
+            END IF;
+        END $$
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_paper_trades_book_symbol_t
+        ON paper_trades (book_id, symbol, t)
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_paper_decisions_book_symbol_ts
+        ON paper_decisions (book_id, symbol, ts)
+    """))
+    log.info("Applied: paper book_id columns + paper_positions PK (book_id, symbol)")
+
+    # (16) latency_traces: prediction t0 → paper → Upbit attempt hop 시각 (t0 기준 ms)
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS latency_traces (
+            id             BIGSERIAL PRIMARY KEY,
+            ts             TIMESTAMPTZ NOT NULL,
+            trace_id       TEXT NOT NULL,
+            symbol         TEXT NOT NULL,
+            book_id        TEXT,
+            paper_trade_id BIGINT,
+            hops           JSONB NOT NULL,
+            created_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """))
+    conn.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_latency_traces_symbol_ts
+        ON latency_traces (symbol, ts)
+    """))
+    log.info("Applied: latency_traces table")
+
+    # (17) binance_mark_price_1s.raw_json: 샘플링 저장 (BINANCE_MARK_RAW_JSON_EVERY_SEC) → NULL 허용
+    conn.execute(text(
+        "ALTER TABLE binance_mark_price_1s ALTER COLUMN raw_json DROP NOT NULL"
+    ))
+    log.info("Applied: binance_mark_price_1s.raw_json nullable")
+
+    # (18) markPrice universe: 심볼 dictionary + 초당 1행 배열 chunk
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS binance_symbols (
+            id      SERIAL PRIMARY KEY,
+            symbol  TEXT NOT NULL UNIQUE
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS binance_mark_universe_1s (
+            ts            TIMESTAMPTZ PRIMARY KEY,
+            sym_ids       INTEGER[] NOT NULL,
+            mark_price    DOUBLE PRECISION[] NOT NULL,
+            index_price   DOUBLE PRECISION[],
+            funding_rate  DOUBLE PRECISION[]
+        )
+    """))
+    log.info("Applied: binance_symbols + binance_mark_universe_1s")
+
+    # (19) binance_liq_1s: 청산 이벤트 초 bucket rollup (bucket = ts 올림)
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS binance_liq_1s (
+            ts        TIMESTAMPTZ NOT NULL,
+            symbol    TEXT NOT NULL,
+            side      TEXT NOT NULL,
+            notional  DOUBLE PRECISION NOT NULL DEFAULT 0,
+            qty       DOUBLE PRECISION NOT NULL DEFAULT 0,
+            cnt       INTEGER NOT NULL DEFAULT 0,
+            last_ts   TIMESTAMPTZ,
+            PRIMARY KEY (symbol, side, ts)
+        )
+    """))
+    # raw 이벤트 backfill — 이미 있는 bucket은 writer가 transaction 단위로 유지하므로 DO NOTHING
+    conn.execute(text("""
+        INSERT INTO binance_liq_1s (ts, symbol, side, notional, qty, cnt, last_ts)
+        SELECT to_timestamp(ceil(extract(epoch FROM ts))), symbol, side,
+               COALESCE(SUM(notional), 0), COALESCE(SUM(qty), 0), COUNT(*), MAX(ts)
+        FROM binance_force_orders
+        GROUP BY 1, symbol, side
+        ON CONFLICT (symbol, side, ts) DO NOTHING
+    """))
+    log.info("Applied: binance_liq_1s rollup (+ backfill)")
+
+
+# ---------------------------------------------------------------------------
+# schema_version: 번호 붙은 migration을 pending일 때만 적용
+# ---------------------------------------------------------------------------
+# 새 migration은 아래 목록 끝에 (다음 번호, 이름, fn(conn)) 으로 추가 — 번호/순서는 바꾸지 말 것.
+# models.py에 테이블/컬럼을 추가할 때도 번호를 올려야 warm start(ensure_schema fast path)에 반영된다.
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "baseline (v1 + Step 7-11 + Step ALT + (12)-(19))", _migrate_baseline),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# 여러 프로세스(bot / dashboard / CLI)가 동시에 migration하지 않도록 transaction 단위 advisory lock
+_MIGRATION_LOCK_KEY = 0x5143_4D47   # "QCMG"
+
+_CREATE_SCHEMA_VERSION = text("""
+CREATE TABLE IF NOT EXISTS schema_version (
+    version     INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL,
+    applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+""")
+
+# to_regclass: 테이블이 없어도 에러 없이 NULL → catalog 조회 1회, table lock 없음
+_CURRENT_VERSION = text("""
+SELECT CASE WHEN to_regclass('schema_version') IS NULL THEN -1
+            ELSE (SELECT COALESCE(MAX(version), 0) FROM schema_version) END
+""")
+
+
+def current_schema_version(conn: Connection) -> int:
+    """적용된 최신 migration 번호 (schema_version 없으면 -1, 비어 있으면 0)."""
+    return int(conn.execute(_CURRENT_VERSION).scalar())
+
+
+def schema_is_current(engine: Engine) -> bool:
+    """warm start fast path — 모든 migration이 적용돼 있으면 True."""
+    with engine.connect() as conn:
+        return current_schema_version(conn) >= SCHEMA_VERSION
+
+
+def lock_schema(conn: Connection) -> None:
+    """현재 transaction이 끝날 때까지 schema 변경 advisory lock."""
+    conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _MIGRATION_LOCK_KEY})
+
+
+def apply_migrations(engine: Engine, settings: Settings | None = None) -> None:
+    """pending migration만 순서대로 적용 (schema_version 기록).
+
+    이미 최신이면 catalog 조회 한 번으로 끝난다. 적용이 필요하면 advisory lock을 잡고
+    버전을 다시 읽은 뒤 (다른 프로세스가 먼저 끝냈을 수 있음) 한 transaction에서 적용.
+    settings가 있으면 DB_PARTITION_TABLES 대상 테이블의 range partitioning(20)까지 적용.
+    """
+    with engine.connect() as conn:
+        current = current_schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        log.info("Schema up to date (version=%d) — migrations skipped", current)
+    else:
+        with engine.begin() as conn:
+            # lock 대기(다른 프로세스의 backfill)와 backfill 모두 — engine 기본 timeout 해제 후 lock
+            conn.execute(text("SET LOCAL statement_timeout = 0"))
+            lock_schema(conn)
+            conn.execute(_CREATE_SCHEMA_VERSION)
+            current = current_schema_version(conn)
+            for version, name, fn in MIGRATIONS:
+                if version <= current:
+                    continue
+                fn(conn)
+                conn.execute(
+                    text("INSERT INTO schema_version (version, name) VALUES (:v, :n)"),
+                    {"v": version, "n": name},
+                )
+                log.info("Applied migration %d: %s", version, name)
+        log.info("All migrations complete (schema_version=%d)", SCHEMA_VERSION)
+
+    # (20) 고빈도 테이블 ts range partitioning (opt-in) — 전환은 여러 transaction이라 위 블록 밖에서
+    if settings is not None and settings.DB_PARTITION_TABLES.strip():
+        for table in parse_tables(settings.DB_PARTITION_TABLES):
+            if convert_to_partitioned(engine, table, settings.DB_PARTITION_INTERVAL, settings.DB_PARTITION_PREMAKE):
+                log.info("Applied: %s → %s range partitions", table, settings.DB_PARTITION_INTERVAL)
+        maintain_partitions(engine, settings)
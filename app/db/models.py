@@ -228,6 +228,8 @@ class BarrierParams(Base):
 class PaperPosition(Base):
     __tablename__ = "paper_positions"
 
+    # multi-book: one row per (book_id, symbol)
+    book_id = Column(Text, primary_key=True, server_default="main")
     symbol = Column(Text, primary_key=True)
     status = Column(Text, nullable=False)  # FLAT | LONG
     cash_krw = Column(Double, nullable=False)
@@ -257,7 +259,7 @@ class PaperPosition(Base):
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     def __repr__(self) -> str:
-        return f"<PaperPosition {self.symbol} status={self.status} cash={self.cash_krw}>"
+        return f"<PaperPosition {self.book_id}/{self.symbol} status={self.status} cash={self.cash_krw}>"
 
 
 class PaperTrade(Base):
@@ -265,6 +267,7 @@ class PaperTrade(Base):
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     t = Column(DateTime(timezone=True), nullable=False)
+    book_id = Column(Text, nullable=False, server_default="main")
     symbol = Column(Text, nullable=False)
     action = Column(Text, nullable=False)
     reason = Column(Text, nullable=False)
@@ -281,6 +284,7 @@ class PaperTrade(Base):
 
     __table_args__ = (
         Index("ix_paper_trades_symbol_t", "symbol", "t"),
+        Index("ix_paper_trades_book_symbol_t", "book_id", "symbol", "t"),
     )
 
     def __repr__(self) -> str:
@@ -292,6 +296,7 @@ class PaperDecision(Base):
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     ts = Column(DateTime(timezone=True), nullable=False)
+    book_id = Column(Text, nullable=False, server_default="main")
     symbol = Column(Text, nullable=False)
     pos_status = Column(Text, nullable=False)
     action = Column(Text, nullable=False)
@@ -321,6 +326,7 @@ class PaperDecision(Base):
 
     __table_args__ = (
         Index("ix_paper_decisions_symbol_ts", "symbol", "ts"),
+        Index("ix_paper_decisions_book_symbol_ts", "book_id", "symbol", "ts"),
     )
 
     def __repr__(self) -> str:
@@ -434,3 +440,25 @@ class LivePosition(Base):
 
     def __repr__(self) -> str:
         return f"<LivePosition {self.symbol} status={self.position_status} btc={self.btc_balance}>"
+
+
+class LatencyTrace(Base):
+    """Signal → order latency trace. hops: {hop: ms since prediction t0} (app.tracing.HOPS)."""
+
+    __tablename__ = "latency_traces"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    ts = Column(DateTime(timezone=True), nullable=False)   # prediction t0 (touch exit은 touch 시각)
+    trace_id = Column(Text, nullable=False)
+    symbol = Column(Text, nullable=False)
+    book_id = Column(Text, nullable=True)
+    paper_trade_id = Column(BigInteger, nullable=True)
+    hops = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_latency_traces_symbol_ts", "symbol", "ts"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<LatencyTrace {self.trace_id} hops={len(self.hops or {})}>"
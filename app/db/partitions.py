@@ -0,0 +1,473 @@
+"""고빈도 테이블 native range partitioning (ts 기준 일/주 단위) + partition drop retention.
+
+대상 (DB_PARTITION_TABLES, 콤마 구분 — 비어 있으면 끔):
+  market_1s, barrier_state, feature_snapshots, paper_decisions, binance_mark_price_1s
+
+- partition 이름: {table}_pYYYYMMDD (range 시작일, UTC). week는 월요일 시작.
+- PK는 partition key(ts)를 포함해야 하므로 id PK 테이블은 (id, ts)로 바뀐다.
+  ON CONFLICT (symbol, ts) / (ts, symbol) upsert는 그대로 동작.
+- DEFAULT partition은 두지 않는다 (이후 range partition 생성이 DEFAULT 내용 검사에 막힘).
+  대신 maintain_partitions()가 항상 DB_PARTITION_PREMAKE 개의 미래 partition을 유지
+  (apply_migrations + bot 주기 task).
+- retention: drop_old_partitions() — upper bound가 cutoff 이전인 partition만 DETACH + DROP
+  (행 단위 DELETE / count(*) / vacuum 없음).
+
+기존 heap 테이블 전환 (convert_to_partitioned, online):
+  1) {table}_partitioned_new 생성 (LIKE ... PARTITION BY RANGE (ts)) + PK + UNIQUE 제약 + 보조 index
+     (임시 이름 *_pn) + partition 미리 생성,
+     원본에 mirror trigger 설치 — 이후 원본의 INSERT/UPDATE(upsert)/DELETE가 새 테이블에도 반영
+  2) cutoff(now - hot window) 이전 데이터를 partition range 단위로 복사 (ON CONFLICT DO NOTHING —
+     trigger가 먼저 쓴 최신 행을 덮지 않음). range마다 별도 transaction, writer는 계속 원본에 기록
+  3) catch-up: 복사에 걸린 시간만큼 쌓인 구간을 새 cutoff로 다시 복사
+     (lock 구간을 hot window 이내로)
+  4) 마지막 transaction에서 원본을 LOCK → cutoff 이후 행만 복사 → trigger 제거 →
+     보조 index 이름 교체 → 원본은 {table}_unpartitioned로, 새 테이블은 {table}로 rename
+     (sequence OWNED BY 이전)
+  원본은 확인용으로 남겨두며 (--drop-old 또는 수동 DROP) 디스크를 회수한다.
+
+사용법:
+  poetry run python -m app.db.partitions --status
+  poetry run python -m app.db.partitions --convert market_1s
+  poetry run python -m app.db.partitions --convert all --drop-old
+  poetry run python -m app.db.partitions --retention 7 --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.config import Settings, load_settings
+from app.db.session import get_engine
+
+log = logging.getLogger(__name__)
+
+# table → partitioned 버전의 PK (partition key ts 포함)
+PARTITION_TABLES: dict[str, tuple[str, ...]] = {
+    "market_1s": ("symbol", "ts"),
+    "barrier_state": ("symbol", "ts"),
+    "feature_snapshots": ("ts", "symbol"),
+    "paper_decisions": ("id", "ts"),
+    "binance_mark_price_1s": ("id", "ts"),
+}
+
+_INTERVALS = ("day", "week")
+_NEW_SUFFIX = "_partitioned_new"
+_OLD_SUFFIX = "_unpartitioned"
+_HOT_WINDOW = timedelta(minutes=5)   # 마지막 lock transaction에서 복사할 최근 구간
+_CATCHUP_PASSES = 3
+
+_IS_PARTITIONED = text("""
+SELECT c.relkind = 'p' AS partitioned
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE c.relname = :table AND n.nspname = current_schema()
+""")
+
+_LIST_PARTITIONS = text("""
+SELECT c.relname AS name
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+JOIN pg_class p ON p.oid = i.inhparent
+JOIN pg_namespace n ON n.oid = p.relnamespace
+WHERE p.relname = :table AND n.nspname = current_schema()
+ORDER BY c.relname
+""")
+
+_INDEX_DEFS = text("""
+SELECT i.indexname, i.indexdef
+FROM pg_indexes i
+WHERE i.tablename = :table AND i.schemaname = current_schema()
+  AND i.indexname NOT IN (
+      SELECT conname FROM pg_constraint
+      WHERE conrelid = CAST(:table AS regclass) AND contype IN ('p', 'u')
+  )
+""")
+
+_UNIQUE_DEFS = text("""
+SELECT conname, pg_get_constraintdef(oid) AS condef FROM pg_constraint
+WHERE conrelid = CAST(:table AS regclass) AND contype = 'u'
+""")
+
+_COLUMNS = text("""
+SELECT column_name FROM information_schema.columns
+WHERE table_name = :table AND table_schema = current_schema()
+ORDER BY ordinal_position
+""")
+
+_PK_NAME = text("""
+SELECT conname FROM pg_constraint
+WHERE conrelid = CAST(:table AS regclass) AND contype = 'p'
+""")
+
+
+def parse_tables(spec: str) -> list[str]:
+    """DB_PARTITION_TABLES → 대상 테이블 목록. "all"은 전체, 모르는 이름은 ValueError."""
+    names = [p.strip() for p in spec.split(",") if p.strip()]
+    if names == ["all"]:
+        return list(PARTITION_TABLES)
+    unknown = [n for n in names if n not in PARTITION_TABLES]
+    if unknown:
+        raise ValueError(f"partitioning 미지원 테이블: {unknown} (지원: {list(PARTITION_TABLES)})")
+    return names
+
+
+def _check_interval(interval: str) -> None:
+    if interval not in _INTERVALS:
+        raise ValueError(f"DB_PARTITION_INTERVAL={interval!r} — day | week")
+
+
+def period_start(d: date, interval: str) -> date:
+    """d가 속한 partition range의 시작일."""
+    return d - timedelta(days=d.weekday()) if interval == "week" else d
+
+
+def _step(interval: str) -> timedelta:
+    return timedelta(days=7 if interval == "week" else 1)
+
+
+def partition_name(table: str, start: date) -> str:
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def _partition_start(table: str, name: str) -> date | None:
+    m = re.fullmatch(re.escape(table) + r"_p(\d{8})", name)
+    return datetime.strptime(m.group(1), "%Y%m%d").date() if m else None
+
+
+def _utc(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    row = conn.execute(_IS_PARTITIONED, {"table": table}).fetchone()
+    return bool(row and row.partitioned)
+
+
+def table_exists(conn: Connection, table: str) -> bool:
+    return conn.execute(_IS_PARTITIONED, {"table": table}).fetchone() is not None
+
+
+def list_partitions(conn: Connection, table: str) -> list[tuple[str, date]]:
+    """(partition 이름, range 시작일) — 이 모듈 naming을 따르는 partition만."""
+    out = []
+    for r in conn.execute(_LIST_PARTITIONS, {"table": table}).fetchall():
+        start = _partition_start(table, r.name)
+        if start is not None:
+            out.append((r.name, start))
+    return sorted(out, key=lambda x: x[1])
+
+
+def ensure_partitions(
+    conn: Connection,
+    parent: str,
+    interval: str,
+    first: date,
+    premake: int,
+    base: str | None = None,
+) -> list[str]:
+    """first가 속한 range부터 오늘 + premake range까지 partition 생성 (이미 있으면 skip).
+
+    base: partition 이름에 쓸 테이블명 (전환 중엔 parent가 임시 이름이라 원래 이름을 넘긴다).
+    """
+    _check_interval(interval)
+    base = base or parent
+    step = _step(interval)
+    today = datetime.now(timezone.utc).date()
+    start = period_start(first, interval)
+    last = period_start(today, interval) + step * premake
+    created = []
+    while start <= last:
+        name = partition_name(base, start)
+        if not table_exists(conn, name):
+            conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {parent} "
+                f"FOR VALUES FROM ('{_utc(start).isoformat()}') "
+                f"TO ('{_utc(start + step).isoformat()}')"
+            ))
+            created.append(name)
+        start += step
+    return created
+
+
+def maintain_partitions(engine: Engine, settings: Settings) -> int:
+    """partitioned 상태인 대상 테이블마다 미래 partition 보충. 생성한 partition 수 반환."""
+    tables = parse_tables(settings.DB_PARTITION_TABLES)
+    created = 0
+    today = datetime.now(timezone.utc).date()
+    for table in tables:
+        with engine.begin() as conn:
+            if not is_partitioned(conn, table):
+                continue
+            names = ensure_partitions(
+                conn, table, settings.DB_PARTITION_INTERVAL, today, settings.DB_PARTITION_PREMAKE,
+            )
+        if names:
+            log.info("Partitions created for %s: %s", table, names)
+        created += len(names)
+    return created
+
+
+def _copy_range(engine: Engine, table: str, new: str, lo: datetime, hi: datetime) -> int:
+    """[lo, hi) 복사. 이미 있는 행(trigger가 반영한 최신 값)은 그대로 둔다."""
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        return conn.execute(
+            text(
+                f"INSERT INTO {new} SELECT * FROM {table} "
+                "WHERE ts >= :lo AND ts < :hi ON CONFLICT DO NOTHING"
+            ),
+            {"lo": lo, "hi": hi},
+        ).rowcount
+
+
+def _mirror_trigger_sql(table: str, new: str, pk: tuple[str, ...], columns: list[str]) -> list[str]:
+    """원본 변경을 새 테이블에 그대로 반영하는 row trigger (전환 중에만 존재)."""
+    fn = f"{new}_mirror"
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in pk)
+    on_conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    match = " AND ".join(f"{c} = OLD.{c}" for c in pk)
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {fn}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {new} WHERE {match};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {new} SELECT (NEW).* ON CONFLICT ({", ".join(pk)}) {on_conflict};
+            END IF;
+            RETURN NULL;
+        END $$
+        """,
+        f"DROP TRIGGER IF EXISTS {fn} ON {table}",
+        f"CREATE TRIGGER {fn} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION {fn}()",
+    ]
+
+
+def convert_to_partitioned(
+    engine: Engine,
+    table: str,
+    interval: str = "day",
+    premake: int = 7,
+    drop_old: bool = False,
+) -> bool:
+    """heap 테이블 → ts range partitioned 테이블 (online). 이미 partitioned면 False."""
+    _check_interval(interval)
+    if table not in PARTITION_TABLES:
+        raise ValueError(f"partitioning 미지원 테이블: {table}")
+    new, old = table + _NEW_SUFFIX, table + _OLD_SUFFIX
+    pk = ", ".join(PARTITION_TABLES[table])
+    uniques: list[str] = []
+    indexes: list[str] = []
+
+    # 1) 새 partitioned 테이블 + partition
+    with engine.begin() as conn:
+        if not table_exists(conn, table) or is_partitioned(conn, table):
+            return False
+        if table_exists(conn, old):
+            raise RuntimeError(f"{old} 가 이미 있음 — 이전 전환 결과 확인 후 DROP 필요")
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {new}_mirror ON {table}"))   # 중단된 이전 시도
+        conn.execute(text(f"DROP TABLE IF EXISTS {new} CASCADE"))
+        conn.execute(text(
+            f"CREATE TABLE {new} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) "
+            f"PARTITION BY RANGE (ts)"
+        ))
+        conn.execute(text(f"ALTER TABLE {new} ADD PRIMARY KEY ({pk})"))
+        # 비-PK UNIQUE 제약 (LIKE가 복사하지 않음 — ON CONFLICT (...) 대상). 이름은 swap 때 원래대로
+        for r in conn.execute(_UNIQUE_DEFS, {"table": table}).fetchall():
+            if not re.search(r"\bts\b", r.condef):
+                raise RuntimeError(
+                    f"{table}.{r.conname} {r.condef}: partitioned UNIQUE 제약은 ts를 포함해야 함"
+                )
+            conn.execute(text(f"ALTER TABLE {new} ADD CONSTRAINT {r.conname}_pn {r.condef}"))
+            uniques.append(r.conname)
+        # 보조 index도 복사 전에 임시 이름으로 생성 — lock 안에서는 rename만
+        # (빈 테이블이라 build 비용 없음)
+        pattern = re.compile(r" ON (\S+\.)?" + re.escape(table) + r" ")
+        for r in conn.execute(_INDEX_DEFS, {"table": table}).fetchall():
+            ddl = pattern.sub(f" ON {new} ", r.indexdef, count=1)
+            ddl = ddl.replace(f"INDEX {r.indexname} ON", f"INDEX {r.indexname}_pn ON", 1)
+            conn.execute(text(ddl))
+            indexes.append(r.indexname)
+        min_ts = conn.execute(text(f"SELECT min(ts) FROM {table}")).scalar()
+        now = datetime.now(timezone.utc)
+        first = min_ts.astimezone(timezone.utc).date() if min_ts is not None else now.date()
+        names = ensure_partitions(conn, new, interval, first, premake, base=table)
+        columns = [r.column_name for r in conn.execute(_COLUMNS, {"table": table}).fetchall()]
+        for sql in _mirror_trigger_sql(table, new, PARTITION_TABLES[table], columns):
+            conn.execute(text(sql))
+    log.info(
+        "[%s] partitioned table staged (%d partitions from %s) + mirror trigger",
+        table, len(names), first,
+    )
+
+    # 2) cutoff 이전 데이터를 range 단위로 복사 (writer는 원본에 계속 기록, 변경은 trigger가 반영)
+    cutoff = now - _HOT_WINDOW
+    step = _step(interval)
+    start = period_start(first, interval)
+    copied = 0
+    while _utc(start) < cutoff:
+        lo, hi = _utc(start), min(_utc(start + step), cutoff)
+        n = _copy_range(engine, table, new, lo, hi)
+        copied += n
+        log.info("[%s] copied %s ~ %s: %d rows", table, lo.date(), hi, n)
+        start += step
+
+    # 3) catch-up — 복사하는 동안 쌓인 구간 (lock 안에서는 hot window만 복사)
+    for _ in range(_CATCHUP_PASSES):
+        fresh = datetime.now(timezone.utc) - _HOT_WINDOW
+        if fresh <= cutoff:
+            break
+        n = _copy_range(engine, table, new, cutoff, fresh)
+        copied += n
+        log.info("[%s] catch-up %s ~ %s: %d rows", table, cutoff, fresh, n)
+        cutoff = fresh
+
+    # 4) 원본 lock → 최근 구간 복사 → trigger 제거 → index / 이름 교체
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL lock_timeout = '30s'"))
+        conn.execute(text("SET LOCAL statement_timeout = 0"))
+        conn.execute(text(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE"))
+        n = conn.execute(
+            text(
+                f"INSERT INTO {new} SELECT * FROM {table} "
+                "WHERE ts >= :cutoff ON CONFLICT DO NOTHING"
+            ),
+            {"cutoff": cutoff},
+        ).rowcount
+        copied += n
+        conn.execute(text(f"DROP TRIGGER {new}_mirror ON {table}"))
+        conn.execute(text(f"DROP FUNCTION {new}_mirror()"))
+
+        # 보조 index: 원본 index 이름을 비우고 step 1에서 만든 index에 원래 이름을
+        for name in indexes:
+            conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}{_OLD_SUFFIX}"))
+            conn.execute(text(f"ALTER INDEX {name}_pn RENAME TO {name}"))
+        old_pk = conn.execute(_PK_NAME, {"table": table}).scalar()
+        if old_pk:
+            conn.execute(text(f"ALTER TABLE {table} RENAME CONSTRAINT {old_pk} TO {old}_pkey"))
+        for name in uniques:
+            conn.execute(
+                text(f"ALTER TABLE {table} RENAME CONSTRAINT {name} TO {name}{_OLD_SUFFIX}")
+            )
+            conn.execute(text(f"ALTER TABLE {new} RENAME CONSTRAINT {name}_pn TO {name}"))
+
+        seq = None
+        if "id" in PARTITION_TABLES[table]:
+            seq = conn.execute(text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+        conn.execute(text(f"ALTER TABLE {new} RENAME TO {table}"))
+        new_pk = conn.execute(_PK_NAME, {"table": table}).scalar()
+        if new_pk and new_pk != f"{table}_pkey":
+            conn.execute(text(f"ALTER TABLE {table} RENAME CONSTRAINT {new_pk} TO {table}_pkey"))
+        if seq:
+            # 새 테이블 DEFAULT nextval(seq)는 LIKE로 복사됨 → 소유권만 이전
+            # (원본 DROP 시 sequence 보존)
+            conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {table}.id"))
+        if drop_old:
+            conn.execute(text(f"DROP TABLE {old}"))
+
+    log.info(
+        "[%s] converted to %s-partitioned table (%d rows copied, old table %s)",
+        table, interval, copied, "dropped" if drop_old else f"kept as {old}",
+    )
+    return True
+
+
+def drop_old_partitions(
+    engine: Engine,
+    table: str,
+    keep_days: int,
+    interval: str = "day",
+    dry_run: bool = False,
+) -> list[str]:
+    """range 전체가 now - keep_days 이전인 partition을 DETACH + DROP. 대상 이름 반환."""
+    _check_interval(interval)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=keep_days)
+    step = _step(interval)
+    with engine.connect() as conn:
+        if not is_partitioned(conn, table):
+            return []
+        targets = [
+            name for name, start in list_partitions(conn, table)
+            if _utc(start + step) <= cutoff
+        ]
+    if dry_run:
+        return targets
+    for name in targets:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        log.info("[%s] dropped partition %s", table, name)
+    return targets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="고빈도 테이블 ts range partitioning")
+    parser.add_argument("--status", action="store_true", help="대상 테이블 partition 현황")
+    parser.add_argument("--convert", default="", help="전환할 테이블 (콤마 구분, all=전체)")
+    parser.add_argument("--drop-old", action="store_true", help="전환 후 _unpartitioned 원본 DROP")
+    parser.add_argument(
+        "--retention", type=int, default=None, help="보관 기간(일) — 초과 partition DROP"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="retention 대상만 출력")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    s = load_settings()
+    engine = get_engine(s, "partitions", pool_size=2, statement_timeout_ms=0)
+    interval = s.DB_PARTITION_INTERVAL
+
+    sep = "=" * 60
+    print(sep)
+    print(f"  partitions — interval={interval} premake={s.DB_PARTITION_PREMAKE}")
+    print(sep)
+
+    ok = True
+    for table in parse_tables(args.convert):
+        try:
+            done = convert_to_partitioned(
+                engine, table, interval, s.DB_PARTITION_PREMAKE, args.drop_old
+            )
+            print(f"  ✅ [{table}] {'전환 완료' if done else '이미 partitioned (skip)'}")
+        except Exception as e:
+            ok = False
+            print(f"  ❌ [{table}] 전환 실패: {e}")
+
+    if args.retention is not None:
+        for table in PARTITION_TABLES:
+            names = drop_old_partitions(engine, table, args.retention, interval, args.dry_run)
+            if names:
+                verb = "DROP 대상" if args.dry_run else "DROP 완료"
+                print(f"  [{table}] {verb}: {', '.join(names)}")
+
+    if args.status or not (args.convert or args.retention is not None):
+        with engine.connect() as conn:
+            for table in PARTITION_TABLES:
+                if not table_exists(conn, table):
+                    print(f"  [{table}] (없음)")
+                elif not is_partitioned(conn, table):
+                    print(f"  [{table}] heap (partitioned 아님)")
+                else:
+                    parts = list_partitions(conn, table)
+                    rng = f"{parts[0][1]} ~ {parts[-1][1]}" if parts else "-"
+                    print(f"  [{table}] partitioned: {len(parts)}개 ({rng})")
+
+    print(sep)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
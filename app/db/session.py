@@ -1,12 +1,174 @@
+"""DB engine factory — 모든 프로세스/CLI가 여기서 engine을 만든다.
+
+- pool 크기: DB_POOL_SIZE (0이면 활성 runner 수로 계산 — 각 runner가 to_thread로 connection 1개씩)
+- pool_pre_ping + pool_recycle: 끊긴 connection을 checkout 시점에 교체
+- connection마다 application_name (pg_stat_activity에서 component 구분) + statement_timeout
+- TimedQueuePool: checkout 대기 시간 집계 → pool_stats() / bot 주기 로그
+- get_async_engine(): psycopg3 async (optional 'greenlet' 필요, 없으면 None → to_thread 경로 유지)
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import threading
+import time
+
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 
 from app.config import Settings
 
+log = logging.getLogger(__name__)
+
+_SLOW_WAIT_SEC = 0.1   # 이 이상 걸린 checkout은 slow로 집계
+
+
+class PoolMetrics:
+    """connection checkout 대기 시간 누적 (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total_sec = 0.0
+        self.wait_max_sec = 0.0
+        self.slow = 0
+        self.timeouts = 0
+
+    def observe(self, wait_sec: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total_sec += wait_sec
+            self.wait_max_sec = max(self.wait_max_sec, wait_sec)
+            if wait_sec >= _SLOW_WAIT_SEC:
+                self.slow += 1
+
+    def snapshot(self, reset_max: bool = False) -> dict:
+        with self._lock:
+            out = {
+                "checkouts": self.checkouts,
+                "wait_avg_ms": self.wait_total_sec / self.checkouts * 1000 if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max_sec * 1000,
+                "slow": self.slow,
+                "timeouts": self.timeouts,
+            }
+            if reset_max:
+                self.wait_max_sec = 0.0
+            return out
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool + checkout 대기 시간 측정 (overflow connection 생성 시간 포함)."""
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.observe(time.perf_counter() - t0, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe(time.perf_counter() - t0)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def runner_pool_size(settings: Settings) -> int:
+    """bot에서 동시에 connection을 쓰는 runner 수 + 여유분."""
+    s = settings
+    n = 4   # resampler, barrier, predictor, evaluator
+    n += int(s.TRACE_ENABLED) + int(s.PAPER_TRADING_ENABLED)
+    n += 2 * int(s.UPBIT_SHADOW_ENABLED) + int(s.UPBIT_PRIVATE_WS_ENABLED)   # shadow + account
+    if s.ALT_DATA_ENABLED:
+        n += 5   # markPrice / universe writer, forceOrder, REST poller, coinglass
+    n += int(bool(s.DB_PARTITION_TABLES.strip()))
+    n += len([t for t in s.DB_WRITE_BEHIND_TABLES.split(",") if t.strip()])   # table별 flusher
+    return n + 2   # 동시 to_thread 중첩 / ad-hoc 쿼리 여유
+
+
+def _connect_args(settings: Settings, component: str, statement_timeout_ms: int | None) -> dict:
+    if not settings.DB_URL.startswith("postgresql"):
+        return {}
+    args = {"application_name": f"{settings.DB_APPLICATION_NAME}:{component}"[:63]}
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+    if timeout > 0:
+        args["options"] = f"-c statement_timeout={int(timeout)}"
+    return args
+
+
+def get_engine(
+    settings: Settings,
+    component: str = "bot",
+    pool_size: int | None = None,
+    statement_timeout_ms: int | None = None,
+) -> Engine:
+    """component: application_name 접미사 (bot / dashboard / export_dataset ...).
+
+    pool_size None이면 DB_POOL_SIZE (0이면 runner_pool_size). CLI는 보통 1~2.
+    statement_timeout_ms None이면 DB_STATEMENT_TIMEOUT_MS, 0이면 제한 없음 (대량 scan CLI).
+    """
+    size = pool_size or settings.DB_POOL_SIZE or runner_pool_size(settings)
+    engine = create_engine(
+        settings.DB_URL,
+        echo=False,
+        poolclass=TimedQueuePool,
+        pool_size=size,
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+        pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+        pool_pre_ping=True,
+        connect_args=_connect_args(settings, component, statement_timeout_ms),
+    )
+    engine.pool.metrics = PoolMetrics()
+    log.debug("Engine created (component=%s pool_size=%d overflow=%d)", component, size, settings.DB_POOL_MAX_OVERFLOW)
+    return engine
+
+
+def pool_stats(engine: Engine, reset_max: bool = False) -> dict:
+    """pool 상태 + checkout 대기 통계."""
+    pool = engine.pool
+    out = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        out.update(metrics.snapshot(reset_max=reset_max))
+    return out
+
+
+def get_async_engine(settings: Settings, component: str = "bot-async", pool_size: int | None = None):
+    """psycopg3 async AsyncEngine. 'greenlet' 미설치 등으로 쓸 수 없으면 None (호출 측은 to_thread fallback)."""
+    if not settings.DB_ASYNC_ENABLED:
+        return None
+    if importlib.util.find_spec("greenlet") is None:
+        log.warning("DB_ASYNC_ENABLED=true but 'greenlet' package not installed — using sync engine + to_thread")
+        return None
+    from sqlalchemy.ext.asyncio import create_async_engine
 
-def get_engine(settings: Settings) -> Engine:
-    return create_engine(settings.DB_URL, echo=False)
+    return create_async_engine(
+        settings.DB_URL,
+        echo=False,
+        pool_size=pool_size or 4,
+        max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+        pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+        pool_pre_ping=True,
+        connect_args=_connect_args(settings, component, None),
+    )
 
 
 def get_sessionmaker(engine: Engine) -> sessionmaker[Session]:
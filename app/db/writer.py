@@ -3,6 +3,8 @@ import json
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from app.db.batch import get_write_behind
+
 
 def _j(val):
     """Serialize Python dict/list to JSON string for psycopg3 text() JSONB params."""
@@ -59,6 +61,8 @@ ON CONFLICT (symbol, ts) DO UPDATE SET
 
 
 def upsert_market_1s(engine: Engine, row: dict) -> None:
+    if get_write_behind().submit(engine, "market_1s", _UPSERT_SQL, dict(row)):
+        return
     with engine.begin() as conn:
         conn.execute(_UPSERT_SQL, row)
 
@@ -101,6 +105,8 @@ ON CONFLICT (symbol, ts) DO UPDATE SET
 
 
 def upsert_barrier_state(engine: Engine, row: dict) -> None:
+    if get_write_behind().submit(engine, "barrier_state", _UPSERT_BARRIER_SQL, dict(row)):
+        return
     with engine.begin() as conn:
         conn.execute(_UPSERT_BARRIER_SQL, row)
 
@@ -203,6 +209,8 @@ ON CONFLICT ON CONSTRAINT uq_evaluation_results_symbol_t0 DO UPDATE SET
 
 
 def upsert_evaluation_result(engine: Engine, row: dict) -> None:
+    if get_write_behind().submit(engine, "evaluation_results", _UPSERT_EVAL_SQL, dict(row)):
+        return
     with engine.begin() as conn:
         conn.execute(_UPSERT_EVAL_SQL, row)
 
@@ -263,22 +271,22 @@ def update_barrier_params(
 # ---------------------------------------------------------------------------
 
 _SELECT_PAPER_POS = text("""
-SELECT symbol, status, cash_krw, qty, entry_time, entry_price, entry_fee_krw,
+SELECT book_id, symbol, status, cash_krw, qty, entry_time, entry_price, entry_fee_krw,
        u_exec, d_exec, h_sec, entry_pred_t0, entry_model_version,
        entry_r_t, entry_z_barrier, entry_ev_rate, entry_p_none,
        initial_krw, equity_high, day_start_date, day_start_equity,
        halted, halt_reason, halted_at, updated_at
-FROM paper_positions WHERE symbol = :symbol
+FROM paper_positions WHERE book_id = :book_id AND symbol = :symbol
 """)
 
 _INSERT_PAPER_POS = text("""
-INSERT INTO paper_positions (symbol, status, cash_krw, qty,
+INSERT INTO paper_positions (book_id, symbol, status, cash_krw, qty,
                              initial_krw, equity_high, day_start_date, day_start_equity,
                              halted)
-VALUES (:symbol, 'FLAT', :cash_krw, 0,
+VALUES (:book_id, :symbol, 'FLAT', :cash_krw, 0,
         :initial_krw, :equity_high, :day_start_date, :day_start_equity,
         false)
-ON CONFLICT (symbol) DO NOTHING
+ON CONFLICT (book_id, symbol) DO NOTHING
 """)
 
 _UPDATE_PAPER_POS = text("""
@@ -293,23 +301,36 @@ UPDATE paper_positions SET
     day_start_date = :day_start_date, day_start_equity = :day_start_equity,
     halted = :halted, halt_reason = :halt_reason, halted_at = :halted_at,
     updated_at = now()
-WHERE symbol = :symbol
+WHERE book_id = :book_id AND symbol = :symbol
 """)
 
 _INSERT_PAPER_TRADE = text("""
-INSERT INTO paper_trades (t, symbol, action, reason, price, qty, fee_krw, cash_after,
+INSERT INTO paper_trades (t, book_id, symbol, action, reason, price, qty, fee_krw, cash_after,
+                          pnl_krw, pnl_rate, hold_sec, pred_t0, model_version)
+VALUES (:t, :book_id, :symbol, :action, :reason, :price, :qty, :fee_krw, :cash_after,
+        :pnl_krw, :pnl_rate, :hold_sec, :pred_t0, :model_version)
+""")
+
+_INSERT_PAPER_TRADE_RETURNING = text("""
+INSERT INTO paper_trades (t, book_id, symbol, action, reason, price, qty, fee_krw, cash_after,
                           pnl_krw, pnl_rate, hold_sec, pred_t0, model_version)
-VALUES (:t, :symbol, :action, :reason, :price, :qty, :fee_krw, :cash_after,
+VALUES (:t, :book_id, :symbol, :action, :reason, :price, :qty, :fee_krw, :cash_after,
         :pnl_krw, :pnl_rate, :hold_sec, :pred_t0, :model_version)
+RETURNING id
 """)
 
+# LISTEN/NOTIFY channel — 커밋 시점에 ShadowExecutionRunner 등 listener에 전달
+PAPER_TRADES_CHANNEL = "paper_trades"
+
+_NOTIFY_PAPER_TRADE = text("SELECT pg_notify(:channel, :payload)")
+
 _INSERT_PAPER_DECISION = text("""
-INSERT INTO paper_decisions (ts, symbol, pos_status, action, reason,
+INSERT INTO paper_decisions (ts, book_id, symbol, pos_status, action, reason,
                              ev_rate, ev, p_up, p_down, p_none, r_t, z_barrier,
                              spread_bps, lag_sec, cost_roundtrip_est, model_version, pred_t0,
                              reason_flags,
                              cash_krw, qty, equity_est, drawdown_pct, policy_profile)
-VALUES (:ts, :symbol, :pos_status, :action, :reason,
+VALUES (:ts, :book_id, :symbol, :pos_status, :action, :reason,
         :ev_rate, :ev, :p_up, :p_down, :p_none, :r_t, :z_barrier,
         :spread_bps, :lag_sec, :cost_roundtrip_est, :model_version, :pred_t0,
         :reason_flags,
@@ -317,11 +338,14 @@ VALUES (:ts, :symbol, :pos_status, :action, :reason,
 """)
 
 
-def get_or_create_paper_position(engine: Engine, symbol: str, initial_krw: float) -> dict:
+def get_or_create_paper_position(
+    engine: Engine, symbol: str, initial_krw: float, book_id: str = "main",
+) -> dict:
     from datetime import date, timezone, datetime as dt
     today_utc = dt.now(timezone.utc).date()
+    key = {"book_id": book_id, "symbol": symbol}
     with engine.begin() as conn:
-        row = conn.execute(_SELECT_PAPER_POS, {"symbol": symbol}).fetchone()
+        row = conn.execute(_SELECT_PAPER_POS, key).fetchone()
         if row is not None:
             d = row._asdict()
             # Backfill missing fields for existing rows
@@ -329,8 +353,8 @@ def get_or_create_paper_position(engine: Engine, symbol: str, initial_krw: float
                 conn.execute(text(
                     "UPDATE paper_positions SET initial_krw=:v, equity_high=:v, "
                     "day_start_date=:d, day_start_equity=:v, halted=false "
-                    "WHERE symbol=:s AND initial_krw IS NULL"
-                ), {"v": initial_krw, "d": today_utc, "s": symbol})
+                    "WHERE book_id=:b AND symbol=:s AND initial_krw IS NULL"
+                ), {"v": initial_krw, "d": today_utc, "b": book_id, "s": symbol})
                 d["initial_krw"] = initial_krw
                 d["equity_high"] = initial_krw
                 d["day_start_date"] = today_utc
@@ -340,14 +364,14 @@ def get_or_create_paper_position(engine: Engine, symbol: str, initial_krw: float
                 d["halted_at"] = None
             return d
         conn.execute(_INSERT_PAPER_POS, {
-            "symbol": symbol,
+            **key,
             "cash_krw": initial_krw,
             "initial_krw": initial_krw,
             "equity_high": initial_krw,
             "day_start_date": today_utc,
             "day_start_equity": initial_krw,
         })
-        row = conn.execute(_SELECT_PAPER_POS, {"symbol": symbol}).fetchone()
+        row = conn.execute(_SELECT_PAPER_POS, key).fetchone()
         return row._asdict()
 
 
@@ -362,10 +386,56 @@ def insert_paper_trade(engine: Engine, trade: dict) -> None:
 
 
 def insert_paper_decision(engine: Engine, decision: dict) -> None:
+    if get_write_behind().submit(engine, "paper_decisions", _INSERT_PAPER_DECISION, dict(decision)):
+        return
     with engine.begin() as conn:
         conn.execute(_INSERT_PAPER_DECISION, decision)
 
 
+def write_paper_ticks(
+    engine: Engine,
+    ticks: list[tuple[dict, dict | None, dict]],
+) -> list[int | None]:
+    """Persist one decision tick for every paper book in a single transaction.
+
+    ticks: [(pos, trade | None, decision), ...] — rows carry their own book_id.
+    Positions and decisions are sent as one executemany each; trades use
+    RETURNING so the caller gets the new paper_trades.id per book.
+    Either every book's rows are committed or none is, so in-memory positions
+    can never get ahead of a half-written tick.
+    Each new trade also issues pg_notify(PAPER_TRADES_CHANNEL) — Postgres delivers
+    it only when the transaction commits.
+    paper_decisions가 write-behind 대상이면 decision 행은 commit 후에 batch로 넘김
+    (transaction이 실패하면 decision도 기록되지 않음).
+    """
+    decisions = [decision for _, _, decision in ticks]
+    wb = get_write_behind()
+    decisions_deferred = wb.accepts(engine, "paper_decisions")
+    trade_ids: list[int | None] = []
+    with engine.begin() as conn:
+        conn.execute(_UPDATE_PAPER_POS, [pos for pos, _, _ in ticks])
+        for _, trade, _ in ticks:
+            if trade is None:
+                trade_ids.append(None)
+                continue
+            trade_id = conn.execute(_INSERT_PAPER_TRADE_RETURNING, trade).scalar()
+            trade_ids.append(trade_id)
+            conn.execute(_NOTIFY_PAPER_TRADE, {
+                "channel": PAPER_TRADES_CHANNEL,
+                "payload": json.dumps({
+                    "id": trade_id, "book_id": trade["book_id"],
+                    "symbol": trade["symbol"], "action": trade["action"],
+                }),
+            })
+        if not decisions_deferred:
+            conn.execute(_INSERT_PAPER_DECISION, decisions)
+    if decisions_deferred and not wb.submit(engine, "paper_decisions", _INSERT_PAPER_DECISION, decisions):
+        # commit 사이에 write-behind가 멈춤 (shutdown) — 즉시 기록
+        with engine.begin() as conn:
+            conn.execute(_INSERT_PAPER_DECISION, decisions)
+    return trade_ids
+
+
 # ---------------------------------------------------------------------------
 # Upbit Exchange (Step 7)
 # ---------------------------------------------------------------------------
@@ -413,6 +483,8 @@ RETURNING id
 def insert_upbit_account_snapshot(engine: Engine, row: dict) -> None:
     r = dict(row)
     r["raw_json"] = _j(r.get("raw_json"))
+    if get_write_behind().submit(engine, "upbit_account_snapshots", _INSERT_UPBIT_ACCOUNT_SNAPSHOT, r):
+        return
     with engine.begin() as conn:
         conn.execute(_INSERT_UPBIT_ACCOUNT_SNAPSHOT, r)
 
@@ -477,6 +549,35 @@ def update_upbit_order_attempt_final(
         })
 
 
+_FINALIZE_ORDER_ATTEMPT_BY_UUID = text("""
+UPDATE upbit_order_attempts
+SET final_state = :final_state,
+    executed_volume = :executed_volume,
+    paid_fee = :paid_fee,
+    avg_price = :avg_price
+WHERE uuid = :uuid AND (final_state IS NULL OR final_state = 'poll_timeout')
+""")
+
+
+def finalize_upbit_order_attempt_by_uuid(
+    engine: Engine,
+    uuid: str,
+    final_state: str,
+    executed_volume: float | None = None,
+    paid_fee: float | None = None,
+    avg_price: float | None = None,
+) -> int:
+    """Pushed final order state → attempt row (아직 미확정 / poll_timeout인 경우만). 갱신 행 수 반환."""
+    with engine.begin() as conn:
+        return conn.execute(_FINALIZE_ORDER_ATTEMPT_BY_UUID, {
+            "uuid": uuid,
+            "final_state": final_state,
+            "executed_volume": executed_volume,
+            "paid_fee": paid_fee,
+            "avg_price": avg_price,
+        }).rowcount
+
+
 _INSERT_UPBIT_ORDER_SNAPSHOT = text("""
 INSERT INTO upbit_order_snapshots
     (ts, symbol, uuid, state, side, ord_type, price, volume,
@@ -513,3 +614,53 @@ ON CONFLICT (symbol) DO UPDATE SET
 def upsert_live_position(engine: Engine, row: dict) -> None:
     with engine.begin() as conn:
         conn.execute(_UPSERT_LIVE_POSITION, row)
+
+
+# private WS myAsset: 변경된 잔고만 반영 (None이면 기존 값 유지, avg_buy_price는 REST 스냅샷이 관리)
+_UPDATE_LIVE_POSITION_BALANCES = text("""
+INSERT INTO live_positions
+    (symbol, ts, krw_balance, btc_balance, btc_avg_buy_price, position_status, updated_at)
+VALUES
+    (:symbol, :ts, :krw_balance, :btc_balance, NULL,
+     CASE WHEN COALESCE(:btc_balance, 0) > 0 THEN 'LONG' ELSE 'FLAT' END, now())
+ON CONFLICT (symbol) DO UPDATE SET
+    ts = EXCLUDED.ts,
+    krw_balance = COALESCE(EXCLUDED.krw_balance, live_positions.krw_balance),
+    btc_balance = COALESCE(EXCLUDED.btc_balance, live_positions.btc_balance),
+    position_status = CASE
+        WHEN COALESCE(EXCLUDED.btc_balance, live_positions.btc_balance, 0) > 0 THEN 'LONG'
+        ELSE 'FLAT'
+    END,
+    updated_at = now()
+""")
+
+
+def update_live_position_balances(engine: Engine, row: dict) -> None:
+    with engine.begin() as conn:
+        conn.execute(_UPDATE_LIVE_POSITION_BALANCES, row)
+
+
+# ---------------------------------------------------------------------------
+# Latency tracing (app.tracing)
+# ---------------------------------------------------------------------------
+
+_INSERT_LATENCY_TRACE = text("""
+INSERT INTO latency_traces (ts, trace_id, symbol, book_id, paper_trade_id, hops)
+VALUES (:ts, :trace_id, :symbol, :book_id, :paper_trade_id, :hops)
+""")
+
+
+def insert_latency_traces(engine: Engine, rows: list[dict]) -> None:
+    """TraceRecorder.drain() 결과를 executemany 한 번으로 저장."""
+    if not rows:
+        return
+    with engine.begin() as conn:
+        conn.execute(_INSERT_LATENCY_TRACE, [{**r, "hops": _j(r["hops"])} for r in rows])
+
+
+async def insert_latency_traces_async(async_engine, rows: list[dict]) -> None:
+    """insert_latency_traces의 AsyncEngine 버전 (psycopg3 async, to_thread 없음)."""
+    if not rows:
+        return
+    async with async_engine.begin() as conn:
+        await conn.execute(_INSERT_LATENCY_TRACE, [{**r, "hops": _j(r["hops"])} for r in rows])
@@ -12,9 +12,10 @@ import argparse
 import sys
 from datetime import datetime, timezone
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 from app.config import is_real_key, load_settings
+from app.db.session import get_engine
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 유틸리티
@@ -206,6 +207,29 @@ def check_force_orders(conn, symbol: str) -> tuple[bool, str]:
         for r in rows3:
             lines.append(_fmt_row(r))
 
+    # 초 bucket rollup (binance_liq_1s) window 합계 — predictor/dashboard가 읽는 경로
+    rows_w, err_w = _safe_query(
+        conn,
+        """SELECT w,
+                  COALESCE(SUM(cnt) FILTER (WHERE side='SELL'), 0)      AS long_liq_cnt,
+                  COALESCE(SUM(notional) FILTER (WHERE side='SELL'), 0) AS long_liq_notional,
+                  COALESCE(SUM(cnt) FILTER (WHERE side='BUY'), 0)       AS short_liq_cnt,
+                  COALESCE(SUM(notional) FILTER (WHERE side='BUY'), 0)  AS short_liq_notional
+           FROM unnest(ARRAY[60, 300, 900]) AS w
+           LEFT JOIN binance_liq_1s b
+             ON b.symbol = :sym AND b.ts > now() - w * interval '1 second'
+           GROUP BY w ORDER BY w""",
+        {"sym": symbol},
+    )
+    if err_w or rows_w is None:
+        lines.append(f"  rollup(binance_liq_1s) SKIP: {err_w}")
+    else:
+        for r in rows_w:
+            lines.append(
+                f"  rollup {r.w // 60:>2}m: long liq {r.long_liq_cnt} ({r.long_liq_notional:,.0f} USDT)"
+                f"  short liq {r.short_liq_cnt} ({r.short_liq_notional:,.0f} USDT)"
+            )
+
     lines.append("  → PASS ✅ (connection-based check)")
     return True, "\n".join(lines)
 
@@ -281,7 +305,7 @@ def main() -> int:
     poll_sec = s.BINANCE_POLL_SEC
     cg_poll_sec = s.COINGLASS_POLL_SEC
 
-    engine = create_engine(s.DB_URL)
+    engine = get_engine(s, "altdata_check", pool_size=2)
 
     now = _now()
     sep = "=" * 60
@@ -0,0 +1,148 @@
+"""
+backtest_parity_check.py — 백테스트 엔진 정합성 점검
+
+1) fast 엔진 vs reference 엔진: 동일 입력에서 체결 내역·최종 포지션이 완전히 같아야 한다 (FAIL 기준)
+2) 백테스트 vs live paper_trades: 기록된 paper_decisions tick 시각으로 재생해
+   action/reason/시각 일치율과 체결가 괴리(bps)를 보고한다 (참고 지표)
+   live는 WS quote, 백테스트는 1s bar라 완전 일치는 기대하지 않는다.
+
+사용법:
+  poetry run python -m app.diagnostics.backtest_parity_check
+  poetry run python -m app.diagnostics.backtest_parity_check --window 86400
+  poetry run python -m app.diagnostics.backtest_parity_check \\
+    --start 2026-02-22T00:00:00Z --end 2026-02-23T00:00:00Z
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+
+from app.backtest.data import (
+    load_backtest_data,
+    load_decision_ticks,
+    load_paper_trades,
+    ns_to_dt,
+    to_ns,
+)
+from app.backtest.engine import new_flat_position, run_fast, run_reference
+from app.config import load_paper_books, load_settings
+from app.db.session import get_engine
+from app.features.export_dataset import _parse_dt
+
+
+def _match_trades(bt: list[dict], live: list[dict], tol_sec: float) -> tuple[int, list[float]]:
+    """Greedy in-order match on (action, reason) within tol_sec. Returns (matched, price_bps)."""
+    matched = 0
+    price_bps: list[float] = []
+    j = 0
+    for lt in live:
+        while j < len(bt) and (bt[j]["t"] - lt["t"]).total_seconds() < -tol_sec:
+            j += 1
+        if j >= len(bt):
+            break
+        b = bt[j]
+        if (
+            b["action"] == lt["action"]
+            and b["reason"] == lt["reason"]
+            and abs((b["t"] - lt["t"]).total_seconds()) <= tol_sec
+        ):
+            matched += 1
+            if lt["price"]:
+                price_bps.append((b["price"] / lt["price"] - 1.0) * 10000)
+            j += 1
+    return matched, price_bps
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backtest parity check")
+    parser.add_argument("--window", type=int, default=6 * 3600, help="seconds back from now")
+    parser.add_argument("--start", default=None, help="ISO8601 UTC (overrides --window)")
+    parser.add_argument("--end", default=None, help="ISO8601 UTC")
+    parser.add_argument("--tol-sec", type=float, default=10.0, help="live trade time match tolerance")
+    parser.add_argument("--book", default=None, help="paper book id (기본 PAPER_PRIMARY_BOOK)")
+    args = parser.parse_args()
+
+    base = load_settings()
+    book_id = args.book or base.PAPER_PRIMARY_BOOK
+    books = load_paper_books(base)
+    if book_id not in books:
+        print(f"❌ Unknown book {book_id!r} (PAPER_BOOKS: {list(books)})")
+        return 1
+    s = books[book_id]
+    symbol = s.SYMBOL
+    end = _parse_dt(args.end) if args.end else datetime.now(timezone.utc)
+    start = _parse_dt(args.start) if args.start else end - timedelta(seconds=args.window)
+    engine = get_engine(s, "backtest_parity_check", pool_size=2)
+
+    print("=" * 60)
+    print("Backtest Parity Check")
+    print(f"  book={book_id}  symbol={symbol}  window={start.isoformat()} ~ {end.isoformat()}")
+    print("=" * 60)
+
+    df_dec = load_decision_ticks(engine, symbol, start, end, book_id=book_id)
+    # 첫 FLAT decision부터 재생 (LONG 중간 진입 상태는 복원 불가)
+    flat = df_dec.index[df_dec["pos_status"] == "FLAT"]
+    if len(flat) == 0:
+        print("❌ No FLAT paper_decisions in window")
+        return 1
+    df_dec = df_dec.loc[flat[0]:]
+    first = df_dec.iloc[0]
+
+    tick_ts = to_ns(df_dec["ts"])
+    replay_start = ns_to_dt(tick_ts[0])
+    data = load_backtest_data(engine, symbol, replay_start, end, s.DECISION_INTERVAL_SEC, tick_ts=tick_ts)
+    init = new_flat_position(symbol, float(first["cash_krw"]), replay_start.date(), s)
+    print(f"  profile={getattr(s, 'PAPER_POLICY_PROFILE', 'strict')}  ticks={data.n_ticks}  "
+          f"predictions={len(data.pred_t0)}  bars={len(data.bar_ts)}  start_cash={init['cash_krw']:,.0f}")
+
+    # ── 1) fast vs reference
+    print("\n[1] fast vs reference engine")
+    ref = run_reference(data, s, initial_pos=init)
+    fast = run_fast(data, s, initial_pos=init)
+    engine_ok = (
+        ref.trades == fast.trades
+        and ref.final_pos == fast.final_pos
+        and ref.max_drawdown == fast.max_drawdown
+    )
+    print(f"  reference: trades={len(ref.trades)} steps={ref.n_steps} elapsed={ref.elapsed_sec:.3f}s")
+    print(f"  fast     : trades={len(fast.trades)} steps={fast.n_steps} elapsed={fast.elapsed_sec:.3f}s")
+    if engine_ok:
+        speedup = ref.elapsed_sec / fast.elapsed_sec if fast.elapsed_sec > 0 else float("inf")
+        print(f"  ✅ identical trades/final position (speedup x{speedup:.1f})")
+    else:
+        print("  ❌ MISMATCH")
+        for i, (a, b) in enumerate(zip(ref.trades, fast.trades, strict=False)):
+            if a != b:
+                print(f"    first diff #{i}: ref={a['action']}/{a['reason']}@{a['t']} "
+                      f"fast={b['action']}/{b['reason']}@{b['t']}")
+                break
+
+    # ── 2) backtest vs live paper_trades
+    print("\n[2] backtest vs live paper_trades")
+    df_live = load_paper_trades(engine, symbol, replay_start, end, book_id=book_id)
+    live = df_live.to_dict("records")
+    for t in live:
+        t["t"] = t["t"].to_pydatetime() if hasattr(t["t"], "to_pydatetime") else t["t"]
+    matched, price_bps = _match_trades(fast.trades, live, args.tol_sec)
+    n_live = len(live)
+    rate = matched / n_live if n_live else None
+    print(f"  live trades={n_live}  backtest trades={len(fast.trades)}  matched={matched}"
+          + (f" ({rate:.1%})" if rate is not None else ""))
+    if price_bps:
+        abs_bps = sorted(abs(x) for x in price_bps)
+        print(f"  price diff bps: mean={sum(price_bps) / len(price_bps):+.2f}  "
+              f"median|.|={abs_bps[len(abs_bps) // 2]:.2f}  max|.|={abs_bps[-1]:.2f}")
+    live_pnl = sum(t["pnl_krw"] or 0 for t in live if t["action"] == "EXIT_LONG")
+    bt_pnl = sum(t["pnl_krw"] or 0 for t in fast.trades if t["action"] == "EXIT_LONG")
+    print(f"  realized pnl: live={live_pnl:+,.0f} KRW  backtest={bt_pnl:+,.0f} KRW")
+
+    print("\n" + "=" * 60)
+    print(f"RESULT: {'PASS' if engine_ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if engine_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,9 +15,10 @@ import argparse
 import sys
 from datetime import datetime, timezone
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 from app.config import is_real_key, load_settings
+from app.db.session import get_engine
 
 
 def _now() -> datetime:
@@ -162,7 +163,7 @@ def main() -> int:
     cg_enabled = getattr(s, "COINGLASS_ENABLED", False)
     key_is_real = is_real_key(s.COINGLASS_API_KEY)
 
-    engine = create_engine(s.DB_URL)
+    engine = get_engine(s, "coinglass_check", pool_size=2)
 
     now = _now()
     sep = "=" * 60
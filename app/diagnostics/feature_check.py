@@ -12,9 +12,10 @@ import argparse
 import sys
 from datetime import datetime, timezone
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 from app.config import load_settings
+from app.db.session import get_engine
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 유틸리티
@@ -224,7 +225,7 @@ def main() -> int:
     symbol = s.SYMBOL
     interval_sec = s.DECISION_INTERVAL_SEC
 
-    engine = create_engine(s.DB_URL)
+    engine = get_engine(s, "feature_check", pool_size=2)
 
     now = _now()
     sep = "=" * 60
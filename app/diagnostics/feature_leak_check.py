@@ -16,9 +16,10 @@ import argparse
 import sys
 from datetime import datetime, timezone
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 from app.config import load_settings
+from app.db.session import get_engine
 
 
 def _now() -> datetime:
@@ -179,7 +180,7 @@ def main() -> int:
 
     s = load_settings()
     symbol = s.SYMBOL
-    engine = create_engine(s.DB_URL)
+    engine = get_engine(s, "feature_leak_check", pool_size=2)
 
     now = _now()
     sep = "=" * 60
@@ -0,0 +1,205 @@
+"""
+feature_parity_check.py — offline vectorized feature builder 정합성 점검
+
+1) vectorized vs reference: 같은 raw 입력에서 tick마다 live 코드 경로
+   (barrier.controller.sigma_from_mids / BarrierController 공식 + BaselineModelV1.predict)를
+   그대로 호출한 값과 offline.build_features 값이 같아야 한다 (FAIL 기준, rtol 1e-9)
+2) vectorized vs 저장된 feature_snapshots: 컬럼별 일치율 (참고 지표)
+   live는 t0 직후 실행이라 늦게 기록된 bar / barrier_state 타이밍 차이로
+   완전 일치는 기대하지 않는다.
+
+사용법:
+  poetry run python -m app.diagnostics.feature_parity_check
+  poetry run python -m app.diagnostics.feature_parity_check --window 86400 --max-ref-ticks 500
+  poetry run python -m app.diagnostics.feature_parity_check \\
+    --start 2026-02-22T00:00:00Z --end 2026-02-23T00:00:00Z
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.barrier.controller import BarrierController, sigma_from_mids
+from app.config import load_settings
+from app.db.archive import read_range
+from app.db.session import get_engine
+from app.features.export_dataset import _FEATURE_COLUMNS, _parse_dt
+from app.features.offline import MODEL_FEATURE_COLUMNS, build_features, decision_ticks, load_inputs
+from app.models.baseline_v1 import BaselineModelV1
+
+_REF_COLUMNS = [
+    "mid_krw", "r_t", "r_min_eff", "cost_roundtrip_est", "sigma_1s", "sigma_h", "barrier_status",
+    "p_up", "p_down", "p_none", "ev", "ev_rate", "action_hat", *MODEL_FEATURE_COLUMNS,
+]
+
+
+def _none(v):
+    return None if v is None or (isinstance(v, float) and math.isnan(v)) else v
+
+
+def _window(market: pd.DataFrame, t0: pd.Timestamp, sec: int) -> pd.DataFrame:
+    """ts ∈ [t0-sec, t0] 행."""
+    return market[(market["ts"] >= t0 - pd.Timedelta(seconds=sec)) & (market["ts"] <= t0)]
+
+
+def reference_row(market: pd.DataFrame, t0: pd.Timestamp, k_vol_eff: float, settings) -> dict:
+    """tick 1개를 live 코드 경로로 계산 (느림 — 점검용)."""
+    s = settings
+    ctrl = BarrierController(s, engine=None)
+
+    rows = _window(market, t0, s.VOL_WINDOW_SEC)
+    mids = []
+    for close, mid in zip(rows["mid_close_1s"], rows["mid"], strict=True):
+        v = _none(close) if _none(close) is not None else _none(mid)
+        if v is not None and v > 0:
+            mids.append(v)
+    sig = sigma_from_mids(mids, s.VOL_DT_SEC)
+
+    sp = _window(market, t0, s.COST_SPREAD_LOOKBACK_SEC)
+    sp = sp["spread_bps"].dropna()
+    spread_med = float(np.median(sp.astype(float))) if len(sp) else None
+    cost = ctrl.compute_cost_roundtrip(spread_med)
+    sigma_h, r_t, r_min_eff = ctrl.compute_r_t(sig["sigma_1s"], k_vol_eff, cost)
+    status = "OK" if sig["sample_n"] >= ctrl._warmup_threshold() else "WARMUP"
+    if status == "WARMUP":
+        r_t = r_min_eff
+    barrier_row = {
+        "r_t": r_t, "h_sec": s.H_SEC, "sigma_1s": sig["sigma_1s"], "sigma_h": sigma_h,
+        "status": status,
+    }
+
+    win = _window(market, t0, s.MODEL_LOOKBACK_SEC)
+    window = [{k: _none(v) for k, v in r.items()} for r in win.to_dict("records")]
+    out = BaselineModelV1().predict(market_window=window, barrier_row=barrier_row, settings=s)
+    f = out.features
+    return {
+        "mid_krw": window[-1]["mid"] if window else None,
+        "r_t": r_t,
+        "r_min_eff": r_min_eff,
+        "cost_roundtrip_est": cost,
+        "sigma_1s": sig["sigma_1s"],
+        "sigma_h": sigma_h,
+        "barrier_status": status,
+        "p_up": out.p_up,
+        "p_down": out.p_down,
+        "p_none": out.p_none,
+        "ev": out.ev,
+        "ev_rate": out.ev_rate,
+        "action_hat": out.action_hat,
+        "ret_10": f.get("ret_10"),
+        "ret_60": f.get("ret_60"),
+        "mom_z": out.mom_z,
+        "feat_spread_bps": out.spread_bps,
+        "feat_imb_notional_top5": out.imb_notional_top5,
+    }
+
+
+def _col_match(a: pd.Series, b: pd.Series, rtol: float, atol: float) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(a) or pd.api.types.is_datetime64_any_dtype(b):
+        a, b = pd.to_datetime(a, utc=True), pd.to_datetime(b, utc=True)
+        return ((a == b) | (a.isna() & b.isna())).to_numpy()
+    an, bn = pd.to_numeric(a, errors="coerce"), pd.to_numeric(b, errors="coerce")
+    if an.notna().any() or bn.notna().any():
+        x, y = an.to_numpy(dtype=np.float64), bn.to_numpy(dtype=np.float64)
+        return np.isclose(x, y, rtol=rtol, atol=atol, equal_nan=True)
+    return ((a.astype(object) == b.astype(object)) | (a.isna() & b.isna())).to_numpy()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline feature builder parity check")
+    parser.add_argument("--window", type=int, default=6 * 3600, help="seconds back from now")
+    parser.add_argument("--start", default=None, help="ISO8601 UTC (overrides --window)")
+    parser.add_argument("--end", default=None, help="ISO8601 UTC")
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument(
+        "--max-ref-ticks", type=int, default=1000,
+        help="reference 경로로 계산할 tick 수 (균등 추출)",
+    )
+    parser.add_argument("--rtol", type=float, default=1e-6, help="[2] 저장값 비교 상대 허용오차")
+    args = parser.parse_args()
+
+    s = load_settings()
+    symbol = args.symbol or s.SYMBOL
+    end = _parse_dt(args.end) if args.end else datetime.now(timezone.utc)
+    start = _parse_dt(args.start) if args.start else end - timedelta(seconds=args.window)
+    engine = get_engine(s, "feature_parity_check", pool_size=2, statement_timeout_ms=0)
+
+    print("=" * 60)
+    print("Feature Parity Check (offline builder)")
+    print(f"  symbol={symbol}  window={start.isoformat()} ~ {end.isoformat()}")
+    print("=" * 60)
+
+    t_ns = decision_ticks(start, end, s.DECISION_INTERVAL_SEC)
+    inp = load_inputs(engine, s, symbol, start, end)
+    t0 = time.monotonic()
+    built = build_features(inp, t_ns, symbol, s)
+    elapsed = time.monotonic() - t0
+    rate = len(inp.market) / elapsed * 60 if elapsed > 0 else float("inf")
+    print(f"  ticks={len(built)}  market rows={len(inp.market)}  mark={len(inp.mark)}  "
+          f"metrics={len(inp.metrics)}  liq buckets={len(inp.liq)}")
+    print(f"  build {elapsed:.3f}s  ({rate:,.0f} market rows/min)")
+    if built.empty:
+        print("❌ No decision ticks in window")
+        return 1
+
+    # ── 1) vectorized vs reference
+    print("\n[1] vectorized vs reference (live code path)")
+    n_pick = min(len(built), args.max_ref_ticks)
+    pick = np.unique(np.linspace(0, len(built) - 1, n_pick).astype(int))
+    t_ref = time.monotonic()
+    with warnings.catch_warnings():
+        # np.std(ddof=1) on 1 sample (live와 동일하게 NaN)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        ref = pd.DataFrame([
+            reference_row(inp.market, built["ts"].iloc[i], float(built["k_vol_eff"].iloc[i]), s)
+            for i in pick
+        ])
+    t_ref = time.monotonic() - t_ref
+    vec = built.iloc[pick].reset_index(drop=True)
+    ref_ok = True
+    for col in _REF_COLUMNS:
+        m = _col_match(vec[col], ref[col], rtol=1e-9, atol=1e-12)
+        if not m.all():
+            ref_ok = False
+            i = int(np.argmin(m))
+            print(f"  ❌ {col:<24} {int((~m).sum())}/{len(m)} mismatch  "
+                  f"first @ {vec['ts'].iloc[i]}: vec={vec[col].iloc[i]!r} ref={ref[col].iloc[i]!r}")
+    if ref_ok:
+        speedup = (t_ref / len(pick)) / (elapsed / len(built)) if elapsed > 0 else float("inf")
+        print(f"  ✅ {len(pick)} ticks × {len(_REF_COLUMNS)} columns identical "
+              f"(per-tick speedup x{speedup:,.0f})")
+
+    # ── 2) vectorized vs stored feature_snapshots
+    print("\n[2] vectorized vs stored feature_snapshots")
+    stored = read_range(
+        engine, "feature_snapshots", start, end, symbol=symbol, columns=_FEATURE_COLUMNS
+    )
+    if stored.empty:
+        print("  (no feature_snapshots in window)")
+    else:
+        both = built.merge(stored, on="ts", suffixes=("", "_stored"))
+        print(f"  stored={len(stored)}  matched ticks={len(both)}")
+        for col in _FEATURE_COLUMNS:
+            if col in ("ts", "symbol") or f"{col}_stored" not in both:
+                continue
+            m = _col_match(both[col], both[f"{col}_stored"], rtol=args.rtol, atol=1e-12)
+            hit = m.mean() if len(m) else float("nan")
+            flag = "✅" if hit >= 0.99 else "⚠️ "
+            print(f"  {flag} {col:<22} {hit:7.2%}")
+
+    print("\n" + "=" * 60)
+    print(f"RESULT: {'PASS' if ref_ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if ref_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+latency_report.py — signal → order hop별 지연 리포트 (latency_traces)
+
+hop 값은 prediction t0 이후 ms (app.tracing). 연속된 두 hop의 차이를 stage 지연으로 보고
+p50/p90/p99/max와 DECISION_INTERVAL_SEC 예산 대비 p50 비중을 출력한다.
+  t0→pred_start       : predictor 스케줄링 지연 (tick 경계 → 실행 시작)
+  order_sent→order_acked : rate limiter 대기 + HTTP 왕복 + retry
+intrabar TP/SL exit trace(":touch")는 touch 시각이 기준이라 따로 집계.
+
+사용법:
+  poetry run python -m app.diagnostics.latency_report
+  poetry run python -m app.diagnostics.latency_report --window 86400
+  poetry run python -m app.diagnostics.latency_report --start 2026-02-22T00:00:00Z --end 2026-02-23T00:00:00Z
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import text
+
+from app.config import load_settings
+from app.db.session import get_engine
+from app.features.export_dataset import _parse_dt
+from app.tracing import HOPS
+
+_SEP = "=" * 72
+
+_FETCH_TRACES = text("""
+SELECT trace_id, hops
+FROM latency_traces
+WHERE symbol = :sym AND ts >= :start AND ts < :end
+ORDER BY ts
+""")
+
+
+def stage_samples(traces: list[dict]) -> tuple[dict[str, list[float]], dict[str, list[float]]]:
+    """traces의 hops → (stage별 ms 샘플, end-to-end 샘플).
+
+    stage는 HOPS 순서상 연속으로 존재하는 hop 쌍. 빠진 hop은 건너뛴다
+    (예: shadow 모드는 order_sent/order_acked 없이 shadow_picked→attempt_written).
+    """
+    stages: dict[str, list[float]] = defaultdict(list)
+    e2e: dict[str, list[float]] = defaultdict(list)
+    for hops in traces:
+        prev = "t0"
+        prev_ms = 0.0
+        for hop in HOPS:
+            ms = hops.get(hop)
+            if ms is None:
+                continue
+            stages[f"{prev}→{hop}"].append(float(ms) - prev_ms)
+            prev, prev_ms = hop, float(ms)
+        if "attempt_written" in hops:
+            e2e["t0→attempt_written"].append(float(hops["attempt_written"]))
+        if "paper_written" in hops:
+            e2e["t0→paper_written"].append(float(hops["paper_written"]))
+    return stages, e2e
+
+
+def _print_table(title: str, samples: dict[str, list[float]], budget_ms: float) -> None:
+    print(f"[{title}]")
+    print(f"  {'stage':<34}{'n':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'p50/budget':>12}")
+    order = {a: i for i, a in enumerate(("t0",) + HOPS)}
+    for name in sorted(samples, key=lambda k: (order.get(k.split("→")[1], 99), order.get(k.split("→")[0], 99))):
+        v = np.asarray(samples[name])
+        p50, p90, p99 = np.percentile(v, [50, 90, 99])
+        print(
+            f"  {name:<34}{len(v):>6}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}{v.max():>9.1f}"
+            f"{p50 / budget_ms:>11.1%}"
+        )
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Signal → order latency report")
+    parser.add_argument("--window", type=int, default=3600, help="seconds back from now")
+    parser.add_argument("--start", default=None, help="ISO8601 UTC (overrides --window)")
+    parser.add_argument("--end", default=None, help="ISO8601 UTC")
+    args = parser.parse_args()
+
+    s = load_settings()
+    end = _parse_dt(args.end) if args.end else datetime.now(timezone.utc)
+    start = _parse_dt(args.start) if args.start else end - timedelta(seconds=args.window)
+    budget_ms = s.DECISION_INTERVAL_SEC * 1000.0
+    engine = get_engine(s, "latency_report", pool_size=2)
+
+    print(_SEP)
+    print("Signal → Order Latency Report (ms)")
+    print(f"  symbol={s.SYMBOL}  window={start.isoformat()} ~ {end.isoformat()}")
+    print(f"  budget=DECISION_INTERVAL_SEC {s.DECISION_INTERVAL_SEC}s")
+    print(_SEP)
+
+    with engine.connect() as conn:
+        rows = conn.execute(_FETCH_TRACES, {"sym": s.SYMBOL, "start": start, "end": end}).fetchall()
+    if not rows:
+        print("❌ No latency_traces in window (TRACE_ENABLED=true 로 bot 실행 필요)")
+        return 1
+
+    tick = [r.hops for r in rows if ":touch" not in r.trace_id]
+    touch = [r.hops for r in rows if ":touch" in r.trace_id]
+    with_order = sum(1 for h in tick + touch if "attempt_written" in h)
+    print(f"  traces={len(rows)}  tick={len(tick)}  touch={len(touch)}  with_attempt={with_order}")
+    print()
+
+    for title, traces in (("decision tick", tick), ("intrabar touch exit", touch)):
+        if not traces:
+            continue
+        stages, e2e = stage_samples(traces)
+        _print_table(f"{title} — stages", stages, budget_ms)
+        if e2e:
+            _print_table(f"{title} — end-to-end", e2e, budget_ms)
+
+    stages, _ = stage_samples(tick)
+    if stages:
+        worst = max(stages, key=lambda k: np.percentile(stages[k], 50))
+        print(f"  slowest stage (p50): {worst}  {np.percentile(stages[worst], 50):.1f}ms")
+    print(_SEP)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 """
-prune_altdata.py — Alt Data / Feature Snapshots retention 정리
+prune_altdata.py — Alt Data / Feature Snapshots / 고빈도 테이블 retention 정리
+
+partitioned 테이블(app.db.partitions)은 오래된 partition을 DETACH + DROP,
+나머지 heap 테이블은 DELETE 한 번 (count(*)는 --dry-run에서만).
 
 사용법:
   poetry run python -m app.diagnostics.prune_altdata
@@ -12,9 +15,11 @@ from __future__ import annotations
 import argparse
 import sys
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 from app.config import load_settings
+from app.db.partitions import drop_old_partitions, is_partitioned, table_exists
+from app.db.session import get_engine
 
 # 기본 retention: 7일
 _DEFAULT_DAYS = 7
@@ -22,11 +27,20 @@ _DEFAULT_DAYS = 7
 # 대상 테이블 + 타임스탬프 컬럼
 _PRUNE_TARGETS = [
     ("binance_mark_price_1s", "ts"),   # 가장 큰 테이블 (1s cadence)
+    ("binance_mark_universe_1s", "ts"),  # 1s cadence, 전 심볼 배열 1행
     ("binance_force_orders", "ts"),    # 이벤트 기반
+    ("binance_liq_1s", "ts"),          # 청산 초 bucket rollup
     ("binance_futures_metrics", "ts"), # 60s cadence, 상대적으로 작음
     ("feature_snapshots", "ts"),       # 5s cadence
 ]
 
+# partitioned 상태일 때만 정리 (heap이면 행 DELETE 하지 않음 — 학습/리포트 원천 데이터)
+_PARTITION_ONLY_TARGETS = [
+    ("market_1s", "ts"),
+    ("barrier_state", "ts"),
+    ("paper_decisions", "ts"),
+]
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Alt Data retention 정리")
@@ -35,7 +49,7 @@ def main() -> int:
     args = parser.parse_args()
 
     s = load_settings()
-    engine = create_engine(s.DB_URL)
+    engine = get_engine(s, "prune_altdata", pool_size=2, statement_timeout_ms=0)
 
     sep = "=" * 60
     print(sep)
@@ -43,33 +57,30 @@ def main() -> int:
     print(sep)
 
     total_deleted = 0
-    with engine.begin() as conn:
-        for table, ts_col in _PRUNE_TARGETS:
-            # 삭제 대상 행 수 확인
-            cnt_row = conn.execute(
-                text(f"""
-                    SELECT count(*) AS cnt
-                    FROM {table}
-                    WHERE {ts_col} < now() AT TIME ZONE 'UTC' - interval '{args.days} days'
-                """)
-            ).fetchone()
-            cnt = cnt_row.cnt if cnt_row else 0
-            print(f"  [{table}] 삭제 대상: {cnt}행 (older than {args.days}d)")
-
-            if cnt == 0:
-                continue
-
+    for table, ts_col in _PRUNE_TARGETS + _PARTITION_ONLY_TARGETS:
+        # partitioned 테이블: 범위 전체가 retention 밖인 partition을 DETACH + DROP (행 scan 없음)
+        with engine.connect() as conn:
+            partitioned = table_exists(conn, table) and is_partitioned(conn, table)
+        if partitioned:
+            names = drop_old_partitions(engine, table, args.days, s.DB_PARTITION_INTERVAL, args.dry_run)
+            verb = "DROP 대상" if args.dry_run else "DROP 완료"
+            print(f"  [{table}] partition {verb}: {len(names)}개 {', '.join(names)}")
+            continue
+        if (table, ts_col) in _PARTITION_ONLY_TARGETS:
+            print(f"  [{table}] heap 테이블 — skip (partitioned일 때만 정리)")
+            continue
+
+        cond = f"{ts_col} < now() AT TIME ZONE 'UTC' - interval '{args.days} days'"
+        with engine.begin() as conn:
             if args.dry_run:
+                # 삭제 대상 행 수 확인 (dry-run에서만 count)
+                cnt = conn.execute(text(f"SELECT count(*) FROM {table} WHERE {cond}")).scalar() or 0
+                print(f"  [{table}] 삭제 대상: {cnt}행 (older than {args.days}d)")
                 print(f"    dry-run: SKIP (실제 삭제 안 함)")
-            else:
-                conn.execute(
-                    text(f"""
-                        DELETE FROM {table}
-                        WHERE {ts_col} < now() AT TIME ZONE 'UTC' - interval '{args.days} days'
-                    """)
-                )
-                print(f"    → {cnt}행 삭제 완료")
-                total_deleted += cnt
+                continue
+            cnt = conn.execute(text(f"DELETE FROM {table} WHERE {cond}")).rowcount
+        print(f"  [{table}] {cnt}행 삭제 완료 (older than {args.days}d)")
+        total_deleted += cnt
 
     print(sep)
     if args.dry_run:
@@ -11,9 +11,10 @@ import argparse
 import sys
 from datetime import datetime, timezone
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 from app.config import load_settings
+from app.db.session import get_engine
 
 # ────────────────────────────────────────────────────────────────
 # 유틸리티
@@ -232,10 +233,15 @@ def check_evaluation_results(conn, sym: str, window_sec: int, h_sec: int) -> tup
         return True, "\n".join(lines)  # optional — OVERALL에 영향 없음
 
 
-def check_paper_decisions(conn, sym: str, window_sec: int, interval_sec: int) -> tuple[bool, str]:
-    lines = ["[paper_decisions]"]
+def check_paper_decisions(
+    conn, sym: str, window_sec: int, interval_sec: int, book: str,
+) -> tuple[bool, str]:
+    lines = [f"[paper_decisions book={book}]"]
 
-    rows, err = _safe_query(conn, "SELECT max(ts) as max_ts FROM paper_decisions WHERE symbol=:sym", {"sym": sym})
+    rows, err = _safe_query(
+        conn, "SELECT max(ts) as max_ts FROM paper_decisions WHERE symbol=:sym AND book_id=:book",
+        {"sym": sym, "book": book},
+    )
     if err or rows is None:
         lines.append(f"  SKIP: {err}")
         return False, "\n".join(lines)
@@ -247,8 +253,8 @@ def check_paper_decisions(conn, sym: str, window_sec: int, interval_sec: int) ->
 
     rows2, err2 = _safe_query(conn, """
         SELECT count(*) as cnt FROM paper_decisions
-        WHERE symbol=:sym AND ts >= now() AT TIME ZONE 'UTC' - interval '{w} seconds'
-    """.replace("{w}", str(window_sec)), {"sym": sym})
+        WHERE symbol=:sym AND book_id=:book AND ts >= now() AT TIME ZONE 'UTC' - interval '{w} seconds'
+    """.replace("{w}", str(window_sec)), {"sym": sym, "book": book})
     count = rows2[0][0] if (rows2 and not err2) else 0
     expected = window_sec // interval_sec if interval_sec > 0 else 0
     fill = count / expected if expected > 0 else 0
@@ -257,8 +263,8 @@ def check_paper_decisions(conn, sym: str, window_sec: int, interval_sec: int) ->
 
     rows3, _ = _safe_query(conn, """
         SELECT ts, pos_status, action, reason, equity_est, drawdown_pct, policy_profile
-        FROM paper_decisions WHERE symbol=:sym ORDER BY ts DESC LIMIT 3
-    """, {"sym": sym})
+        FROM paper_decisions WHERE symbol=:sym AND book_id=:book ORDER BY ts DESC LIMIT 3
+    """, {"sym": sym, "book": book})
     if rows3:
         lines.append("  last 3 rows:")
         for r in rows3:
@@ -269,13 +275,13 @@ def check_paper_decisions(conn, sym: str, window_sec: int, interval_sec: int) ->
     return ok, "\n".join(lines)
 
 
-def check_paper_trades(conn, sym: str, window_sec: int) -> str:
-    lines = ["[paper_trades]"]
+def check_paper_trades(conn, sym: str, window_sec: int, book: str) -> str:
+    lines = [f"[paper_trades book={book}]"]
 
     rows, err = _safe_query(conn, """
         SELECT count(*) as cnt FROM paper_trades
-        WHERE symbol=:sym AND t >= now() AT TIME ZONE 'UTC' - interval '86400 seconds'
-    """, {"sym": sym})
+        WHERE symbol=:sym AND book_id=:book AND t >= now() AT TIME ZONE 'UTC' - interval '86400 seconds'
+    """, {"sym": sym, "book": book})
     if err or rows is None:
         lines.append(f"  SKIP: {err}")
         return "\n".join(lines)
@@ -285,8 +291,8 @@ def check_paper_trades(conn, sym: str, window_sec: int) -> str:
 
     rows3, _ = _safe_query(conn, """
         SELECT t, action, reason, price, qty, fee_krw, pnl_krw
-        FROM paper_trades WHERE symbol=:sym ORDER BY t DESC LIMIT 3
-    """, {"sym": sym})
+        FROM paper_trades WHERE symbol=:sym AND book_id=:book ORDER BY t DESC LIMIT 3
+    """, {"sym": sym, "book": book})
     if rows3:
         lines.append("  last 3 rows:")
         for r in rows3:
@@ -322,8 +328,9 @@ def main() -> int:
     sym = s.SYMBOL
     interval_sec = s.DECISION_INTERVAL_SEC
     h_sec = s.H_SEC
+    book = s.PAPER_PRIMARY_BOOK
 
-    engine = create_engine(s.DB_URL)
+    engine = get_engine(s, "realtime_check", pool_size=2)
 
     now = _now()
     sep = "=" * 60
@@ -357,12 +364,12 @@ def main() -> int:
         print(out)
         print()
 
-        ok, out = check_paper_decisions(conn, sym, window_sec, interval_sec)
+        ok, out = check_paper_decisions(conn, sym, window_sec, interval_sec, book)
         results["paper_decisions"] = ok
         print(out)
         print()
 
-        out = check_paper_trades(conn, sym, window_sec)
+        out = check_paper_trades(conn, sym, window_sec, book)
         print(out)
         print()
 
@@ -56,7 +56,7 @@ def main() -> int:
     print(f"  E2E_TEST_ORDER_KRW={s.UPBIT_E2E_TEST_ORDER_KRW}")
     print(_SEP)
 
-    engine = get_engine(s)
+    engine = get_engine(s, "e2e_test", pool_size=2)
     client = UpbitRestClient(
         access_key=s.UPBIT_ACCESS_KEY,
         secret_key=s.UPBIT_SECRET_KEY,
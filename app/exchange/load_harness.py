@@ -0,0 +1,276 @@
+"""Exchange-layer 부하/지연 harness — ShadowExecutionRunner를 로컬 REST mock에 대고 고속 구동.
+
+- 합성 paper trade(ENTER/EXIT 교대)를 --rate 속도로 PaperTradeFeed에 흘려 실제 run() 루프를 구동
+- DB 대신 in-memory attempt store (ShadowExecutionRunner의 DB hook override) — Postgres 불필요
+- --dup-rate: 이미 처리한 trade를 재전달 (재시작 후 cursor 재처리 상황) → idempotency 검증
+- mock 주입: --latency-ms/--jitter-ms/--error-rate/--storm-rate(429)/--rate-order
+
+리포트: throughput, signal→attempt 지연 p50/p99, HTTP 지연, status 분포, retry/429/rate-limit 횟수,
+idempotency 위반 (같은 identifier 재전송 또는 final status 덮어쓰기) — 위반 있으면 exit 1.
+
+사용법:
+  poetry run python -m app.exchange.load_harness --trades 200 --rate 50
+  poetry run python -m app.exchange.load_harness --trades 100 --rate 100 \\
+    --storm-rate 0.2 --error-rate 0.05
+  poetry run python -m app.exchange.load_harness --mode live --trades 50 --fill-delay-sec 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.config import Settings, load_settings
+from app.exchange.rest_mock import UpbitRestMock
+from app.exchange.runner import _FINAL_STATUSES, ShadowExecutionRunner
+from app.trading.notify import PaperTradeFeed
+
+_SEP = "=" * 60
+
+
+class _HarnessShadowRunner(ShadowExecutionRunner):
+    """ShadowExecutionRunner with its DB hooks backed by in-memory dicts."""
+
+    def __init__(self, settings: Settings, feed: PaperTradeFeed) -> None:
+        super().__init__(settings, engine=None, trade_feed=feed)
+        self.pending: list[SimpleNamespace] = []
+        self.enqueued_at: dict[int, float] = {}
+        self.attempt_at: dict[int, float] = {}
+        self.attempts: dict[tuple[str, str], dict] = {}
+        self.snapshots = 0
+        self.violations: list[str] = []
+        self.handled = 0
+
+    def enqueue(self, trade: dict) -> None:
+        self.enqueued_at.setdefault(trade["id"], time.monotonic())
+        self.pending.append(SimpleNamespace(id=trade["id"], _mapping=trade))
+
+    # ── DB hook overrides ───────────────────────────────────────
+
+    def _init_cursor(self) -> None:
+        self._last_seen_id = 0
+
+    def _fetch_new_trades(self) -> list:
+        rows, self.pending = self.pending, []
+        return rows
+
+    def _has_final_status(self, identifier: str, mode: str) -> bool:
+        row = self.attempts.get((identifier, mode))
+        return row is not None and row["status"] in _FINAL_STATUSES
+
+    def _get_next_retry_count(self, paper_trade_id: int, action: str) -> int:
+        row = self.attempts.get((f"paper-{paper_trade_id}-{action}", self._determine_mode()))
+        return (row["retry_count"] or 0) + 1 if row else 0
+
+    def _market_lag_sec(self) -> float | None:
+        return 0.0
+
+    def _insert_attempt(self, row: dict) -> int | None:
+        key = (row["identifier"], row["mode"])
+        prev = self.attempts.get(key)
+        if prev is not None and prev["status"] in _FINAL_STATUSES:
+            self.violations.append(
+                f"final status overwritten: {key} {prev['status']}→{row['status']}"
+            )
+        row = {**row, "id": prev["id"] if prev else len(self.attempts) + 1}
+        self.attempts[key] = row
+        self.attempt_at.setdefault(row["paper_trade_id"], time.monotonic())
+        return row["id"]
+
+    def _insert_snapshot(self, row: dict) -> None:
+        self.snapshots += 1
+
+    def _finalize_attempt(self, attempt_id: int, final_state: str, **fields) -> None:
+        for row in self.attempts.values():
+            if row["id"] == attempt_id:
+                row.update(final_state=final_state, **fields)
+                return
+
+    async def _handle_trade(self, trade: dict) -> None:
+        await super()._handle_trade(trade)
+        self.handled += 1
+
+
+def _pct(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def _harness_settings(base: Settings, args: argparse.Namespace, base_url: str) -> Settings:
+    update = {
+        "UPBIT_API_BASE": base_url,
+        "UPBIT_ACCESS_KEY": "harness-access-key",
+        "UPBIT_SECRET_KEY": "harness-secret-key-0123456789abcdef",
+        "UPBIT_REST_MAX_RETRY": args.max_retry,
+        "UPBIT_REST_TIMEOUT_SEC": args.timeout_sec,
+        "UPBIT_RATE_ORDER_PER_SEC": args.client_rate_order,
+        "UPBIT_RATE_DEFAULT_PER_SEC": args.client_rate_default,
+        "UPBIT_RATE_MAX_WAIT_SEC": args.max_wait_sec,
+        "UPBIT_TEST_ON_PAPER_TRADES": True,
+        "UPBIT_ORDER_TEST_ENABLED": True,
+        "DECISION_INTERVAL_SEC": 1,
+    }
+    if args.mode == "live":
+        update.update(
+            LIVE_TRADING_ENABLED=True,
+            UPBIT_TRADE_MODE="live",
+            LIVE_GUARD_PHRASE="I_CONFIRM_LIVE_TRADING",
+            PAPER_POLICY_PROFILE="strict",
+            LIVE_ORDER_POLL_INTERVAL_SEC=0,
+            LIVE_ORDER_MAX_POLLS=args.max_polls,
+        )
+    else:
+        update.update(
+            LIVE_TRADING_ENABLED=False,
+            UPBIT_TRADE_MODE="test",
+            PAPER_POLICY_PROFILE=base.UPBIT_TEST_REQUIRE_PAPER_PROFILE,
+        )
+    return base.model_copy(update=update)
+
+
+async def _drive(
+    runner: _HarnessShadowRunner, feed: PaperTradeFeed, args: argparse.Namespace,
+) -> tuple[int, float]:
+    rng = random.Random(args.seed)
+    task = asyncio.create_task(runner.run())
+    await asyncio.sleep(0.05)
+
+    t0 = time.monotonic()
+    sent = 0
+    dups = 0
+    interval = 1.0 / args.rate if args.rate > 0 else 0.0
+    for i in range(args.trades):
+        trade_id = i + 1
+        action = "ENTER_LONG" if i % 2 == 0 else "EXIT_LONG"
+        trade = {"id": trade_id, "action": action, "reason": "HARNESS", "price": 100_000_000.0,
+                 "qty": 0.0001, "fee_krw": 5.0, "t": None, "cash_after": 0.0}
+        runner.enqueue(trade)
+        sent += 1
+        if i > 0 and rng.random() < args.dup_rate:
+            j = rng.randrange(1, trade_id)
+            action = "ENTER_LONG" if (j - 1) % 2 == 0 else "EXIT_LONG"
+            runner.enqueue({**trade, "id": j, "action": action})
+            dups += 1
+        feed.publish()
+        if interval:
+            await asyncio.sleep(interval)
+
+    deadline = time.monotonic() + args.drain_sec
+    while runner.handled < sent + dups and time.monotonic() < deadline:
+        await asyncio.sleep(0.02)
+    elapsed = time.monotonic() - t0
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await runner.client.aclose()
+    return dups, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ShadowExecutionRunner load/latency harness")
+    parser.add_argument("--mode", choices=["test", "live"], default="test")
+    parser.add_argument("--trades", type=int, default=200)
+    parser.add_argument(
+        "--rate", type=float, default=50.0, help="paper trades per second (0=burst)"
+    )
+    parser.add_argument(
+        "--dup-rate", type=float, default=0.05, help="fraction of re-delivered trades"
+    )
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--storm-rate", type=float, default=0.0)
+    parser.add_argument("--rate-default", type=int, default=30, help="mock server limit (req/s)")
+    parser.add_argument("--rate-order", type=int, default=8, help="mock server limit (req/s)")
+    parser.add_argument("--client-rate-default", type=int, default=30)
+    parser.add_argument("--client-rate-order", type=int, default=8)
+    parser.add_argument("--max-wait-sec", type=float, default=5.0)
+    parser.add_argument("--max-retry", type=int, default=3)
+    parser.add_argument("--timeout-sec", type=float, default=5.0)
+    parser.add_argument("--fill-delay-sec", type=float, default=0.0)
+    parser.add_argument("--max-polls", type=int, default=50)
+    parser.add_argument("--drain-sec", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    base = load_settings()
+    mock = UpbitRestMock(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, storm_rate=args.storm_rate,
+        rate_default=args.rate_default, rate_order=args.rate_order,
+        fill_delay_sec=args.fill_delay_sec, seed=args.seed,
+    )
+    mock.start()
+    s = _harness_settings(base, args, mock.url)
+    mock.secret_key = s.UPBIT_SECRET_KEY
+
+    feed = PaperTradeFeed()
+    runner = _HarnessShadowRunner(s, feed)
+
+    print(_SEP)
+    print(f"Exchange load harness  mode={args.mode}  trades={args.trades}  rate={args.rate}/s")
+    print(f"  mock={mock.url}  latency={args.latency_ms}±{args.jitter_ms}ms  "
+          f"5xx={args.error_rate:.0%}  429 storm={args.storm_rate:.0%}  "
+          f"server limits default={args.rate_default}/s order={args.rate_order}/s")
+    print(_SEP)
+
+    try:
+        dups, elapsed = asyncio.run(_drive(runner, feed, args))
+    finally:
+        mock.stop()
+
+    lat = [
+        (runner.attempt_at[tid] - runner.enqueued_at[tid]) * 1000
+        for tid in runner.attempt_at if tid in runner.enqueued_at
+    ]
+    http_lat = [
+        r["latency_ms"] for r in runner.attempts.values() if r.get("latency_ms") is not None
+    ]
+    statuses = Counter(r["status"] for r in runner.attempts.values())
+    finals = Counter(r.get("final_state") for r in runner.attempts.values() if r.get("final_state"))
+    dup_ids = mock.duplicate_identifiers()
+    violations = runner.violations + [
+        f"server accepted identifier twice: {k} x{n}" for k, n in dup_ids.items()
+    ]
+
+    throughput = runner.handled / elapsed if elapsed > 0 else 0
+    print(f"  handled={runner.handled} (trades={args.trades} + re-delivered={dups})  "
+          f"elapsed={elapsed:.2f}s  throughput={throughput:.1f} trades/s")
+    print(f"  signal→attempt ms: p50={_pct(lat, 50):.1f}  p99={_pct(lat, 99):.1f}  "
+          f"max={max(lat, default=0):.1f}")
+    print(f"  http latency ms   : p50={_pct(http_lat, 50):.1f}  p99={_pct(http_lat, 99):.1f}")
+    print(f"  attempt status    : {dict(statuses)}"
+          + (f"  final_state: {dict(finals)}" if finals else ""))
+    print(f"  client            : {dict(runner.client.call_stats)}")
+    if runner.client.limiter is not None:
+        print(f"  limiter           : {runner.client.limiter.summary()}")
+    n_requests = sum(v for k, v in mock.stats.items() if " /v1/" in k)
+    print(f"  mock              : requests={n_requests}  "
+          f"429={mock.stats['429']}  5xx={mock.stats['5xx']}  401={mock.stats['401']}")
+    print(_SEP)
+    if violations:
+        print(f"❌ idempotency violations: {len(violations)}")
+        for v in violations[:10]:
+            print(f"   {v}")
+    else:
+        print("✅ idempotency violations: 0")
+    incomplete = args.trades - len(runner.attempt_at)
+    if incomplete > 0:
+        print(f"⚠️  {incomplete} trades without an attempt row (drain timeout?)")
+    print(f"RESULT: {'FAIL' if violations else 'PASS'}")
+    print(_SEP)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,7 +35,7 @@ def main(window_sec: int = 600) -> int:
     print(f"paper_test_smoke: window={window_sec}s  symbol={s.SYMBOL}")
     print(_SEP)
 
-    engine = get_engine(s)
+    engine = get_engine(s, "paper_test_smoke", pool_size=2)
 
     # ── 1) paper_trades count in window ────────────────────────────────────
     with engine.connect() as conn:
@@ -43,12 +43,14 @@ def main(window_sec: int = 600) -> int:
             text("""
                 SELECT count(*) FROM paper_trades
                 WHERE symbol = :sym
+                  AND book_id = :book
                   AND t >= now() - (:win || ' seconds')::interval
             """),
-            {"sym": s.SYMBOL, "win": str(window_sec)},
+            {"sym": s.SYMBOL, "book": s.PAPER_PRIMARY_BOOK, "win": str(window_sec)},
         ).scalar() or 0
 
-    print(f"[1] paper_trades (last {window_sec}s): {paper_cnt}")
+    # ShadowExecutionRunner는 primary book의 trade만 주문 → 다른 book은 비교 대상 아님
+    print(f"[1] paper_trades book={s.PAPER_PRIMARY_BOOK} (last {window_sec}s): {paper_cnt}")
 
     # ── 2) upbit_order_attempts test_ok count in window ────────────────────
     with engine.connect() as conn:
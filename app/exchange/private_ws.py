@@ -0,0 +1,267 @@
+"""Upbit private WebSocket (myOrder / myAsset) client.
+
+주문 체결·잔고 변화를 push로 받아 DB에 반영:
+  - myOrder → upbit_order_snapshots (+ done/cancel이면 upbit_order_attempts를 uuid로 확정하고
+    OrderEventHub로 최종 상태 통지 — 기다리는 runner가 없어도 (늦은 push / 재시작 후) attempt가 확정됨)
+  - myAsset → live_positions (변경된 통화만 오므로 기존 값과 병합)
+
+ShadowExecutionRunner는 live 주문 후 push된 최종 상태를 기다리고, 못 받으면 REST polling으로
+fallback. UpbitAccountRunner는 연결 중이면 UPBIT_ACCOUNT_RECONCILE_SEC 주기로만 REST 재조정.
+
+engine=None이면 DB 기록 없이 hub/잔고 상태만 갱신 (private_ws_mock --check 오프라인 점검용).
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import random
+import time
+import uuid as uuid_mod
+from datetime import datetime, timezone
+from typing import Any
+
+import websockets
+from sqlalchemy.engine import Engine
+
+from app.config import Settings
+from app.db.writer import (
+    finalize_upbit_order_attempt_by_uuid,
+    insert_upbit_order_snapshot,
+    update_live_position_balances,
+)
+from app.exchange.upbit_auth import make_auth_header
+
+log = logging.getLogger(__name__)
+
+_FINAL_ORDER_STATES = ("done", "cancel")
+
+# websockets 12 (legacy connect) → extra_headers, 14+ → additional_headers
+_HEADERS_KW = (
+    "additional_headers"
+    if "additional_headers" in inspect.signature(websockets.connect).parameters
+    else "extra_headers"
+)
+
+
+def _safe_float(v: Any) -> float | None:
+    try:
+        return float(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _ms_to_dt(ms: Any) -> datetime:
+    if ms:
+        return datetime.fromtimestamp(int(ms) / 1000.0, tz=timezone.utc)
+    return datetime.now(timezone.utc)
+
+
+def order_snapshot_row(msg: dict) -> dict:
+    """myOrder 이벤트 → upbit_order_snapshots 행 (REST get_order 폴링과 같은 컬럼)."""
+    return {
+        "ts": _ms_to_dt(msg.get("timestamp")),
+        "symbol": msg.get("code"),
+        "uuid": msg.get("uuid"),
+        "state": msg.get("state"),
+        "side": (msg.get("ask_bid") or "").lower() or None,
+        "ord_type": msg.get("order_type"),
+        "price": _safe_float(msg.get("price")),
+        "volume": _safe_float(msg.get("volume")),
+        "remaining_volume": _safe_float(msg.get("remaining_volume")),
+        "executed_volume": _safe_float(msg.get("executed_volume")),
+        "paid_fee": _safe_float(msg.get("paid_fee")),
+        "avg_price": _safe_float(msg.get("avg_price")),
+        "raw_json": msg,
+    }
+
+
+class OrderEventHub:
+    """uuid별 최종(done/cancel) 주문 이벤트 전달.
+
+    시장가 주문은 create_order 응답보다 push가 먼저 올 수 있으므로 최종 이벤트를 ttl 동안 보관,
+    늦게 wait_final()을 호출해도 바로 반환한다.
+    """
+
+    def __init__(self, ttl_sec: float = 600.0) -> None:
+        self.ttl_sec = ttl_sec
+        self._final: dict[str, tuple[float, dict]] = {}
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+
+    def publish(self, row: dict) -> None:
+        uuid = row.get("uuid")
+        if not uuid or row.get("state") not in _FINAL_ORDER_STATES:
+            return
+        now = time.monotonic()
+        self._final[uuid] = (now, row)
+        for fut in self._waiters.pop(uuid, []):
+            if not fut.done():
+                fut.set_result(row)
+        # expire old entries
+        for k in [k for k, (t, _) in self._final.items() if now - t > self.ttl_sec]:
+            del self._final[k]
+
+    async def wait_final(self, uuid: str, timeout: float) -> dict | None:
+        hit = self._final.get(uuid)
+        if hit is not None:
+            return hit[1]
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(uuid, []).append(fut)
+        try:
+            return await asyncio.wait_for(fut, timeout=timeout)
+        except TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(uuid)
+            if waiters and fut in waiters:
+                waiters.remove(fut)
+                if not waiters:
+                    del self._waiters[uuid]
+
+
+class UpbitPrivateWsClient:
+    """myOrder/myAsset 구독 + 자동 재연결 (UpbitWsClient와 같은 backoff 규칙)."""
+
+    def __init__(self, settings: Settings, engine: Engine | None, url: str | None = None) -> None:
+        self.settings = settings
+        self.engine = engine
+        self.url = url or settings.UPBIT_PRIVATE_WS_URL
+        self.hub = OrderEventHub()
+        self.connected: bool = False
+        self.order_event_count = 0
+        self.asset_event_count = 0
+        self._reconnect_count = 0
+        self._last_recv_ts: float = 0.0
+        self._ws: Any = None
+        self._stop = False
+        coin = settings.SYMBOL.split("-")[1] if "-" in settings.SYMBOL else "BTC"
+        self._coin = coin
+        # currency → balance (myAsset은 변경분만 전달하므로 마지막 값 유지)
+        self.balances: dict[str, float] = {}
+
+    # ── public ────────────────────────────────────────────────
+
+    async def run(self) -> None:
+        attempt = 0
+        while not self._stop:
+            try:
+                await self._connect_and_consume()
+                attempt = 0
+                if not self._stop:
+                    log.info("Private WS closed by server, reconnecting")
+                    self.connected = False
+                    await asyncio.sleep(self.settings.UPBIT_RECONNECT_MIN_SEC)
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                self._reconnect_count += 1
+                base = min(
+                    self.settings.UPBIT_RECONNECT_MAX_SEC,
+                    self.settings.UPBIT_RECONNECT_MIN_SEC * (2 ** attempt),
+                )
+                backoff = base * (0.5 + random.random() * 0.5)
+                log.warning(
+                    "Private WS disconnected (%s), reconnect #%d in %.1fs",
+                    exc, self._reconnect_count, backoff,
+                )
+                await asyncio.sleep(backoff)
+                attempt += 1
+            finally:
+                self.connected = False
+
+    async def stop(self) -> None:
+        self._stop = True
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def wait_order_final(self, uuid: str, timeout: float) -> dict | None:
+        return await self.hub.wait_final(uuid, timeout)
+
+    # ── internal ──────────────────────────────────────────────
+
+    async def _connect_and_consume(self) -> None:
+        s = self.settings
+        # JWT는 연결마다 새 nonce로 서명 (query 없음)
+        headers = make_auth_header(s.UPBIT_ACCESS_KEY, s.UPBIT_SECRET_KEY)
+        async with websockets.connect(
+            self.url,
+            ping_interval=s.UPBIT_PING_INTERVAL_SEC,
+            ping_timeout=10,
+            close_timeout=5,
+            **{_HEADERS_KW: headers},
+        ) as ws:
+            self._ws = ws
+            payload = [
+                {"ticket": str(uuid_mod.uuid4())},
+                {"type": "myOrder", "codes": [s.SYMBOL]},
+                {"type": "myAsset"},
+                {"format": "DEFAULT"},
+            ]
+            await ws.send(json.dumps(payload))
+            self.connected = True
+            self._last_recv_ts = time.time()
+            log.info("Private WS connected: %s (myOrder %s, myAsset)", self.url, s.SYMBOL)
+            try:
+                await self._reader(ws)
+            finally:
+                self._ws = None
+
+    async def _reader(self, ws: Any) -> None:
+        async for raw in ws:
+            self._last_recv_ts = time.time()
+            try:
+                msg = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+            except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+                log.warning("Private WS parse error, skipping message: %s", exc)
+                continue
+            if not isinstance(msg, dict):
+                continue
+            if "error" in msg:
+                log.warning("Private WS error frame: %s", msg["error"])
+                continue
+            try:
+                msg_type = msg.get("type")
+                if msg_type == "myOrder":
+                    await self._on_order(msg)
+                elif msg_type == "myAsset":
+                    await self._on_asset(msg)
+            except Exception as exc:
+                log.warning("Private WS handler error (%s): %s", msg.get("type"), exc)
+
+    async def _on_order(self, msg: dict) -> None:
+        row = order_snapshot_row(msg)
+        self.order_event_count += 1
+        if self.engine is not None:
+            snap = {k: v for k, v in row.items() if k != "avg_price"}
+            await asyncio.to_thread(insert_upbit_order_snapshot, self.engine, snap)
+            if row["uuid"] and row["state"] in _FINAL_ORDER_STATES:
+                await asyncio.to_thread(
+                    finalize_upbit_order_attempt_by_uuid, self.engine, row["uuid"], row["state"],
+                    executed_volume=row["executed_volume"],
+                    paid_fee=row["paid_fee"],
+                    avg_price=row["avg_price"] or row["price"],
+                )
+        log.info("Private WS myOrder uuid=%s state=%s executed=%s",
+                 row["uuid"], row["state"], row["executed_volume"])
+        self.hub.publish(row)
+
+    async def _on_asset(self, msg: dict) -> None:
+        self.asset_event_count += 1
+        for a in msg.get("assets") or []:
+            cur = a.get("currency")
+            bal = _safe_float(a.get("balance"))
+            if cur and bal is not None:
+                self.balances[cur] = bal
+        krw = self.balances.get("KRW")
+        coin = self.balances.get(self._coin)
+        if krw is None and coin is None:
+            return
+        if self.engine is not None:
+            await asyncio.to_thread(update_live_position_balances, self.engine, {
+                "symbol": self.settings.SYMBOL,
+                "ts": _ms_to_dt(msg.get("asset_timestamp") or msg.get("timestamp")),
+                "krw_balance": krw,
+                "btc_balance": coin,
+            })
+        log.info("Private WS myAsset KRW=%s %s=%s", krw, self._coin, coin)
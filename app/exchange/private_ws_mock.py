@@ -0,0 +1,244 @@
+"""Upbit private WebSocket stand-in server — 스크립트된 myOrder/myAsset 이벤트 재생 (오프라인 점검용).
+
+- 연결 시 Authorization: Bearer 헤더 확인 → 구독 frame 수신 → 스크립트 이벤트를 delay_sec 간격으로 push
+- push(msg)로 임의 이벤트를 연결된 모든 클라이언트에 즉시 전송 (REST mock 등에서 체결 연동용)
+- 스크립트: JSON lines, 각 줄 {"delay_sec": 0.1, "msg": {...myOrder/myAsset...}}
+  timestamp가 없으면 전송 시각(ms)으로 채움
+
+사용법:
+  # 기본 체결 시나리오로 UpbitPrivateWsClient 왕복 점검 (DB 불필요)
+  poetry run python -m app.exchange.private_ws_mock --check
+
+  # 서버만 띄우기 (bot에서 UPBIT_PRIVATE_WS_URL=ws://127.0.0.1:8765 로 연결)
+  poetry run python -m app.exchange.private_ws_mock --serve --port 8765 --script fills.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid as uuid_mod
+from pathlib import Path
+
+import websockets
+
+from app.config import load_settings
+
+log = logging.getLogger(__name__)
+
+
+def default_script(
+    symbol: str,
+    order_uuid: str,
+    side: str = "bid",
+    price: float = 100_000_000.0,
+    volume: float = 0.0001,
+    krw_before: float = 1_000_000.0,
+    fee_rate: float = 0.0005,
+) -> list[dict]:
+    """시장가 주문 1건: wait → 부분체결(trade) → done, 이후 myAsset 잔고 변화."""
+    coin = symbol.split("-")[1] if "-" in symbol else "BTC"
+    half = volume / 2
+    funds = price * volume
+    fee = funds * fee_rate
+    order = {
+        "type": "myOrder", "code": symbol, "uuid": order_uuid, "ask_bid": side.upper(),
+        "order_type": "price" if side == "bid" else "market", "price": price, "volume": volume,
+        "identifier": None, "stream_type": "REALTIME",
+    }
+    krw_after = krw_before - funds - fee if side == "bid" else krw_before + funds - fee
+    coin_after = volume if side == "bid" else 0.0
+    return [
+        {"delay_sec": 0.05, "msg": {**order, "state": "wait", "executed_volume": 0.0,
+                                    "remaining_volume": volume, "paid_fee": 0.0}},
+        {"delay_sec": 0.05, "msg": {**order, "state": "trade", "executed_volume": half,
+                                    "remaining_volume": volume - half, "paid_fee": fee / 2,
+                                    "avg_price": price}},
+        {"delay_sec": 0.05, "msg": {**order, "state": "done", "executed_volume": volume,
+                                    "remaining_volume": 0.0, "paid_fee": fee, "avg_price": price}},
+        {"delay_sec": 0.02, "msg": {"type": "myAsset", "stream_type": "REALTIME", "assets": [
+            {"currency": "KRW", "balance": krw_after, "locked": 0.0},
+            {"currency": coin, "balance": coin_after, "locked": 0.0},
+        ]}},
+    ]
+
+
+def load_script(path: str) -> list[dict]:
+    steps = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            steps.append(json.loads(line))
+    return steps
+
+
+class PrivateWsStandIn:
+    """Upbit /websocket/v1/private 흉내 — 인증 헤더 확인 + 구독 후 스크립트 재생."""
+
+    def __init__(
+        self,
+        script: list[dict],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        require_auth: bool = True,
+    ) -> None:
+        self.script = script
+        self.host = host
+        self.port = port
+        self.require_auth = require_auth
+        self.sent: list[tuple[float, dict]] = []   # (monotonic send time, msg)
+        self._clients: set = set()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("Private WS stand-in listening on %s (%d scripted events)", self.url, len(self.script))
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def push(self, msg: dict) -> None:
+        for ws in list(self._clients):
+            await self._send(ws, msg)
+
+    async def _send(self, ws, msg: dict) -> None:
+        msg = dict(msg)
+        now_ms = int(time.time() * 1000)
+        msg.setdefault("timestamp", now_ms)
+        if msg.get("type") == "myOrder":
+            msg.setdefault("trade_timestamp", now_ms)
+            msg.setdefault("order_timestamp", now_ms)
+        elif msg.get("type") == "myAsset":
+            msg.setdefault("asset_timestamp", now_ms)
+        self.sent.append((time.monotonic(), msg))
+        await ws.send(json.dumps(msg).encode("utf-8"))
+
+    async def _handler(self, ws, path: str | None = None) -> None:
+        # websockets 12 legacy: ws.request_headers / 14+: ws.request.headers
+        headers = getattr(ws, "request_headers", None) or ws.request.headers
+        if self.require_auth and not (headers.get("Authorization") or "").startswith("Bearer "):
+            await ws.send(json.dumps({"error": {"name": "INVALID_AUTH", "message": "missing jwt"}}))
+            await ws.close(code=4401, reason="unauthorized")
+            return
+
+        await ws.recv()   # subscribe frame
+        self._clients.add(ws)
+        try:
+            for step in self.script:
+                await asyncio.sleep(float(step.get("delay_sec", 0.0)))
+                await self._send(ws, step["msg"])
+            await ws.wait_closed()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self._clients.discard(ws)
+
+
+async def _check(symbol: str, script_path: str | None) -> int:
+    from app.exchange.private_ws import UpbitPrivateWsClient
+
+    s = load_settings()
+    s = s.model_copy(update={
+        "SYMBOL": symbol,
+        "UPBIT_ACCESS_KEY": s.UPBIT_ACCESS_KEY or "stand-in-access",
+        "UPBIT_SECRET_KEY": s.UPBIT_SECRET_KEY or "stand-in-secret-key-for-offline-check",
+    })
+    order_uuid = str(uuid_mod.uuid4())
+    script = load_script(script_path) if script_path else default_script(symbol, order_uuid)
+    final_uuid = next(
+        (st["msg"]["uuid"] for st in script
+         if st["msg"].get("type") == "myOrder" and st["msg"].get("state") in ("done", "cancel")),
+        None,
+    )
+
+    server = PrivateWsStandIn(script)
+    await server.start()
+    client = UpbitPrivateWsClient(s, engine=None, url=server.url)
+    task = asyncio.create_task(client.run())
+
+    print("=" * 60)
+    print("Private WS stand-in check")
+    print(f"  url={server.url}  symbol={symbol}  events={len(script)}")
+    print("=" * 60)
+
+    ok = True
+    try:
+        if final_uuid is None:
+            print("❌ script has no final (done/cancel) myOrder event")
+            return 1
+        total_delay = sum(float(st.get("delay_sec", 0.0)) for st in script)
+        pushed = await client.wait_order_final(final_uuid, timeout=total_delay + 5.0)
+        t_recv = time.monotonic()
+        if pushed is None:
+            print(f"❌ no final myOrder for uuid={final_uuid}")
+            ok = False
+        else:
+            t_sent = next(t for t, m in server.sent if m.get("uuid") == final_uuid
+                          and m.get("state") == pushed["state"])
+            print(f"✅ final myOrder: state={pushed['state']} executed={pushed['executed_volume']} "
+                  f"paid_fee={pushed['paid_fee']} avg_price={pushed['avg_price']}")
+            print(f"   push → hub latency: {(t_recv - t_sent) * 1000:.1f} ms")
+        await asyncio.sleep(0.2)
+        print(f"  order events={client.order_event_count}  asset events={client.asset_event_count}")
+        if client.asset_event_count:
+            print(f"✅ balances: {client.balances}")
+        else:
+            print("⚠️  no myAsset events received")
+    finally:
+        await client.stop()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await server.close()
+
+    print("=" * 60)
+    print(f"RESULT: {'PASS' if ok else 'FAIL'}")
+    print("=" * 60)
+    return 0 if ok else 1
+
+
+async def _serve(host: str, port: int, symbol: str, script_path: str | None, order_uuid: str) -> None:
+    script = load_script(script_path) if script_path else default_script(symbol, order_uuid)
+    server = PrivateWsStandIn(script, host=host, port=port)
+    await server.start()
+    print(f"Serving private WS stand-in on {server.url} (Ctrl+C to stop)")
+    try:
+        await asyncio.Future()
+    finally:
+        await server.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Upbit private WS stand-in server")
+    parser.add_argument("--serve", action="store_true", help="run server until interrupted")
+    parser.add_argument("--check", action="store_true", help="round-trip check with UpbitPrivateWsClient")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument("--script", default=None, help="JSON lines script (default: built-in fill)")
+    parser.add_argument("--uuid", default=None, help="order uuid for the built-in script")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    symbol = args.symbol or load_settings().SYMBOL
+    if args.serve:
+        try:
+            asyncio.run(_serve(args.host, args.port, symbol, args.script, args.uuid or str(uuid_mod.uuid4())))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    return asyncio.run(_check(symbol, args.script))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Upbit rate group별 공유 token bucket — remaining-req 헤더로 보정.
+
+- 프로세스 전역 limiter 1개 (get_rate_limiter) — 모든 Upbit 클라이언트가 같은 bucket 사용
+- rate group: 응답 remaining-req의 group= 값이 기준 — (method, path)별로 학습해 다음 호출부터
+  그 group bucket을 씀. 아직 응답을 못 본 경로만 추정 (POST /v1/orders* → "order", 나머지 → "default")
+- 매 응답의 remaining-req.sec로 로컬 토큰 수를 서버 값 이하로 낮춤, 429면 1초 창 동안 비움
+- 우선순위 lane: LANE_ORDER(주문/주문조회)가 LANE_POLL(계좌 polling)보다 먼저 permit을 받음
+- permit을 max_wait_sec 안에 못 받으면 skip → 호출측이 throttled로 기록
+- granted/queued/skipped/wait_ms를 group·lane별로 집계 (summary()로 로그)
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+LANE_ORDER = 0
+LANE_POLL = 1
+_LANE_NAMES = {LANE_ORDER: "order", LANE_POLL: "poll"}
+
+
+def rate_group(method: str, path: str) -> str:
+    """Upbit rate group 추정 (remaining-req로 학습하기 전 fallback) — 주문 생성/테스트는 order, 그 외 default."""
+    if method == "POST" and path.startswith("/v1/orders"):
+        return "order"
+    return "default"
+
+
+class TokenBucket:
+    """초당 rate개 토큰, 용량 rate (Upbit 초 단위 창과 동일 규모).
+
+    async 대기열은 (lane, seq) heap — 낮은 lane 번호가 먼저, 같은 lane은 FIFO.
+    await 경로는 단일 event loop에서만 쓴다. acquire_blocking(동기 client / to_thread)이 같은
+    bucket을 다른 thread에서 건드리므로 토큰·통계 갱신은 _lock 안에서 (sleep은 lock 밖).
+    """
+
+    def __init__(self, group: str, rate_per_sec: float) -> None:
+        self.group = group
+        self.rate = max(float(rate_per_sec), 0.1)
+        self.capacity = self.rate
+        self.tokens = self.capacity
+        self._ts = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = threading.Lock()
+        self.stats: dict[int, dict[str, int]] = {
+            lane: {"granted": 0, "queued": 0, "skipped": 0, "wait_ms": 0} for lane in _LANE_NAMES
+        }
+
+    def _refill(self) -> None:
+        """호출 측이 _lock을 잡고 있어야 함."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def observe(self, remaining_sec: int | None, http_status: int | None = None) -> None:
+        """서버가 알려준 잔여량으로 보정 (로컬 추정이 더 낙관적일 때만 낮춤)."""
+        with self._lock:
+            self._refill()
+            if http_status == 429 or remaining_sec == 0:
+                # 이번 초 창이 소진됨 — 다음 토큰이 약 1초 뒤에 생기도록 비움
+                self.tokens = min(self.tokens, 1.0 - self.capacity)
+            elif remaining_sec is not None:
+                self.tokens = min(self.tokens, float(remaining_sec))
+
+    # ── async path ──────────────────────────────────────────────
+
+    def _head_lane(self) -> int | None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        return self._waiters[0][0] if self._waiters else None
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        with self._lock:
+            self._refill()
+            while self._head_lane() is not None and self.tokens >= 1.0:
+                _, _, fut = heapq.heappop(self._waiters)
+                self.tokens -= 1.0
+                fut.set_result(True)
+            delay = max((1.0 - self.tokens) / self.rate, 0.001)
+        if self._head_lane() is not None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, lane: int, max_wait_sec: float) -> bool:
+        with self._lock:
+            self._refill()
+            head = self._head_lane()
+            if (head is None or head > lane) and self.tokens >= 1.0:
+                self.tokens -= 1.0
+                self.stats[lane]["granted"] += 1
+                return True
+            self.stats[lane]["queued"] += 1
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (lane, next(self._seq), fut))
+        if self._timer is None:
+            self._dispatch()
+        t0 = time.monotonic()
+        try:
+            await asyncio.wait_for(fut, timeout=max_wait_sec)
+        except TimeoutError:
+            with self._lock:
+                self.stats[lane]["skipped"] += 1
+            log.warning(
+                "Upbit rate limit: %s/%s permit not granted within %.1fs — skipping call",
+                self.group, _LANE_NAMES[lane], max_wait_sec,
+            )
+            return False
+        finally:
+            with self._lock:
+                self.stats[lane]["wait_ms"] += int((time.monotonic() - t0) * 1000)
+        with self._lock:
+            self.stats[lane]["granted"] += 1
+        return True
+
+    # ── sync path (CLI) ─────────────────────────────────────────
+
+    def acquire_blocking(self, lane: int, max_wait_sec: float) -> bool:
+        deadline = time.monotonic() + max_wait_sec
+        queued = False
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self.stats[lane]["granted"] += 1
+                    return True
+                wait = (1.0 - self.tokens) / self.rate
+                if time.monotonic() + wait > deadline:
+                    self.stats[lane]["skipped"] += 1
+                    return False
+                if not queued:
+                    self.stats[lane]["queued"] += 1
+                    queued = True
+                self.stats[lane]["wait_ms"] += int(wait * 1000)
+            time.sleep(wait)
+
+
+class UpbitRateLimiter:
+    """rate group → TokenBucket. 모르는 group은 default rate로 lazily 생성.
+
+    (method, path) → group은 응답 remaining-req의 group= 으로 학습 (group_for / observe).
+    """
+
+    def __init__(self, rates: dict[str, float], max_wait_sec: float = 5.0) -> None:
+        self.rates = dict(rates)
+        self.max_wait_sec = max_wait_sec
+        self._buckets: dict[str, TokenBucket] = {}
+        self._routes: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, group: str) -> TokenBucket:
+        b = self._buckets.get(group)
+        if b is None:
+            with self._lock:
+                b = self._buckets.get(group)
+                if b is None:
+                    b = TokenBucket(group, self.rates.get(group, self.rates.get("default", 10)))
+                    self._buckets[group] = b
+        return b
+
+    def group_for(self, method: str, path: str) -> str:
+        """이 경로가 속한 rate group — 서버 헤더로 학습한 값, 없으면 rate_group 추정."""
+        return self._routes.get((method, path)) or rate_group(method, path)
+
+    async def acquire(self, group: str, lane: int = LANE_POLL) -> bool:
+        return await self.bucket(group).acquire(lane, self.max_wait_sec)
+
+    def acquire_blocking(self, group: str, lane: int = LANE_POLL) -> bool:
+        return self.bucket(group).acquire_blocking(lane, self.max_wait_sec)
+
+    def observe(self, method: str, path: str, meta: dict) -> str:
+        """응답 remaining-req로 보정. 헤더의 group= 이 있으면 그 bucket을 쓰고 경로에 기억. group 반환."""
+        parsed = meta.get("remaining_req_parsed") or {}
+        group = parsed.get("group") or self.group_for(method, path)
+        if parsed.get("group"):
+            self._routes[(method, path)] = group
+        self.bucket(group).observe(parsed.get("sec"), meta.get("http_status"))
+        return group
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, int]]]:
+        return {
+            g: {_LANE_NAMES[lane]: dict(st) for lane, st in b.stats.items()}
+            for g, b in self._buckets.items()
+        }
+
+    def summary(self) -> str:
+        """'default[order 3/0/0 poll 10/2/0] ...' — granted/queued/skipped."""
+        parts = []
+        for g, lanes in self.snapshot().items():
+            body = " ".join(
+                f"{name} {st['granted']}/{st['queued']}/{st['skipped']}" for name, st in lanes.items()
+            )
+            parts.append(f"{g}[{body}]")
+        return " ".join(parts) or "n/a"
+
+
+_LIMITER: UpbitRateLimiter | None = None
+
+
+def get_rate_limiter(settings) -> UpbitRateLimiter:
+    """프로세스 전역 limiter (최초 호출의 settings로 생성)."""
+    global _LIMITER
+    if _LIMITER is None:
+        _LIMITER = UpbitRateLimiter(
+            {
+                "default": settings.UPBIT_RATE_DEFAULT_PER_SEC,
+                "order": settings.UPBIT_RATE_ORDER_PER_SEC,
+            },
+            max_wait_sec=settings.UPBIT_RATE_MAX_WAIT_SEC,
+        )
+    return _LIMITER
@@ -32,7 +32,7 @@ def main() -> int:
         print("   (shadow 모드에서는 실제 주문이 없으므로 리컨실리에이션 불필요)")
         return 0
 
-    engine = get_engine(s)
+    engine = get_engine(s, "reconcile", pool_size=2)
     client = UpbitRestClient(
         access_key=s.UPBIT_ACCESS_KEY,
         secret_key=s.UPBIT_SECRET_KEY,
@@ -0,0 +1,345 @@
+"""Upbit REST mock server — 오프라인 부하/지연/오류 주입용 로컬 stand-in.
+
+구현 endpoint:
+  GET  /v1/accounts, /v1/orders/chance, /v1/order, /v1/orders/open
+  POST /v1/orders/test, /v1/orders
+
+- JWT(HS256) 검증: secret_key를 주면 서명 + query_hash까지 확인 (클라이언트 서명 버그 검출)
+- rate group별 초당 한도 집행 → remaining-req 헤더(sec) 반환, 초과 시 429
+- 주입: 고정/jitter 지연, 5xx 비율, 429 storm 비율
+- 주문: identifier 중복 수신 집계(idempotency 검증), fill_delay_sec 후 get_order가 done 반환
+- on_order 콜백: 주문 생성 시 호출 (private_ws_mock.push로 myOrder 체결 연동 등)
+
+사용법:
+  poetry run python -m app.exchange.rest_mock --port 8080 --latency-ms 30 --error-rate 0.02
+  UPBIT_API_BASE=http://127.0.0.1:8080 poetry run python -m app.exchange.smoke
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import uuid as uuid_mod
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import jwt
+
+from app.exchange.rate_limit import rate_group
+
+log = logging.getLogger(__name__)
+
+
+class UpbitRestMock:
+    """ThreadingHTTPServer 기반 mock (HTTP/1.1 keep-alive)."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        secret_key: str | None = None,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        storm_rate: float = 0.0,
+        rate_default: int = 30,
+        rate_order: int = 8,
+        fill_delay_sec: float = 0.0,
+        mark_price: float = 100_000_000.0,
+        fee_rate: float = 0.0005,
+        seed: int | None = None,
+        on_order: Callable[[dict], None] | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.secret_key = secret_key
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.storm_rate = storm_rate
+        self.rates = {"default": rate_default, "order": rate_order}
+        self.fill_delay_sec = fill_delay_sec
+        self.mark_price = mark_price
+        self.fee_rate = fee_rate
+        self.on_order = on_order
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._windows: dict[str, tuple[int, int]] = {}   # group → (epoch sec, count)
+        self.orders: dict[str, dict] = {}
+        self.identifiers: Counter = Counter()             # accepted (identifier, path) submissions
+        self.balances = {"KRW": 10_000_000.0, "BTC": 0.0}
+        self.stats: Counter = Counter()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    # ── lifecycle ───────────────────────────────────────────────
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> UpbitRestMock:
+        mock = self
+
+        class _Handler(_MockHandler):
+            pass
+
+        _Handler.mock = mock
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="upbit-rest-mock", daemon=True)
+        self._thread.start()
+        log.info("Upbit REST mock listening on %s", self.url)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def duplicate_identifiers(self) -> dict[str, int]:
+        """같은 identifier가 한 endpoint에서 2번 이상 수락된 경우 (idempotency 위반)."""
+        return {f"{path} {ident}": n for (ident, path), n in self.identifiers.items() if n > 1}
+
+    # ── request handling ────────────────────────────────────────
+
+    def _remaining(self, group: str) -> tuple[bool, str]:
+        now_sec = int(time.time())
+        limit = self.rates.get(group, self.rates["default"])
+        with self._lock:
+            sec, count = self._windows.get(group, (now_sec, 0))
+            if sec != now_sec:
+                count = 0
+            count += 1
+            self._windows[group] = (now_sec, count)
+        left = max(limit - count, 0)
+        return count <= limit, f"group={group}; min=1800; sec={left}"
+
+    def _check_auth(self, headers: Any, params: dict | None) -> str | None:
+        auth = headers.get("Authorization") or ""
+        if not auth.startswith("Bearer "):
+            return "missing bearer token"
+        if self.secret_key is None:
+            return None
+        try:
+            payload = jwt.decode(auth[7:], self.secret_key, algorithms=["HS256"])
+        except jwt.PyJWTError as e:
+            return f"invalid jwt: {e}"
+        if params:
+            qs = "&".join(f"{k}={v}" for k, v in params.items())
+            if payload.get("query_hash") != hashlib.sha512(qs.encode()).hexdigest():
+                return "query_hash mismatch"
+        return None
+
+    def handle(self, method: str, path: str, params: dict, headers: Any) -> tuple[int, dict, Any]:
+        self.stats[f"{method} {path}"] += 1
+        delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        group = rate_group(method, path)
+        allowed, remaining = self._remaining(group)
+        hdrs = {"remaining-req": remaining}
+        if not allowed or (self.storm_rate and self._rng.random() < self.storm_rate):
+            self.stats["429"] += 1
+            return 429, {"remaining-req": f"group={group}; min=1800; sec=0"}, {
+                "error": {"name": "too_many_requests", "message": "rate limited"}}
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.stats["5xx"] += 1
+            return 503, hdrs, {"error": {"name": "service_unavailable", "message": "injected"}}
+
+        err = self._check_auth(headers, params)
+        if err:
+            self.stats["401"] += 1
+            return 401, hdrs, {"error": {"name": "jwt_verification", "message": err}}
+
+        route = self._ROUTES.get((method, path))
+        if route is None:
+            return 404, hdrs, {"error": {"name": "not_found", "message": path}}
+        status, body = route(self, params)
+        return status, hdrs, body
+
+    # ── endpoints ───────────────────────────────────────────────
+
+    def _accounts(self, params: dict) -> tuple[int, Any]:
+        with self._lock:
+            return 200, [
+                {"currency": cur, "balance": f"{bal:.8f}", "locked": "0", "avg_buy_price": "0",
+                 "avg_buy_price_modified": False, "unit_currency": "KRW"}
+                for cur, bal in self.balances.items()
+            ]
+
+    def _chance(self, params: dict) -> tuple[int, Any]:
+        market = params.get("market", "KRW-BTC")
+        return 200, {
+            "bid_fee": str(self.fee_rate), "ask_fee": str(self.fee_rate),
+            "market": {"id": market, "state": "active"},
+            "bid_account": {"currency": "KRW", "balance": f"{self.balances['KRW']:.8f}"},
+            "ask_account": {"currency": "BTC", "balance": f"{self.balances['BTC']:.8f}"},
+        }
+
+    def _new_order(self, params: dict, path: str) -> tuple[int, Any]:
+        ident = params.get("identifier")
+        with self._lock:
+            if ident is not None:
+                if (ident, path) in self.identifiers and path == "/v1/orders":
+                    # 실거래 endpoint는 identifier 재사용 거부 — 그래도 위반으로 집계
+                    self.identifiers[(ident, path)] += 1
+                    return 400, {"error": {"name": "duplicate_identifier", "message": ident}}
+                self.identifiers[(ident, path)] += 1
+        order = {
+            "uuid": str(uuid_mod.uuid4()),
+            "side": params.get("side"),
+            "ord_type": params.get("ord_type"),
+            "price": params.get("price"),
+            "volume": params.get("volume"),
+            "state": "wait",
+            "market": params.get("market"),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "remaining_volume": params.get("volume"),
+            "executed_volume": "0",
+            "paid_fee": "0",
+            "trades_count": 0,
+            "identifier": ident,
+        }
+        if path == "/v1/orders":
+            with self._lock:
+                self.orders[order["uuid"]] = {**order, "_t0": time.monotonic()}
+            if self.on_order is not None:
+                self.on_order(dict(order))
+        return 201, order
+
+    def _order_test(self, params: dict) -> tuple[int, Any]:
+        return self._new_order(params, "/v1/orders/test")
+
+    def _order(self, params: dict) -> tuple[int, Any]:
+        return self._new_order(params, "/v1/orders")
+
+    def _fill(self, o: dict) -> None:
+        """fill_delay_sec 경과 시 mark_price로 전량 체결 (lock 보유 상태에서 호출)."""
+        if o["state"] != "wait" or time.monotonic() - o["_t0"] < self.fill_delay_sec:
+            return
+        if o["side"] == "bid":
+            funds = float(o["price"] or 0)
+            vol = funds / self.mark_price
+            self.balances["KRW"] -= funds * (1 + self.fee_rate)
+            self.balances["BTC"] += vol
+        else:
+            vol = float(o["volume"] or 0)
+            funds = vol * self.mark_price
+            self.balances["BTC"] -= vol
+            self.balances["KRW"] += funds * (1 - self.fee_rate)
+        o.update(state="done", executed_volume=f"{vol:.8f}", remaining_volume="0",
+                 paid_fee=f"{funds * self.fee_rate:.8f}", trades_count=1)
+
+    def _get_order(self, params: dict) -> tuple[int, Any]:
+        with self._lock:
+            o = self.orders.get(params.get("uuid", ""))
+            if o is None:
+                return 404, {"error": {"name": "order_not_found", "message": "order not found"}}
+            self._fill(o)
+            return 200, {k: v for k, v in o.items() if not k.startswith("_")}
+
+    def _open_orders(self, params: dict) -> tuple[int, Any]:
+        with self._lock:
+            for o in self.orders.values():
+                self._fill(o)
+            return 200, [
+                {k: v for k, v in o.items() if not k.startswith("_")}
+                for o in self.orders.values()
+                if o["state"] == "wait" and o["market"] == params.get("market")
+            ]
+
+    _ROUTES = {
+        ("GET", "/v1/accounts"): _accounts,
+        ("GET", "/v1/orders/chance"): _chance,
+        ("GET", "/v1/order"): _get_order,
+        ("GET", "/v1/orders/open"): _open_orders,
+        ("POST", "/v1/orders/test"): _order_test,
+        ("POST", "/v1/orders"): _order,
+    }
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive (pooled client 재사용 확인)
+    disable_nagle_algorithm = True  # header/body 분리 write + delayed ACK로 인한 ~40ms 지연 방지
+    mock: UpbitRestMock
+
+    def _dispatch(self, method: str) -> None:
+        parts = urlsplit(self.path)
+        if method == "GET":
+            params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        else:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                params = json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                params = {}
+        status, headers, body = self.mock.handle(method, parts.path, params, self.headers)
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._dispatch("POST")
+
+    def log_message(self, format: str, *args: Any) -> None:  # silence per-request stderr lines
+        pass
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Upbit REST mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--secret-key", default=None, help="verify JWT signature with this key")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--storm-rate", type=float, default=0.0, help="fraction of injected 429s")
+    parser.add_argument("--rate-default", type=int, default=30)
+    parser.add_argument("--rate-order", type=int, default=8)
+    parser.add_argument("--fill-delay-sec", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    mock = UpbitRestMock(
+        host=args.host, port=args.port, secret_key=args.secret_key,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, storm_rate=args.storm_rate,
+        rate_default=args.rate_default, rate_order=args.rate_order,
+        fill_delay_sec=args.fill_delay_sec,
+    ).start()
+    print(f"Upbit REST mock on {mock.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.stop()
+        print(f"stats: {dict(mock.stats)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
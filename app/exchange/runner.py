@@ -3,14 +3,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import time
 from datetime import datetime, timezone
 from typing import Any
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
-from app.config import Settings
+from app.config import Settings, account_stale_after
 from app.db.writer import (
     insert_upbit_account_snapshot,
     insert_upbit_order_attempt,
@@ -18,10 +17,10 @@ from app.db.writer import (
     update_upbit_order_attempt_final,
     upsert_live_position,
 )
-from app.exchange.upbit_rest import UpbitApiError, UpbitRestClient, parse_remaining_req
-
-# remaining-req.sec 임계값: 이 값 이하이면 API 호출을 스로틀
-_THROTTLE_SEC_THRESHOLD = 1
+from app.exchange.private_ws import UpbitPrivateWsClient
+from app.exchange.upbit_rest import AsyncUpbitRestClient, UpbitApiError, UpbitRateLimited
+from app.tracing import get_tracer
+from app.trading.notify import PaperTradeFeed
 
 # Step 9: Final statuses — DB upsert 후 이 상태이면 추가 처리 스킵
 _FINAL_STATUSES = frozenset({"submitted", "done", "cancel", "test_ok", "logged"})
@@ -34,28 +33,34 @@ class UpbitAccountRunner:
 
     UPBIT_ACCESS_KEY / UPBIT_SECRET_KEY가 설정된 경우에만 실행.
     오류 시 polling 간격을 최대 2배까지 자동 증가 (simple backoff).
+    private WS(myAsset)가 연결돼 있으면 UPBIT_ACCOUNT_RECONCILE_SEC 주기의 재조정 polling만 수행.
     """
 
-    def __init__(self, settings: Settings, engine: Engine) -> None:
+    def __init__(
+        self, settings: Settings, engine: Engine, private_ws: UpbitPrivateWsClient | None = None,
+    ) -> None:
         self.settings = settings
         self.engine = engine
-        self.client = UpbitRestClient(
-            access_key=settings.UPBIT_ACCESS_KEY,
-            secret_key=settings.UPBIT_SECRET_KEY,
-            base_url=settings.UPBIT_API_BASE,
-            timeout=settings.UPBIT_REST_TIMEOUT_SEC,
-            max_retry=settings.UPBIT_REST_MAX_RETRY,
-        )
+        self.private_ws = private_ws
+        # async pooled client — REST I/O가 default executor thread를 점유하지 않음
+        self.client = AsyncUpbitRestClient.from_settings(settings)
         self._poll_interval = settings.UPBIT_ACCOUNT_POLL_SEC
 
+    def _base_interval(self) -> int:
+        if self.private_ws is not None and self.private_ws.connected:
+            return self.settings.UPBIT_ACCOUNT_RECONCILE_SEC
+        return self.settings.UPBIT_ACCOUNT_POLL_SEC
+
     async def run(self) -> None:
         log.info("UpbitAccountRunner started (poll=%ds)", self.settings.UPBIT_ACCOUNT_POLL_SEC)
-        loop = asyncio.get_event_loop()
         while True:
             try:
-                await loop.run_in_executor(None, self._poll_once)
+                await self._poll_once()
                 # Reset interval on success
-                self._poll_interval = self.settings.UPBIT_ACCOUNT_POLL_SEC
+                self._poll_interval = self._base_interval()
+            except UpbitRateLimited as e:
+                # limiter가 이미 skip 집계 — 다음 주기에 재시도 (backoff 없음)
+                log.info("UpbitAccountRunner poll skipped: %s", e)
             except Exception as e:
                 log.warning("UpbitAccountRunner poll error: %s", e)
                 # Backoff: up to 2x base interval
@@ -66,21 +71,6 @@ class UpbitAccountRunner:
                 log.info("UpbitAccountRunner backoff: next poll in %ds", self._poll_interval)
             await asyncio.sleep(self._poll_interval)
 
-    def _is_throttled(self) -> bool:
-        """Step 10: remaining-req.sec throttle guard for AccountRunner."""
-        meta = self.client._last_call_meta
-        parsed = meta.get("remaining_req_parsed")
-        if not parsed:
-            return False
-        sec = parsed.get("sec")
-        if sec is not None and sec <= _THROTTLE_SEC_THRESHOLD:
-            log.warning(
-                "AccountRunner throttled: remaining-req.sec=%d <= threshold=%d — skipping poll",
-                sec, _THROTTLE_SEC_THRESHOLD,
-            )
-            return True
-        return False
-
     def _account_freshness(self) -> tuple[bool, float | None]:
         """Step 10: Return (is_fresh, lag_sec) based on last snapshot timestamp."""
         try:
@@ -98,17 +88,17 @@ class UpbitAccountRunner:
             if ts.tzinfo is None:
                 ts = ts.replace(tzinfo=timezone.utc)
             lag = (datetime.now(timezone.utc) - ts).total_seconds()
-            threshold = self.settings.UPBIT_ACCOUNT_POLL_SEC * 3
-            return lag <= threshold, lag
+            ws_connected = self.private_ws is not None and self.private_ws.connected
+            return lag <= account_stale_after(self.settings, ws_connected), lag
         except Exception:
             return False, None
 
-    def _poll_once(self) -> None:
-        # Step 10: throttle guard — skip poll if remaining-req.sec is too low
-        if self._is_throttled():
-            return
+    async def _poll_once(self) -> None:
+        # 공유 rate limiter가 permit을 줄 때까지 대기 (주문 lane이 우선) — 못 받으면 UpbitRateLimited
+        accounts = await self.client.get_accounts()
+        await asyncio.to_thread(self._save_accounts, accounts)
 
-        accounts = self.client.get_accounts()
+    def _save_accounts(self, accounts: list[dict]) -> None:
         now = datetime.now(timezone.utc)
 
         coin_sym = (
@@ -155,21 +145,25 @@ class UpbitAccountRunner:
         # Step 10: account freshness check (log for dashboard Ready signal)
         is_fresh, lag_sec = self._account_freshness()
         log.info(
-            "UpbitAccountRunner: saved %d snapshots  remaining-req=%s  account_fresh=%s lag=%.1fs",
+            "UpbitAccountRunner: saved %d snapshots  remaining-req=%s  account_fresh=%s lag=%.1fs"
+            "  ratelimit(granted/queued/skipped)=%s",
             len(accounts),
             self.client._last_call_meta.get("remaining_req", "n/a"),
             is_fresh,
             lag_sec if lag_sec is not None else -1.0,
+            self.client.limiter.summary() if self.client.limiter else "n/a",
         )
 
 
 class ShadowExecutionRunner:
     """Paper 거래를 실행하는 Runner — Step 8 업그레이드.
 
-    paper_trades 테이블에서 새 행을 감지하면:
+    paper_trades 테이블에서 PAPER_PRIMARY_BOOK의 새 행을 감지하면
+    (trade_feed 알림으로 즉시 깨어나고, 알림이 없으면 DECISION_INTERVAL_SEC마다 id cursor catch-up):
       - shadow 모드 (기본): DB에 로깅만 (API 호출 없음)
       - test 모드 (UPBIT_ORDER_TEST_ENABLED=true): POST /v1/orders/test
-      - live 모드 (4중 안전장치 통과 시): POST /v1/orders → uuid 폴링 → snapshots 저장
+      - live 모드 (4중 안전장치 통과 시): POST /v1/orders → 최종 상태 확인 → snapshots 저장
+        (private WS 연결 시 myOrder push 대기, 없거나 시간 초과면 uuid REST 폴링)
 
     4중 안전장치 (모두 true여야 live 허용):
       1. LIVE_TRADING_ENABLED=true
@@ -184,16 +178,19 @@ class ShadowExecutionRunner:
       - error 상태이면 retry_count < UPBIT_REST_MAX_RETRY 일 때만 재시도.
     """
 
-    def __init__(self, settings: Settings, engine: Engine) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        engine: Engine,
+        private_ws: UpbitPrivateWsClient | None = None,
+        trade_feed: PaperTradeFeed | None = None,
+    ) -> None:
         self.settings = settings
         self.engine = engine
-        self.client = UpbitRestClient(
-            access_key=settings.UPBIT_ACCESS_KEY,
-            secret_key=settings.UPBIT_SECRET_KEY,
-            base_url=settings.UPBIT_API_BASE,
-            timeout=settings.UPBIT_REST_TIMEOUT_SEC,
-            max_retry=settings.UPBIT_REST_MAX_RETRY,
-        )
+        self.private_ws = private_ws
+        self.trade_feed = trade_feed
+        self.client = AsyncUpbitRestClient.from_settings(settings)
+        self.tracer = get_tracer()
         self._last_seen_id: int = 0
 
     async def run(self) -> None:
@@ -204,42 +201,55 @@ class ShadowExecutionRunner:
             self.settings.LIVE_TRADING_ENABLED,
             self.settings.UPBIT_TRADE_MODE,
         )
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._init_cursor)
+        await asyncio.to_thread(self._init_cursor)
 
         while True:
             try:
-                await loop.run_in_executor(None, self._process_new_trades)
+                await self._process_new_trades()
             except Exception as e:
                 log.warning("ShadowExecutionRunner error: %s", e)
-            await asyncio.sleep(self.settings.DECISION_INTERVAL_SEC)
+            if self.trade_feed is not None:
+                await self.trade_feed.wait(self.settings.DECISION_INTERVAL_SEC)
+            else:
+                await asyncio.sleep(self.settings.DECISION_INTERVAL_SEC)
 
     def _init_cursor(self) -> None:
         with self.engine.connect() as conn:
             row = conn.execute(
-                text("SELECT COALESCE(max(id), 0) FROM paper_trades WHERE symbol=:sym"),
-                {"sym": self.settings.SYMBOL},
+                text("SELECT COALESCE(max(id), 0) FROM paper_trades WHERE symbol=:sym AND book_id=:book"),
+                {"sym": self.settings.SYMBOL, "book": self.settings.PAPER_PRIMARY_BOOK},
             ).fetchone()
             self._last_seen_id = row[0] if row else 0
         log.info("ShadowExecutionRunner cursor init: last_id=%d", self._last_seen_id)
 
-    def _process_new_trades(self) -> None:
+    async def _process_new_trades(self) -> None:
+        rows = await asyncio.to_thread(self._fetch_new_trades)
+        for row in rows:
+            trade = dict(row._mapping)
+            # paper tick에서 연결된 latency trace (같은 프로세스일 때만)
+            trade["trace_id"] = self.tracer.trace_for_trade(row.id)
+            self.tracer.mark(trade["trace_id"], "shadow_picked")
+            try:
+                await self._handle_trade(trade)
+            finally:
+                self.tracer.finish(trade["trace_id"], from_shadow=True)
+            self._last_seen_id = row.id
+
+    def _fetch_new_trades(self) -> list:
         with self.engine.connect() as conn:
             rows = conn.execute(
                 text("""
                     SELECT id, action, reason, price, qty, fee_krw, t, cash_after
                     FROM paper_trades
-                    WHERE symbol=:sym AND id > :last_id
+                    WHERE symbol=:sym AND book_id=:book AND id > :last_id
                     ORDER BY id ASC
                 """),
-                {"sym": self.settings.SYMBOL, "last_id": self._last_seen_id},
+                {"sym": self.settings.SYMBOL, "book": self.settings.PAPER_PRIMARY_BOOK,
+                 "last_id": self._last_seen_id},
             ).fetchall()
+        return rows
 
-        for row in rows:
-            self._handle_trade(dict(row._mapping))
-            self._last_seen_id = row.id
-
-    def _handle_trade(self, trade: dict) -> None:
+    async def _handle_trade(self, trade: dict) -> None:
         action = trade["action"]
         if action not in ("ENTER_LONG", "EXIT_LONG"):
             return
@@ -249,7 +259,7 @@ class ShadowExecutionRunner:
         identifier = f"paper-{paper_trade_id}-{action}"
 
         # ── Step 9: App-level idempotency (optimisation before DB upsert) ─────
-        if self._has_final_status(identifier, mode):
+        if await asyncio.to_thread(self._has_final_status, identifier, mode):
             log.debug("Idempotency skip: identifier=%s mode=%s", identifier, mode)
             return
 
@@ -288,10 +298,10 @@ class ShadowExecutionRunner:
             request_json["volume"] = str(order_volume)
 
         # ── Step 11: collect blocked_reasons ──────────────────────────────────
-        blocked_reasons = self._collect_blocked_reasons()
+        blocked_reasons = await asyncio.to_thread(self._collect_blocked_reasons)
 
         # Base row fields shared across all status paths
-        retry_count = self._get_next_retry_count(paper_trade_id, action)
+        retry_count = await asyncio.to_thread(self._get_next_retry_count, paper_trade_id, action)
         base_row: dict = {
             "ts": datetime.now(timezone.utc),
             "symbol": self.settings.SYMBOL,
@@ -318,12 +328,6 @@ class ShadowExecutionRunner:
             "blocked_reasons": blocked_reasons if blocked_reasons else None,
         }
 
-        # ── THROTTLED: always takes priority ─────────────────────────────────
-        if "THROTTLED" in blocked_reasons:
-            log.warning("Throttled [%s]: remaining-req.sec too low, skipping", action)
-            insert_upbit_order_attempt(self.engine, {**base_row, "status": "throttled"})
-            return
-
         # ── SHADOW mode ───────────────────────────────────────────────────────
         if mode == "shadow":
             # Intentional shadow (UPBIT_TRADE_MODE=shadow or ORDER_TEST_ENABLED=False)?
@@ -346,7 +350,10 @@ class ShadowExecutionRunner:
                 reasons_str = ",".join(blocked_reasons)
                 log.warning("Blocked [%s]: %s (downgraded to shadow)", action, reasons_str)
                 base_row["error_msg"] = f"blocked: {reasons_str}"
-            insert_upbit_order_attempt(self.engine, {**base_row, "status": status})
+            await asyncio.to_thread(
+                self._insert_attempt, {**base_row, "status": status}
+            )
+            self.tracer.mark(trade.get("trace_id"), "attempt_written")
             return
 
         # ── TEST mode: runtime blocking checks ───────────────────────────────
@@ -359,11 +366,12 @@ class ShadowExecutionRunner:
             if runtime_blocks:
                 reasons_str = ",".join(runtime_blocks)
                 log.warning("Blocked test [%s]: %s", action, reasons_str)
-                insert_upbit_order_attempt(self.engine, {
+                await asyncio.to_thread(self._insert_attempt, {
                     **base_row,
                     "status": "blocked",
                     "error_msg": f"blocked: {reasons_str}",
                 })
+                self.tracer.mark(trade.get("trace_id"), "attempt_written")
                 return
 
             # ── All clear: call POST /v1/orders/test ────────────────────────
@@ -380,7 +388,8 @@ class ShadowExecutionRunner:
                     "Test [%s]: POST /v1/orders/test side=%s ord_type=%s price=%s vol=%s",
                     action, side, ord_type, order_price, order_volume,
                 )
-                result = self.client.order_test(
+                self.tracer.mark(trade.get("trace_id"), "order_sent")
+                result = await self.client.order_test(
                     market=self.settings.SYMBOL,
                     side=side,
                     volume=order_volume,
@@ -388,6 +397,7 @@ class ShadowExecutionRunner:
                     ord_type=ord_type,
                     identifier=identifier,
                 )
+                self.tracer.mark(trade.get("trace_id"), "order_acked")
                 meta = self.client._last_call_meta
                 response_json = result
                 status = "test_ok"
@@ -401,6 +411,10 @@ class ShadowExecutionRunner:
                     parsed.get("sec"), parsed.get("min"),
                 )
 
+            except UpbitRateLimited as e:
+                error_msg = str(e)
+                status = "throttled"
+                log.warning("Throttled [%s]: %s", action, e)
             except UpbitApiError as e:
                 error_msg = str(e)
                 status = "error"
@@ -412,7 +426,7 @@ class ShadowExecutionRunner:
                 status = "error"
                 log.error("ShadowExecutionRunner error [%s]: %s", action, e)
 
-            insert_upbit_order_attempt(self.engine, {
+            await asyncio.to_thread(self._insert_attempt, {
                 **base_row,
                 "response_json": response_json,
                 "status": status,
@@ -421,8 +435,10 @@ class ShadowExecutionRunner:
                 "http_status": http_status,
                 "latency_ms": latency_ms,
                 "remaining_req": remaining_req_raw,
-                "blocked_reasons": None,  # clear on successful test
+                # THROTTLED만 남기고 clear (test 호출까지 진행됨)
+                "blocked_reasons": ["THROTTLED"] if status == "throttled" else None,
             })
+            self.tracer.mark(trade.get("trace_id"), "attempt_written")
             return
 
         # ── LIVE mode ─────────────────────────────────────────────────────────
@@ -439,7 +455,8 @@ class ShadowExecutionRunner:
                 "LIVE [%s]: POST /v1/orders side=%s ord_type=%s (LIVE_TRADING_ENABLED=True)",
                 action, side, ord_type,
             )
-            result = self.client.create_order(
+            self.tracer.mark(trade.get("trace_id"), "order_sent")
+            result = await self.client.create_order(
                 market=self.settings.SYMBOL,
                 side=side,
                 volume=order_volume,
@@ -447,6 +464,7 @@ class ShadowExecutionRunner:
                 ord_type=ord_type,
                 identifier=identifier,
             )
+            self.tracer.mark(trade.get("trace_id"), "order_acked")
             meta = self.client._last_call_meta
             response_json = result
             status = "submitted"
@@ -456,6 +474,10 @@ class ShadowExecutionRunner:
             remaining_req_raw = meta.get("remaining_req")
             log.info("Live order submitted: uuid=%s latency=%dms", uuid, latency_ms or 0)
 
+        except UpbitRateLimited as e:
+            error_msg = str(e)
+            status = "throttled"
+            log.warning("Throttled [%s]: %s", action, e)
         except UpbitApiError as e:
             error_msg = str(e)
             status = "error"
@@ -467,7 +489,7 @@ class ShadowExecutionRunner:
             status = "error"
             log.error("ShadowExecutionRunner error [%s]: %s", action, e)
 
-        attempt_id = insert_upbit_order_attempt(self.engine, {
+        attempt_id = await asyncio.to_thread(self._insert_attempt, {
             **base_row,
             "response_json": response_json,
             "status": status,
@@ -476,15 +498,34 @@ class ShadowExecutionRunner:
             "http_status": http_status,
             "latency_ms": latency_ms,
             "remaining_req": remaining_req_raw,
-            "blocked_reasons": None,
+            "blocked_reasons": ["THROTTLED"] if status == "throttled" else None,
         })
+        self.tracer.mark(trade.get("trace_id"), "attempt_written")
 
         # Live mode: poll order until done/cancel
         if uuid and attempt_id is not None:
-            self._poll_live_order(attempt_id, uuid)
+            await self._poll_live_order(attempt_id, uuid)
+
+    async def _poll_live_order(self, attempt_id: int, uuid: str) -> None:
+        """Finalize a live order: pushed myOrder final state first, REST polling as fallback."""
+        if self.private_ws is not None and self.private_ws.connected:
+            wait_sec = self.settings.LIVE_ORDER_PUSH_WAIT_SEC
+            pushed = await self.private_ws.wait_order_final(uuid, wait_sec)
+            if pushed is not None:
+                # snapshot / uuid 기준 attempt 확정은 private WS client가 이미 처리 (여기선 id로 한 번 더 — 멱등)
+                await asyncio.to_thread(
+                    self._finalize_attempt, attempt_id, pushed["state"],
+                    executed_volume=pushed["executed_volume"],
+                    paid_fee=pushed["paid_fee"],
+                    avg_price=pushed["avg_price"] or pushed["price"],
+                )
+                log.info("Live order finalized (push): uuid=%s final_state=%s", uuid, pushed["state"])
+                return
+            log.warning(
+                "No pushed final state for uuid=%s within %.0fs — falling back to REST polling",
+                uuid, wait_sec,
+            )
 
-    def _poll_live_order(self, attempt_id: int, uuid: str) -> None:
-        """Poll live order status and save snapshots until done/cancel."""
         max_polls = self.settings.LIVE_ORDER_MAX_POLLS
         poll_interval = self.settings.LIVE_ORDER_POLL_INTERVAL_SEC
         final_state: str | None = None
@@ -493,9 +534,9 @@ class ShadowExecutionRunner:
         avg_price: float | None = None
 
         for poll_n in range(max_polls):
-            time.sleep(poll_interval)
+            await asyncio.sleep(poll_interval)
             try:
-                result = self.client.get_order(uuid)
+                result = await self.client.get_order(uuid)
                 now = datetime.now(timezone.utc)
                 state = result.get("state")
 
@@ -519,7 +560,7 @@ class ShadowExecutionRunner:
                     "paid_fee": _safe_float(result.get("paid_fee")),
                     "raw_json": result,
                 }
-                insert_upbit_order_snapshot(self.engine, snap_row)
+                await asyncio.to_thread(self._insert_snapshot, snap_row)
                 log.info("Live order poll %d/%d uuid=%s state=%s", poll_n + 1, max_polls, uuid, state)
 
                 if state in ("done", "cancel"):
@@ -536,8 +577,8 @@ class ShadowExecutionRunner:
                 log.warning("get_order poll error (poll=%d uuid=%s): %s", poll_n, uuid, e)
 
         if final_state:
-            update_upbit_order_attempt_final(
-                self.engine, attempt_id, final_state,
+            await asyncio.to_thread(
+                self._finalize_attempt, attempt_id, final_state,
                 executed_volume=executed_volume,
                 paid_fee=paid_fee,
                 avg_price=avg_price,
@@ -549,8 +590,8 @@ class ShadowExecutionRunner:
                 "Live order polling exhausted (poll_timeout): uuid=%s max_polls=%d",
                 uuid, max_polls,
             )
-            update_upbit_order_attempt_final(
-                self.engine, attempt_id, "poll_timeout",
+            await asyncio.to_thread(
+                self._finalize_attempt, attempt_id, "poll_timeout",
                 executed_volume=executed_volume,
                 paid_fee=paid_fee,
                 avg_price=avg_price,
@@ -589,28 +630,12 @@ class ShadowExecutionRunner:
             ).fetchone()
         return row[0] if row else 0
 
-    def _is_throttled(self) -> bool:
-        """Step 9: Return True if remaining-req.sec is at or below the throttle threshold."""
-        meta = self.client._last_call_meta
-        parsed = meta.get("remaining_req_parsed")
-        if not parsed:
-            return False  # No data yet — don't throttle
-        sec = parsed.get("sec")
-        if sec is None:
-            return False
-        if sec <= _THROTTLE_SEC_THRESHOLD:
-            log.warning(
-                "remaining-req throttle: sec=%d <= threshold=%d",
-                sec, _THROTTLE_SEC_THRESHOLD,
-            )
-            return True
-        return False
-
     def _collect_blocked_reasons(self) -> list[str]:
         """Step 11: Collect all reasons why a Upbit API call cannot be made right now.
 
         Checks config-level conditions (KEYS_MISSING, TEST_DISABLED, AUTO_TEST_DISABLED,
-        PAPER_PROFILE_MISMATCH) and runtime conditions (THROTTLED, DATA_LAG).
+        PAPER_PROFILE_MISMATCH) and runtime conditions (DATA_LAG).
+        THROTTLED는 호출 시점에 공유 rate limiter가 permit을 못 줄 때 기록된다.
         """
         reasons: list[str] = []
         s = self.settings
@@ -625,28 +650,39 @@ class ShadowExecutionRunner:
         if s.PAPER_POLICY_PROFILE != s.UPBIT_TEST_REQUIRE_PAPER_PROFILE:
             reasons.append("PAPER_PROFILE_MISMATCH")
 
-        # Runtime: remaining-req throttle
-        if self._is_throttled():
-            reasons.append("THROTTLED")
-
         # Runtime: DATA_LAG — market_1s freshness
+        lag = self._market_lag_sec()
+        if lag is not None and lag > s.DATA_LAG_SEC_MAX:
+            reasons.append("DATA_LAG")
+
+        return reasons
+
+    # ── DB hooks (sync, called via asyncio.to_thread; load_harness overrides them) ──
+
+    def _market_lag_sec(self) -> float | None:
         try:
             with self.engine.connect() as conn:
                 row = conn.execute(
                     text("SELECT ts FROM market_1s WHERE symbol=:sym ORDER BY ts DESC LIMIT 1"),
-                    {"sym": s.SYMBOL},
+                    {"sym": self.settings.SYMBOL},
                 ).fetchone()
-            if row is not None:
-                ts = row.ts
-                if ts.tzinfo is None:
-                    ts = ts.replace(tzinfo=timezone.utc)
-                lag = (datetime.now(timezone.utc) - ts).total_seconds()
-                if lag > s.DATA_LAG_SEC_MAX:
-                    reasons.append("DATA_LAG")
         except Exception:
-            pass
+            return None
+        if row is None:
+            return None
+        ts = row.ts
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - ts).total_seconds()
 
-        return reasons
+    def _insert_attempt(self, row: dict) -> int | None:
+        return insert_upbit_order_attempt(self.engine, row)
+
+    def _insert_snapshot(self, row: dict) -> None:
+        insert_upbit_order_snapshot(self.engine, row)
+
+    def _finalize_attempt(self, attempt_id: int, final_state: str, **fields) -> None:
+        update_upbit_order_attempt_final(self.engine, attempt_id, final_state, **fields)
 
     def _determine_mode(self) -> str:
         s = self.settings
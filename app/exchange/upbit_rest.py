@@ -1,14 +1,22 @@
-"""Upbit v1 REST 클라이언트 (동기 httpx 기반) — Step 9 안정화."""
+"""Upbit v1 REST 클라이언트 (httpx connection pool 기반, sync/async) — Step 9 안정화."""
 from __future__ import annotations
 
+import asyncio
+import importlib.util
 import logging
 import random
-import re
 import time
+from collections import Counter
 from typing import Any
 
 import httpx
 
+from app.exchange.rate_limit import (
+    LANE_ORDER,
+    LANE_POLL,
+    UpbitRateLimiter,
+    get_rate_limiter,
+)
 from app.exchange.upbit_auth import make_auth_header
 
 log = logging.getLogger(__name__)
@@ -61,19 +69,15 @@ class UpbitApiError(Exception):
         self.remaining_req = remaining_req
 
 
-class UpbitRestClient:
-    """Upbit REST API wrapper.
+class UpbitRateLimited(UpbitApiError):
+    """공유 rate limiter가 max_wait 안에 permit을 주지 못해 호출을 skip."""
 
-    Step 8 추가:
-    - 요청마다 latency_ms / http_status / remaining_req를 _last_call_meta에 저장
-    - 재시도: exponential backoff + jitter (max_retry 횟수)
-    - UpbitApiError 표준화 (runner가 status/error_msg 기록 용이)
-    - order_test: POST /v1/orders/test 직접 호출 (dry-run)
-    - create_order / order_test에 identifier 파라미터 지원
 
-    Step 9 추가:
-    - parse_remaining_req() — remaining-req 헤더 파싱
-    - _last_call_meta에 remaining_req_parsed 추가
+class _UpbitRestBase:
+    """Sync/async 클라이언트 공통부 — 인증, 응답 메타 기록, backoff, 주문 body 구성.
+
+    HTTP 전송은 하위 클래스가 소유한 장수명 connection pool(httpx.Client / AsyncClient)로 한다.
+    요청마다 새 TCP/TLS 핸드셰이크를 하지 않도록 keep-alive 연결을 재사용.
     """
 
     def __init__(
@@ -83,24 +87,178 @@ class UpbitRestClient:
         base_url: str = "https://api.upbit.com",
         timeout: float = 10.0,
         max_retry: int = 3,
+        pool_size: int = 4,
+        http2: bool = False,
+        keepalive_sec: float = 30.0,
+        limiter: UpbitRateLimiter | None = None,
     ) -> None:
         self.access_key = access_key
         self.secret_key = secret_key
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.max_retry = max_retry
+        self.pool_size = max(1, pool_size)
+        self.keepalive_sec = keepalive_sec
+        # HTTP/2는 optional 'h2' 패키지가 있을 때만 — 없으면 HTTP/1.1 keep-alive로 fallback
+        if http2 and importlib.util.find_spec("h2") is None:
+            log.warning("UPBIT_HTTP2_ENABLED=true but 'h2' package not installed — using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        # None이면 rate limit 없음 (from_settings는 프로세스 전역 limiter 사용)
+        self.limiter = limiter
         # Populated after every request; caller may read http_status / remaining_req / latency_ms
         self._last_call_meta: dict = {}
+        # calls / attempts / retries / rate_limited (load_harness, 로그용)
+        self.call_stats: Counter = Counter()
+
+    @classmethod
+    def from_settings(cls, settings: Any):
+        return cls(
+            access_key=settings.UPBIT_ACCESS_KEY,
+            secret_key=settings.UPBIT_SECRET_KEY,
+            base_url=settings.UPBIT_API_BASE,
+            timeout=settings.UPBIT_REST_TIMEOUT_SEC,
+            max_retry=settings.UPBIT_REST_MAX_RETRY,
+            pool_size=settings.UPBIT_HTTP_POOL_SIZE,
+            http2=settings.UPBIT_HTTP2_ENABLED,
+            keepalive_sec=settings.UPBIT_HTTP_KEEPALIVE_SEC,
+            limiter=get_rate_limiter(settings),
+        )
+
+    def _client_kwargs(self) -> dict:
+        return {
+            "timeout": self.timeout,
+            "http2": self.http2,
+            "limits": httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_sec,
+            ),
+        }
 
     def _auth(self, query_params: dict | None = None) -> dict[str, str]:
         return make_auth_header(self.access_key, self.secret_key, query_params)
 
+    def _request_kwargs(self, method: str, params: dict | None, body: dict | None) -> dict:
+        """JWT는 query_hash 때문에 요청(재시도 포함)마다 새로 서명."""
+        if method == "GET":
+            return {"params": params, "headers": self._auth(params)}
+        return {"json": body, "headers": self._auth(body)}
+
+    def _backoff_wait(self, attempt: int, method: str, path: str) -> float:
+        wait = (2 ** attempt) + random.uniform(0.0, 0.5)
+        log.info(
+            "Retry %d/%d %s %s (wait=%.2fs)", attempt, self.max_retry - 1, method, path, wait
+        )
+        return wait
+
+    def _rate_limited(self, group: str, lane: int) -> UpbitRateLimited:
+        return UpbitRateLimited(
+            f"rate limit: no {group} permit within {self.limiter.max_wait_sec:.1f}s (lane={lane})"
+        )
+
+    def _handle_response(
+        self, r: httpx.Response, method: str, path: str, attempt: int, latency_ms: int
+    ) -> UpbitApiError | None:
+        """_last_call_meta 기록 (+ limiter 보정) 후 재시도 대상이면 UpbitApiError를 반환 (raise 아님).
+
+        재시도 불가 4xx/5xx는 바로 raise, 성공이면 None.
+        """
+        remaining_req = r.headers.get("remaining-req")
+        self._last_call_meta = {
+            "http_status": r.status_code,
+            "remaining_req": remaining_req,
+            "remaining_req_parsed": parse_remaining_req(remaining_req),
+            "latency_ms": latency_ms,
+        }
+        if self.limiter is not None:
+            self.limiter.observe(method, path, self._last_call_meta)
+
+        if r.status_code in _RETRYABLE_STATUS and attempt < self.max_retry - 1:
+            log.warning(
+                "Retryable HTTP %d from %s (attempt %d)", r.status_code, path, attempt
+            )
+            return UpbitApiError(
+                f"HTTP {r.status_code}",
+                http_status=r.status_code,
+                remaining_req=remaining_req,
+            )
+
+        if r.status_code >= 400:
+            raise UpbitApiError(
+                f"HTTP {r.status_code}: {r.text[:300]}",
+                http_status=r.status_code,
+                remaining_req=remaining_req,
+            )
+        return None
+
+    def _exhausted(self, last_exc: Exception | None) -> UpbitApiError:
+        return UpbitApiError(f"All {self.max_retry} retries failed: {last_exc}")
+
+    @staticmethod
+    def _order_body(
+        market: str,
+        side: str,
+        volume: float | None,
+        price: float | None,
+        ord_type: str,
+        identifier: str | None,
+    ) -> dict:
+        body: dict = {"market": market, "side": side, "ord_type": ord_type}
+        if volume is not None:
+            body["volume"] = str(volume)
+        if price is not None:
+            body["price"] = str(int(price))
+        if identifier is not None:
+            body["identifier"] = identifier
+        return body
+
+
+class UpbitRestClient(_UpbitRestBase):
+    """Upbit REST API wrapper (동기).
+
+    Step 8 추가:
+    - 요청마다 latency_ms / http_status / remaining_req를 _last_call_meta에 저장
+    - 재시도: exponential backoff + jitter (max_retry 횟수)
+    - UpbitApiError 표준화 (runner가 status/error_msg 기록 용이)
+    - order_test: POST /v1/orders/test 직접 호출 (dry-run)
+    - create_order / order_test에 identifier 파라미터 지원
+
+    Step 9 추가:
+    - parse_remaining_req() — remaining-req 헤더 파싱
+    - _last_call_meta에 remaining_req_parsed 추가
+
+    연결은 lazily 생성한 httpx.Client pool을 재사용 (close() 또는 with 블록으로 정리).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._http: httpx.Client | None = None
+
+    @property
+    def http(self) -> httpx.Client:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.Client(**self._client_kwargs())
+        return self._http
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def __enter__(self) -> UpbitRestClient:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
     def _request(
         self,
         method: str,
         path: str,
         params: dict | None = None,
         body: dict | None = None,
+        lane: int = LANE_POLL,
     ) -> Any:
         """Execute HTTP request with exponential backoff + jitter.
 
@@ -111,53 +269,27 @@ class UpbitRestClient:
         """
         url = f"{self.base_url}{path}"
         last_exc: Exception | None = None
+        self.call_stats["calls"] += 1
 
         for attempt in range(self.max_retry):
             if attempt > 0:
-                wait = (2 ** attempt) + random.uniform(0.0, 0.5)
-                log.info(
-                    "Retry %d/%d %s %s (wait=%.2fs)", attempt, self.max_retry - 1, method, path, wait
-                )
-                time.sleep(wait)
+                self.call_stats["retries"] += 1
+                time.sleep(self._backoff_wait(attempt, method, path))
+            if self.limiter is not None:
+                group = self.limiter.group_for(method, path)   # 헤더로 학습한 group (재시도마다 최신)
+                if not self.limiter.acquire_blocking(group, lane):
+                    self.call_stats["rate_limited"] += 1
+                    raise self._rate_limited(group, lane)
+            self.call_stats["attempts"] += 1
 
             try:
                 t0 = time.monotonic()
-                if method == "GET":
-                    headers = self._auth(params)
-                    r = httpx.get(url, params=params, headers=headers, timeout=self.timeout)
-                else:  # POST
-                    headers = self._auth(body)
-                    r = httpx.post(url, json=body, headers=headers, timeout=self.timeout)
-
+                r = self.http.request(method, url, **self._request_kwargs(method, params, body))
                 latency_ms = int((time.monotonic() - t0) * 1000)
-                remaining_req = r.headers.get("remaining-req")
-                http_status = r.status_code
-
-                self._last_call_meta = {
-                    "http_status": http_status,
-                    "remaining_req": remaining_req,
-                    "remaining_req_parsed": parse_remaining_req(remaining_req),
-                    "latency_ms": latency_ms,
-                }
-
-                if r.status_code in _RETRYABLE_STATUS and attempt < self.max_retry - 1:
-                    log.warning(
-                        "Retryable HTTP %d from %s (attempt %d)", r.status_code, path, attempt
-                    )
-                    last_exc = UpbitApiError(
-                        f"HTTP {r.status_code}",
-                        http_status=r.status_code,
-                        remaining_req=remaining_req,
-                    )
+                retry_exc = self._handle_response(r, method, path, attempt, latency_ms)
+                if retry_exc is not None:
+                    last_exc = retry_exc
                     continue
-
-                if r.status_code >= 400:
-                    raise UpbitApiError(
-                        f"HTTP {r.status_code}: {r.text[:300]}",
-                        http_status=r.status_code,
-                        remaining_req=remaining_req,
-                    )
-
                 return r.json()
 
             except UpbitApiError:
@@ -166,13 +298,13 @@ class UpbitRestClient:
                 last_exc = e
                 log.warning("Request error (attempt %d/%d): %s", attempt, self.max_retry - 1, e)
 
-        raise UpbitApiError(f"All {self.max_retry} retries failed: {last_exc}") from last_exc
+        raise self._exhausted(last_exc) from last_exc
 
-    def _get(self, path: str, params: dict | None = None) -> Any:
-        return self._request("GET", path, params=params)
+    def _get(self, path: str, params: dict | None = None, lane: int = LANE_POLL) -> Any:
+        return self._request("GET", path, params=params, lane=lane)
 
     def _post(self, path: str, body: dict) -> Any:
-        return self._request("POST", path, body=body)
+        return self._request("POST", path, body=body, lane=LANE_ORDER)
 
     # ── Public API methods ──────────────────────────────────────
 
@@ -198,13 +330,7 @@ class UpbitRestClient:
         응답은 실제 주문 응답과 동일한 구조이지만 체결되지 않음.
         uuid는 임시값이므로 get_order() 조회 금지.
         """
-        body: dict = {"market": market, "side": side, "ord_type": ord_type}
-        if volume is not None:
-            body["volume"] = str(volume)
-        if price is not None:
-            body["price"] = str(int(price))
-        if identifier is not None:
-            body["identifier"] = identifier
+        body = self._order_body(market, side, volume, price, ord_type, identifier)
         log.info(
             "order_test: market=%s side=%s ord_type=%s volume=%s price=%s",
             market, side, ord_type, volume, price,
@@ -221,19 +347,138 @@ class UpbitRestClient:
         identifier: str | None = None,
     ) -> dict:
         """실제 주문 생성 (LIVE_TRADING_ENABLED=True 시에만 호출)."""
-        body: dict = {"market": market, "side": side, "ord_type": ord_type}
-        if volume is not None:
-            body["volume"] = str(volume)
-        if price is not None:
-            body["price"] = str(int(price))
-        if identifier is not None:
-            body["identifier"] = identifier
+        body = self._order_body(market, side, volume, price, ord_type, identifier)
         return self._post("/v1/orders", body)
 
     def get_order(self, uuid: str) -> dict:
         """개별 주문 조회."""
-        return self._get("/v1/order", {"uuid": uuid})
+        return self._get("/v1/order", {"uuid": uuid}, lane=LANE_ORDER)
 
     def list_open_orders(self, market: str) -> list[dict]:
         """미체결 주문 목록 조회."""
-        return self._get("/v1/orders/open", {"market": market})
+        return self._get("/v1/orders/open", {"market": market}, lane=LANE_ORDER)
+
+
+class AsyncUpbitRestClient(_UpbitRestBase):
+    """UpbitRestClient의 async 버전 — retry / _last_call_meta / UpbitApiError 의미 동일.
+
+    runner가 default executor thread를 blocking I/O와 time.sleep backoff로 점유하지 않도록
+    httpx.AsyncClient + asyncio.sleep 사용. 종료 시 aclose() (또는 async with).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._http: httpx.AsyncClient | None = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(**self._client_kwargs())
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def __aenter__(self) -> AsyncUpbitRestClient:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict | None = None,
+        body: dict | None = None,
+        lane: int = LANE_POLL,
+    ) -> Any:
+        """UpbitRestClient._request와 동일 (backoff는 asyncio.sleep)."""
+        url = f"{self.base_url}{path}"
+        last_exc: Exception | None = None
+        self.call_stats["calls"] += 1
+
+        for attempt in range(self.max_retry):
+            if attempt > 0:
+                self.call_stats["retries"] += 1
+                await asyncio.sleep(self._backoff_wait(attempt, method, path))
+            if self.limiter is not None:
+                group = self.limiter.group_for(method, path)   # 헤더로 학습한 group (재시도마다 최신)
+                if not await self.limiter.acquire(group, lane):
+                    self.call_stats["rate_limited"] += 1
+                    raise self._rate_limited(group, lane)
+            self.call_stats["attempts"] += 1
+
+            try:
+                t0 = time.monotonic()
+                r = await self.http.request(method, url, **self._request_kwargs(method, params, body))
+                latency_ms = int((time.monotonic() - t0) * 1000)
+                retry_exc = self._handle_response(r, method, path, attempt, latency_ms)
+                if retry_exc is not None:
+                    last_exc = retry_exc
+                    continue
+                return r.json()
+
+            except UpbitApiError:
+                raise
+            except Exception as e:
+                last_exc = e
+                log.warning("Request error (attempt %d/%d): %s", attempt, self.max_retry - 1, e)
+
+        raise self._exhausted(last_exc) from last_exc
+
+    async def _get(self, path: str, params: dict | None = None, lane: int = LANE_POLL) -> Any:
+        return await self._request("GET", path, params=params, lane=lane)
+
+    async def _post(self, path: str, body: dict) -> Any:
+        return await self._request("POST", path, body=body, lane=LANE_ORDER)
+
+    # ── Public API methods ──────────────────────────────────────
+
+    async def get_accounts(self) -> list[dict]:
+        """계좌 잔액 전체 조회."""
+        return await self._get("/v1/accounts")
+
+    async def get_orders_chance(self, market: str) -> dict:
+        """주문 가능 정보 조회 (수수료, 잔액 포함)."""
+        return await self._get("/v1/orders/chance", {"market": market})
+
+    async def order_test(
+        self,
+        market: str,
+        side: str,
+        volume: float | None = None,
+        price: float | None = None,
+        ord_type: str = "price",
+        identifier: str | None = None,
+    ) -> dict:
+        """POST /v1/orders/test — dry-run (UpbitRestClient.order_test 참고)."""
+        body = self._order_body(market, side, volume, price, ord_type, identifier)
+        log.info(
+            "order_test: market=%s side=%s ord_type=%s volume=%s price=%s",
+            market, side, ord_type, volume, price,
+        )
+        return await self._post("/v1/orders/test", body)
+
+    async def create_order(
+        self,
+        market: str,
+        side: str,
+        volume: float | None = None,
+        price: float | None = None,
+        ord_type: str = "market",
+        identifier: str | None = None,
+    ) -> dict:
+        """실제 주문 생성 (LIVE_TRADING_ENABLED=True 시에만 호출)."""
+        body = self._order_body(market, side, volume, price, ord_type, identifier)
+        return await self._post("/v1/orders", body)
+
+    async def get_order(self, uuid: str) -> dict:
+        """개별 주문 조회."""
+        return await self._get("/v1/order", {"uuid": uuid}, lane=LANE_ORDER)
+
+    async def list_open_orders(self, market: str) -> list[dict]:
+        """미체결 주문 목록 조회."""
+        return await self._get("/v1/orders/open", {"market": market}, lane=LANE_ORDER)
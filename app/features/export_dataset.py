@@ -12,11 +12,48 @@ export_dataset.py — feature_snapshots → 학습/백테스트용 Dataset 내
 
 옵션:
   --format parquet|csv   (기본 parquet)
-  --label-type direction|binary|continuous  (기본 direction)
+  --label-type direction|binary|continuous|exec  (기본 direction)
     - direction: y = UP/DOWN/NONE (future_return 기준 ±r_t)
     - binary:    y = 1 if future_return > 0 else 0
     - continuous: y = future_return (float)
+    - exec:       evaluator exec_v1과 같은 first-touch 라벨
+                  (market_1s bid high/low 경로, slippage 포함)
+                  y = UP/DOWN/NONE, touch_time_sec, r_h (NONE일 때 horizon 끝 청산 수익률),
+                  exec_return (UP +r_t / DOWN -r_t / NONE r_h), ambig_touch
   --no-label             라벨 없이 피처만 export
+  --chunk-rows N         한 번에 읽고 쓰는 행 수 (기본 ARCHIVE_CHUNK_ROWS)
+
+sharded (parallel) export — hive-partitioned Parquet dataset + manifest:
+  poetry run python -m app.features.export_dataset \\
+    --symbol KRW-BTC,KRW-ETH --start 2026-09-01T00:00:00Z --end 2026-10-01T00:00:00Z \\
+    --dataset-dir ./data/datasets/features_h120 --workers 4 [--shard-hours 24]
+
+  - layout: {dataset-dir}/symbol=KRW-BTC/date=YYYY-MM-DD/part-HH.parquet (HH = shard 시작 시)
+  - shard마다 [shard_start, shard_end + horizon + tolerance] 를 읽어 라벨
+    (경계 행도 단일 export와 동일)
+  - {dataset-dir}/_manifest.json: shard별 rows / dropped / sha256 / source fingerprint
+  - 재실행 시 export 파라미터·source fingerprint(DB count·max(ts), archive 파일 size·mtime)·
+    파일 checksum이 모두 같은 shard는 건너뜀
+
+incremental (append-only) — --dataset-dir + --incremental:
+  poetry run python -m app.features.export_dataset \\
+    --symbol KRW-BTC --dataset-dir ./data/datasets/features_h120 --incremental \\
+    [--start ... (첫 실행)]
+
+  - _manifest.json의 watermarks["{symbol}@{config_id}"] = 라벨까지 확정된 마지막 t0
+    (config_id = export 파라미터 hash — label 설정이 다르면 별도 watermark/dataset)
+  - 실행마다 (watermark, 확정 가능 시각] 만 export해 inc-HHMMSSffffff.parquet 새 파일로 추가
+    확정 가능 시각 = source 최신 ts - label lag
+    (direction류 horizon+tolerance, exec horizon, 라벨 없음 0)
+    → 이전 행의 라벨에 필요한 horizon tail은 그 다음 실행에서 읽히고,
+      이미 쓴 파일은 다시 쓰지 않음
+  - 모든 shard가 끝난 뒤에만 watermark 전진 (중단 시 같은 경로로 다시 export)
+
+streaming:
+  - feature_snapshots를 [start, end+horizon+tolerance] 구간 한 번만 읽는다
+    (server-side cursor chunk)
+  - 라벨용 미래 행은 chunk 사이에 horizon+tolerance 만큼만 carry buffer로 넘김
+  - parquet은 chunk마다 row group으로 바로 기록 → 메모리 ≈ chunk + horizon window
 
 누수 방지:
   - 피처는 모두 t0 이하 값 (DB에서 ts <= t0 쿼리로 보장)
@@ -26,14 +63,24 @@ export_dataset.py — feature_snapshots → 학습/백테스트용 Dataset 내
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import sys
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
+from app.backtest.data import to_ns
 from app.config import load_settings
+from app.db.archive import _require_pyarrow, archived_days, day_path, iter_range, read_range
+from app.db.session import get_engine
 
 
 def _parse_dt(s: str) -> datetime:
@@ -46,36 +93,68 @@ def _parse_dt(s: str) -> datetime:
     return dt
 
 
+_FEATURE_COLUMNS = [
+    "ts", "symbol",
+    "mid_krw", "spread_bps", "imb_notional_top5",
+    "r_t", "r_min_eff", "cost_roundtrip_est",
+    "sigma_1s", "sigma_h", "k_vol_eff", "barrier_status",
+    "p_up", "p_down", "p_none", "ev", "ev_rate", "action_hat", "model_version",
+    "bin_mark_price", "bin_index_price", "bin_funding_rate", "bin_mark_index_basis",
+    "oi_value", "global_ls_ratio", "taker_ls_ratio", "basis_value",
+    "liq_5m_notional", "liq_5m_count",
+    "bin_mark_ts", "oi_ts", "liq_last_ts",
+]
+_TS_COLUMNS = {"ts", "bin_mark_ts", "oi_ts", "liq_last_ts"}
+_STR_COLUMNS = {"symbol", "barrier_status", "action_hat", "model_version", "y"}
+_INT_COLUMNS = {"liq_5m_count"}
+_BOOL_COLUMNS = {"ambig_touch"}
+_LABEL_TYPES = ["direction", "binary", "continuous", "exec"]
+
+# exec 라벨 — evaluator._evaluate_one과 같은 입력/규칙
+_EXEC_MARKET_COLUMNS = [
+    "ts", "bid_high_1s", "bid_low_1s", "bid_close_1s", "bid", "ask_close_1s", "ask",
+]
+_EXEC_ENTRY_STALE_SEC = 5.0
+_EXEC_BLOCK_ROWS = 20_000
+_NS = 1_000_000_000
+_LABEL_TOLERANCE_SEC = 5
+_MANIFEST = "_manifest.json"
+_MANIFEST_VERSION = 1
+
+_SQL_MAX_TS = """
+SELECT max(ts) AS max_ts FROM {table} WHERE symbol = :symbol
+"""
+
+_SQL_SOURCE_FP = """
+SELECT count(*) AS n, max(ts) AS max_ts FROM {table}
+WHERE symbol = :symbol AND ts >= :start AND ts <= :end
+"""
+
+
 def load_feature_snapshots(
     engine,
     symbol: str,
     start: datetime,
     end: datetime,
 ) -> pd.DataFrame:
-    """feature_snapshots를 시간 범위로 로딩."""
-    with engine.connect() as conn:
-        df = pd.read_sql_query(
-            text("""
-                SELECT
-                    ts, symbol,
-                    mid_krw, spread_bps, imb_notional_top5,
-                    r_t, r_min_eff, cost_roundtrip_est,
-                    sigma_1s, sigma_h, k_vol_eff, barrier_status,
-                    p_up, p_down, p_none, ev, ev_rate, action_hat, model_version,
-                    bin_mark_price, bin_index_price, bin_funding_rate, bin_mark_index_basis,
-                    oi_value, global_ls_ratio, taker_ls_ratio, basis_value,
-                    liq_5m_notional, liq_5m_count,
-                    bin_mark_ts, oi_ts, liq_last_ts
-                FROM feature_snapshots
-                WHERE symbol = :sym
-                  AND ts >= :start
-                  AND ts <= :end
-                ORDER BY ts ASC
-            """),
-            conn,
-            params={"sym": symbol, "start": start, "end": end},
-        )
-    return df
+    """feature_snapshots를 시간 범위로 로딩 (ARCHIVE_DIR의 Parquet 보관분 + DB)."""
+    return read_range(
+        engine, "feature_snapshots", start, end, symbol=symbol, columns=_FEATURE_COLUMNS
+    )
+
+
+def iter_feature_snapshots(
+    engine,
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    chunk_rows: int = 50_000,
+) -> Iterator[pd.DataFrame]:
+    """load_feature_snapshots의 chunk 버전 (ts 오름차순)."""
+    return iter_range(
+        engine, "feature_snapshots", start, end,
+        symbol=symbol, columns=_FEATURE_COLUMNS, chunk_rows=chunk_rows,
+    )
 
 
 def create_labels(
@@ -144,29 +223,638 @@ def create_labels(
     return merged, dropped
 
 
+def _num(df: pd.DataFrame, col: str) -> np.ndarray:
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+
+
+def create_exec_labels(
+    df_features: pd.DataFrame,
+    df_market: pd.DataFrame,
+    horizon_sec: int,
+    slippage_bps: float,
+    block_rows: int = _EXEC_BLOCK_ROWS,
+) -> tuple[pd.DataFrame, int]:
+    """evaluator exec_v1 first-touch 라벨을 전체 행에 대해 vectorized로 계산.
+
+    df_market: market_1s [min(ts)-5s, max(ts)+horizon] (_EXEC_MARKET_COLUMNS, ts 오름차순).
+    - entry: ts <= t0 최신 bar (5초 초과 stale이면 제외), ask_close_1s(없으면 ask) × (1+slip)
+    - barrier: entry × (1 ± r_t)
+    - touch: ts ∈ (t0, t0+h] bar를 순서대로 bid_high/low × (1-slip) 비교, 첫 touch bar
+      (같은 bar에서 둘 다면 DOWN, ambig_touch=True), touch_time_sec = bar ts - t0 - 0.5
+    - NONE: ts <= t0+h 최신 bar의 bid_close_1s(없으면 bid) × (1-slip)로 r_h
+    evaluator가 건너뛰는 행 (entry 없음/stale/ask 없음/horizon bar 없음)은 제거하고 dropped로 센다.
+    """
+    slip = slippage_bps / 10000.0
+    feat = df_features.sort_values("ts").reset_index(drop=True)
+    t0 = to_ns(feat["ts"])
+    r_t = feat["r_t"].fillna(0.001).to_numpy(dtype=np.float64)
+    h_ns = horizon_sec * _NS
+
+    mts = to_ns(df_market["ts"]) if len(df_market) else np.empty(0, dtype=np.int64)
+    ask_close = _num(df_market, "ask_close_1s")
+    ask = np.where(~np.isnan(ask_close), ask_close, _num(df_market, "ask"))
+    bid_close = _num(df_market, "bid_close_1s")
+    bid_end = np.where(~np.isnan(bid_close), bid_close, _num(df_market, "bid"))
+    high = _num(df_market, "bid_high_1s")
+    low = _num(df_market, "bid_low_1s")
+    n_m = len(mts)
+
+    # (1)(2) entry
+    j0 = np.searchsorted(mts, t0, side="right") - 1
+    j0c = np.clip(j0, 0, max(n_m - 1, 0))
+    has_entry = (j0 >= 0) & (n_m > 0)
+    stale = has_entry & ((t0 - (mts[j0c] if n_m else 0)) / _NS > _EXEC_ENTRY_STALE_SEC)
+    ask0 = np.where(has_entry, ask[j0c] if n_m else np.nan, np.nan)
+    ok = has_entry & ~stale & ~np.isnan(ask0) & (ask0 > 0)
+    entry = ask0 * (1 + slip)
+    u_exec = entry * (1 + r_t)
+    d_exec = entry * (1 - r_t)
+
+    # (4) horizon bar 범위 [a, b)
+    a = np.searchsorted(mts, t0, side="right")
+    b = np.searchsorted(mts, t0 + h_ns, side="right")
+    ok &= b > a
+
+    n = len(feat)
+    hit = np.full(n, -1, dtype=np.int64)   # 첫 touch bar index
+    hit_dn = np.zeros(n, dtype=bool)
+    hit_up = np.zeros(n, dtype=bool)
+    if n_m:
+        # NaN(bar 없음) 비교는 False → evaluator의 continue와 같음
+        exec_high = high * (1 - slip)
+        exec_low = low * (1 - slip)
+        skip = np.isnan(high) | np.isnan(low)
+        for lo_i in range(0, n, max(1, block_rows)):
+            sl = slice(lo_i, min(n, lo_i + block_rows))
+            width = int((b[sl] - a[sl]).max(initial=0))
+            if width == 0:
+                continue
+            idx = a[sl, None] + np.arange(width)[None, :]
+            inside = idx < b[sl, None]
+            idx = np.minimum(idx, n_m - 1)
+            valid = inside & ~skip[idx]
+            with np.errstate(invalid="ignore"):
+                up = valid & (exec_high[idx] >= u_exec[sl, None])
+                dn = valid & (exec_low[idx] <= d_exec[sl, None])
+            any_hit = up | dn
+            first = np.argmax(any_hit, axis=1)
+            found = any_hit[np.arange(len(first)), first]
+            rows = np.arange(sl.start, sl.stop)
+            hit[rows[found]] = idx[found, first[found]]
+            hit_dn[rows[found]] = dn[found, first[found]]
+            hit_up[rows[found]] = up[found, first[found]]
+
+    touched = ok & (hit >= 0)
+    direction = np.where(touched, np.where(hit_dn, "DOWN", "UP"), "NONE").astype(object)
+    hit_ts = mts[np.clip(hit, 0, max(n_m - 1, 0))] if n_m else np.zeros(n, dtype=np.int64)
+    touch_time = np.where(touched, np.maximum(0.0, (hit_ts - t0) / _NS - 0.5), np.nan)
+
+    # (6) NONE → r_h
+    jh = np.searchsorted(mts, t0 + h_ns, side="right") - 1
+    exit_bid = np.where(
+        jh >= 0, bid_end[np.clip(jh, 0, max(n_m - 1, 0))] if n_m else np.nan, np.nan
+    )
+    with np.errstate(invalid="ignore"):
+        has_exit = ~touched & ~np.isnan(exit_bid) & (exit_bid > 0)
+        r_h = np.where(has_exit, (exit_bid * (1 - slip) - entry) / entry, np.nan)
+    exec_return = np.where(touched, np.where(hit_dn, -r_t, r_t), r_h)
+
+    out = feat.copy()
+    out["y"] = direction
+    out["touch_time_sec"] = touch_time
+    out["r_h"] = r_h
+    out["exec_return"] = exec_return
+    out["ambig_touch"] = touched & hit_dn & hit_up
+    out = out[ok].reset_index(drop=True)
+    return out, int(n - ok.sum())
+
+
+def iter_labeled(
+    chunks: Iterable[pd.DataFrame],
+    end: datetime,
+    horizon_sec: int,
+    label_type: str,
+    tolerance_sec: int = _LABEL_TOLERANCE_SEC,
+) -> Iterator[tuple[pd.DataFrame, int]]:
+    """ts 오름차순 chunk stream → (라벨 붙은 행, dropped) — create_labels와 같은 결과.
+
+    chunks는 [start, end + horizon + tolerance] 구간. 피처 행 t의 매칭 후보는
+    [t+h-tol, t+h+tol]이므로 buffer 마지막 ts가 t+h+tol 이상이면 확정 → 라벨링 후 내보내고,
+    미확정 행부터(후보 구간 포함)만 다음 chunk로 carry. ts > end 행은 미래값으로만 쓰인다.
+    """
+    end_ts = pd.Timestamp(end)
+    reach = pd.Timedelta(seconds=horizon_sec + tolerance_sec)
+    back = pd.Timedelta(seconds=horizon_sec - tolerance_sec)
+    buf: pd.DataFrame | None = None
+
+    def _label(rows: pd.DataFrame, fut: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+        rows = rows[rows["ts"] <= end_ts]
+        if rows.empty:
+            return rows, 0
+        return create_labels(rows, fut, horizon_sec, label_type, tolerance_sec)
+
+    done = 0   # buf 앞쪽의 이미 라벨링된 행 수 (미래값 후보로만 carry)
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        buf = chunk if buf is None else pd.concat([buf, chunk], ignore_index=True)
+        last = buf["ts"].iloc[-1]
+        n_ready = int(((buf["ts"] + reach) <= last).sum())   # ts 오름차순 → 앞쪽 prefix
+        if n_ready <= done:
+            continue
+        out, dropped = _label(buf.iloc[done:n_ready], buf)
+        if not out.empty or dropped:
+            yield out, dropped
+        if n_ready < len(buf):
+            first = buf["ts"].iloc[n_ready]
+            keep = buf["ts"] >= min(first, first + back)
+        else:
+            keep = buf["ts"] > last   # 전부 확정 — 비움
+        done = n_ready - int((~keep).sum())
+        buf = buf[keep].reset_index(drop=True)
+
+    if buf is not None and len(buf) > done:
+        # stream 끝: 남은 행은 가진 미래값으로 라벨 (create_labels 전체 실행과 동일)
+        out, dropped = _label(buf.iloc[done:], buf)
+        if not out.empty or dropped:
+            yield out, dropped
+
+
+class DatasetWriter:
+    """chunk 단위 append writer — parquet은 chunk마다 row group, csv는 header 1회.
+
+    parquet schema는 첫 chunk 컬럼 기준으로 고정 (chunk마다 dtype 추론이 달라지지 않도록
+    ts류=timestamp, 문자열 컬럼=string, 나머지=float64).
+    """
+
+    def __init__(self, path: Path, fmt: str, label_type: str | None = None) -> None:
+        self.path = path
+        self.fmt = fmt
+        self.label_type = label_type
+        self.rows = 0
+        self.columns: list[str] = []
+        self._pq_writer = None
+        self._schema = None
+        self._tmp = path.with_name(path.name + ".tmp")
+
+    def _arrow_schema(self, columns: list[str]):
+        pa, _ = _require_pyarrow()
+        fields = []
+        for c in columns:
+            if c in _TS_COLUMNS:
+                t = pa.timestamp("us", tz="UTC")
+            elif c == "y" and self.label_type == "binary":
+                t = pa.int64()
+            elif c == "y" and self.label_type == "continuous":
+                t = pa.float64()
+            elif c in _STR_COLUMNS:
+                t = pa.string()
+            elif c in _INT_COLUMNS:
+                t = pa.int64()
+            elif c in _BOOL_COLUMNS:
+                t = pa.bool_()
+            else:
+                t = pa.float64()
+            fields.append(pa.field(c, t))
+        return pa.schema(fields)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        if not self.columns:
+            self.columns = list(df.columns)
+        df = df[self.columns]
+        if self.fmt == "parquet":
+            pa, pq = _require_pyarrow()
+            if self._pq_writer is None:
+                self._schema = self._arrow_schema(self.columns)
+                self._pq_writer = pq.ParquetWriter(self._tmp, self._schema, compression="zstd")
+            self._pq_writer.write_table(
+                pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            )
+        else:
+            df.to_csv(self._tmp, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+        if self._tmp.exists():
+            self._tmp.replace(self.path)
+
+    def abort(self) -> None:
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+def export_stream(
+    engine,
+    writer: DatasetWriter,
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    horizon_sec: int,
+    label_type: str | None,
+    chunk_rows: int,
+    slippage_bps: float = 0.0,
+) -> tuple[int, Counter]:
+    """[start, end] 피처(+라벨)를 writer로 streaming. label_type None이면 라벨 없음.
+
+    returns (dropped, y 분포).
+
+    exec 라벨은 chunk마다 market_1s [chunk 시작-5s, chunk 끝+horizon] 경로를 읽어 붙인다.
+    """
+    dropped = 0
+    dist: Counter = Counter()
+    if label_type is None:
+        for chunk in iter_feature_snapshots(engine, symbol, start, end, chunk_rows):
+            writer.write(chunk)
+        return dropped, dist
+    if label_type == "exec":
+        for chunk in iter_feature_snapshots(engine, symbol, start, end, chunk_rows):
+            if chunk.empty:
+                continue
+            market = read_range(
+                engine, "market_1s",
+                chunk["ts"].iloc[0].to_pydatetime() - timedelta(seconds=_EXEC_ENTRY_STALE_SEC),
+                chunk["ts"].iloc[-1].to_pydatetime() + timedelta(seconds=horizon_sec),
+                symbol=symbol, columns=_EXEC_MARKET_COLUMNS,
+            )
+            df_out, n_dropped = create_exec_labels(chunk, market, horizon_sec, slippage_bps)
+            dropped += n_dropped
+            dist.update(df_out["y"].value_counts().to_dict())
+            writer.write(df_out)
+        return dropped, dist
+    read_end = end + timedelta(seconds=horizon_sec + _LABEL_TOLERANCE_SEC)
+    chunks = iter_feature_snapshots(engine, symbol, start, read_end, chunk_rows)
+    for df_out, n_dropped in iter_labeled(chunks, end, horizon_sec, label_type):
+        dropped += n_dropped
+        if label_type == "direction":
+            dist.update(df_out["y"].value_counts().to_dict())
+        writer.write(df_out)
+    return dropped, dist
+
+
+# ---------------------------------------------------------------------------
+# sharded export
+# ---------------------------------------------------------------------------
+
+def plan_shards(
+    symbols: list[str], start: datetime, end: datetime, shard_hours: int, incremental: bool = False,
+) -> list[dict]:
+    """symbol × UTC 시간 shard. 각 shard는 [start, end] (end 포함, 다음 shard 직전까지).
+
+    incremental이면 파일명이 shard 실제 시작 시각 (inc-HHMMSSffffff) — 실행마다 새 파일로 추가된다.
+    """
+    if shard_hours <= 0 or 24 % shard_hours:
+        raise ValueError(f"shard_hours must divide 24: {shard_hours}")
+    step = timedelta(hours=shard_hours)
+    t = start.astimezone(timezone.utc)
+    t = t.replace(hour=t.hour - t.hour % shard_hours, minute=0, second=0, microsecond=0)
+    shards = []
+    while t <= end:
+        s_start, s_end = max(t, start), min(t + step - timedelta(microseconds=1), end)
+        for sym in symbols:
+            shards.append({
+                "symbol": sym,
+                "start": s_start,
+                "end": s_end,
+                "path": (
+                    f"symbol={sym}/date={t:%Y-%m-%d}/inc-{s_start:%H%M%S%f}.parquet" if incremental
+                    else f"symbol={sym}/date={t:%Y-%m-%d}/part-{t:%H}.parquet"
+                ),
+            })
+        t += step
+    return shards
+
+
+def source_fingerprint(
+    engine, symbol: str, start: datetime, end: datetime, archive_root: str = "",
+    table: str = "feature_snapshots",
+) -> dict:
+    """shard 입력 구간 [start, end]의 변경 감지용.
+
+    DB count/max(ts) + 겹치는 archive 파일 size/mtime.
+    """
+    if table not in ("feature_snapshots", "market_1s"):
+        raise ValueError(f"unsupported fingerprint table: {table}")
+    with engine.connect() as conn:
+        row = conn.execute(
+            text(_SQL_SOURCE_FP.format(table=table)),
+            {"symbol": symbol, "start": start, "end": end},
+        ).one()
+    fp = {"db_rows": int(row.n), "db_max_ts": str(row.max_ts) if row.max_ts is not None else None}
+    if archive_root:
+        done = archived_days(archive_root, table)
+        d, files = start.astimezone(timezone.utc).date(), []
+        while d <= end.astimezone(timezone.utc).date():
+            if d in done:
+                st = day_path(archive_root, table, d).stat()
+                files.append([d.isoformat(), st.st_size, st.st_mtime_ns])
+            d += timedelta(days=1)
+        if files:
+            fp["archive"] = files
+    return fp
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(root: Path) -> dict:
+    p = root / _MANIFEST
+    if not p.is_file():
+        return {}
+    return json.loads(p.read_text())
+
+
+def write_manifest(root: Path, manifest: dict) -> None:
+    p = root / _MANIFEST
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True, default=str))
+    os.replace(tmp, p)
+
+
+def _shard_unchanged(root: Path, prev: dict | None, fp: dict) -> bool:
+    if not prev or prev.get("source") != fp:
+        return False
+    if prev["rows"] == 0:
+        return not (root / prev["path"]).exists()
+    out = root / prev["path"]
+    return out.is_file() and file_sha256(out) == prev.get("sha256")
+
+
+_W: dict = {}
+
+
+def _init_worker(root: str, horizon_sec: int, label_type: str | None, chunk_rows: int) -> None:
+    s = load_settings()
+    _W.update(
+        engine=get_engine(s, "export_dataset", pool_size=1, statement_timeout_ms=0),
+        archive_root=s.ARCHIVE_DIR,
+        slippage_bps=s.SLIPPAGE_BPS,
+        root=Path(root),
+        horizon_sec=horizon_sec,
+        label_type=label_type,
+        chunk_rows=chunk_rows,
+    )
+
+
+def _export_shard(task: dict) -> dict:
+    """shard 1개 export (worker process). task = plan_shards 항목 + prev(manifest entry)."""
+    root, engine = _W["root"], _W["engine"]
+    h, label_type = _W["horizon_sec"], _W["label_type"]
+    if label_type == "exec":
+        # 피처는 shard 구간만, 라벨 경로는 market_1s
+        fp = source_fingerprint(
+            engine, task["symbol"], task["start"], task["end"], _W["archive_root"]
+        )
+        fp["market_1s"] = source_fingerprint(
+            engine, task["symbol"], task["start"] - timedelta(seconds=_EXEC_ENTRY_STALE_SEC),
+            task["end"] + timedelta(seconds=h), _W["archive_root"], table="market_1s",
+        )
+    else:
+        read_end = task["end"]
+        if label_type is not None:
+            read_end += timedelta(seconds=h + _LABEL_TOLERANCE_SEC)
+        fp = source_fingerprint(engine, task["symbol"], task["start"], read_end, _W["archive_root"])
+    if _shard_unchanged(root, task.get("prev"), fp):
+        return {**task["prev"], "skipped": True}
+
+    out = root / task["path"]
+    out.parent.mkdir(parents=True, exist_ok=True)
+    writer = DatasetWriter(out, "parquet", label_type)
+    try:
+        dropped, _ = export_stream(
+            engine, writer, task["symbol"], task["start"], task["end"], h, label_type,
+            _W["chunk_rows"], _W["slippage_bps"],
+        )
+    except BaseException:
+        writer.abort()
+        raise
+    if writer.rows:
+        writer.close()
+        sha = file_sha256(out)
+    else:
+        writer.abort()
+        out.unlink(missing_ok=True)   # 예전에 행이 있던 shard
+        sha = None
+    return {
+        "path": task["path"],
+        "symbol": task["symbol"],
+        "start": task["start"].isoformat(),
+        "end": task["end"].isoformat(),
+        "rows": writer.rows,
+        "dropped": dropped,
+        "sha256": sha,
+        "source": fp,
+        "skipped": False,
+    }
+
+
+def _dataset_params(horizon_sec: int, label_type: str | None) -> dict:
+    return {
+        "version": _MANIFEST_VERSION,
+        "horizon_sec": horizon_sec,
+        "label_type": label_type,
+        "tolerance_sec": _LABEL_TOLERANCE_SEC,
+        "slippage_bps": load_settings().SLIPPAGE_BPS if label_type == "exec" else None,
+        "columns": _FEATURE_COLUMNS,
+    }
+
+
+def _run_shards(
+    root: Path, manifest: dict, tasks: list[dict], initargs: tuple, workers: int,
+) -> list[dict]:
+    """tasks → worker pool. shard 완료마다 manifest 기록 (중단 후 재실행 시 이어서)."""
+    prev = manifest["shards"]
+    results = []
+
+    def _done(entry: dict) -> None:
+        results.append(entry)
+        prev[entry["path"]] = {k: v for k, v in entry.items() if k != "skipped"}
+        write_manifest(root, manifest)
+        tag = "skip" if entry["skipped"] else "ok"
+        print(f"  [{tag:>4}] {entry['path']}: {entry['rows']} rows ({entry['dropped']} dropped)")
+
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(*initargs)
+        for t in tasks:
+            _done(_export_shard(t))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=initargs,
+        ) as pool:
+            for fut in as_completed([pool.submit(_export_shard, t) for t in tasks]):
+                _done(fut.result())
+    return sorted(results, key=lambda e: e["path"])
+
+
+def export_sharded(
+    root: Path,
+    symbols: list[str],
+    start: datetime,
+    end: datetime,
+    horizon_sec: int,
+    label_type: str | None,
+    chunk_rows: int,
+    shard_hours: int = 24,
+    workers: int = 4,
+) -> list[dict]:
+    """plan_shards → worker pool → manifest 갱신. 변경 없는 shard는 건너뜀."""
+    root.mkdir(parents=True, exist_ok=True)
+    params = _dataset_params(horizon_sec, label_type)
+    manifest = load_manifest(root)
+    if manifest.get("params") != params:
+        if "watermarks" in manifest:
+            raise ValueError(
+                f"{root} is an incremental dataset — use --incremental or a new --dataset-dir"
+            )
+        manifest = {"params": params, "shards": {}}   # 파라미터가 바뀌면 전부 다시
+    prev = manifest["shards"]
+    tasks = [
+        {**t, "prev": prev.get(t["path"])}
+        for t in plan_shards(symbols, start, end, shard_hours)
+    ]
+    initargs = (str(root), horizon_sec, label_type, chunk_rows)
+    return _run_shards(root, manifest, tasks, initargs, workers)
+
+
+def label_lag_sec(label_type: str | None, horizon_sec: int) -> int:
+    """t0 행의 라벨 확정에 필요한 source 데이터 여유 (t0 + lag 까지 있어야 함)."""
+    if label_type is None:
+        return 0
+    if label_type == "exec":
+        return horizon_sec
+    return horizon_sec + _LABEL_TOLERANCE_SEC
+
+
+def finalized_until(
+    engine, symbol: str, label_type: str | None, horizon_sec: int,
+) -> datetime | None:
+    """라벨까지 확정해 export할 수 있는 마지막 t0 = source 최신 ts - label lag."""
+    tables = ["feature_snapshots"] + (["market_1s"] if label_type == "exec" else [])
+    latest = []
+    with engine.connect() as conn:
+        for table in tables:
+            v = conn.execute(text(_SQL_MAX_TS.format(table=table)), {"symbol": symbol}).scalar()
+            if v is None:
+                return None
+            latest.append(pd.to_datetime(v, utc=True).to_pydatetime())
+    lag = timedelta(seconds=label_lag_sec(label_type, horizon_sec))
+    if label_type == "exec":
+        return min(latest[0], latest[1] - lag)
+    return latest[0] - lag
+
+
+def export_incremental(
+    root: Path,
+    symbols: list[str],
+    horizon_sec: int,
+    label_type: str | None,
+    chunk_rows: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    shard_hours: int = 24,
+    workers: int = 4,
+) -> tuple[list[dict], dict]:
+    """watermark 이후 확정 가능한 구간만 새 파일로 추가. (shard 결과, {symbol: (from, to)})."""
+    root.mkdir(parents=True, exist_ok=True)
+    params = {**_dataset_params(horizon_sec, label_type), "mode": "incremental"}
+    config_id = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+    manifest = load_manifest(root)
+    if manifest and manifest.get("params") != params and manifest.get("shards"):
+        raise ValueError(f"{root} holds a different export config/mode — use a new --dataset-dir")
+    manifest = {
+        "params": params,
+        "shards": manifest.get("shards", {}),
+        "watermarks": manifest.get("watermarks", {}),
+    }
+
+    engine = get_engine(load_settings(), "export_dataset", pool_size=1)
+    plans: dict[str, tuple[datetime, datetime]] = {}
+    tasks: list[dict] = []
+    for sym in symbols:
+        wm = manifest["watermarks"].get(f"{sym}@{config_id}")
+        lo = _parse_dt(wm) + timedelta(microseconds=1) if wm else start
+        if lo is None:
+            raise ValueError(
+                f"{sym}: no watermark yet — --start is required for the first incremental run"
+            )
+        hi = finalized_until(engine, sym, label_type, horizon_sec)
+        if hi is not None and end is not None:
+            hi = min(hi, end)
+        if hi is None or lo > hi:
+            print(f"  {sym}: up to date (watermark={wm or '-'})")
+            continue
+        plans[sym] = (lo, hi)
+        tasks += [
+            {**t, "prev": None}
+            for t in plan_shards([sym], lo, hi, shard_hours, incremental=True)
+        ]
+    engine.dispose()
+
+    initargs = (str(root), horizon_sec, label_type, chunk_rows)
+    results = _run_shards(root, manifest, tasks, initargs, workers)
+    for sym, (_, hi) in plans.items():
+        manifest["watermarks"][f"{sym}@{config_id}"] = hi.isoformat()
+    write_manifest(root, manifest)
+    return results, plans
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="feature_snapshots → 학습용 Dataset export")
     parser.add_argument("--symbol", default="KRW-BTC", help="심볼 (기본 KRW-BTC)")
-    parser.add_argument("--start", required=True, help="시작 시각 (ISO8601, UTC)")
-    parser.add_argument("--end", required=True, help="종료 시각 (ISO8601, UTC)")
+    parser.add_argument(
+        "--start", default=None, help="시작 시각 (ISO8601, UTC; --incremental은 첫 실행만)"
+    )
+    parser.add_argument(
+        "--end", default=None, help="종료 시각 (ISO8601, UTC; --incremental은 상한, 기본 없음)"
+    )
     parser.add_argument("--horizon-sec", type=int, default=120, help="라벨 horizon(초, 기본 120)")
-    parser.add_argument("--out", required=True, help="출력 파일 경로")
+    dest = parser.add_mutually_exclusive_group(required=True)
+    dest.add_argument("--out", help="출력 파일 경로 (단일 파일)")
+    dest.add_argument(
+        "--dataset-dir", help="sharded export: hive-partitioned Parquet dataset 디렉터리"
+    )
     parser.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="출력 형식")
-    parser.add_argument("--label-type", choices=["direction", "binary", "continuous"],
+    parser.add_argument("--label-type", choices=_LABEL_TYPES,
                         default="direction", help="라벨 타입")
     parser.add_argument("--no-label", action="store_true", help="라벨 없이 피처만 export")
+    parser.add_argument("--chunk-rows", type=int, default=0,
+                        help="streaming chunk 크기 (기본 ARCHIVE_CHUNK_ROWS)")
+    parser.add_argument("--workers", type=int, default=4, help="sharded export worker process 수")
+    parser.add_argument("--shard-hours", type=int, default=24, help="shard 길이(시간, 24의 약수)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="--dataset-dir에 watermark 이후 확정된 행만 새 파일로 추가")
     args = parser.parse_args()
 
-    start_dt = _parse_dt(args.start)
-    end_dt = _parse_dt(args.end)
+    s = load_settings()
+    chunk_rows = args.chunk_rows or s.ARCHIVE_CHUNK_ROWS
+    label_type = None if args.no_label else args.label_type
+    start_dt = _parse_dt(args.start) if args.start else None
+    end_dt = _parse_dt(args.end) if args.end else None
     horizon_sec = args.horizon_sec
 
+    if args.incremental:
+        if not args.dataset_dir:
+            print("ERROR: --incremental requires --dataset-dir")
+            return 1
+        return _main_incremental(args, start_dt, end_dt, label_type, chunk_rows)
+    if start_dt is None or end_dt is None:
+        print("ERROR: --start and --end are required")
+        return 1
     if start_dt >= end_dt:
         print("ERROR: --start must be before --end")
         return 1
-
-    s = load_settings()
-    engine = create_engine(s.DB_URL)
+    if args.dataset_dir:
+        return _main_sharded(args, start_dt, end_dt, label_type, chunk_rows)
+    engine = get_engine(s, "export_dataset", pool_size=2, statement_timeout_ms=0)
 
     print("=" * 60)
     print("  export_dataset")
@@ -176,55 +864,128 @@ def main() -> int:
     print(f"  horizon_sec = {horizon_sec}s")
     print(f"  label_type  = {'none' if args.no_label else args.label_type}")
     print(f"  format      = {args.format}")
+    print(f"  chunk_rows  = {chunk_rows}")
     print(f"  out         = {args.out}")
     print("=" * 60)
 
-    # 피처 로딩 (기간 내)
-    print("Loading feature_snapshots...")
-    df_features = load_feature_snapshots(engine, args.symbol, start_dt, end_dt)
-    print(f"  Loaded {len(df_features)} feature rows")
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = DatasetWriter(out_path, args.format, label_type)
+
+    # 피처 + 라벨용 미래 행을 한 번에 streaming (end + horizon + tolerance)
+    print(f"Streaming feature_snapshots → {out_path}...")
+    try:
+        dropped, dist = export_stream(
+            engine, writer, args.symbol, start_dt, end_dt, horizon_sec, label_type, chunk_rows,
+            s.SLIPPAGE_BPS,
+        )
+    except BaseException:
+        writer.abort()
+        raise
+
+    if writer.rows == 0:
+        writer.abort()
+        if args.no_label or dropped == 0:
+            print("ERROR: No feature_snapshots data in the given range")
+        else:
+            print(f"ERROR: No future data available for label creation ({dropped} rows dropped)")
+        return 1
+    writer.close()
 
-    if df_features.empty:
-        print("ERROR: No feature_snapshots data in the given range")
+    if not args.no_label:
+        reason = "no entry/horizon bar" if label_type == "exec" else "no future match"
+        print(f"  Label created: {writer.rows} rows ({dropped} dropped — {reason})")
+        if args.label_type in ("direction", "exec"):
+            print(f"  Label distribution: {dict(dist)}")
+
+    size_kb = out_path.stat().st_size / 1024
+    cols = writer.columns
+    print(f"  Written: {writer.rows} rows, {len(cols)} cols, {size_kb:.1f} KB")
+    print(f"  Columns: {cols[:10]}{'...' if len(cols) > 10 else ''}")
+    print("=" * 60)
+    print("DONE ✅")
+    return 0
+
+
+def _main_sharded(
+    args, start_dt: datetime, end_dt: datetime, label_type: str | None, chunk_rows: int,
+) -> int:
+    if args.format != "parquet":
+        print("ERROR: --dataset-dir supports --format parquet only")
         return 1
+    symbols = [x.strip() for x in args.symbol.split(",") if x.strip()]
+    root = Path(args.dataset_dir)
 
-    if args.no_label:
-        df_out = df_features
-        dropped = 0
-    else:
-        # 라벨용 미래 데이터 로딩 (end + horizon + tolerance)
-        future_end = end_dt + timedelta(seconds=horizon_sec + 10)
-        print(f"Loading future snapshots up to {future_end.isoformat()}...")
-        df_future = load_feature_snapshots(engine, args.symbol, start_dt, future_end)
-        print(f"  Loaded {len(df_future)} rows for label matching")
-
-        if df_future.empty:
-            print("ERROR: No future data available for label creation")
-            return 1
+    print("=" * 60)
+    print("  export_dataset (sharded)")
+    print(f"  symbols     = {symbols}")
+    print(f"  start       = {start_dt.isoformat()}")
+    print(f"  end         = {end_dt.isoformat()}")
+    print(f"  horizon_sec = {args.horizon_sec}s")
+    print(f"  label_type  = {label_type or 'none'}")
+    print(f"  shard_hours = {args.shard_hours}")
+    print(f"  workers     = {args.workers}")
+    print(f"  dataset_dir = {root}")
+    print("=" * 60)
 
-        print("Creating labels...")
-        df_out, dropped = create_labels(
-            df_features, df_future, horizon_sec, args.label_type
+    try:
+        results = export_sharded(
+            root, symbols, start_dt, end_dt, args.horizon_sec, label_type, chunk_rows,
+            shard_hours=args.shard_hours, workers=args.workers,
         )
-        print(f"  Label created: {len(df_out)} rows ({dropped} dropped — no future match)")
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    rows = sum(e["rows"] for e in results)
+    skipped = sum(1 for e in results if e["skipped"])
+    print("-" * 60)
+    print(f"  shards: {len(results)} ({skipped} unchanged, {len(results) - skipped} exported)")
+    print(f"  rows:   {rows} ({sum(e['dropped'] for e in results)} dropped — no label)")
+    print(f"  manifest: {root / _MANIFEST}")
+    print("=" * 60)
+    if rows == 0:
+        print("ERROR: No feature_snapshots data in the given range")
+        return 1
+    print("DONE ✅")
+    return 0
 
-        if args.label_type == "direction":
-            dist = df_out["y"].value_counts()
-            print(f"  Label distribution: {dist.to_dict()}")
 
-    # 출력 경로 생성
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+def _main_incremental(
+    args, start_dt: datetime | None, end_dt: datetime | None, label_type: str | None,
+    chunk_rows: int,
+) -> int:
+    if args.format != "parquet":
+        print("ERROR: --incremental supports --format parquet only")
+        return 1
+    symbols = [x.strip() for x in args.symbol.split(",") if x.strip()]
+    root = Path(args.dataset_dir)
 
-    print(f"Writing {args.format} to {out_path}...")
-    if args.format == "parquet":
-        df_out.to_parquet(out_path, index=False)
-    else:
-        df_out.to_csv(out_path, index=False)
+    print("=" * 60)
+    print("  export_dataset (incremental)")
+    print(f"  symbols     = {symbols}")
+    print(f"  horizon_sec = {args.horizon_sec}s")
+    lag = label_lag_sec(label_type, args.horizon_sec)
+    print(f"  label_type  = {label_type or 'none'}  (label lag {lag}s)")
+    print(f"  dataset_dir = {root}")
+    print("=" * 60)
 
-    size_kb = out_path.stat().st_size / 1024
-    print(f"  Written: {len(df_out)} rows, {len(df_out.columns)} cols, {size_kb:.1f} KB")
-    print(f"  Columns: {list(df_out.columns)[:10]}{'...' if len(df_out.columns) > 10 else ''}")
+    try:
+        results, plans = export_incremental(
+            root, symbols, args.horizon_sec, label_type, chunk_rows,
+            start=start_dt, end=end_dt, shard_hours=args.shard_hours, workers=args.workers,
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+
+    print("-" * 60)
+    for sym, (lo, hi) in plans.items():
+        print(f"  {sym}: ({lo.isoformat()} .. {hi.isoformat()}] → watermark {hi.isoformat()}")
+    rows = sum(e["rows"] for e in results)
+    print(f"  new files: {sum(1 for e in results if e['rows'])}  rows: {rows} "
+          f"({sum(e['dropped'] for e in results)} dropped — no label)")
+    print(f"  manifest: {root / _MANIFEST}")
     print("=" * 60)
     print("DONE ✅")
     return 0
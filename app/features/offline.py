@@ -0,0 +1,564 @@
+"""
+offline.py — raw 테이블(market_1s / binance_*)에서 feature_snapshots 컬럼을 vectorized로 재계산
+
+live predictor가 돌지 않은 구간(과거 전체)에도 학습용 피처를 만들기 위한 offline builder.
+decision tick t0 (DECISION_INTERVAL_SEC 격자)마다 live와 같은 규칙으로 계산한다:
+
+  barrier  (BarrierController)
+    - sigma_1s: ts ∈ [t0-VOL_WINDOW_SEC, t0] mid(mid_close_1s 우선)를 VOL_DT_SEC 간격 downsample한
+      log-return 표준편차 — 위상별 strided prefix-sum으로 tick마다 O(1)
+    - spread median: [t0-COST_SPREAD_LOOKBACK_SEC, t0] spread_bps 중앙값 (time-based rolling)
+    - cost_roundtrip_est / r_min_eff / sigma_h / r_t / WARMUP 판정: controller 공식 그대로
+    - k_vol_eff: feedback 상태라 재계산 불가 → barrier_state as-of (없으면 K_VOL)
+  model    (BaselineModelV1.predict)
+    - window ts ∈ [t0-MODEL_LOOKBACK_SEC, t0]:
+      ret_10 / ret_60 / mom_z / spread_bps / imb_notional_top5
+      → p_up/p_down/p_none/ev/ev_rate/action_hat
+  alt-data (PredictionRunner._save_feature_snapshot)
+    - binance_mark_price_1s: ts ∈ [t0-3s, t0] 최신
+    - binance_futures_metrics: metric별 ts ∈ [t0-BINANCE_METRICS_FRESH_SEC, t0] 최신
+    - binance_liq_1s: (t0-300s, t0] bucket 합계 (prefix-sum)
+
+모든 as-of는 ts <= t0 (searchsorted right) — 미래값 사용 없음.
+live와의 차이: live barrier/predictor는 t0 직후 실행이라
+그 시점에 아직 기록되지 않은 bar가 빠질 수 있다.
+정합성 점검은 app.diagnostics.feature_parity_check.
+
+사용법:
+  poetry run python -m app.features.offline \\
+    --start 2026-09-01T00:00:00Z --end 2026-10-01T00:00:00Z \\
+    --out ./data/datasets/offline_features.parquet [--format csv] [--batch-hours 24]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from app.config import Settings, load_settings
+from app.db.archive import read_range
+from app.db.session import get_engine
+from app.features.export_dataset import DatasetWriter, _parse_dt
+from app.models.baseline_v1 import BaselineModelV1
+
+_NS = 1_000_000_000
+_EPS = 1e-12
+_MARK_FRESH_SEC = 3
+_LIQ_WINDOW_SEC = 300
+_NAT = np.iinfo(np.int64).min   # NaT (pandas iNaT)
+
+# feature_snapshots 컬럼 → binance_futures_metrics.metric
+_METRIC_COLUMNS = {
+    "oi_value": "open_interest",
+    "global_ls_ratio": "global_ls_ratio",
+    "taker_ls_ratio": "taker_ls_ratio",
+    "basis_value": "basis",
+}
+
+# feature_snapshots에 없는 모델 내부 피처 (학습용 추가 컬럼)
+MODEL_FEATURE_COLUMNS = ["ret_10", "ret_60", "mom_z", "feat_spread_bps", "feat_imb_notional_top5"]
+
+_MARKET_COLUMNS = ["ts", "mid", "mid_close_1s", "spread", "spread_bps", "imb_notional_top5"]
+
+_METRICS_SQL = text("""
+SELECT ts, metric, value
+FROM binance_futures_metrics
+WHERE symbol = :sym AND metric IN ('open_interest', 'global_ls_ratio', 'taker_ls_ratio', 'basis')
+  AND ts >= :start AND ts <= :end
+ORDER BY ts ASC
+""")
+
+_LIQ_SQL = text("""
+SELECT ts, SUM(notional) AS notional, SUM(cnt) AS cnt, MAX(last_ts) AS last_ts
+FROM binance_liq_1s
+WHERE symbol = :sym AND ts > :start AND ts <= :end
+GROUP BY ts
+ORDER BY ts ASC
+""")
+
+_K_VOL_BEFORE_SQL = text("""
+SELECT ts, k_vol_eff FROM barrier_state
+WHERE symbol = :sym AND ts < :start AND k_vol_eff IS NOT NULL
+ORDER BY ts DESC LIMIT 1
+""")
+
+
+@dataclass
+class OfflineInputs:
+    """t0 범위 [start, end] 계산에 필요한 raw 행 (warm-up 구간 포함, 모두 ts 오름차순)."""
+
+    market: pd.DataFrame
+    mark: pd.DataFrame
+    metrics: pd.DataFrame
+    liq: pd.DataFrame
+    k_vol: pd.DataFrame
+
+
+def _ns(values) -> np.ndarray:
+    """Datetime-like → int64 epoch ns (UTC)."""
+    s = pd.to_datetime(pd.Series(values), utc=True)
+    return s.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _ts(ns: np.ndarray) -> pd.Series:
+    """int64 epoch ns (_NAT = NaT) → tz-aware Series."""
+    return pd.to_datetime(pd.Series(ns, dtype="int64"), unit="ns", utc=True)
+
+
+def _f(df: pd.DataFrame, col: str) -> np.ndarray:
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _take(arr: np.ndarray, idx: np.ndarray, ok: np.ndarray, fill=np.nan) -> np.ndarray:
+    """ok인 곳은 arr[idx], 아니면 fill (arr가 비어 있어도 안전)."""
+    if len(arr) == 0:
+        return np.full(len(idx), fill)
+    return np.where(ok, arr[np.clip(idx, 0, len(arr) - 1)], fill)
+
+
+def _asof(ts_ns: np.ndarray, t_ns: np.ndarray) -> np.ndarray:
+    """ts <= t 인 마지막 index (-1 = 없음)."""
+    return np.searchsorted(ts_ns, t_ns, side="right") - 1
+
+
+def _last_valid(mask: np.ndarray) -> np.ndarray:
+    """i 이하에서 mask가 True인 마지막 index (-1 = 없음)."""
+    if not len(mask):
+        return mask.astype(np.int64)
+    return np.maximum.accumulate(np.where(mask, np.arange(len(mask)), -1))
+
+
+def decision_ticks(start: datetime, end: datetime, interval_sec: int) -> np.ndarray:
+    """[start, end] 안의 interval_sec 배수 시각 (live runner 격자와 동일) → epoch ns."""
+    a = math.ceil(start.timestamp() / interval_sec) * interval_sec
+    b = math.floor(end.timestamp() / interval_sec) * interval_sec
+    if b < a:
+        return np.empty(0, dtype=np.int64)
+    return np.arange(a, b + 1, interval_sec, dtype=np.int64) * _NS
+
+
+def load_inputs(
+    engine, settings: Settings, symbol: str, start: datetime, end: datetime,
+) -> OfflineInputs:
+    s = settings
+    warm = max(s.VOL_WINDOW_SEC, s.MODEL_LOOKBACK_SEC, s.COST_SPREAD_LOOKBACK_SEC)
+    alt = s.ALT_SYMBOL_BINANCE
+
+    market = read_range(engine, "market_1s", start - timedelta(seconds=warm), end,
+                        symbol=symbol, columns=_MARKET_COLUMNS)
+    mark = read_range(engine, "binance_mark_price_1s",
+                      start - timedelta(seconds=_MARK_FRESH_SEC), end,
+                      symbol=alt, columns=["ts", "mark_price", "index_price", "funding_rate"])
+    k_vol = read_range(engine, "barrier_state", start, end,
+                       symbol=symbol, columns=["ts", "k_vol_eff"])
+
+    with engine.connect() as conn:
+        metrics = pd.read_sql_query(_METRICS_SQL, conn, params={
+            "sym": alt, "start": start - timedelta(seconds=s.BINANCE_METRICS_FRESH_SEC), "end": end,
+        })
+        liq = pd.read_sql_query(_LIQ_SQL, conn, params={
+            "sym": alt, "start": start - timedelta(seconds=_LIQ_WINDOW_SEC), "end": end,
+        })
+        before = pd.read_sql_query(_K_VOL_BEFORE_SQL, conn, params={"sym": symbol, "start": start})
+    if not before.empty:
+        k_vol = pd.concat([before, k_vol], ignore_index=True)
+    for df in (metrics, liq, k_vol):
+        df["ts"] = pd.to_datetime(df["ts"], utc=True)
+    liq["last_ts"] = pd.to_datetime(liq["last_ts"], utc=True)
+    return OfflineInputs(market=market, mark=mark, metrics=metrics, liq=liq, k_vol=k_vol)
+
+
+# ---------------------------------------------------------------------------
+# barrier (BarrierController)
+# ---------------------------------------------------------------------------
+
+def _strided_cumsum(x: np.ndarray, step: int) -> np.ndarray:
+    """P[i] = x[i] + x[i-step] + x[i-2*step] + ... (위상별 누적합)."""
+    out = np.empty_like(x)
+    for p in range(step):
+        out[p::step] = np.cumsum(x[p::step])
+    return out
+
+
+def rolling_sigma(
+    mids_ts: np.ndarray, mids: np.ndarray, t_ns: np.ndarray, window_sec: int, dt: int,
+) -> tuple:
+    """tick마다 sigma_from_mids(mids[ts ∈ [t-window, t]], dt) — (sigma_1s, sample_n)."""
+    step = max(1, dt)
+    n_t = len(t_ns)
+    sigma = np.full(n_t, np.nan)
+    if len(mids) <= step:
+        return sigma, np.zeros(n_t, dtype=np.int64)
+
+    s = np.searchsorted(mids_ts, t_ns - window_sec * _NS, side="left")
+    j = _asof(mids_ts, t_ns)
+    k = np.where(j >= s, (j - s) // step + 1, 0)       # downsample 후 mid 개수
+    n = np.maximum(k - 1, 0)                            # log-return 개수
+
+    lr = np.log(mids[step:]) - np.log(mids[:-step])     # lr[i] = mids[i] → mids[i+step]
+    lr = lr - lr.mean()                                 # 분산은 이동 불변 — 누적합 상쇄 오차 감소
+    p1 = _strided_cumsum(lr, step)
+    p2 = _strided_cumsum(lr * lr, step)
+
+    ok = n >= 2
+    first, last = s[ok], s[ok] + (n[ok] - 1) * step
+    prev = first - step
+    s1 = p1[last] - np.where(prev >= 0, p1[np.maximum(prev, 0)], 0.0)
+    s2 = p2[last] - np.where(prev >= 0, p2[np.maximum(prev, 0)], 0.0)
+    m = n[ok].astype(np.float64)
+    var = np.maximum((s2 - s1 * s1 / m) / (m - 1), 0.0)
+    sigma[ok] = np.sqrt(var) / (math.sqrt(dt) if dt > 0 else 1.0)
+    return sigma, n
+
+
+def rolling_median_asof(
+    ts_ns: np.ndarray, values: np.ndarray, t_ns: np.ndarray, window_sec: int,
+) -> np.ndarray:
+    """tick마다 median(values[ts ∈ [t-window, t]], NaN 제외).
+
+    없으면 NaN (percentile_cont(0.5)와 동일).
+    """
+    keep = ~np.isnan(values)
+    n_data = int(keep.sum())
+    if len(t_ns) == 0 or n_data == 0:
+        return np.full(len(t_ns), np.nan)
+    # tick을 NaN 행으로 끼워 넣고 (같은 ts면 data 뒤) time-based rolling median → tick 행만 추출
+    idx = np.concatenate([ts_ns[keep], t_ns])
+    val = np.concatenate([values[keep], np.full(len(t_ns), np.nan)])
+    order = np.lexsort((np.r_[np.zeros(n_data), np.ones(len(t_ns))], idx))
+    ser = pd.Series(val[order], index=pd.to_datetime(idx[order], unit="ns"))
+    med = np.empty(len(idx))
+    med[order] = ser.rolling(f"{window_sec}s", closed="both", min_periods=1).median().to_numpy()
+    return med[n_data:]
+
+
+def compute_barrier(
+    inp: OfflineInputs, t_ns: np.ndarray, settings: Settings,
+) -> dict[str, np.ndarray]:
+    s = settings
+    mkt = inp.market
+    mts = _ns(mkt["ts"])
+    mid, close = _f(mkt, "mid"), _f(mkt, "mid_close_1s")
+    v = np.where(~np.isnan(close), close, mid)           # mid_close_1s if not None else mid
+    valid = ~np.isnan(v) & (v > 0)
+    sigma_1s, sample_n = rolling_sigma(mts[valid], v[valid], t_ns, s.VOL_WINDOW_SEC, s.VOL_DT_SEC)
+
+    spread_med = rolling_median_asof(mts, _f(mkt, "spread_bps"), t_ns, s.COST_SPREAD_LOOKBACK_SEC)
+    cost = s.EV_COST_MULT * (
+        2 * s.FEE_RATE
+        + 2 * (s.SLIPPAGE_BPS / 10000.0)
+        + np.where(np.isnan(spread_med), 0.0, spread_med / 10000.0)
+    )
+    r_min_eff = np.maximum(s.R_MIN, s.R_MIN_COST_MULT * cost)
+
+    kv = inp.k_vol.dropna(subset=["k_vol_eff"]).sort_values("ts", kind="stable")
+    kj = _asof(_ns(kv["ts"]), t_ns)
+    k_vol_eff = _take(_f(kv, "k_vol_eff"), kj, kj >= 0, s.K_VOL)
+
+    sigma_h = sigma_1s * math.sqrt(s.H_SEC)
+    warmup_th = max(30, int((s.VOL_WINDOW_SEC / max(1, s.VOL_DT_SEC)) * 0.3))   # _warmup_threshold
+    ok = sample_n >= warmup_th
+    r_vol = np.minimum(np.maximum(r_min_eff, k_vol_eff * np.where(ok, sigma_h, 0.0)), s.R_MAX)
+    r_t = np.where(ok, r_vol, r_min_eff)
+    return {
+        "r_t": r_t,
+        "r_min_eff": r_min_eff,
+        "cost_roundtrip_est": cost,
+        "sigma_1s": sigma_1s,
+        "sigma_h": sigma_h,
+        "k_vol_eff": k_vol_eff,
+        "barrier_status": np.where(ok, "OK", "WARMUP").astype(object),
+        "sample_n": sample_n,
+    }
+
+
+# ---------------------------------------------------------------------------
+# model (BaselineModelV1)
+# ---------------------------------------------------------------------------
+
+def compute_model(
+    inp: OfflineInputs, t_ns: np.ndarray, barrier: dict, settings: Settings,
+) -> dict[str, np.ndarray]:
+    s = settings
+    h = float(s.H_SEC)
+    mkt = inp.market
+    mts = _ns(mkt["ts"])
+    mid, close = _f(mkt, "mid"), _f(mkt, "mid_close_1s")
+    since = t_ns - s.MODEL_LOOKBACK_SEC * _NS
+    w_start = np.searchsorted(mts, since, side="left")
+    w_end = _asof(mts, t_ns)
+    has_row = w_end >= w_start
+
+    # snapshot의 Upbit market 컬럼 = window 마지막 행
+    spread, sbps, imb = _f(mkt, "spread"), _f(mkt, "spread_bps"), _f(mkt, "imb_notional_top5")
+    mid_krw = _take(mid, w_end, has_row)
+    snap_spread = _take(sbps, w_end, has_row)
+    snap_imb = _take(imb, w_end, has_row)
+
+    # mids: mid_close_1s or mid (0도 falsy), > 0
+    v = np.where(~np.isnan(close) & (close != 0), close, mid)
+    valid = ~np.isnan(v) & (v > 0)
+    vts, vm = mts[valid], v[valid]
+    sv = np.searchsorted(vts, since, side="left")
+    jv = _asof(vts, t_ns)
+    ok = (jv - sv + 1) >= 2
+    m_last = _take(vm, jv, ok)
+    ret_10 = np.log(m_last / _take(vm, np.maximum(sv, jv - 10), ok))
+    ret_60 = np.log(m_last / _take(vm, np.maximum(sv, jv - 60), ok))
+
+    sigma_1s, sigma_h, r_t = barrier["sigma_1s"], barrier["sigma_h"], barrier["r_t"]
+    pos_sigma = np.nan_to_num(sigma_1s, nan=0.0) > 0
+    sig = np.where(pos_sigma, sigma_1s, 1.0)
+    mom_z = np.where(
+        pos_sigma,
+        0.7 * (ret_10 / (sig * math.sqrt(10) + _EPS))
+        + 0.3 * (ret_60 / (sig * math.sqrt(60) + _EPS)),
+        0.0,
+    )
+
+    # spread_bps / imb: window 안에서 값이 있는 마지막 행
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alt_bps = np.where(
+            ~np.isnan(spread) & ~np.isnan(mid) & (mid > 0), 10000 * spread / mid, np.nan
+        )
+    cand = np.where(~np.isnan(sbps), sbps, alt_bps)
+    ls = _take(_last_valid(~np.isnan(cand)), w_end, has_row, -1)
+    li = _take(_last_valid(~np.isnan(imb)), w_end, has_row, -1)
+    spread_bps = _take(cand, ls, ls >= w_start, 0.0)
+    imb_notional = _take(imb, li, li >= w_start, 0.0)
+
+    # score → p_dir
+    score = (
+        s.SCORE_A_MOMZ * mom_z
+        + s.SCORE_B_IMB * imb_notional
+        - s.SCORE_C_SPREAD * (spread_bps / 10.0)
+    )
+    p_dir = 1.0 / (1.0 + np.exp(-np.clip(score, -20.0, 20.0)))
+
+    # z-based p_none
+    barrier_ok = (barrier["barrier_status"] == "OK") & (np.nan_to_num(sigma_h, nan=0.0) > 0)
+    sh = np.where(barrier_ok, sigma_h, 1.0)
+    p_hit = np.exp(-s.P_HIT_CZ * (r_t / (sh + _EPS)) ** 2)
+    p_none = np.where(barrier_ok, np.clip(1 - p_hit, 0.0, 0.99), 0.99)
+    p_up = np.where(barrier_ok, (1 - p_none) * p_dir, 0.005)
+    p_down = np.where(barrier_ok, (1 - p_none) * (1 - p_dir), 0.005)
+    total = p_up + p_down + p_none
+    p_up, p_down, p_none = p_up / total, p_down / total, p_none / total
+
+    # conditional arrival times
+    s1 = np.where(pos_sigma, sigma_1s, 1e-8)
+    base_t = np.clip(r_t ** 2 / (s1 ** 2 + _EPS), 1.0, h)
+    conf = np.clip(np.abs(score) / 2.0, 0.0, 1.0)
+    fast = np.clip(base_t * (1 - 0.2 * conf), 1.0, h)
+    slow = np.clip(base_t * (1 + 0.2 * conf), 1.0, h)
+    t_up = np.where(score >= 0, fast, slow)
+    t_down = np.where(score >= 0, slow, fast)
+
+    r_none_pred = np.clip(ret_60 * (h / 60.0), -0.5 * r_t, 0.5 * r_t)
+    cost = s.EV_COST_MULT * (2 * s.FEE_RATE + spread_bps / 10000.0 + 2 * (s.SLIPPAGE_BPS / 10000.0))
+    ev = p_up * r_t - p_down * r_t + p_none * r_none_pred - cost
+    e_t = p_up * t_up + p_down * t_down + p_none * h
+    ev_rate = ev / (e_t + _EPS)
+    enter = (
+        (ev_rate >= s.ENTER_EV_RATE_TH)
+        & (p_none <= s.ENTER_PNONE_MAX)
+        & (p_up >= p_down + s.ENTER_PDIR_MARGIN)
+        & (spread_bps <= s.ENTER_SPREAD_BPS_MAX)
+    )
+
+    # window mid 2개 미만 → BaselineModelV1._fallback
+    fb_cost = -s.EV_COST_MULT * (2 * s.FEE_RATE + 2 * (s.SLIPPAGE_BPS / 10000.0))
+    return {
+        "mid_krw": mid_krw,
+        "spread_bps": snap_spread,
+        "imb_notional_top5": snap_imb,
+        "p_up": np.where(ok, p_up, 0.0),
+        "p_down": np.where(ok, p_down, 0.0),
+        "p_none": np.where(ok, p_none, 1.0),
+        "ev": np.where(ok, ev, fb_cost),
+        "ev_rate": np.where(ok, ev_rate, np.nan),
+        "action_hat": np.where(ok & enter, "ENTER_LONG", "STAY_FLAT").astype(object),
+        "model_version": np.full(len(t_ns), BaselineModelV1.MODEL_VERSION, dtype=object),
+        "ret_10": ret_10,
+        "ret_60": ret_60,
+        "mom_z": np.where(ok, mom_z, np.nan),
+        "feat_spread_bps": np.where(ok, spread_bps, np.nan),
+        "feat_imb_notional_top5": np.where(ok, imb_notional, np.nan),
+    }
+
+
+# ---------------------------------------------------------------------------
+# alt-data as-of joins (PredictionRunner._save_feature_snapshot)
+# ---------------------------------------------------------------------------
+
+
+def _asof_fresh(
+    ts_ns: np.ndarray, t_ns: np.ndarray, fresh_sec: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """ts ∈ [t-fresh, t] 최신 index → (index, 유효 mask)."""
+    j = _asof(ts_ns, t_ns)
+    return j, (j >= 0) & (_take(ts_ns, j, j >= 0, _NAT) >= t_ns - fresh_sec * _NS)
+
+
+def join_altdata(inp: OfflineInputs, t_ns: np.ndarray, settings: Settings) -> dict[str, np.ndarray]:
+    out: dict[str, np.ndarray] = {}
+
+    mark = inp.mark
+    mts = _ns(mark["ts"])
+    j, ok = _asof_fresh(mts, t_ns, _MARK_FRESH_SEC)
+    for col, src in (("bin_mark_price", "mark_price"), ("bin_index_price", "index_price"),
+                     ("bin_funding_rate", "funding_rate")):
+        out[col] = _take(_f(mark, src), j, ok)
+    out["bin_mark_index_basis"] = out["bin_mark_price"] - out["bin_index_price"]
+    out["bin_mark_ts"] = _take(mts, j, ok, _NAT)
+
+    met = inp.metrics
+    for col, metric in _METRIC_COLUMNS.items():
+        sub = met[met["metric"] == metric]
+        sts = _ns(sub["ts"])
+        j, ok = _asof_fresh(sts, t_ns, settings.BINANCE_METRICS_FRESH_SEC)
+        out[col] = _take(_f(sub, "value"), j, ok)
+        if metric == "open_interest":
+            out["oi_ts"] = _take(sts, j, ok, _NAT)
+
+    # (t0-300s, t0] 합계 = cum[asof(t0)] - cum[asof(t0-300s)]
+    liq = inp.liq
+    lts = _ns(liq["ts"])
+    if len(lts):
+        cum_n = np.r_[0.0, np.cumsum(_f(liq, "notional"))]
+        cum_c = np.r_[0, np.cumsum(pd.to_numeric(liq["cnt"]).to_numpy(dtype=np.int64))]
+        last_ts = np.maximum.accumulate(
+            np.where(liq["last_ts"].isna(), _NAT, _ns(liq["last_ts"].fillna(liq["ts"])))
+        )
+        hi = _asof(lts, t_ns) + 1
+        lo = _asof(lts, t_ns - _LIQ_WINDOW_SEC * _NS) + 1
+        out["liq_5m_notional"] = cum_n[hi] - cum_n[lo]
+        out["liq_5m_count"] = cum_c[hi] - cum_c[lo]
+        out["liq_last_ts"] = np.where(hi > lo, last_ts[np.maximum(hi - 1, 0)], _NAT)
+    else:
+        out["liq_5m_notional"] = np.zeros(len(t_ns))
+        out["liq_5m_count"] = np.zeros(len(t_ns), dtype=np.int64)
+        out["liq_last_ts"] = np.full(len(t_ns), _NAT)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# builder
+# ---------------------------------------------------------------------------
+
+def build_features(
+    inp: OfflineInputs,
+    t_ns: np.ndarray,
+    symbol: str,
+    settings: Settings,
+) -> pd.DataFrame:
+    """decision tick(t_ns)별 feature_snapshots 컬럼 + MODEL_FEATURE_COLUMNS."""
+    barrier = compute_barrier(inp, t_ns, settings)
+    model = compute_model(inp, t_ns, barrier, settings)
+    alt = join_altdata(inp, t_ns, settings)
+
+    df = pd.DataFrame({"ts": _ts(t_ns), "symbol": symbol})
+    for col in ("mid_krw", "spread_bps", "imb_notional_top5"):
+        df[col] = model[col]
+    for col in ("r_t", "r_min_eff", "cost_roundtrip_est", "sigma_1s", "sigma_h", "k_vol_eff",
+                "barrier_status"):
+        df[col] = barrier[col]
+    for col in ("p_up", "p_down", "p_none", "ev", "ev_rate", "action_hat", "model_version"):
+        df[col] = model[col]
+    for col in ("bin_mark_price", "bin_index_price", "bin_funding_rate", "bin_mark_index_basis",
+                *_METRIC_COLUMNS, "liq_5m_notional", "liq_5m_count"):
+        df[col] = alt[col]
+    for col in ("bin_mark_ts", "oi_ts", "liq_last_ts"):
+        df[col] = _ts(alt[col])
+    for col in MODEL_FEATURE_COLUMNS:
+        df[col] = model[col]
+    return df
+
+
+def build_range(
+    engine, settings: Settings, symbol: str, start: datetime, end: datetime,
+) -> pd.DataFrame:
+    """[start, end] decision tick 피처 (raw 로딩 포함)."""
+    t_ns = decision_ticks(start, end, settings.DECISION_INTERVAL_SEC)
+    inp = load_inputs(engine, settings, symbol, start, end)
+    return build_features(inp, t_ns, symbol, settings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Offline vectorized feature builder (raw tables → features)"
+    )
+    parser.add_argument("--symbol", default=None, help="Upbit 심볼 (기본 SYMBOL)")
+    parser.add_argument("--start", required=True, help="ISO8601 UTC")
+    parser.add_argument("--end", required=True, help="ISO8601 UTC")
+    parser.add_argument("--out", required=True, help="출력 파일 경로")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument(
+        "--batch-hours", type=int, default=24, help="한 번에 로딩/계산할 구간 (메모리 상한)"
+    )
+    args = parser.parse_args()
+
+    s = load_settings()
+    symbol = args.symbol or s.SYMBOL
+    start, end = _parse_dt(args.start), _parse_dt(args.end)
+    if start >= end:
+        print("ERROR: --start must be before --end")
+        return 1
+    engine = get_engine(s, "offline_features", pool_size=2, statement_timeout_ms=0)
+
+    print("=" * 60)
+    print("  offline feature builder")
+    print(f"  symbol = {symbol}  window = {start.isoformat()} ~ {end.isoformat()}")
+    print(f"  interval = {s.DECISION_INTERVAL_SEC}s  batch = {args.batch_hours}h  out = {args.out}")
+    print("=" * 60)
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = DatasetWriter(out_path, args.format)
+    step = timedelta(hours=max(1, args.batch_hours))
+    t0 = time.monotonic()
+    n_raw = 0
+    try:
+        a = start
+        while a <= end:
+            b = min(a + step - timedelta(microseconds=1), end)
+            t_ns = decision_ticks(a, b, s.DECISION_INTERVAL_SEC)
+            inp = load_inputs(engine, s, symbol, a, b)
+            tb = time.monotonic()
+            df = build_features(inp, t_ns, symbol, s)
+            n_raw += len(inp.market)
+            writer.write(df)
+            print(f"  {a.isoformat()} ~ {b.isoformat()}: "
+                  f"{len(df)} ticks from {len(inp.market)} market rows "
+                  f"(compute {time.monotonic() - tb:.2f}s)")
+            a += step
+    except BaseException:
+        writer.abort()
+        raise
+
+    if writer.rows == 0:
+        writer.abort()
+        print("ERROR: no decision ticks in range")
+        return 1
+    writer.close()
+    elapsed = time.monotonic() - t0
+    print("-" * 60)
+    print(f"  Written: {writer.rows} rows → {out_path}")
+    rate = n_raw / max(elapsed, 1e-9) * 60
+    print(f"  elapsed {elapsed:.1f}s  ({rate:,.0f} market rows/min incl. load)")
+    print("=" * 60)
+    print("DONE ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
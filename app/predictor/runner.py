@@ -9,10 +9,12 @@ from datetime import datetime, timezone
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from app.altdata.liq_rollup import fetch_liq_window
 from app.config import Settings
 from app.db.writer import upsert_prediction
 from app.features.writer import upsert_feature_snapshot
 from app.models.interface import BaseModel
+from app.tracing import get_tracer, trace_id_for
 
 log = logging.getLogger(__name__)
 
@@ -55,10 +57,14 @@ class PredictionRunner:
 
     def _run_tick(self, t0: datetime) -> None:
         symbol = self.settings.SYMBOL
+        tracer = get_tracer()
+        trace_id = trace_id_for(symbol, t0)
+        tracer.mark(trace_id, "pred_start", symbol=symbol, pred_t0=t0)
 
         barrier_row = self.fetch_latest_barrier(symbol, t0)
         if barrier_row is None:
             log.warning("Pred: no barrier_state row found for t0=%s, skipping", t0)
+            tracer.discard(trace_id)
             return
 
         market_window = self.fetch_market_window(symbol, t0)
@@ -101,6 +107,7 @@ class PredictionRunner:
         }
 
         upsert_prediction(self.engine, row)
+        tracer.mark(trace_id, "pred_written")
 
         try:
             self._save_feature_snapshot(t0, barrier_row, output, market_window)
@@ -169,30 +176,10 @@ class PredictionRunner:
         return values, ts_dict
 
     def _fetch_liq_aggregate(self, symbol: str, t0: datetime) -> dict:
-        """binance_force_orders에서 (t0-5min, t0] 구간 청산 합계 (USDT 기준).
-        반환: {notional: float, count: int, liq_last_ts: datetime|None}"""
+        """(t0-5min, t0] 구간 청산 합계 (USDT 기준) — 초 bucket rollup의 prefix-sum 차이.
+        반환: {notional: float, count: int, liq_last_ts: datetime|None, buy_/sell_ 분리값}"""
         try:
-            with self.engine.connect() as conn:
-                row = conn.execute(
-                    text("""
-                        SELECT
-                            COALESCE(SUM(notional), 0.0) AS liq_5m_notional,
-                            COALESCE(COUNT(*), 0)        AS liq_5m_count,
-                            MAX(ts)                      AS liq_last_ts
-                        FROM binance_force_orders
-                        WHERE symbol = :sym
-                          AND ts >  (:t0 - interval '5 minutes')
-                          AND ts <= :t0
-                    """),
-                    {"sym": symbol, "t0": t0},
-                ).fetchone()
-            if row:
-                return {
-                    "notional": float(row.liq_5m_notional),
-                    "count": int(row.liq_5m_count),
-                    "liq_last_ts": row.liq_last_ts,
-                }
-            return {}
+            return fetch_liq_window(self.engine, symbol, t0, 300)
         except Exception:
             return {}
 
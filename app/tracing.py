@@ -0,0 +1,188 @@
+"""Signal → order latency tracing (in-process, monotonic).
+
+trace_id = "{symbol}@{pred t0 epoch}" — PredictionRunner가 열고, PaperTradingRunner가 같은
+prediction을 읽은 tick에서 hop을 이어 찍는다. primary book이 체결하면 paper_trades.id로 trace를
+연결해 두고 ShadowExecutionRunner가 그 id로 trace를 찾아 주문 hop을 마저 기록한다.
+(EXIT의 paper_trades.pred_t0는 진입 시점 prediction이라 id 재구성에 쓸 수 없음)
+
+각 hop은 time.monotonic()으로 찍고, trace 시작 시 한 번 wall clock에 고정해
+'prediction t0 이후 ms'로 저장한다 (hops JSONB). hop 간 차이는 순수 monotonic 차이.
+
+HOPS (정상 순서):
+  pred_start → pred_written → paper_start → paper_decided → paper_written
+  → shadow_picked → order_sent → order_acked → attempt_written
+intrabar TP/SL exit은 touch hop으로 시작 (trace_id = "{symbol}@{touch epoch}:touch").
+같은 hop은 처음 찍힌 시각만 유지 — 같은 prediction을 다시 읽은 tick이 덮어쓰지 않음.
+
+완료된 trace는 buffer에 쌓이고 bot의 flusher task가 latency_traces로 일괄 insert.
+enabled=False(기본)이면 모든 호출이 no-op — backtest/CLI에서 메모리 누적 없음.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+log = logging.getLogger(__name__)
+
+HOPS = (
+    "pred_start",
+    "pred_written",
+    "touch",
+    "paper_start",
+    "paper_decided",
+    "paper_written",
+    "shadow_picked",
+    "order_sent",
+    "order_acked",
+    "attempt_written",
+)
+
+
+def trace_id_for(symbol: str, pred_t0: datetime | None, suffix: str = "") -> str | None:
+    if pred_t0 is None:
+        return None
+    if pred_t0.tzinfo is None:
+        pred_t0 = pred_t0.replace(tzinfo=timezone.utc)
+    return f"{symbol}@{int(pred_t0.timestamp())}{suffix}"
+
+
+class _Trace:
+    __slots__ = ("trace_id", "symbol", "t0", "mono0", "wall_offset_ms", "hops",
+                 "book_id", "paper_trade_id", "pending_shadow", "started")
+
+    def __init__(self, trace_id: str, symbol: str, t0: datetime, mono: float) -> None:
+        self.trace_id = trace_id
+        self.symbol = symbol
+        self.t0 = t0
+        self.mono0 = mono
+        # wall(mono0) - t0 : 이 값 + (mono - mono0) = t0 이후 경과 ms
+        self.wall_offset_ms = (time.time() - (time.monotonic() - mono) - t0.timestamp()) * 1000.0
+        self.hops: dict[str, float] = {}
+        self.book_id: str | None = None
+        self.paper_trade_id: int | None = None
+        self.pending_shadow = False
+        self.started = time.monotonic()
+
+    def mark(self, hop: str, mono: float) -> None:
+        if hop in self.hops:
+            return
+        self.hops[hop] = round(self.wall_offset_ms + (mono - self.mono0) * 1000.0, 1)
+
+    def row(self) -> dict:
+        return {
+            "ts": self.t0,
+            "trace_id": self.trace_id,
+            "symbol": self.symbol,
+            "book_id": self.book_id,
+            "paper_trade_id": self.paper_trade_id,
+            "hops": dict(self.hops),
+        }
+
+
+class TraceRecorder:
+    def __init__(self, max_pending_sec: float = 120.0) -> None:
+        self.enabled = False
+        self.max_pending_sec = max_pending_sec
+        self._lock = threading.Lock()
+        self._open: dict[str, _Trace] = {}
+        self._done: list[dict] = []
+        self._by_trade: dict[int, str] = {}
+
+    def mark(
+        self,
+        trace_id: str | None,
+        hop: str,
+        symbol: str = "",
+        pred_t0: datetime | None = None,
+        mono: float | None = None,
+    ) -> None:
+        """hop 기록. 열린 trace가 없으면 새로 시작 (pred_t0 필요)."""
+        if not self.enabled or trace_id is None:
+            return
+        mono = time.monotonic() if mono is None else mono
+        with self._lock:
+            tr = self._open.get(trace_id)
+            if tr is None:
+                if pred_t0 is None:
+                    return
+                if pred_t0.tzinfo is None:
+                    pred_t0 = pred_t0.replace(tzinfo=timezone.utc)
+                tr = _Trace(trace_id, symbol, pred_t0, mono)
+                self._open[trace_id] = tr
+            tr.mark(hop, mono)
+
+    def expect_shadow(self, trace_id: str | None, book_id: str, paper_trade_id: int | None) -> None:
+        """primary book 체결 — shadow hop까지 열어둔다."""
+        if not self.enabled or trace_id is None:
+            return
+        with self._lock:
+            tr = self._open.get(trace_id)
+            if tr is not None and paper_trade_id is not None:
+                tr.book_id = book_id
+                tr.paper_trade_id = paper_trade_id
+                tr.pending_shadow = True
+                self._by_trade[paper_trade_id] = trace_id
+
+    def trace_for_trade(self, paper_trade_id: int) -> str | None:
+        """expect_shadow로 연결된 trace_id (같은 프로세스에서 paper trading이 돈 경우만)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._by_trade.pop(paper_trade_id, None)
+
+    def finish(self, trace_id: str | None, from_shadow: bool = False) -> None:
+        """trace 완료. paper 단계의 finish는 shadow 대기 중이면 무시."""
+        if not self.enabled or trace_id is None:
+            return
+        with self._lock:
+            tr = self._open.get(trace_id)
+            if tr is None or (tr.pending_shadow and not from_shadow):
+                return
+            del self._open[trace_id]
+            self._done.append(tr.row())
+
+    def discard(self, trace_id: str | None) -> None:
+        """저장할 가치가 없는 trace (예: prediction skip) 폐기."""
+        if not self.enabled or trace_id is None:
+            return
+        with self._lock:
+            self._open.pop(trace_id, None)
+
+    def drain(self) -> list[dict]:
+        """완료된 행 + max_pending_sec 넘게 열린 trace(부분 hop)를 꺼낸다."""
+        now = time.monotonic()
+        with self._lock:
+            for tid in [t for t, tr in self._open.items() if now - tr.started > self.max_pending_sec]:
+                tr = self._open.pop(tid)
+                if tr.paper_trade_id is not None:
+                    self._by_trade.pop(tr.paper_trade_id, None)
+                self._done.append(tr.row())
+            rows, self._done = self._done, []
+        return rows
+
+    async def run_flusher(self, engine, interval_sec: float, async_engine=None) -> None:
+        """완료된 trace를 주기적으로 insert. async_engine이 있으면 executor thread 없이 기록."""
+        from app.db.writer import insert_latency_traces, insert_latency_traces_async
+
+        while True:
+            await asyncio.sleep(interval_sec)
+            rows = self.drain()
+            if not rows:
+                continue
+            try:
+                if async_engine is not None:
+                    await insert_latency_traces_async(async_engine, rows)
+                else:
+                    await asyncio.to_thread(insert_latency_traces, engine, rows)
+            except Exception as e:
+                log.warning("latency_traces flush failed (%d rows dropped): %s", len(rows), e)
+
+
+_TRACER = TraceRecorder()
+
+
+def get_tracer() -> TraceRecorder:
+    return _TRACER
@@ -0,0 +1,84 @@
+"""Quote-driven intrabar TP/SL monitor for paper positions.
+
+PaperTradingRunner는 DECISION_INTERVAL_SEC마다 깨어나므로 tick 사이의 barrier touch를
+놓치거나 늦게 체결한다. ExitMonitor는 consumer의 orderbook quote마다 호출되어
+resting u_exec/d_exec와 O(1)로 비교하고, touch 시 runner를 즉시 깨운다.
+
+Touch 판정은 app.trading.policy._decide_long과 동일:
+  exit_exec = bid * (1 - slip)
+  TP: exit_exec >= u_exec  (우선)
+  SL: exit_exec <= d_exec
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+
+class ExitMonitor:
+    """Resting TP/SL levels checked on every quote.
+
+    arm()/disarm() may be called from a worker thread (tuple assignment is atomic);
+    on_quote() and wait() must run on the event loop.
+    Several monitors (one per paper book) may share one event; the waiter then
+    collects each monitor's touch with take().
+    """
+
+    def __init__(self, slip_rate: float, event: asyncio.Event | None = None) -> None:
+        self.slip_rate = slip_rate
+        # (entry_time, u_exec, d_exec) or None when no LONG position is resting
+        self._levels: tuple[datetime, float | None, float | None] | None = None
+        self._touch: dict | None = None
+        self._event = event if event is not None else asyncio.Event()
+        self.touch_count: int = 0
+
+    def arm(self, entry_time: datetime, u_exec: float | None, d_exec: float | None) -> None:
+        if u_exec is None and d_exec is None:
+            self._levels = None
+            return
+        self._levels = (entry_time, u_exec, d_exec)
+
+    def disarm(self) -> None:
+        self._levels = None
+
+    def on_quote(self, bid: float, ask: float) -> None:
+        levels = self._levels
+        if levels is None or not bid or bid <= 0:
+            return
+        entry_time, u_exec, d_exec = levels
+        exit_exec = bid * (1 - self.slip_rate)
+        if u_exec is not None and exit_exec >= u_exec:
+            reason = "TP"
+        elif d_exec is not None and exit_exec <= d_exec:
+            reason = "SL"
+        else:
+            return
+
+        # Fire once per armed position; the runner re-arms after its next write.
+        self._levels = None
+        self._touch = {
+            "reason": reason,
+            "entry_time": entry_time,
+            "best_bid": bid,
+            "best_ask": ask,
+            "now_utc": datetime.now(timezone.utc),
+            "mono": time.monotonic(),
+        }
+        self.touch_count += 1
+        self._event.set()
+
+    async def wait(self, timeout: float) -> dict | None:
+        """Wait up to timeout seconds for a touch. Returns the touch dict or None."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+        except TimeoutError:
+            return None
+        self._event.clear()
+        return self.take()
+
+    def take(self) -> dict | None:
+        """Pop the pending touch (if any) without waiting."""
+        touch, self._touch = self._touch, None
+        return touch
@@ -0,0 +1,62 @@
+"""paper_trades insert → ShadowExecutionRunner 즉시 깨우기.
+
+- 같은 bot 프로세스: PaperTradingRunner가 쓰기 커밋 직후 publish() (thread-safe)
+- 다른 프로세스에서 paper trading: write_paper_ticks의 pg_notify를 listen_pg()로 LISTEN
+- 알림은 '새 행이 있을 수 있음' 신호일 뿐 — 실제 처리는 id cursor 조회가 담당하므로
+  알림 유실/재시작 시에도 timeout 기반 catch-up polling으로 따라잡는다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from app.db.writer import PAPER_TRADES_CHANNEL
+
+log = logging.getLogger(__name__)
+
+
+class PaperTradeFeed:
+    def __init__(self) -> None:
+        self._event = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.publish_count = 0
+        self.notify_count = 0
+
+    def publish(self) -> None:
+        """새 paper trade 커밋 알림. 어느 thread에서 호출해도 된다."""
+        self.publish_count += 1
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # 아직 wait() 전 — cursor catch-up이 처리
+        loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self, timeout: float) -> bool:
+        """알림이 오면 True, timeout이면 False (호출측은 어느 쪽이든 cursor 조회)."""
+        self._loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            self._event.clear()
+
+    async def listen_pg(self, db_url: str, reconnect_sec: float = 5.0) -> None:
+        """Postgres LISTEN paper_trades → 알림마다 깨우기 (연결 실패 시 재시도)."""
+        import psycopg  # optional at import time — only needed when paper trading runs elsewhere
+
+        self._loop = asyncio.get_running_loop()
+        dsn = db_url.replace("postgresql+psycopg://", "postgresql://", 1)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {PAPER_TRADES_CHANNEL}")
+                    log.info("PaperTradeFeed listening on channel %s", PAPER_TRADES_CHANNEL)
+                    async for _ in conn.notifies():
+                        self.notify_count += 1
+                        self._event.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("PaperTradeFeed LISTEN error: %s — retry in %.0fs", e, reconnect_sec)
+                await asyncio.sleep(reconnect_sec)
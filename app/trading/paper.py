@@ -132,3 +132,73 @@ def execute_exit_long(
     }
 
     return new_pos, trade
+
+
+def carry_risk_fields(new_pos: dict, old_pos: dict, settings) -> dict:
+    """Return new position with risk management fields carried over from old."""
+    new_pos["initial_krw"] = old_pos.get("initial_krw") or settings.PAPER_INITIAL_KRW
+    new_pos["equity_high"] = old_pos.get("equity_high") or settings.PAPER_INITIAL_KRW
+    new_pos["day_start_date"] = old_pos.get("day_start_date")
+    new_pos["day_start_equity"] = old_pos.get("day_start_equity") or settings.PAPER_INITIAL_KRW
+    new_pos["halted"] = old_pos.get("halted") or False
+    new_pos["halt_reason"] = old_pos.get("halt_reason")
+    new_pos["halted_at"] = old_pos.get("halted_at")
+    return new_pos
+
+
+def compute_equity(pos_row: dict, market_snapshot: dict, action: str, settings) -> float:
+    """Mark-to-market equity: LONG marked at bid * (1 - slip), FLAT/EXIT = cash."""
+    slip_rate = settings.SLIPPAGE_BPS / 10000.0
+    if pos_row["status"] == "LONG" and action != "EXIT_LONG":
+        bid = market_snapshot.get("best_bid") or 0
+        return pos_row["cash_krw"] + pos_row["qty"] * bid * (1 - slip_rate)
+    return pos_row["cash_krw"]
+
+
+def apply_risk_checks(
+    pos_row: dict,
+    equity_est: float,
+    now_utc: datetime,
+    settings,
+) -> tuple[dict, float]:
+    """Update equity_high / day_start / HALT fields. Returns (risk_fields, drawdown).
+
+    HALT is sticky: once halted the position stays halted (FLAT → STAY_FLAT/HALTED).
+    """
+    equity_high = pos_row.get("equity_high") or settings.PAPER_INITIAL_KRW
+    equity_high = max(equity_high, equity_est)
+
+    # Day change detection (UTC)
+    today_utc = now_utc.date()
+    day_start_date = pos_row.get("day_start_date")
+    day_start_equity = pos_row.get("day_start_equity") or settings.PAPER_INITIAL_KRW
+    if day_start_date is None or today_utc != day_start_date:
+        day_start_date = today_utc
+        day_start_equity = equity_est
+
+    dd = (equity_est / (equity_high + 1e-12)) - 1.0
+
+    halted = pos_row.get("halted") or False
+    halt_reason = pos_row.get("halt_reason")
+    halted_at = pos_row.get("halted_at")
+
+    if not halted:
+        if dd <= -settings.PAPER_MAX_DRAWDOWN_PCT:
+            halted = True
+            halt_reason = "MAX_DRAWDOWN"
+            halted_at = now_utc
+        elif equity_est <= day_start_equity * (1 - settings.PAPER_DAILY_LOSS_LIMIT_PCT):
+            halted = True
+            halt_reason = "DAILY_LOSS_LIMIT"
+            halted_at = now_utc
+
+    risk = {
+        "initial_krw": pos_row.get("initial_krw") or settings.PAPER_INITIAL_KRW,
+        "equity_high": equity_high,
+        "day_start_date": day_start_date,
+        "day_start_equity": day_start_equity,
+        "halted": halted,
+        "halt_reason": halt_reason,
+        "halted_at": halted_at,
+    }
+    return risk, dd
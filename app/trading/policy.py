@@ -186,6 +186,22 @@ def _decide_long(
     return "HOLD_LONG", "OK"
 
 
+def market_snapshot(best_bid: float | None, best_ask: float | None, lag_sec: float) -> dict:
+    """Build the market_snapshot dict consumed by decide_action / execute_*."""
+    if best_bid and best_ask and best_ask > 0:
+        mid = (best_bid + best_ask) / 2
+        spread_bps = 10000 * (best_ask - best_bid) / mid if mid > 0 else 999
+    else:
+        spread_bps = 999
+
+    return {
+        "best_bid": best_bid,
+        "best_ask": best_ask,
+        "spread_bps": spread_bps,
+        "lag_sec": lag_sec,
+    }
+
+
 def _compute_cost_est(spread_bps: float, settings) -> float:
     fee_round = 2 * settings.FEE_RATE
     slip_round = 2 * (settings.SLIPPAGE_BPS / 10000.0)
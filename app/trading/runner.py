@@ -4,21 +4,26 @@ import asyncio
 import json
 import logging
 import time
-from datetime import datetime, timezone
+from collections import deque
+from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
-from app.config import Settings
-from app.db.writer import (
-    get_or_create_paper_position,
-    insert_paper_decision,
-    insert_paper_trade,
-    update_paper_position,
-)
+from app.config import Settings, load_paper_books
+from app.db.writer import get_or_create_paper_position, write_paper_ticks
 from app.marketdata.state import MarketState
-from app.trading.paper import execute_enter_long, execute_exit_long
-from app.trading.policy import decide_action, _compute_cost_est
+from app.tracing import get_tracer, trace_id_for
+from app.trading.exit_monitor import ExitMonitor
+from app.trading.notify import PaperTradeFeed
+from app.trading.paper import (
+    apply_risk_checks,
+    carry_risk_fields,
+    compute_equity,
+    execute_enter_long,
+    execute_exit_long,
+)
+from app.trading.policy import _compute_cost_est, decide_action, market_snapshot
 
 log = logging.getLogger(__name__)
 
@@ -30,178 +35,144 @@ WHERE symbol = :sym
 ORDER BY t0 DESC LIMIT 1
 """)
 
-_COUNT_RECENT_ENTERS = text("""
-SELECT count(*) FROM paper_trades
-WHERE symbol = :sym AND action = 'ENTER_LONG'
+_FETCH_RECENT_ENTERS = text("""
+SELECT t FROM paper_trades
+WHERE book_id = :book AND symbol = :sym AND action = 'ENTER_LONG'
   AND t >= :since
+ORDER BY t ASC
 """)
 
 _LAST_TRADE_TIME = text("""
 SELECT t FROM paper_trades
-WHERE symbol = :sym
+WHERE book_id = :book AND symbol = :sym
 ORDER BY t DESC LIMIT 1
 """)
 
 
-class PaperTradingRunner:
+class PaperBook:
+    """One named paper portfolio: own thresholds / risk limits / in-memory position.
+
+    step() is pure computation on the shared tick inputs; PaperTradingRunner
+    persists every book's rows in one transaction and then calls commit().
+    """
+
     def __init__(
         self,
+        book_id: str,
         settings: Settings,
         engine: Engine,
-        market_state: MarketState,
+        touch_event: asyncio.Event | None = None,
     ) -> None:
+        self.book_id = book_id
         self.settings = settings
         self.engine = engine
-        self.market_state = market_state
-
-    def _get_market_snapshot(self, now_utc: datetime) -> dict:
-        ms = self.market_state
-        best_bid = ms.best_bid
-        best_ask = ms.best_ask
-
-        if best_bid and best_ask and best_ask > 0:
-            mid = (best_bid + best_ask) / 2
-            spread_bps = 10000 * (best_ask - best_bid) / mid if mid > 0 else 999
-        else:
-            spread_bps = 999
-
-        lag_sec = time.time() - ms.last_update_ts if ms.last_update_ts > 0 else 999
-
-        return {
-            "best_bid": best_bid,
-            "best_ask": best_ask,
-            "spread_bps": spread_bps,
-            "lag_sec": lag_sec,
-        }
-
-    def _fetch_latest_pred(self) -> dict | None:
-        with self.engine.connect() as conn:
-            row = conn.execute(
-                _FETCH_LATEST_PRED, {"sym": self.settings.SYMBOL}
-            ).fetchone()
-        if row is None:
-            return None
-        return row._asdict()
-
-    def _count_recent_enters(self, now_utc: datetime) -> int:
-        since = now_utc - __import__("datetime").timedelta(hours=1)
-        with self.engine.connect() as conn:
-            row = conn.execute(
-                _COUNT_RECENT_ENTERS, {"sym": self.settings.SYMBOL, "since": since}
-            ).fetchone()
-        return row[0] if row else 0
-
-    def _last_trade_time(self) -> datetime | None:
+        # In-memory position state — loaded once, then owned by the book.
+        # None means "not loaded yet" (startup or after a failed tick write).
+        self._pos: dict | None = None
+        self._recent_enter_times: deque[datetime] = deque()
+        self._last_trade_time: datetime | None = None
+        # Intrabar TP/SL: fed by the quote consumer via PaperTradingRunner.on_quote
+        self.exit_monitor = ExitMonitor(settings.SLIPPAGE_BPS / 10000.0, event=touch_event)
+
+    def load_state(self, now_utc: datetime) -> None:
+        """Load position + rate-limit state from DB (startup / after a failed write)."""
+        symbol = self.settings.SYMBOL
+        pos = get_or_create_paper_position(
+            self.engine, symbol, self.settings.PAPER_INITIAL_KRW, book_id=self.book_id
+        )
+        pos.pop("updated_at", None)
+        since = now_utc - timedelta(hours=1)
+        key = {"book": self.book_id, "sym": symbol}
         with self.engine.connect() as conn:
-            row = conn.execute(
-                _LAST_TRADE_TIME, {"sym": self.settings.SYMBOL}
-            ).fetchone()
-        return row[0] if row else None
+            enters = conn.execute(_FETCH_RECENT_ENTERS, {**key, "since": since}).fetchall()
+            last = conn.execute(_LAST_TRADE_TIME, key).fetchone()
+        self._pos = pos
+        self._arm_exit_monitor(pos)
+        self._recent_enter_times = deque(r[0] for r in enters)
+        self._last_trade_time = last[0] if last else None
+        log.info(
+            "PaperBook[%s] state loaded: status=%s cash=%.0f qty=%.8f recent_enters=%d profile=%s",
+            self.book_id, pos["status"], pos["cash_krw"], pos["qty"],
+            len(self._recent_enter_times), self.settings.PAPER_POLICY_PROFILE,
+        )
 
-    def _compute_equity(self, pos: dict, snapshot: dict, action: str) -> float:
-        slip_rate = self.settings.SLIPPAGE_BPS / 10000.0
-        if pos["status"] == "LONG" and action != "EXIT_LONG":
-            bid = snapshot.get("best_bid") or 0
-            return pos["cash_krw"] + pos["qty"] * bid * (1 - slip_rate)
-        return pos["cash_krw"]
+    def reset(self) -> None:
+        """Drop in-memory state so the next tick reloads from DB."""
+        self._pos = None
+        self.exit_monitor.disarm()
 
-    def _run_tick(self, now_utc: datetime) -> None:
-        symbol = self.settings.SYMBOL
-        profile = self.settings.PAPER_POLICY_PROFILE
-        pos = get_or_create_paper_position(
-            self.engine, symbol, self.settings.PAPER_INITIAL_KRW
+    def _count_recent_enters(self, now_utc: datetime) -> int:
+        since = now_utc - timedelta(hours=1)
+        while self._recent_enter_times and self._recent_enter_times[0] < since:
+            self._recent_enter_times.popleft()
+        return len(self._recent_enter_times)
+
+    def _arm_exit_monitor(self, pos: dict) -> None:
+        if pos["status"] == "LONG" and pos.get("entry_time") is not None:
+            self.exit_monitor.arm(pos["entry_time"], pos.get("u_exec"), pos.get("d_exec"))
+        else:
+            self.exit_monitor.disarm()
+
+    def touch_is_current(self, touch: dict) -> bool:
+        pos = self._pos
+        return (
+            pos is not None
+            and pos["status"] == "LONG"
+            and pos.get("entry_time") == touch["entry_time"]
         )
-        pred = self._fetch_latest_pred()
-        snapshot = self._get_market_snapshot(now_utc)
 
-        # Rate limit / cooldown data for test mode
+    def step(self, now_utc: datetime, pred: dict | None, snapshot: dict) -> dict:
+        """Decide + execute for this book. Returns {pos, trade, decision, ...} (no DB I/O)."""
+        s = self.settings
+        symbol = s.SYMBOL
+        profile = s.PAPER_POLICY_PROFILE
+        if self._pos is None:
+            self.load_state(now_utc)
+        pos = self._pos
+
+        # Rate limit / cooldown data for test mode (in-memory, no DB reads)
         recent_enter_count = 0
         last_trade_time = None
         if profile == "test":
             recent_enter_count = self._count_recent_enters(now_utc)
-            last_trade_time = self._last_trade_time()
+            last_trade_time = self._last_trade_time
 
         action, reason, reason_flags, diag = decide_action(
-            now_utc, pos, pred, snapshot, self.settings,
+            now_utc, pos, pred, snapshot, s,
             recent_enter_count=recent_enter_count,
             last_trade_time=last_trade_time,
         )
 
         # Execute if actionable
+        trade = None
         if action == "ENTER_LONG":
-            result = execute_enter_long(pos, pred, snapshot, self.settings, now_utc)
+            result = execute_enter_long(pos, pred, snapshot, s, now_utc)
             if result is not None:
                 new_pos, trade = result
-                self._save_pos_with_risk_fields(new_pos, pos)
-                insert_paper_trade(self.engine, trade)
-                log.info(
-                    "PaperTrade ENTER: price=%.0f qty=%.8f fee=%.2f cash=%.0f u_exec=%.0f d_exec=%.0f h=%ds",
-                    trade["price"], trade["qty"], trade["fee_krw"], trade["cash_after"],
-                    new_pos.get("u_exec") or 0, new_pos.get("d_exec") or 0,
-                    new_pos.get("h_sec") or 0,
-                )
-                # Re-read pos after update for equity calc
-                pos = get_or_create_paper_position(
-                    self.engine, symbol, self.settings.PAPER_INITIAL_KRW
-                )
+                pos = carry_risk_fields(new_pos, pos, s)
             else:
-                log.warning("Paper ENTER skipped: invest_krw too small")
+                log.warning("PaperBook[%s] ENTER skipped: invest_krw too small", self.book_id)
 
         elif action == "EXIT_LONG":
-            new_pos, trade = execute_exit_long(
-                pos, snapshot, self.settings, now_utc, reason
-            )
-            self._save_pos_with_risk_fields(new_pos, pos)
-            insert_paper_trade(self.engine, trade)
-            log.info(
-                "PaperTrade EXIT(%s): price=%.0f qty=%.8f fee=%.2f pnl=%.2f pnl_rate=%.4f%% hold=%.0fs cash=%.0f",
-                reason, trade["price"], trade["qty"], trade["fee_krw"],
-                trade["pnl_krw"] or 0, (trade["pnl_rate"] or 0) * 100,
-                trade["hold_sec"] or 0, trade["cash_after"],
-            )
-            # Re-read pos after update
-            pos = get_or_create_paper_position(
-                self.engine, symbol, self.settings.PAPER_INITIAL_KRW
-            )
+            new_pos, trade = execute_exit_long(pos, snapshot, s, now_utc, reason)
+            pos = carry_risk_fields(new_pos, pos, s)
+
+        if trade is not None:
+            trade["book_id"] = self.book_id
+
+        # Equity tracking + risk HALT check
+        equity_est = compute_equity(pos, snapshot, action, s)
+        risk, dd = apply_risk_checks(pos, equity_est, now_utc, s)
+        if risk["halted"] and not pos.get("halted"):
+            if risk["halt_reason"] == "MAX_DRAWDOWN":
+                log.warning("PaperRisk[%s]: HALTED — MAX_DRAWDOWN dd=%.4f%%", self.book_id, dd * 100)
+            else:
+                log.warning("PaperRisk[%s]: HALTED — DAILY_LOSS_LIMIT equity=%.0f day_start=%.0f",
+                            self.book_id, equity_est, risk["day_start_equity"])
 
-        # Equity tracking
-        equity_est = self._compute_equity(pos, snapshot, action)
-
-        # Update equity_high
-        equity_high = pos.get("equity_high") or self.settings.PAPER_INITIAL_KRW
-        equity_high = max(equity_high, equity_est)
-
-        # Day change detection (UTC)
-        today_utc = now_utc.date()
-        day_start_date = pos.get("day_start_date")
-        day_start_equity = pos.get("day_start_equity") or self.settings.PAPER_INITIAL_KRW
-        if day_start_date is None or today_utc != day_start_date:
-            day_start_date = today_utc
-            day_start_equity = equity_est
-
-        # Drawdown
-        dd = (equity_est / (equity_high + 1e-12)) - 1.0
-
-        # Risk HALT check
-        halted = pos.get("halted") or False
-        halt_reason = pos.get("halt_reason")
-        halted_at = pos.get("halted_at")
-
-        if not halted:
-            if dd <= -self.settings.PAPER_MAX_DRAWDOWN_PCT:
-                halted = True
-                halt_reason = "MAX_DRAWDOWN"
-                halted_at = now_utc
-                log.warning("PaperRisk: HALTED — MAX_DRAWDOWN dd=%.4f%%", dd * 100)
-            elif equity_est <= day_start_equity * (1 - self.settings.PAPER_DAILY_LOSS_LIMIT_PCT):
-                halted = True
-                halt_reason = "DAILY_LOSS_LIMIT"
-                halted_at = now_utc
-                log.warning("PaperRisk: HALTED — DAILY_LOSS_LIMIT equity=%.0f day_start=%.0f",
-                            equity_est, day_start_equity)
-
-        # Save risk fields to position (even if no trade happened)
-        risk_update = {
+        # Position row for this tick (risk fields saved even if no trade happened)
+        new_state = {
+            "book_id": self.book_id,
             "symbol": symbol,
             "status": pos["status"],
             "cash_krw": pos["cash_krw"],
@@ -218,23 +189,17 @@ class PaperTradingRunner:
             "entry_z_barrier": pos.get("entry_z_barrier"),
             "entry_ev_rate": pos.get("entry_ev_rate"),
             "entry_p_none": pos.get("entry_p_none"),
-            "initial_krw": pos.get("initial_krw") or self.settings.PAPER_INITIAL_KRW,
-            "equity_high": equity_high,
-            "day_start_date": day_start_date,
-            "day_start_equity": day_start_equity,
-            "halted": halted,
-            "halt_reason": halt_reason,
-            "halted_at": halted_at,
+            **risk,
         }
-        update_paper_position(self.engine, risk_update)
 
         # Build cost estimate for decision log
         cost_est = diag.get("cost_est") or _compute_cost_est(
-            snapshot.get("spread_bps", 0), self.settings
+            snapshot.get("spread_bps", 0), s
         )
 
         decision = {
             "ts": now_utc,
+            "book_id": self.book_id,
             "symbol": symbol,
             "pos_status": pos["status"],
             "action": action,
@@ -258,35 +223,183 @@ class PaperTradingRunner:
             "drawdown_pct": dd,
             "policy_profile": profile,
         }
-        insert_paper_decision(self.engine, decision)
+
+        return {
+            "pos": new_state,
+            "trade": trade,
+            "decision": decision,
+            "action": action,
+            "reason": reason,
+            "equity_est": equity_est,
+            "dd": dd,
+        }
+
+    def commit(self, out: dict) -> None:
+        """Adopt the tick's position after its rows were written."""
+        new_state = out["pos"]
+        trade = out["trade"]
+        self._pos = new_state
+        self._arm_exit_monitor(new_state)
+
+        if trade is not None:
+            self._last_trade_time = trade["t"]
+            if trade["action"] == "ENTER_LONG":
+                self._recent_enter_times.append(trade["t"])
+                log.info(
+                    "PaperTrade[%s] ENTER: price=%.0f qty=%.8f fee=%.2f cash=%.0f u_exec=%.0f d_exec=%.0f h=%ds",
+                    self.book_id, trade["price"], trade["qty"], trade["fee_krw"], trade["cash_after"],
+                    new_state.get("u_exec") or 0, new_state.get("d_exec") or 0,
+                    new_state.get("h_sec") or 0,
+                )
+            else:
+                log.info(
+                    "PaperTrade[%s] EXIT(%s): price=%.0f qty=%.8f fee=%.2f pnl=%.2f pnl_rate=%.4f%% hold=%.0fs cash=%.0f",
+                    self.book_id, out["reason"], trade["price"], trade["qty"], trade["fee_krw"],
+                    trade["pnl_krw"] or 0, (trade["pnl_rate"] or 0) * 100,
+                    trade["hold_sec"] or 0, trade["cash_after"],
+                )
 
         log.info(
-            "Paper: pos=%s action=%s reason=%s cash=%.0f qty=%.8f equity=%.0f dd=%.4f%% halted=%s profile=%s",
-            pos["status"], action, reason, pos["cash_krw"], pos["qty"],
-            equity_est, dd * 100, halted, profile,
+            "Paper[%s]: pos=%s action=%s reason=%s cash=%.0f qty=%.8f equity=%.0f dd=%.4f%% halted=%s profile=%s",
+            self.book_id, new_state["status"], out["action"], out["reason"],
+            new_state["cash_krw"], new_state["qty"], out["equity_est"], out["dd"] * 100,
+            new_state["halted"], self.settings.PAPER_POLICY_PROFILE,
         )
 
-    def _save_pos_with_risk_fields(self, new_pos: dict, old_pos: dict) -> None:
-        """Save new position but carry over risk management fields from old."""
-        new_pos["initial_krw"] = old_pos.get("initial_krw") or self.settings.PAPER_INITIAL_KRW
-        new_pos["equity_high"] = old_pos.get("equity_high") or self.settings.PAPER_INITIAL_KRW
-        new_pos["day_start_date"] = old_pos.get("day_start_date")
-        new_pos["day_start_equity"] = old_pos.get("day_start_equity") or self.settings.PAPER_INITIAL_KRW
-        new_pos["halted"] = old_pos.get("halted") or False
-        new_pos["halt_reason"] = old_pos.get("halt_reason")
-        new_pos["halted_at"] = old_pos.get("halted_at")
-        update_paper_position(self.engine, new_pos)
+
+class PaperTradingRunner:
+    """Drives every paper book from one tick: one prediction read, one market
+    snapshot, one write transaction keyed by book_id."""
+
+    def __init__(
+        self,
+        settings: Settings,
+        engine: Engine,
+        market_state: MarketState,
+        books: dict[str, Settings] | None = None,
+        trade_feed: PaperTradeFeed | None = None,
+    ) -> None:
+        self.settings = settings
+        self.engine = engine
+        self.market_state = market_state
+        # 같은 프로세스의 ShadowExecutionRunner를 커밋 직후 깨움 (없으면 pg_notify/polling)
+        self.trade_feed = trade_feed
+        if books is None:
+            books = load_paper_books(settings)
+        # One wake-up event shared by every book's ExitMonitor
+        self._touch_event = asyncio.Event()
+        self.books = [
+            PaperBook(book_id, book_settings, engine, self._touch_event)
+            for book_id, book_settings in books.items()
+        ]
+
+    def on_quote(self, bid: float, ask: float) -> None:
+        """Quote listener for the consumer — O(1) TP/SL check per book, never touches the DB."""
+        for book in self.books:
+            book.exit_monitor.on_quote(bid, ask)
+
+    def _get_market_snapshot(self, now_utc: datetime) -> dict:
+        ms = self.market_state
+        lag_sec = time.time() - ms.last_update_ts if ms.last_update_ts > 0 else 999
+        return market_snapshot(ms.best_bid, ms.best_ask, lag_sec)
+
+    def _fetch_latest_pred(self) -> dict | None:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                _FETCH_LATEST_PRED, {"sym": self.settings.SYMBOL}
+            ).fetchone()
+        if row is None:
+            return None
+        return row._asdict()
+
+    def _run_touch_exit(self, book: PaperBook, touch: dict) -> None:
+        """Run an out-of-cycle tick for one book, priced at the quote that touched u_exec/d_exec."""
+        if not book.touch_is_current(touch):
+            return  # position already changed by a regular tick
+        snapshot = market_snapshot(touch["best_bid"], touch["best_ask"], 0.0)
+        trace_id = trace_id_for(self.settings.SYMBOL, touch["now_utc"], f":touch:{book.book_id}")
+        get_tracer().mark(
+            trace_id, "touch", symbol=self.settings.SYMBOL, pred_t0=touch["now_utc"], mono=touch["mono"],
+        )
+        self._run_tick(touch["now_utc"], snapshot=snapshot, books=[book], trace_id=trace_id)
+        log.info(
+            "IntrabarExit[%s](%s): bid=%.0f touch→write=%.1fms",
+            book.book_id, touch["reason"], touch["best_bid"],
+            (time.monotonic() - touch["mono"]) * 1000,
+        )
+
+    def _run_tick(
+        self,
+        now_utc: datetime,
+        snapshot: dict | None = None,
+        books: list[PaperBook] | None = None,
+        trace_id: str | None = None,
+    ) -> None:
+        books = self.books if books is None else books
+        tracer = get_tracer()
+        mono_start = time.monotonic()
+        pred = self._fetch_latest_pred()
+        if trace_id is None and pred is not None:
+            # 이 prediction의 trace가 아직 열려 있으면 (첫 tick) paper hop을 이어 찍음
+            trace_id = trace_id_for(self.settings.SYMBOL, pred.get("t0"))
+        tracer.mark(trace_id, "paper_start", mono=mono_start)
+        if snapshot is None:
+            snapshot = self._get_market_snapshot(now_utc)
+
+        outs = [book.step(now_utc, pred, snapshot) for book in books]
+        tracer.mark(trace_id, "paper_decided")
+
+        # Single transaction for every book's position + trade + decision.
+        # On failure drop the in-memory state so the next tick reloads from DB.
+        try:
+            trade_ids = write_paper_ticks(
+                self.engine, [(o["pos"], o["trade"], o["decision"]) for o in outs]
+            )
+        except Exception:
+            for book in books:
+                book.reset()
+            tracer.finish(trace_id)
+            raise
+        tracer.mark(trace_id, "paper_written")
+        for book, out, trade_id in zip(books, outs, trade_ids, strict=True):
+            book.commit(out)
+            if (
+                trade_id is not None
+                and self.settings.UPBIT_SHADOW_ENABLED
+                and book.book_id == self.settings.PAPER_PRIMARY_BOOK
+            ):
+                tracer.expect_shadow(trace_id, book.book_id, trade_id)
+        # primary book 체결이 없으면 여기서 완료, 있으면 ShadowExecutionRunner가 완료
+        tracer.finish(trace_id)
+        if self.trade_feed is not None and any(o["trade"] is not None for o in outs):
+            self.trade_feed.publish()
 
     async def run(self) -> None:
         interval = self.settings.DECISION_INTERVAL_SEC
+        log.info("PaperTradingRunner books: %s", [b.book_id for b in self.books])
         # Wait a bit for initial data
         await asyncio.sleep(interval + 1)
 
         while True:
+            # Between decision ticks, react to TP/SL touches pushed by the quote consumer
+            deadline = time.monotonic() + interval
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    await asyncio.wait_for(self._touch_event.wait(), timeout=remaining)
+                except TimeoutError:
+                    break
+                self._touch_event.clear()
+                for book in self.books:
+                    touch = book.exit_monitor.take()
+                    if touch is None:
+                        continue
+                    try:
+                        await asyncio.to_thread(self._run_touch_exit, book, touch)
+                    except Exception:
+                        log.exception("PaperTradingRunner intrabar exit error (book=%s)", book.book_id)
+
             now_utc = datetime.now(timezone.utc).replace(microsecond=0)
             try:
                 await asyncio.to_thread(self._run_tick, now_utc)
             except Exception:
                 log.exception("PaperTradingRunner error")
-
-            await asyncio.sleep(interval)